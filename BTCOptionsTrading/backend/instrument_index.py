@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+期权合约索引
+Instrument metadata index for ATM / expiry selection
+
+按 到期日 → 有序执行价 组织合约元数据，开仓前的选约查询全部是二分查找：
+  - 距今 T+N 天最近的到期日
+  - 某到期日上最接近现货的执行价
+  - 同执行价的 Call/Put 组合（ATM Straddle）
+
+合约列表通过 MarketSnapshot 读取（跨进程共享、带 TTL），刷新时只对新增和下架的
+合约做增量更新；已到期的合约在查询时按当前时间自动跳过并清理。
+
+使用方法：
+    index = await load_instrument_index(MarketSnapshot(session))
+    expiry = index.nearest_expiry(days=3)
+    pair = index.atm_pair(expiry, spot)
+"""
+
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from market_snapshot import INSTRUMENTS_TTL, MarketSnapshot
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86400 * 1000
+
+
+@dataclass
+class AtmPair:
+    """ATM 组合（call/put 可能因缺少同执行价合约而不同）"""
+    expiry: int                 # 到期时间（毫秒）
+    call: str
+    call_strike: float
+    put: str
+    put_strike: float
+
+    @property
+    def same_strike(self) -> bool:
+        return self.call_strike == self.put_strike
+
+
+@dataclass
+class ExpiryChain:
+    """单个到期日的合约，按执行价排序"""
+    expiry: int
+    call_strikes: list = field(default_factory=list)
+    put_strikes: list = field(default_factory=list)
+    calls: dict = field(default_factory=dict)    # strike -> instrument_name
+    puts: dict = field(default_factory=dict)
+
+    def _side(self, option_type: str):
+        if option_type == 'call':
+            return self.call_strikes, self.calls
+        return self.put_strikes, self.puts
+
+    def add(self, option_type: str, strike: float, name: str):
+        strikes, names = self._side(option_type)
+        if strike not in names:
+            bisect.insort(strikes, strike)
+        names[strike] = name
+
+    def remove(self, option_type: str, strike: float):
+        strikes, names = self._side(option_type)
+        if names.pop(strike, None) is not None:
+            del strikes[bisect.bisect_left(strikes, strike)]
+
+    def nearest_strike(self, option_type: str, spot: float) -> Optional[float]:
+        """最接近 spot 的执行价（距离相同时取较低的执行价）"""
+        strikes, _ = self._side(option_type)
+        if not strikes:
+            return None
+        i = bisect.bisect_left(strikes, spot)
+        if i == 0:
+            return strikes[0]
+        if i == len(strikes):
+            return strikes[-1]
+        lower, upper = strikes[i - 1], strikes[i]
+        return lower if spot - lower <= upper - spot else upper
+
+    def __len__(self):
+        return len(self.calls) + len(self.puts)
+
+
+class InstrumentIndex:
+    """期权合约索引（到期日 → 有序执行价）"""
+
+    def __init__(self):
+        self.expiries: list[int] = []               # 有序到期时间（毫秒）
+        self.chains: dict[int, ExpiryChain] = {}
+        self._instruments: dict[str, tuple] = {}    # name -> (expiry, option_type, strike)
+
+    def __len__(self):
+        return len(self._instruments)
+
+    def __contains__(self, instrument_name: str):
+        return instrument_name in self._instruments
+
+    # ── 更新 ──────────────────────────────────────────
+
+    def update(self, instruments: list[dict]) -> tuple[int, int]:
+        """
+        用最新的合约列表增量更新索引
+
+        Args:
+            instruments: public/get_instruments 的 result
+
+        Returns:
+            (新增数量, 删除数量)
+        """
+        latest = {}
+        for inst in instruments:
+            name = inst.get('instrument_name')
+            expiry = inst.get('expiration_timestamp')
+            strike = inst.get('strike')
+            option_type = inst.get('option_type')
+            if name and expiry and strike and option_type in ('call', 'put'):
+                latest[name] = (int(expiry), option_type, float(strike))
+
+        removed = [name for name in self._instruments if name not in latest]
+        for name in removed:
+            self._remove(name)
+
+        added = 0
+        for name, meta in latest.items():
+            if name not in self._instruments:
+                self._add(name, meta)
+                added += 1
+
+        if added or removed:
+            logger.debug(f"合约索引更新: +{added} -{len(removed)}，共 {len(self)} 个")
+        return added, len(removed)
+
+    def _add(self, name: str, meta: tuple):
+        expiry, option_type, strike = meta
+        chain = self.chains.get(expiry)
+        if chain is None:
+            chain = self.chains[expiry] = ExpiryChain(expiry)
+            bisect.insort(self.expiries, expiry)
+        chain.add(option_type, strike, name)
+        self._instruments[name] = meta
+
+    def _remove(self, name: str):
+        expiry, option_type, strike = self._instruments.pop(name)
+        chain = self.chains[expiry]
+        chain.remove(option_type, strike)
+        if not len(chain):
+            del self.chains[expiry]
+            del self.expiries[bisect.bisect_left(self.expiries, expiry)]
+
+    def prune(self, now_ms: Optional[int] = None) -> int:
+        """删除已到期的合约，返回删除数量"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        cut = bisect.bisect_right(self.expiries, now_ms)
+        removed = 0
+        for expiry in self.expiries[:cut]:
+            chain = self.chains.pop(expiry)
+            for names in (chain.calls, chain.puts):
+                for name in names.values():
+                    self._instruments.pop(name, None)
+                    removed += 1
+        del self.expiries[:cut]
+        return removed
+
+    # ── 查询 ──────────────────────────────────────────
+
+    def nearest_expiry(self, days: float, now_ms: Optional[int] = None) -> Optional[int]:
+        """
+        距 now + days 天最近的未到期到期日
+
+        Args:
+            days: 目标天数
+            now_ms: 当前时间（毫秒），默认取系统时间
+
+        Returns:
+            到期时间（毫秒），没有未到期合约时返回 None
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        self.prune(now_ms)
+        if not self.expiries:
+            return None
+
+        target = now_ms + days * DAY_MS
+        i = bisect.bisect_left(self.expiries, target)
+        candidates = self.expiries[max(i - 1, 0):i + 1]
+        return min(candidates, key=lambda e: abs(e - target))
+
+    def expiries_between(self, min_days: float, max_days: float, now_ms: Optional[int] = None) -> list[int]:
+        """到期日在 [now + min_days, now + max_days] 之间的到期时间（升序）"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        lo = bisect.bisect_left(self.expiries, now_ms + min_days * DAY_MS)
+        hi = bisect.bisect_right(self.expiries, now_ms + max_days * DAY_MS)
+        return self.expiries[lo:hi]
+
+    def nearest_strike(self, expiry: int, spot: float, option_type: str) -> Optional[str]:
+        """某到期日上执行价最接近 spot 的合约名"""
+        chain = self.chains.get(expiry)
+        if chain is None:
+            return None
+        strike = chain.nearest_strike(option_type, spot)
+        if strike is None:
+            return None
+        return chain._side(option_type)[1][strike]
+
+    def atm_pair(self, expiry: int, spot: float) -> Optional[AtmPair]:
+        """
+        某到期日的 ATM Call/Put
+
+        Call 取最接近现货的执行价；优先选同执行价的 Put，没有时取最接近现货的 Put。
+        """
+        chain = self.chains.get(expiry)
+        if chain is None:
+            return None
+        call_strike = chain.nearest_strike('call', spot)
+        if call_strike is None or not chain.puts:
+            return None
+        put_strike = call_strike if call_strike in chain.puts else chain.nearest_strike('put', spot)
+        return AtmPair(
+            expiry=expiry,
+            call=chain.calls[call_strike],
+            call_strike=call_strike,
+            put=chain.puts[put_strike],
+            put_strike=put_strike
+        )
+
+    def best_atm_pair(self, expiries: list[int], spot: float) -> Optional[AtmPair]:
+        """在多个到期日中选 Call 执行价最接近现货的 ATM 组合（距离相同时取较早到期）"""
+        best = None
+        for expiry in expiries:
+            pair = self.atm_pair(expiry, spot)
+            if pair and (best is None or abs(pair.call_strike - spot) < abs(best.call_strike - spot)):
+                best = pair
+        return best
+
+
+# 进程内按 (API 地址, 币种) 缓存的索引，长驻进程只做增量更新
+_indexes: dict[tuple, InstrumentIndex] = {}
+
+
+async def load_instrument_index(
+    snapshot: MarketSnapshot,
+    currency: str = "BTC",
+    ttl: float = INSTRUMENTS_TTL
+) -> InstrumentIndex:
+    """
+    获取合约索引（合约列表经 MarketSnapshot 缓存，索引按差异增量更新）
+
+    Args:
+        snapshot: 行情快照缓存
+        currency: 币种
+        ttl: 合约列表缓存有效期（秒）
+
+    Returns:
+        InstrumentIndex
+    """
+    key = (snapshot.base_url, currency)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = InstrumentIndex()
+    index.update(await snapshot.get_instruments(currency=currency, ttl=ttl))
+    return index
@@ -18,6 +18,9 @@ import re
 from datetime import datetime, timezone
 from pathlib import Path
 
+from market_snapshot import MarketSnapshot
+from trade_store import TradeStore
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -70,43 +73,24 @@ def is_expired(instrument: str) -> bool:
 
 
 def get_active_instruments() -> list[str]:
-    """从交易日志中提取所有持仓合约（去重）"""
-    if not TRADE_LOG.exists():
-        return []
-
-    instruments = set()
+    """成功交易涉及的所有合约（去重，来自交易存储）"""
     try:
-        content = TRADE_LOG.read_text(encoding='utf-8')
-        entries = content.split('=' * 80)
-        for entry in entries:
-            if '交易成功: True' not in entry:
-                continue
-            for line in entry.split('\n'):
-                line = line.strip()
-                # 匹配 "看涨期权: BTC-..." 或 "看跌期权: BTC-..."
-                if line.startswith('看涨期权:') or line.startswith('看跌期权:'):
-                    val = line.split(':', 1)[1].strip()
-                    if re.match(r'^BTC-\d+[A-Z]+\d+-\d+-[CP]$', val):
-                        instruments.add(val)
+        instruments = TradeStore(log_path=TRADE_LOG).instruments()
     except Exception as e:
-        logger.error(f"解析交易日志失败: {e}")
+        logger.error(f"读取交易记录失败: {e}")
+        return []
 
-    return sorted(instruments)
+    return [i for i in instruments if re.match(r'^BTC-\d+[A-Z]+\d+-\d+-[CP]$', i)]
 
 
 async def fetch_ticker(session: aiohttp.ClientSession, instrument: str) -> dict:
     """获取合约 ticker（mark_iv + mark_price）"""
     try:
-        url = f"{MAINNET_URL}/public/ticker"
-        async with session.get(url, params={"instrument_name": instrument},
-                               timeout=aiohttp.ClientTimeout(total=8)) as resp:
-            data = await resp.json()
-            if 'result' in data:
-                r = data['result']
-                return {
-                    "mark_iv": r.get('mark_iv'),       # 可能为 None（深度虚值合约）
-                    "mark_price": r.get('mark_price'),
-                }
+        r = await MarketSnapshot(session).get_ticker(instrument)
+        return {
+            "mark_iv": r.get('mark_iv'),       # 可能为 None（深度虚值合约）
+            "mark_price": r.get('mark_price'),
+        }
     except Exception as e:
         logger.warning(f"获取 {instrument} ticker 失败: {e}")
     return {"mark_iv": None, "mark_price": None}
@@ -115,11 +99,7 @@ async def fetch_ticker(session: aiohttp.ClientSession, instrument: str) -> dict:
 async def fetch_spot(session: aiohttp.ClientSession) -> float:
     """获取 BTC 现货价格"""
     try:
-        url = f"{MAINNET_URL}/public/get_index_price"
-        async with session.get(url, params={"index_name": "btc_usd"},
-                               timeout=aiohttp.ClientTimeout(total=8)) as resp:
-            data = await resp.json()
-            return data['result']['index_price']
+        return await MarketSnapshot(session).get_index_price()
     except Exception as e:
         logger.error(f"获取现货价格失败: {e}")
     return 0.0
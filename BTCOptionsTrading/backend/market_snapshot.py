@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+共享行情快照缓存
+Shared market-data snapshot cache for the cron scripts
+
+多个 cron 脚本（iv_collector / pnl_updater / take_profit_monitor / perp_strategy /
+news_impact_tracker / weighted_sentiment_cron）在同一分钟启动，原来各自请求相同的
+指数价格、ticker 和合约列表。这里把 Deribit 公共接口的结果写入本地 SQLite，
+按 (接口, 参数) 缓存并设置 TTL：
+
+  - TTL 内的数据直接读本地，不发请求
+  - 过期时用文件锁保证同一个 key 只有一个进程去请求，其余进程等待后读取结果
+  - 请求失败时可退回到不超过 max_stale 秒的旧数据
+
+使用方法：
+    async with aiohttp.ClientSession() as session:
+        snapshot = MarketSnapshot(session)
+        spot = await snapshot.get_index_price()
+        ticker = await snapshot.get_ticker("BTC-27MAR26-100000-C")
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+MAINNET_URL = "https://www.deribit.com/api/v2"
+BASE_DIR = Path(__file__).parent
+DB_PATH = BASE_DIR / "data" / "market_snapshot.db"
+
+# 默认 TTL（秒）
+INDEX_TTL = 15
+TICKER_TTL = 15
+INSTRUMENTS_TTL = 300
+BOOK_SUMMARY_TTL = 15
+CHART_TTL = 60
+# 已结束时间窗口的 K 线不会再变化
+CLOSED_CHART_TTL = 7 * 86400
+
+# 请求失败时默认可接受的旧数据年龄（秒）
+MAX_STALE = 300
+
+# 等待其他进程完成请求的最长时间（秒），超时后自己请求
+LOCK_TIMEOUT = 15
+
+
+class MarketSnapshotError(Exception):
+    """请求失败且没有可用的缓存数据"""
+
+
+class MarketSnapshot:
+    """Deribit 公共接口的共享 TTL 缓存"""
+
+    # 本进程内已初始化过的数据库，避免每次创建实例都执行建表
+    _initialized: set = set()
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        base_url: str = MAINNET_URL,
+        db_path: Path = DB_PATH,
+        request_timeout: float = 8.0
+    ):
+        """
+        Args:
+            session: aiohttp 会话（None 表示每次请求临时创建）
+            base_url: Deribit API 地址（缓存 key 包含该地址，主网和测试网互不影响）
+            db_path: 缓存数据库路径（所有脚本共用同一个文件）
+            request_timeout: 单次请求超时（秒）
+        """
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.db_path = Path(db_path)
+        self.request_timeout = request_timeout
+        self.lock_dir = self.db_path.parent / "snapshot_locks"
+        if self.db_path not in MarketSnapshot._initialized:
+            self._init_db()
+            MarketSnapshot._initialized.add(self.db_path)
+
+    # ── 常用接口 ──────────────────────────────────────
+
+    async def get_index_price(
+        self,
+        index_name: str = "btc_usd",
+        ttl: float = INDEX_TTL,
+        max_stale: float = MAX_STALE
+    ) -> float:
+        """指数价格"""
+        result = await self.fetch("public/get_index_price", {"index_name": index_name}, ttl=ttl, max_stale=max_stale)
+        return float(result['index_price'])
+
+    async def get_ticker(
+        self,
+        instrument_name: str,
+        ttl: float = TICKER_TTL,
+        max_stale: float = MAX_STALE
+    ) -> dict:
+        """合约 ticker（与 public/ticker 的 result 一致）"""
+        return await self.fetch(
+            "public/ticker", {"instrument_name": instrument_name}, ttl=ttl, max_stale=max_stale
+        )
+
+    async def get_tickers(self, instrument_names: list[str], ttl: float = TICKER_TTL) -> dict[str, dict]:
+        """
+        并发获取多个 ticker，失败的合约不包含在结果中
+        """
+        results = await asyncio.gather(
+            *(self.get_ticker(name, ttl=ttl) for name in instrument_names),
+            return_exceptions=True
+        )
+        tickers = {}
+        for name, result in zip(instrument_names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"获取 {name} ticker 失败: {result}")
+            else:
+                tickers[name] = result
+        return tickers
+
+    async def get_instruments(
+        self,
+        currency: str = "BTC",
+        kind: str = "option",
+        ttl: float = INSTRUMENTS_TTL
+    ) -> list[dict]:
+        """未到期合约列表"""
+        return await self.fetch(
+            "public/get_instruments",
+            {"currency": currency, "kind": kind, "expired": "false"},
+            ttl=ttl
+        )
+
+    async def get_book_summary(
+        self,
+        currency: str = "BTC",
+        kind: str = "option",
+        ttl: float = BOOK_SUMMARY_TTL
+    ) -> list[dict]:
+        """全市场行情摘要（mark_price / mark_iv / 买卖价等）"""
+        return await self.fetch(
+            "public/get_book_summary_by_currency",
+            {"currency": currency, "kind": kind},
+            ttl=ttl
+        )
+
+    async def get_chart_data(
+        self,
+        instrument_name: str,
+        start_timestamp: int,
+        end_timestamp: int,
+        resolution: str = "60"
+    ) -> dict:
+        """
+        K 线数据（public/get_tradingview_chart_data）
+
+        时间窗口已经结束的 K 线按 CLOSED_CHART_TTL 缓存，否则按 CHART_TTL 缓存。
+
+        Args:
+            instrument_name: 合约名
+            start_timestamp: 开始时间（毫秒）
+            end_timestamp: 结束时间（毫秒）
+            resolution: K 线周期（分钟）
+        """
+        closed = end_timestamp < (time.time() - 3600) * 1000
+        return await self.fetch(
+            "public/get_tradingview_chart_data",
+            {
+                "instrument_name": instrument_name,
+                "start_timestamp": start_timestamp,
+                "end_timestamp": end_timestamp,
+                "resolution": resolution
+            },
+            ttl=CLOSED_CHART_TTL if closed else CHART_TTL
+        )
+
+    # ── 通用读取 ──────────────────────────────────────
+
+    async def fetch(self, method: str, params: dict, ttl: float, max_stale: float = MAX_STALE):
+        """
+        读取公共接口结果（优先使用缓存）
+
+        Args:
+            method: 接口名，如 "public/ticker"
+            params: 请求参数
+            ttl: 缓存有效期（秒）
+            max_stale: 请求失败时可接受的旧数据年龄（秒）
+
+        Returns:
+            接口返回的 result 字段
+
+        Raises:
+            MarketSnapshotError: 请求失败且没有可用的旧数据
+        """
+        key = self._key(method, params)
+
+        cached = self._read(key, ttl)
+        if cached is not None:
+            return cached
+
+        async with self._single_flight(key):
+            # 等锁期间其他进程可能已经取到了
+            cached = self._read(key, ttl)
+            if cached is not None:
+                return cached
+
+            try:
+                result = await self._request(method, params)
+            except Exception as e:
+                stale = self._read(key, max_stale)
+                if stale is not None:
+                    logger.warning(f"{method} 请求失败，使用缓存数据: {e}")
+                    return stale
+                raise MarketSnapshotError(f"{method} 请求失败: {e}") from e
+
+            self._write(key, result)
+            return result
+
+    async def _request(self, method: str, params: dict):
+        url = f"{self.base_url}/{method}"
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+
+        if self.session is not None:
+            async with self.session.get(url, params=params, timeout=timeout) as resp:
+                data = await resp.json()
+        else:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, params=params, timeout=timeout) as resp:
+                    data = await resp.json()
+
+        if 'result' not in data:
+            raise MarketSnapshotError(f"接口错误: {data.get('error', data)}")
+        return data['result']
+
+    # ── 存储 ──────────────────────────────────────────
+
+    def _key(self, method: str, params: dict) -> str:
+        return f"{self.base_url}/{method}?{json.dumps(params, sort_keys=True)}"
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA busy_timeout = 10000")
+        return conn
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            # WAL：多个脚本同时读写不互相阻塞
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    key        TEXT PRIMARY KEY,
+                    fetched_at REAL NOT NULL,   -- Unix timestamp (seconds)
+                    payload    TEXT NOT NULL    -- JSON
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _read(self, key: str, max_age: float):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM snapshots WHERE key = ? AND fetched_at >= ?",
+                (key, time.time() - max_age)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, key: str, result):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots(key, fetched_at, payload) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(result))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def purge(self, older_than: float = 86400) -> int:
+        """删除超过 older_than 秒的缓存和锁文件，返回删除的缓存条数"""
+        cutoff = time.time() - older_than
+        conn = self._connect()
+        try:
+            cursor = conn.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,))
+            conn.commit()
+            deleted = cursor.rowcount
+        finally:
+            conn.close()
+
+        if self.lock_dir.is_dir():
+            for lock_path in self.lock_dir.glob("*.lock"):
+                try:
+                    if lock_path.stat().st_mtime < cutoff:
+                        self._unlink_lock(lock_path)
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    @staticmethod
+    def _unlink_lock(lock_path: Path):
+        """只删除当前没有进程持有的锁文件"""
+        fd = os.open(lock_path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return
+        try:
+            lock_path.unlink()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    @asynccontextmanager
+    async def _single_flight(self, key: str):
+        """跨进程的 per-key 互斥（flock），等待时不阻塞事件循环"""
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.lock_dir / (hashlib.sha1(key.encode()).hexdigest() + ".lock")
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        locked = False
+        try:
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.warning(f"等待缓存锁超时，直接请求: {key}")
+                        break
+                    await asyncio.sleep(0.05)
+            yield
+        finally:
+            if locked:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
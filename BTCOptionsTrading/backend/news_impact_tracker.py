@@ -21,6 +21,9 @@ import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 
+from market_snapshot import CLOSED_CHART_TTL, MarketSnapshot
+from trade_store import TradeStore, select_fields
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -34,58 +37,30 @@ CHECKPOINTS = [1, 4, 24]  # 小时
 
 
 def parse_trades() -> list[dict]:
-    """从 trades.log 提取成功交易的新闻信息（只取 23MAR26 及以后）"""
-    if not TRADE_LOG.exists():
-        return []
-
-    trades = []
-    EXCLUDED = ('27MAR26', '20MAR26')
-
+    """读取成功交易的新闻信息（只取 23MAR26 及以后）"""
     try:
-        content = TRADE_LOG.read_text(encoding='utf-8')
-        for entry in content.split('=' * 80):
-            entry = entry.strip()
-            if not entry or '交易成功: True' not in entry:
-                continue
-
-            t = {}
-            for line in entry.split('\n'):
-                line = line.strip()
-                if ':' not in line:
-                    continue
-                k, v = line.split(':', 1)
-                k, v = k.strip(), v.strip()
-                if k == '交易时间':
-                    t['trade_time'] = v
-                elif k == '新闻 ID':
-                    t['news_id'] = v
-                elif k == '新闻内容':
-                    t['news_content'] = v
-                elif k == '情绪':
-                    t['sentiment'] = v
-                elif k == '重要性评分':
-                    t['score'] = v
-                elif k == '现货价格':
-                    try:
-                        t['spot_at_trade'] = float(v.replace('$', '').replace(',', ''))
-                    except Exception:
-                        pass
-                elif k == '看涨期权':
-                    t['call_instrument'] = v
-                elif k == 'Combo ID':
-                    t['combo_id'] = v
-
-            if 'trade_time' not in t or 'call_instrument' not in t:
-                continue
-            if any(ex in t.get('call_instrument', '') for ex in EXCLUDED):
-                continue
-
-            trades.append(t)
-
+        trades = TradeStore(log_path=TRADE_LOG).successful_trades()
     except Exception as e:
-        logger.error(f"解析 trades.log 失败: {e}")
+        logger.error(f"读取交易记录失败: {e}")
+        return []
 
-    return trades
+    results = []
+    for t in trades:
+        if not t['call_instrument']:
+            continue
+        trade = select_fields(t, {
+            'trade_time': 'trade_time',
+            'news_id': 'news_id',
+            'news_content': 'news_content',
+            'sentiment': 'sentiment',
+            'spot_at_trade': 'spot_price',
+            'call_instrument': 'call_instrument',
+            'combo_id': 'combo_id',
+        })
+        if t['importance_score'] is not None:
+            trade['score'] = f"{t['importance_score']:g}/10"
+        results.append(trade)
+    return results
 
 
 async def fetch_btc_price_at(session: aiohttp.ClientSession, ts: int) -> float:
@@ -95,19 +70,14 @@ async def fetch_btc_price_at(session: aiohttp.ClientSession, ts: int) -> float:
         start_ts = (ts // 3600) * 3600 * 1000  # 对齐到小时，毫秒
         end_ts = start_ts + 3600 * 1000
 
-        url = f"{MAINNET_URL}/public/get_tradingview_chart_data"
-        params = {
-            "instrument_name": "BTC-PERPETUAL",
-            "start_timestamp": start_ts,
-            "end_timestamp": end_ts,
-            "resolution": "60"  # 1小时
-        }
-        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-            data = await resp.json()
-            if 'result' in data and data['result'].get('status') == 'ok':
-                closes = data['result'].get('close', [])
-                if closes:
-                    return float(closes[-1])
+        # 已结束的K线由共享快照长期缓存，多次运行不会重复请求
+        result = await MarketSnapshot(session).get_chart_data(
+            "BTC-PERPETUAL", start_ts, end_ts, resolution="60"  # 1小时
+        )
+        if result.get('status') == 'ok':
+            closes = result.get('close', [])
+            if closes:
+                return float(closes[-1])
     except Exception as e:
         logger.warning(f"获取 ts={ts} 价格失败: {e}")
     return 0.0
@@ -155,22 +125,13 @@ async def fetch_iv_from_deribit(session: aiohttp.ClientSession, instrument: str,
         # 拉取 T0 前后 25 小时的 1 小时 K 线
         start_ms = (t0_ts - 3600) * 1000
         end_ms = (t0_ts + 25 * 3600) * 1000
-        url = f"{MAINNET_URL}/public/get_tradingview_chart_data"
-        params = {
-            "instrument_name": instrument,
-            "start_timestamp": start_ms,
-            "end_timestamp": end_ms,
-            "resolution": "60"
-        }
-        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-            data = await resp.json()
-            if 'result' not in data or data['result'].get('status') != 'ok':
-                return {}
-            result_data = data['result']
-            ticks = result_data.get('ticks', [])
-            iv_vals = result_data.get('iv', [])  # mark_iv 字段
-            if not ticks or not iv_vals or len(ticks) != len(iv_vals):
-                return {}
+        result_data = await MarketSnapshot(session).get_chart_data(instrument, start_ms, end_ms, resolution="60")
+        if result_data.get('status') != 'ok':
+            return {}
+        ticks = result_data.get('ticks', [])
+        iv_vals = result_data.get('iv', [])  # mark_iv 字段
+        if not ticks or not iv_vals or len(ticks) != len(iv_vals):
+            return {}
 
         # 找最接近 T0 的点
         t0_row = min(zip(ticks, iv_vals), key=lambda x: abs(x[0] - t0_ts * 1000))
@@ -330,6 +291,11 @@ async def update_impact():
     IMPACT_FILE.write_text(json.dumps(impact_data, ensure_ascii=False, indent=2), encoding='utf-8')
     logger.info(f"完成，更新 {updated} 条，共 {len(impact_data)} 条记录")
 
+    # 每条新闻的K线窗口都是新的缓存 key，定期清理过期缓存和锁文件
+    purged = MarketSnapshot().purge(older_than=CLOSED_CHART_TTL)
+    if purged:
+        logger.info(f"清理过期行情缓存 {purged} 条")
+
 
 if __name__ == "__main__":
     asyncio.run(update_impact())
@@ -22,6 +22,8 @@ from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
+from market_snapshot import MarketSnapshot
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).parent
@@ -90,9 +92,8 @@ async def authenticate(session: aiohttp.ClientSession, api_key: str, api_secret:
 
 async def get_spot_price(session: aiohttp.ClientSession) -> float:
     try:
-        r = await session.get(f"{MAINNET_URL}/public/get_index_price",
-                              params={"index_name": "btc_usd"})
-        return (await r.json())['result']['index_price']
+        # 入场记录和止损都依赖现价：请求失败时不使用旧数据
+        return await MarketSnapshot(session).get_index_price(max_stale=0)
     except Exception:
         return 0.0
 
@@ -316,10 +317,7 @@ async def check_and_close_expired():
     # 获取当前价格（用于止损检查）
     current_spot = 0.0
     try:
-        async with aiohttp.ClientSession() as session:
-            r = await session.get(f"{MAINNET_URL}/public/get_index_price",
-                                  params={"index_name": "btc_usd"})
-            current_spot = (await r.json())['result']['index_price']
+        current_spot = await MarketSnapshot().get_index_price(max_stale=0)
     except Exception:
         pass
 
@@ -18,6 +18,9 @@ import re
 from datetime import datetime, timezone
 from pathlib import Path
 
+from market_snapshot import MarketSnapshot
+from trade_store import TradeStore, select_fields
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -32,92 +35,40 @@ PNL_FILE = BASE_DIR / "data" / "pnl_history.json"
 
 
 def parse_trade_log():
-    """解析交易日志，提取每个持仓的入场信息"""
-    if not TRADE_LOG.exists():
-        return []
-
-    positions = []
+    """读取成功交易的入场信息（交易存储的索引查询）"""
     try:
-        content = TRADE_LOG.read_text(encoding='utf-8')
-        entries = content.split('=' * 80)
-
-        for entry in entries:
-            entry = entry.strip()
-            if not entry or '交易成功: True' not in entry:
-                continue
-
-            pos = {}
-            lines = entry.split('\n')
-            current_side = None  # 'call' or 'put'
-
-            for line in lines:
-                line = line.strip()
-                if not line or ':' not in line:
-                    continue
-                key, value = line.split(':', 1)
-                key, value = key.strip(), value.strip()
-
-                if key == '交易时间':
-                    pos['trade_time'] = value
-                elif key == '现货价格':
-                    pos['spot_price'] = float(value.replace('$', '').replace(',', ''))
-                elif key == '看涨期权':
-                    pos['call_instrument'] = value
-                    current_side = 'call'
-                elif key == '看跌期权':
-                    pos['put_instrument'] = value
-                    current_side = 'put'
-                elif key == '入场价(BTC)':
-                    if current_side == 'call':
-                        pos['call_entry_btc'] = float(value)
-                    elif current_side == 'put':
-                        pos['put_entry_btc'] = float(value)
-                elif key == '权利金' and '入场价(BTC)' not in pos.get('_seen', ''):
-                    # 兼容旧日志（没有入场价字段，用权利金代替）
-                    btc_val = float(value.replace(' BTC', ''))
-                    if current_side == 'call' and 'call_entry_btc' not in pos:
-                        pos['call_entry_btc'] = btc_val
-                    elif current_side == 'put' and 'put_entry_btc' not in pos:
-                        pos['put_entry_btc'] = btc_val
-                elif key == '总成本':
-                    pos['total_cost'] = float(value.replace('$', '').replace(',', ''))
-                elif key == '虚拟交易':
-                    pos['is_virtual'] = value == 'True'
-                elif key == '下单数量':
-                    try:
-                        pos['quantity'] = float(value.replace(' BTC', ''))
-                    except Exception:
-                        pass
-
-            if 'call_instrument' in pos and 'put_instrument' in pos:
-                positions.append(pos)
-
+        trades = TradeStore(log_path=TRADE_LOG).successful_trades()
     except Exception as e:
-        logger.error(f"解析交易日志失败: {e}")
+        logger.error(f"读取交易记录失败: {e}")
+        return []
 
-    # 只保留 23MAR26 及以后的合约
-    EXCLUDED = ('27MAR26', '20MAR26')
-    positions = [
-        p for p in positions
-        if not any(ex in p.get('call_instrument', '') for ex in EXCLUDED)
+    return [
+        select_fields(t, {
+            'trade_time': 'trade_time',
+            'spot_price': 'spot_price',
+            'call_instrument': 'call_instrument',
+            'put_instrument': 'put_instrument',
+            'call_entry_btc': 'call_entry_btc',
+            'put_entry_btc': 'put_entry_btc',
+            'total_cost': 'total_cost',
+            'is_virtual': 'is_virtual',
+            'quantity': 'quantity',
+        })
+        for t in trades
+        if t['call_instrument'] and t['put_instrument']
     ]
-    return positions
 
 
 async def get_current_price(session: aiohttp.ClientSession, instrument_name: str) -> dict:
     """从主网获取合约当前价格"""
     try:
-        url = f"{MAINNET_URL}/public/ticker"
-        async with session.get(url, params={"instrument_name": instrument_name}) as resp:
-            data = await resp.json()
-            if 'result' in data:
-                r = data['result']
-                return {
-                    "mark_price": r.get('mark_price', 0.0),
-                    "mark_iv": r.get('mark_iv', 0.0),
-                    "best_bid": r.get('best_bid_price', 0.0),
-                    "best_ask": r.get('best_ask_price', 0.0),
-                }
+        r = await MarketSnapshot(session).get_ticker(instrument_name)
+        return {
+            "mark_price": r.get('mark_price', 0.0),
+            "mark_iv": r.get('mark_iv', 0.0),
+            "best_bid": r.get('best_bid_price', 0.0),
+            "best_ask": r.get('best_ask_price', 0.0),
+        }
     except Exception as e:
         logger.warning(f"获取 {instrument_name} 价格失败: {e}")
     return {"mark_price": 0.0, "mark_iv": 0.0, "best_bid": 0.0, "best_ask": 0.0}
@@ -126,10 +77,7 @@ async def get_current_price(session: aiohttp.ClientSession, instrument_name: str
 async def get_spot_price(session: aiohttp.ClientSession) -> float:
     """获取 BTC 现货价格"""
     try:
-        url = f"{MAINNET_URL}/public/get_index_price"
-        async with session.get(url, params={"index_name": "btc_usd"}) as resp:
-            data = await resp.json()
-            return data['result']['index_price']
+        return await MarketSnapshot(session).get_index_price()
     except Exception as e:
         logger.error(f"获取现货价格失败: {e}")
         return 0.0
@@ -2,6 +2,7 @@
 策略管理API接口
 """
 
+import math
 from typing import List, Optional, Dict
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
@@ -74,15 +75,61 @@ class RiskCalculateRequest(BaseModel):
     volatility: Optional[float] = 0.8
 
 
+class BatchRiskCalculateRequest(BaseModel):
+    """批量风险计算请求模型（候选策略打分）"""
+    candidates: List[List[StrategyLegRequest]]
+    spot_price: float
+    risk_free_rate: Optional[float] = 0.05
+    volatility: Optional[float] = 0.8
+    sort_by: Optional[str] = None  # probability_of_profit / risk_reward_ratio / max_loss
+
+
 class RiskMetricsResponse(BaseModel):
-    """风险指标响应模型"""
+    """风险指标响应模型（收益或损失无限时对应字段为null）"""
     greeks: Dict[str, float]
     initial_cost: float
-    max_profit: float
-    max_loss: float
+    max_profit: Optional[float]
+    max_loss: Optional[float]
     breakeven_points: List[float]
-    risk_reward_ratio: float
+    risk_reward_ratio: Optional[float]
     probability_of_profit: Optional[float]
+    unlimited_profit: bool = False
+    unlimited_loss: bool = False
+
+
+class BatchRiskMetricsResponse(BaseModel):
+    """批量风险计算响应模型"""
+    results: List[RiskMetricsResponse]
+    ranking: List[int]  # 按sort_by排序后的候选下标
+
+
+# 压力测试立方体的最大格点数（价格 x 波动率 x 时间）
+MAX_STRESS_CUBE_CELLS = 100_000
+
+
+class StressCubeRequest(BaseModel):
+    """压力测试立方体请求模型"""
+    legs: List[StrategyLegRequest]
+    spot_price: float
+    risk_free_rate: Optional[float] = 0.05
+    volatility: Optional[float] = 0.8
+    spot_shocks: Optional[List[float]] = None   # 相对价格冲击，如 -0.2 表示下跌20%
+    vol_shocks: Optional[List[float]] = None    # 相对波动率冲击
+    days_forward: Optional[List[float]] = None  # 时间推进天数
+    scenarios: Optional[List[Dict]] = None      # 自定义历史情景（name/spot_shock/vol_shock/days_forward）
+
+
+class StressCubeResponse(BaseModel):
+    """压力测试立方体响应模型"""
+    base_value: float
+    spot_price: float
+    spot_shocks: List[float]
+    vol_shocks: List[float]
+    days_forward: List[float]
+    pnl: List[List[List[float]]]
+    worst_case: Dict[str, float]
+    worst_by_day: List[Dict[str, float]]
+    historical: List[Dict]
 
 
 class StrategyResponse(BaseModel):
@@ -522,6 +569,45 @@ async def validate_strategy(request: StrategyValidateRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _risk_legs(legs: List[StrategyLegRequest], volatility: float) -> List[Dict]:
+    """将请求中的策略腿转换为风险计算器使用的字典格式"""
+    return [
+        {
+            "option_contract": {
+                "instrument_name": leg.option_contract.instrument_name,
+                "underlying": leg.option_contract.underlying,
+                "option_type": leg.option_contract.option_type,
+                "strike_price": leg.option_contract.strike_price,
+                "expiration_date": leg.option_contract.expiration_date.isoformat(),
+                "implied_volatility": volatility
+            },
+            "action": leg.action,
+            "quantity": leg.quantity
+        }
+        for leg in legs
+    ]
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    """JSON不支持inf，无限值返回None"""
+    return value if math.isfinite(value) else None
+
+
+def _risk_metrics_response(risk_metrics: Dict) -> RiskMetricsResponse:
+    """将风险计算器结果转换为响应模型"""
+    return RiskMetricsResponse(
+        greeks=risk_metrics['greeks'],
+        initial_cost=risk_metrics['initial_cost'],
+        max_profit=_finite_or_none(risk_metrics['max_profit']),
+        max_loss=_finite_or_none(risk_metrics['max_loss']),
+        breakeven_points=risk_metrics['breakeven_points'],
+        risk_reward_ratio=_finite_or_none(risk_metrics['risk_reward_ratio']),
+        probability_of_profit=risk_metrics.get('probability_of_profit'),
+        unlimited_profit=risk_metrics.get('unlimited_profit', False),
+        unlimited_loss=risk_metrics.get('unlimited_loss', False)
+    )
+
+
 @router.post("/calculate-risk", response_model=RiskMetricsResponse)
 async def calculate_strategy_risk(request: RiskCalculateRequest):
     """
@@ -535,21 +621,7 @@ async def calculate_strategy_risk(request: RiskCalculateRequest):
     """
     try:
         # 转换legs为字典格式
-        legs_dict = []
-        for leg in request.legs:
-            leg_dict = {
-                "option_contract": {
-                    "instrument_name": leg.option_contract.instrument_name,
-                    "underlying": leg.option_contract.underlying,
-                    "option_type": leg.option_contract.option_type,
-                    "strike_price": leg.option_contract.strike_price,
-                    "expiration_date": leg.option_contract.expiration_date.isoformat(),
-                    "implied_volatility": request.volatility
-                },
-                "action": leg.action,
-                "quantity": leg.quantity
-            }
-            legs_dict.append(leg_dict)
+        legs_dict = _risk_legs(request.legs, request.volatility)
         
         # 创建风险计算器
         from src.pricing.options_engine import OptionsEngine
@@ -566,15 +638,102 @@ async def calculate_strategy_risk(request: RiskCalculateRequest):
             volatility=request.volatility
         )
         
-        return RiskMetricsResponse(
-            greeks=risk_metrics['greeks'],
-            initial_cost=risk_metrics['initial_cost'],
-            max_profit=risk_metrics['max_profit'],
-            max_loss=risk_metrics['max_loss'],
-            breakeven_points=risk_metrics['breakeven_points'],
-            risk_reward_ratio=risk_metrics['risk_reward_ratio'],
-            probability_of_profit=risk_metrics.get('probability_of_profit')
+        return _risk_metrics_response(risk_metrics)
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# 批量打分的排序键（越大越好）
+_RANKING_KEYS = {
+    "probability_of_profit": lambda m: m['probability_of_profit'],
+    "risk_reward_ratio": lambda m: m['risk_reward_ratio'],
+    "max_loss": lambda m: m['max_loss'],
+}
+
+
+@router.post("/calculate-risk/batch", response_model=BatchRiskMetricsResponse)
+async def calculate_strategies_risk(request: BatchRiskCalculateRequest):
+    """
+    批量计算候选策略的风险指标并排序
+    
+    Args:
+        request: 批量风险计算请求
+    
+    Returns:
+        每个候选的风险指标（按输入顺序）及排序后的下标
+    """
+    if request.sort_by is not None and request.sort_by not in _RANKING_KEYS:
+        raise HTTPException(status_code=400, detail=f"不支持的排序字段: {request.sort_by}")
+    
+    try:
+        from src.pricing.options_engine import OptionsEngine
+        from src.risk.risk_calculator import RiskCalculator
+        
+        risk_calculator = RiskCalculator(OptionsEngine())
+        results = risk_calculator.calculate_strategies_risk(
+            strategies=[_risk_legs(legs, request.volatility) for legs in request.candidates],
+            spot_price=request.spot_price,
+            risk_free_rate=request.risk_free_rate,
+            volatility=request.volatility
+        )
+        
+        ranking = list(range(len(results)))
+        if request.sort_by is not None:
+            key = _RANKING_KEYS[request.sort_by]
+            ranking.sort(key=lambda i: key(results[i]), reverse=True)
+        
+        return BatchRiskMetricsResponse(
+            results=[_risk_metrics_response(m) for m in results],
+            ranking=ranking
         )
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/stress-cube", response_model=StressCubeResponse)
+async def calculate_stress_cube(request: StressCubeRequest):
+    """
+    策略压力测试：价格 x 波动率 x 时间 三维情景网格及历史情景回放
+    
+    Args:
+        request: 压力测试请求
+    
+    Returns:
+        P&L立方体、最坏情景及历史情景结果
+    """
+    # 立方体大小 = 价格 x 波动率 x 时间，按持仓分块不能限制输出大小
+    grid_size = math.prod(
+        len(axis) if axis is not None else 1
+        for axis in (request.spot_shocks, request.vol_shocks, request.days_forward)
+    )
+    if grid_size > MAX_STRESS_CUBE_CELLS or len(request.scenarios or []) > MAX_STRESS_CUBE_CELLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"情景网格过大：最多 {MAX_STRESS_CUBE_CELLS} 个格点，请求 {grid_size} 个"
+        )
+    
+    try:
+        from src.pricing.options_engine import OptionsEngine
+        from src.risk.risk_calculator import RiskCalculator
+        
+        risk_calculator = RiskCalculator(OptionsEngine())
+        result = risk_calculator.strategy_stress_test(
+            strategy_legs=_risk_legs(request.legs, request.volatility),
+            spot_price=request.spot_price,
+            risk_free_rate=request.risk_free_rate,
+            volatility=request.volatility,
+            spot_shocks=request.spot_shocks,
+            vol_shocks=request.vol_shocks,
+            days_forward=request.days_forward,
+            scenarios=request.scenarios
+        )
+        
+        return StressCubeResponse(
+            **result['cube'].to_dict(),
+            historical=result['historical']
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -4,5 +4,17 @@
 """
 
 from .backtest_engine import BacktestEngine
+from .parameter_sweep import (
+    ParameterSweepRunner, SweepConfig, SweepSettings, SweepSummary,
+    SweepResultStore, build_sweep_grid
+)
 
-__all__ = ['BacktestEngine']
+__all__ = [
+    'BacktestEngine',
+    'ParameterSweepRunner',
+    'SweepConfig',
+    'SweepSettings',
+    'SweepSummary',
+    'SweepResultStore',
+    'build_sweep_grid',
+]
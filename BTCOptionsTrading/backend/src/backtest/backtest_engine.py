@@ -15,6 +15,7 @@ from src.core.models import (
     Position, Portfolio, TradeAction, ActionType, OptionType
 )
 from src.pricing.options_engine import OptionsEngine
+from src.historical.columnar_store import ColumnarMarketData
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -27,7 +28,8 @@ class BacktestEngine(IBacktestEngine):
         self,
         options_engine: Optional[OptionsEngine] = None,
         use_historical_data: bool = None,
-        historical_data_manager=None
+        historical_data_manager=None,
+        market_data: Optional[ColumnarMarketData] = None
     ):
         """
         初始化回测引擎
@@ -36,6 +38,8 @@ class BacktestEngine(IBacktestEngine):
             options_engine: 期权定价引擎（可选，默认创建新实例）
             use_historical_data: 是否使用历史数据（None表示根据配置决定）
             historical_data_manager: 历史数据管理器实例（当use_historical_data=True时需要）
+            market_data: 预先构建的列式行情数据（如参数扫描的共享内存数据），
+                提供时无需historical_data_manager
         """
         from src.config.settings import Settings
         settings = Settings()
@@ -51,10 +55,11 @@ class BacktestEngine(IBacktestEngine):
         self.strict_mode = settings.is_strict_mode
         self.historical_data_manager = historical_data_manager
         self.historical_dataset = None
+        self.market_data = market_data
         
         # 严格模式下的验证
         if self.use_historical_data:
-            if not historical_data_manager:
+            if not historical_data_manager and market_data is None:
                 if self.strict_mode:
                     raise ValueError(
                         "Strict mode requires historical_data_manager when use_historical_data=True. "
@@ -77,7 +82,9 @@ class BacktestEngine(IBacktestEngine):
         start_date: datetime,
         end_date: datetime,
         initial_capital: Decimal,
-        underlying_symbol: str = "BTC"
+        underlying_symbol: str = "BTC",
+        vectorized: bool = False,
+        timestep: timedelta = timedelta(days=1)
     ) -> BacktestResult:
         """
         运行回测
@@ -88,6 +95,8 @@ class BacktestEngine(IBacktestEngine):
             end_date: 回测结束日期
             initial_capital: 初始资金
             underlying_symbol: 标的资产符号
+            vectorized: 是否使用向量化模拟（一次数组运算重估所有时间步和持仓）
+            timestep: 向量化模式的时间步长（支持小时级、分钟级）
             
         Returns:
             BacktestResult对象，包含完整的回测结果
@@ -107,6 +116,9 @@ class BacktestEngine(IBacktestEngine):
                 check_completeness=True
             )
             
+            # 一次性转换为列式数据，后续按日期常数时间查询
+            self.market_data = ColumnarMarketData.from_dataset(self.historical_dataset)
+            
             if self.historical_dataset.coverage_stats:
                 coverage = self.historical_dataset.coverage_stats.coverage_percentage
                 logger.info(f"Historical data coverage: {coverage:.1%}")
@@ -117,6 +129,11 @@ class BacktestEngine(IBacktestEngine):
                         f"Missing {len(self.historical_dataset.coverage_stats.missing_dates)} dates"
                     )
         
+        if vectorized:
+            return self._run_vectorized_backtest(
+                strategy, start_date, end_date, initial_capital, timestep
+            )
+        
         # 初始化组合
         portfolio = Portfolio(
             cash_balance=initial_capital,
@@ -136,6 +153,7 @@ class BacktestEngine(IBacktestEngine):
         current_date = start_date
         previous_portfolio_value = initial_capital
         cumulative_pnl = Decimal(0)
+        realized_pnl = Decimal(0)
         
         while current_date <= end_date:
             # 更新期权价格和希腊字母
@@ -148,6 +166,10 @@ class BacktestEngine(IBacktestEngine):
             expired_trades = self._check_and_handle_expiry(portfolio, current_date)
             trades.extend(expired_trades)
             
+            # 已实现盈亏按事件累加，避免每天对全部交易重新求和
+            for trade in expired_trades:
+                realized_pnl += trade.pnl
+            
             # 更新组合价值
             portfolio.total_value = self._calculate_portfolio_value(portfolio)
             
@@ -160,7 +182,7 @@ class BacktestEngine(IBacktestEngine):
                 portfolio_value=portfolio.total_value,
                 daily_pnl=daily_change,
                 cumulative_pnl=cumulative_pnl,
-                realized_pnl=sum(t.pnl for t in trades if t.action == TradeAction.CLOSE),
+                realized_pnl=realized_pnl,
                 unrealized_pnl=portfolio.total_unrealized_pnl
             ))
             
@@ -201,6 +223,258 @@ class BacktestEngine(IBacktestEngine):
         return result
 
     
+    def _run_vectorized_backtest(
+        self,
+        strategy: Strategy,
+        start_date: datetime,
+        end_date: datetime,
+        initial_capital: Decimal,
+        timestep: timedelta
+    ) -> BacktestResult:
+        """
+        向量化回测
+        
+        建仓后持仓只会因到期而减少，因此整个回测区间可以表示为
+        (时间步 × 持仓) 矩阵：标的价格、剩余期限和历史价格按列生成，
+        所有持仓在所有时间步上的估值由批量定价一次完成；现金和已实现盈亏
+        由到期结算事件的累加得到。
+        
+        与逐日循环的区别：
+        - 剩余期限按实际时间计算，支持小时级、分钟级时间步
+        - 完全重估已包含时间价值衰减，不再额外叠加theta
+        - 空头持仓按负价值计入组合，到期结算按持仓方向收付现金
+        
+        Args:
+            strategy: 交易策略
+            start_date: 回测开始时间
+            end_date: 回测结束时间
+            initial_capital: 初始资金
+            timestep: 时间步长
+            
+        Returns:
+            BacktestResult对象，daily_pnl按时间步记录
+        """
+        if timestep <= timedelta(0):
+            raise ValueError("timestep must be positive")
+        
+        grid = self._build_time_grid(start_date, end_date, timestep)
+        if grid.size == 0:
+            raise ValueError("end_date must not be earlier than start_date")
+        
+        portfolio = Portfolio(
+            cash_balance=initial_capital,
+            total_value=initial_capital
+        )
+        trades = self._open_strategy_positions(strategy, portfolio, start_date)
+        positions = list(portfolio.positions)
+        
+        n_steps = grid.size
+        intraday = timestep < timedelta(days=1)
+        
+        # 持仓参数（每个持仓一列）
+        options = [p.option_contract for p in positions]
+        strikes = np.array([float(o.strike_price) for o in options])
+        sigmas = np.array([o.implied_volatility for o in options], dtype=np.float64)
+        is_call = np.array([o.option_type == OptionType.CALL for o in options], dtype=bool)
+        quantities = np.array([p.quantity for p in positions], dtype=np.float64)
+        entry_prices = np.array([float(p.entry_price) for p in positions])
+        expiries = np.array(
+            [o.expiration_date.replace(tzinfo=None) for o in options], dtype='datetime64[us]'
+        )
+        
+        # 到期所在的时间步（区间内不到期为n_steps）；日级步长按日期比较，与逐日循环一致
+        if intraday:
+            expiry_step = np.searchsorted(grid, expiries, side='left')
+        else:
+            expiry_step = np.searchsorted(
+                grid.astype('datetime64[D]'), expiries.astype('datetime64[D]'), side='left'
+            )
+        
+        spot = self._underlying_price_path(grid)
+        
+        # 没有有效波动率的持仓无法用模型定价，保持建仓价格（与逐日循环定价失败时一致）
+        priceable = sigmas > 0
+        safe_sigmas = np.where(priceable, sigmas, 1.0)
+        
+        positions_value = np.zeros(n_steps)
+        unrealized = np.zeros(n_steps)
+        last_prices = entry_prices
+        
+        # 按时间分块，限制 (时间步 × 持仓) 矩阵的内存
+        chunk = max(1, 500_000 // max(len(positions), 1))
+        for lo in range(0, n_steps if positions else 0, chunk):
+            hi = min(lo + chunk, n_steps)
+            times = grid[lo:hi]
+            
+            time_to_expiry = (expiries[None, :] - times[:, None]) / np.timedelta64(1, 's') / (365.0 * 86400)
+            model_prices = self.options_engine.price_batch(
+                S=spot[lo:hi, None],
+                K=strikes,
+                T=np.maximum(time_to_expiry, 0.0),
+                r=0.05,
+                sigma=safe_sigmas,
+                option_types=is_call,
+                validate=False
+            ).price
+            prices = np.where(priceable, model_prices, entry_prices)
+            
+            historical_prices = self._historical_price_matrix(options, times, intraday)
+            if historical_prices is not None:
+                prices = np.where(np.isnan(historical_prices), prices, historical_prices)
+            
+            alive = np.arange(lo, hi)[:, None] < expiry_step[None, :]
+            positions_value[lo:hi] = np.where(alive, prices * quantities, 0.0).sum(axis=1)
+            unrealized[lo:hi] = np.where(alive, (prices - entry_prices) * quantities, 0.0).sum(axis=1)
+            last_prices = prices[-1]
+        
+        # 到期结算事件：按内在价值收付现金并计入已实现盈亏
+        expired = expiry_step < n_steps
+        settle_spot = spot[np.minimum(expiry_step, n_steps - 1)]
+        settlement = np.where(
+            is_call,
+            np.maximum(settle_spot - strikes, 0.0),
+            np.maximum(strikes - settle_spot, 0.0)
+        )
+        settlement_pnl = (settlement - entry_prices) * quantities
+        
+        cash_flow = np.zeros(n_steps)
+        realized_flow = np.zeros(n_steps)
+        np.add.at(cash_flow, expiry_step[expired], (settlement * quantities)[expired])
+        np.add.at(realized_flow, expiry_step[expired], settlement_pnl[expired])
+        
+        cash = float(portfolio.cash_balance) + np.cumsum(cash_flow)
+        realized = np.cumsum(realized_flow)
+        values = cash + positions_value
+        
+        for i in np.flatnonzero(expired)[np.argsort(expiry_step[expired], kind='stable')]:
+            step = int(expiry_step[i])
+            trades.append(Trade(
+                timestamp=grid[step].item(),
+                action=TradeAction.EXPIRE,
+                option_contract=options[i],
+                quantity=positions[i].quantity,
+                price=self._to_decimal(settlement[i]),
+                pnl=self._to_decimal(settlement_pnl[i]),
+                portfolio_value=self._to_decimal(values[step])
+            ))
+        
+        # 按最后一个时间步的价格平仓剩余持仓
+        for i in np.flatnonzero(~expired):
+            options[i].current_price = self._to_decimal(last_prices[i])
+            trades.append(Trade(
+                timestamp=end_date,
+                action=TradeAction.CLOSE,
+                option_contract=options[i],
+                quantity=positions[i].quantity,
+                price=options[i].current_price,
+                pnl=self._to_decimal((last_prices[i] - entry_prices[i]) * quantities[i]),
+                portfolio_value=self._to_decimal(values[-1])
+            ))
+        portfolio.positions.clear()
+        
+        initial = float(initial_capital)
+        step_pnl = np.diff(values, prepend=initial)
+        daily_pnl = [
+            DailyPnL(
+                date=when,
+                portfolio_value=self._to_decimal(value),
+                daily_pnl=self._to_decimal(change),
+                cumulative_pnl=self._to_decimal(value - initial),
+                realized_pnl=self._to_decimal(realized_value),
+                unrealized_pnl=self._to_decimal(unrealized_value)
+            )
+            for when, value, change, realized_value, unrealized_value in zip(
+                grid.tolist(), values.tolist(), step_pnl.tolist(), realized.tolist(), unrealized.tolist()
+            )
+        ]
+        
+        final_capital = self._to_decimal(values[-1])
+        total_return = float((final_capital - initial_capital) / initial_capital)
+        periods_per_year = 252 * (timedelta(days=1) / timestep)
+        sharpe_ratio = self._sharpe_from_values(values, periods_per_year)
+        max_drawdown = self._max_drawdown_from_values(values)
+        win_rate = self._calculate_win_rate(trades)
+        
+        result = BacktestResult(
+            strategy_name=strategy.name,
+            start_date=start_date,
+            end_date=end_date,
+            initial_capital=initial_capital,
+            final_capital=final_capital,
+            total_return=total_return,
+            sharpe_ratio=sharpe_ratio,
+            max_drawdown=max_drawdown,
+            win_rate=win_rate,
+            total_trades=len(trades),
+            trades=trades,
+            daily_pnl=daily_pnl
+        )
+        
+        logger.info(
+            f"Vectorized backtest completed: {n_steps} steps x {len(positions)} positions. "
+            f"Total return: {total_return:.2%}"
+        )
+        logger.info(f"Sharpe ratio: {sharpe_ratio:.2f}, Max drawdown: {max_drawdown:.2%}")
+        
+        return result
+    
+    @staticmethod
+    def _build_time_grid(start_date: datetime, end_date: datetime, timestep: timedelta) -> np.ndarray:
+        """生成 [start_date, end_date] 内按timestep等距的时间点（datetime64[us]）"""
+        start = np.datetime64(start_date.replace(tzinfo=None), 'us')
+        end = np.datetime64(end_date.replace(tzinfo=None), 'us')
+        return np.arange(start, end + np.timedelta64(1, 'us'), np.timedelta64(timestep))
+    
+    def _underlying_price_path(self, grid: np.ndarray) -> np.ndarray:
+        """
+        标的价格路径
+        
+        使用历史数据时按日期从列式数据估算，缺失的日期和模拟模式下使用50000。
+        """
+        spot = np.full(grid.size, 50000.0)  # BTC价格基准
+        
+        market_data = self._get_market_data() if self.use_historical_data else None
+        if market_data is not None:
+            estimated = market_data.underlying_prices_for(grid)
+            spot = np.where(np.isnan(estimated), spot, estimated)
+        
+        return spot
+    
+    def _historical_price_matrix(
+        self,
+        options: List[OptionContract],
+        times: np.ndarray,
+        intraday: bool
+    ) -> Optional[np.ndarray]:
+        """
+        持仓在一组时间点上的历史收盘价矩阵（时间步 × 持仓）
+        
+        日级步长取当天第一条记录；日内步长取不晚于该时间点的最新记录，
+        数据滞后超过一天时视为缺失。
+        
+        Returns:
+            价格矩阵，缺失处为NaN；不使用历史数据时返回None
+        """
+        market_data = self._get_market_data() if self.use_historical_data else None
+        if market_data is None:
+            return None
+        
+        columns = [
+            market_data.close_path(
+                option.instrument_name,
+                times,
+                asof=intraday,
+                max_staleness=timedelta(days=1) if intraday else None
+            )
+            for option in options
+        ]
+        return np.column_stack(columns)
+    
+    @staticmethod
+    def _to_decimal(value: float) -> Decimal:
+        """将浮点结果转换为记账用的Decimal（保留8位小数）"""
+        return Decimal(str(round(float(value), 8) + 0.0))
+    
     def _open_strategy_positions(
         self,
         strategy: Strategy,
@@ -268,7 +542,7 @@ class BacktestEngine(IBacktestEngine):
             current_date: 当前日期
         """
         # 获取标的价格
-        if self.use_historical_data and self.historical_dataset:
+        if self.use_historical_data and self._get_market_data() is not None:
             # 从历史数据获取标的价格（使用平价期权的隐含价格）
             underlying_price = self._get_underlying_price_from_data(current_date)
         else:
@@ -283,7 +557,7 @@ class BacktestEngine(IBacktestEngine):
             
             if time_to_expiry > 0:
                 # 如果使用历史数据，尝试从数据中获取实际价格
-                if self.use_historical_data and self.historical_dataset:
+                if self.use_historical_data and self._get_market_data() is not None:
                     historical_price = self._get_option_price_from_data(
                         option.instrument_name,
                         current_date
@@ -371,18 +645,14 @@ class BacktestEngine(IBacktestEngine):
         Returns:
             标的资产价格
         """
-        if not self.historical_dataset or not self.historical_dataset.options_data:
+        market_data = self._get_market_data()
+        if market_data is None:
             return 50000.0  # 默认价格
         
-        # 尝试找到当天的期权数据
-        for instrument_name, data_list in self.historical_dataset.options_data.items():
-            for data in data_list:
-                if data.timestamp.date() == current_date.date():
-                    # 使用期权价格和执行价估算标的价格
-                    # 简化方法：对于平价期权，S ≈ K
-                    return float(data.strike_price)
+        # 简化方法：对于平价期权，S ≈ K
+        price = market_data.underlying_price_on(current_date)
         
-        return 50000.0  # 默认价格
+        return price if price is not None else 50000.0  # 默认价格
     
     def _get_option_price_from_data(
         self,
@@ -399,21 +669,34 @@ class BacktestEngine(IBacktestEngine):
         Returns:
             期权价格，如果没有数据则返回None
         """
-        if not self.historical_dataset or not self.historical_dataset.options_data:
+        market_data = self._get_market_data()
+        if market_data is None:
             return None
         
-        # 查找对应合约的数据
-        if instrument_name not in self.historical_dataset.options_data:
-            return None
+        # 查找当天的数据（使用收盘价）
+        return market_data.close_decimal_on(instrument_name, current_date)
+    
+    def _get_market_data(self) -> Optional[ColumnarMarketData]:
+        """
+        获取当前数据集的列式行情数据
         
-        data_list = self.historical_dataset.options_data[instrument_name]
+        直接赋值historical_dataset（未经run_backtest加载）时按需构建一次；
+        没有数据集时返回构造时提供的列式数据。
         
-        # 查找当天的数据（使用收盘价）
-        for data in data_list:
-            if data.timestamp.date() == current_date.date():
-                return data.close_price
+        Returns:
+            列式行情数据，没有历史数据时返回None
+        """
+        if self.historical_dataset is None:
+            # 直接提供的列式数据（没有对应的数据集）
+            return self.market_data
+        
+        if not self.historical_dataset.options_data:
+            return None
         
-        return None
+        if self.market_data is None or self.market_data.source is not self.historical_dataset:
+            self.market_data = ColumnarMarketData.from_dataset(self.historical_dataset)
+        
+        return self.market_data
     
     def _apply_time_decay(self, portfolio: Portfolio, current_date: datetime):
         """
@@ -605,31 +888,49 @@ class BacktestEngine(IBacktestEngine):
     def handle_early_exercise(
         self,
         option: OptionContract,
-        underlying_price: Decimal
+        underlying_price: Decimal,
+        current_date: Optional[datetime] = None
     ) -> bool:
         """
         处理提前行权（美式期权）
         
+        使用美式二叉树计算持有价值，当持有价值相对内在价值的溢价
+        不足内在价值的5%时建议提前行权。无法建树时（如缺少有效波动率）
+        退回使用合约当前价格估算时间价值。
+        
         Args:
             option: 期权合约
             underlying_price: 标的资产价格
+            current_date: 估值日期（默认当前时间）
             
         Returns:
             是否应该提前行权
         """
-        # 简化的提前行权逻辑
-        # 实际应考虑更多因素，如股息、利率等
-        
         intrinsic_value = self.simulate_option_expiry(option, underlying_price)
         
-        # 如果内在价值显著高于时间价值，考虑提前行权
-        time_value = option.current_price - intrinsic_value
+        if intrinsic_value <= 0:
+            return False
+        
+        current_date = current_date or datetime.now()
+        time_to_expiry = (option.expiration_date - current_date).total_seconds() / (365.0 * 86400)
+        
+        try:
+            american_value = self.options_engine.binomial_tree_price(
+                S=float(underlying_price),
+                K=float(option.strike_price),
+                T=max(time_to_expiry, 0.0),
+                r=0.05,
+                sigma=option.implied_volatility,
+                steps=200,
+                option_type=option.option_type
+            )
+            time_value = Decimal(str(american_value)) - intrinsic_value
+        except Exception as e:
+            logger.debug(f"American pricing unavailable for {option.instrument_name}: {str(e)}")
+            time_value = option.current_price - intrinsic_value
         
         # 如果时间价值很小（小于内在价值的5%），可以考虑提前行权
-        if intrinsic_value > 0 and time_value < intrinsic_value * Decimal("0.05"):
-            return True
-        
-        return False
+        return time_value < intrinsic_value * Decimal("0.05")
     
     def _calculate_sharpe_ratio(self, daily_pnl: List[DailyPnL]) -> float:
         """
@@ -641,33 +942,38 @@ class BacktestEngine(IBacktestEngine):
         Returns:
             夏普比率
         """
-        if len(daily_pnl) < 2:
-            return 0.0
+        values = np.array([float(pnl.portfolio_value) for pnl in daily_pnl])
         
-        # 计算每日收益率
-        returns = []
-        for i in range(1, len(daily_pnl)):
-            prev_value = daily_pnl[i-1].portfolio_value
-            curr_value = daily_pnl[i].portfolio_value
-            if prev_value > 0:
-                daily_return = float((curr_value - prev_value) / prev_value)
-                returns.append(daily_return)
+        # 年化夏普比率 = (平均日收益率 * 252) / (日收益率标准差 * sqrt(252))
+        return self._sharpe_from_values(values, 252)
+    
+    @staticmethod
+    def _sharpe_from_values(values: np.ndarray, periods_per_year: float) -> float:
+        """
+        由组合价值序列计算年化夏普比率（无风险利率按0处理）
         
-        if not returns:
+        Args:
+            values: 按时间排列的组合价值
+            periods_per_year: 每年的时间步数（日级为252）
+            
+        Returns:
+            夏普比率
+        """
+        if len(values) < 2:
+            return 0.0
+        
+        prev_values = values[:-1]
+        valid = prev_values > 0
+        if not valid.any():
             return 0.0
         
-        # 计算平均收益率和标准差
-        mean_return = np.mean(returns)
+        returns = (values[1:][valid] - prev_values[valid]) / prev_values[valid]
         std_return = np.std(returns)
         
         if std_return == 0:
             return 0.0
         
-        # 假设无风险利率为0（简化）
-        # 年化夏普比率 = (平均日收益率 * 252) / (日收益率标准差 * sqrt(252))
-        sharpe_ratio = (mean_return * np.sqrt(252)) / std_return
-        
-        return float(sharpe_ratio)
+        return float(np.mean(returns) * np.sqrt(periods_per_year) / std_return)
     
     def _calculate_max_drawdown(self, daily_pnl: List[DailyPnL]) -> float:
         """
@@ -682,19 +988,29 @@ class BacktestEngine(IBacktestEngine):
         if not daily_pnl:
             return 0.0
         
-        portfolio_values = [float(pnl.portfolio_value) for pnl in daily_pnl]
+        portfolio_values = np.array([float(pnl.portfolio_value) for pnl in daily_pnl])
         
-        max_drawdown = 0.0
-        peak = portfolio_values[0]
+        return self._max_drawdown_from_values(portfolio_values)
+    
+    @staticmethod
+    def _max_drawdown_from_values(values: np.ndarray) -> float:
+        """
+        由组合价值序列计算最大回撤（运行峰值的向量化实现）
         
-        for value in portfolio_values:
-            if value > peak:
-                peak = value
+        Args:
+            values: 按时间排列的组合价值
             
-            drawdown = (peak - value) / peak if peak > 0 else 0.0
-            max_drawdown = max(max_drawdown, drawdown)
+        Returns:
+            最大回撤（百分比）
+        """
+        if len(values) == 0:
+            return 0.0
+        
+        peaks = np.maximum.accumulate(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(peaks > 0, (peaks - values) / peaks, 0.0)
         
-        return max_drawdown
+        return float(max(drawdowns.max(), 0.0))
     
     def _calculate_win_rate(self, trades: List[Trade]) -> float:
         """
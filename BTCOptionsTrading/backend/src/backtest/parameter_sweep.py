@@ -0,0 +1,582 @@
+"""
+参数扫描回测
+批量运行策略模板 × 执行价偏移 × 到期天数 × 入场日期的回测组合：
+历史数据只加载一次并放入共享内存，各组合分发到进程池并行执行，
+结果逐条写入SQLite结果表，中断后可跳过已完成的组合继续运行
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.backtest.backtest_engine import BacktestEngine
+from src.core.models import OptionType, Strategy
+from src.historical.columnar_store import ColumnarMarketData, SharedMarketData
+from src.pricing.options_engine import OptionsEngine
+from src.strategy.strategy_manager import StrategyManager
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 支持的策略模板
+STRATEGY_TEMPLATES = (
+    'long_call', 'short_call', 'long_put', 'short_put',
+    'long_straddle', 'short_straddle', 'long_strangle', 'short_strangle',
+    'iron_condor', 'butterfly'
+)
+
+# 排序指标 -> 是否越大越好
+RANKING_METRICS = {
+    'sharpe_ratio': True,
+    'total_return': True,
+    'win_rate': True,
+    'max_drawdown': False,
+}
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """单个回测组合"""
+    template: str
+    entry_date: datetime
+    dte: int                                  # 入场时距到期的天数
+    strike_offset: float = 0.0                # 执行价相对入场标的价格的偏移比例
+    holding_days: Optional[int] = None        # 持有天数（None表示持有到期）
+    wing_width: float = 0.1                   # 宽跨式/铁鹰/蝶式的翼宽（相对标的价格的比例）
+    quantity: int = 1
+    
+    def __post_init__(self):
+        if self.template not in STRATEGY_TEMPLATES:
+            raise ValueError(f"Unknown strategy template: {self.template}")
+        if self.dte <= 0:
+            raise ValueError("dte must be positive")
+        if self.holding_days is not None and self.holding_days <= 0:
+            raise ValueError("holding_days must be positive")
+    
+    @property
+    def expiry_date(self) -> datetime:
+        """到期日"""
+        return self.entry_date + timedelta(days=self.dte)
+    
+    @property
+    def exit_date(self) -> datetime:
+        """回测结束日期"""
+        if self.holding_days is None:
+            return self.expiry_date
+        return self.entry_date + timedelta(days=min(self.holding_days, self.dte))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典"""
+        data = asdict(self)
+        data['entry_date'] = self.entry_date.isoformat()
+        return data
+    
+    @property
+    def config_id(self) -> str:
+        """组合的稳定标识（参数相同则相同，用于断点续跑）"""
+        payload = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def build_sweep_grid(
+    templates: Sequence[str],
+    entry_dates: Sequence[datetime],
+    dtes: Sequence[int],
+    strike_offsets: Sequence[float] = (0.0,),
+    holding_days: Sequence[Optional[int]] = (None,),
+    wing_widths: Sequence[float] = (0.1,),
+    quantity: int = 1
+) -> List[SweepConfig]:
+    """
+    生成参数网格的全部组合
+    
+    Args:
+        templates: 策略模板列表（见STRATEGY_TEMPLATES）
+        entry_dates: 入场日期列表
+        dtes: 到期天数列表
+        strike_offsets: 执行价偏移比例列表
+        holding_days: 持有天数列表（None表示持有到期）
+        wing_widths: 翼宽比例列表
+        quantity: 每条腿的数量
+    
+    Returns:
+        SweepConfig列表
+    """
+    return [
+        SweepConfig(
+            template=template,
+            entry_date=entry_date,
+            dte=dte,
+            strike_offset=offset,
+            holding_days=holding,
+            wing_width=wing,
+            quantity=quantity
+        )
+        for template, entry_date, dte, offset, holding, wing in itertools.product(
+            templates, entry_dates, dtes, strike_offsets, holding_days, wing_widths
+        )
+    ]
+
+
+@dataclass
+class SweepSettings:
+    """所有组合共用的回测设置"""
+    initial_capital: Decimal = Decimal("100000")
+    implied_volatility: float = 0.8           # 没有历史价格时用于建仓定价
+    risk_free_rate: float = 0.05
+    strike_step: float = 1000.0               # 执行价取整步长
+    default_spot: float = 50000.0             # 没有历史数据时的标的价格
+    vectorized: bool = True
+    timestep: timedelta = timedelta(days=1)
+
+
+@dataclass
+class SweepSummary:
+    """参数扫描运行摘要"""
+    total: int
+    skipped: int
+    completed: int
+    failed: int
+    elapsed_seconds: float
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def build_strategy(
+    config: SweepConfig,
+    settings: SweepSettings,
+    market_data: Optional[ColumnarMarketData] = None,
+    strategy_manager: Optional[StrategyManager] = None,
+    options_engine: Optional[OptionsEngine] = None
+) -> Strategy:
+    """
+    按组合参数构建策略并设置建仓价格
+    
+    执行价以入场日标的价格为中心，按strike_step取整；建仓价格优先使用
+    入场日的历史收盘价，没有数据时用Black-Scholes定价。
+    
+    Args:
+        config: 回测组合
+        settings: 回测设置
+        market_data: 列式行情数据（可选）
+        strategy_manager: 策略管理器（可选）
+        options_engine: 定价引擎（可选）
+    
+    Returns:
+        Strategy对象
+    """
+    strategy_manager = strategy_manager or StrategyManager()
+    options_engine = options_engine or OptionsEngine()
+    
+    spot = market_data.underlying_price_on(config.entry_date) if market_data is not None else None
+    spot = spot or settings.default_spot
+    
+    step = settings.strike_step
+    center = Decimal(str(round(spot * (1 + config.strike_offset) / step) * step))
+    wing = Decimal(str(max(round(spot * config.wing_width / step), 1) * step))
+    expiry = config.expiry_date
+    quantity = config.quantity
+    template = config.template
+    
+    if template in ('long_call', 'short_call', 'long_put', 'short_put'):
+        action, option_type = template.split('_')
+        strategy = strategy_manager.create_single_leg_strategy(
+            option_type=OptionType(option_type),
+            action='buy' if action == 'long' else 'sell',
+            strike=center,
+            expiry=expiry,
+            quantity=quantity
+        )
+    elif template in ('long_straddle', 'short_straddle'):
+        strategy = strategy_manager.create_straddle(
+            strike=center, expiry=expiry, quantity=quantity, long=template == 'long_straddle'
+        )
+    elif template in ('long_strangle', 'short_strangle'):
+        strategy = strategy_manager.create_strangle(
+            call_strike=center + wing,
+            put_strike=center - wing,
+            expiry=expiry,
+            quantity=quantity,
+            long=template == 'long_strangle'
+        )
+    elif template == 'iron_condor':
+        strategy = strategy_manager.create_iron_condor(
+            strikes=[center - 2 * wing, center - wing, center + wing, center + 2 * wing],
+            expiry=expiry,
+            quantity=quantity
+        )
+    else:
+        strategy = strategy_manager.create_butterfly(
+            center_strike=center, wing_width=wing, expiry=expiry, quantity=quantity
+        )
+    
+    for leg in strategy.legs:
+        option = leg.option_contract
+        option.implied_volatility = settings.implied_volatility
+        
+        price = None
+        if market_data is not None:
+            price = market_data.close_on(option.instrument_name, config.entry_date)
+        if price is None:
+            price = options_engine.black_scholes_price(
+                S=spot,
+                K=float(option.strike_price),
+                T=config.dte / 365.0,
+                r=settings.risk_free_rate,
+                sigma=settings.implied_volatility,
+                option_type=option.option_type
+            )
+        option.current_price = Decimal(str(round(price, 8)))
+    
+    return strategy
+
+
+def evaluate_config(
+    engine: BacktestEngine,
+    config: SweepConfig,
+    settings: SweepSettings
+) -> Dict[str, Any]:
+    """
+    运行单个组合的回测
+    
+    Args:
+        engine: 回测引擎（其market_data作为行情数据）
+        config: 回测组合
+        settings: 回测设置
+    
+    Returns:
+        结果行（失败时error字段为错误信息）
+    """
+    row: Dict[str, Any] = {'config_id': config.config_id, 'error': None}
+    
+    try:
+        strategy = build_strategy(
+            config, settings, engine.market_data, options_engine=engine.options_engine
+        )
+        result = asyncio.run(engine.run_backtest(
+            strategy=strategy,
+            start_date=config.entry_date,
+            end_date=config.exit_date,
+            initial_capital=settings.initial_capital,
+            vectorized=settings.vectorized,
+            timestep=settings.timestep
+        ))
+        row.update(
+            total_return=result.total_return,
+            sharpe_ratio=result.sharpe_ratio,
+            max_drawdown=result.max_drawdown,
+            win_rate=result.win_rate,
+            total_trades=result.total_trades,
+            final_capital=float(result.final_capital)
+        )
+    except Exception as e:
+        logger.warning(f"Sweep config {config.config_id[:8]} failed: {str(e)}")
+        row['error'] = str(e)
+    
+    return row
+
+
+# 工作进程状态（由进程池initializer设置）
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(handle, settings: SweepSettings):
+    """工作进程初始化：挂载共享内存中的行情数据并创建回测引擎"""
+    market_data = None
+    if handle is not None:
+        market_data, shm = SharedMarketData.attach(handle)
+        _worker_state['shm'] = shm  # 保持引用，数组视图依赖这块内存
+    
+    _worker_state['engine'] = BacktestEngine(
+        use_historical_data=market_data is not None,
+        market_data=market_data
+    )
+    _worker_state['settings'] = settings
+
+
+def _run_in_worker(configs: List[SweepConfig]) -> List[Dict[str, Any]]:
+    """在工作进程中运行一批组合"""
+    return [evaluate_config(_worker_state['engine'], config, _worker_state['settings']) for config in configs]
+
+
+class SweepResultStore:
+    """参数扫描结果表（SQLite）"""
+    
+    METRIC_COLUMNS = ('total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'total_trades', 'final_capital')
+    
+    def __init__(self, db_path: str = "data/sweep_results.db", commit_every: int = 50):
+        """
+        初始化结果表
+        
+        Args:
+            db_path: 数据库文件路径
+            commit_every: 每写入多少条结果提交一次
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self._pending = 0
+        
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sweep_results (
+                config_id TEXT PRIMARY KEY,
+                template TEXT NOT NULL,
+                entry_date TEXT NOT NULL,
+                dte INTEGER NOT NULL,
+                strike_offset REAL NOT NULL,
+                holding_days INTEGER,
+                wing_width REAL NOT NULL,
+                quantity INTEGER NOT NULL,
+                total_return REAL,
+                sharpe_ratio REAL,
+                max_drawdown REAL,
+                win_rate REAL,
+                total_trades INTEGER,
+                final_capital REAL,
+                error TEXT,
+                completed_at INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sweep_sharpe
+            ON sweep_results(sharpe_ratio)
+        """)
+        self.conn.commit()
+    
+    def completed_ids(self) -> set:
+        """已成功完成的组合标识（失败的组合会在续跑时重试）"""
+        cursor = self.conn.execute("SELECT config_id FROM sweep_results WHERE error IS NULL")
+        return {row[0] for row in cursor}
+    
+    def record(self, config: SweepConfig, row: Dict[str, Any]):
+        """
+        写入一条结果
+        
+        Args:
+            config: 回测组合
+            row: evaluate_config返回的结果行
+        """
+        params = config.to_dict()
+        self.conn.execute("""
+            INSERT OR REPLACE INTO sweep_results
+            (config_id, template, entry_date, dte, strike_offset, holding_days, wing_width, quantity,
+             total_return, sharpe_ratio, max_drawdown, win_rate, total_trades, final_capital,
+             error, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            config.config_id,
+            params['template'],
+            params['entry_date'],
+            params['dte'],
+            params['strike_offset'],
+            params['holding_days'],
+            params['wing_width'],
+            params['quantity'],
+            *(row.get(column) for column in self.METRIC_COLUMNS),
+            row.get('error'),
+            int(datetime.now().timestamp())
+        ))
+        
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+    
+    def flush(self):
+        """提交未提交的结果"""
+        self.conn.commit()
+        self._pending = 0
+    
+    def ranked(self, by: str = 'sharpe_ratio', limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """
+        按指标排序的结果（同分时按最大回撤从小到大）
+        
+        Args:
+            by: 排序指标（见RANKING_METRICS）
+            limit: 返回条数（None表示全部）
+        
+        Returns:
+            结果字典列表
+        """
+        if by not in RANKING_METRICS:
+            raise ValueError(f"Unsupported ranking metric: {by}")
+        
+        direction = 'DESC' if RANKING_METRICS[by] else 'ASC'
+        sql = f"""
+            SELECT * FROM sweep_results
+            WHERE error IS NULL
+            ORDER BY {by} {direction}, max_drawdown ASC
+        """
+        params: tuple = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        
+        return [dict(row) for row in self.conn.execute(sql, params)]
+    
+    def close(self):
+        """提交并关闭连接"""
+        self.flush()
+        self.conn.close()
+
+
+class ParameterSweepRunner:
+    """参数扫描运行器"""
+    
+    def __init__(
+        self,
+        results_path: str = "data/sweep_results.db",
+        workers: int = 1,
+        settings: Optional[SweepSettings] = None,
+        historical_data_manager=None,
+        underlying_symbol: str = "BTC"
+    ):
+        """
+        初始化运行器
+        
+        Args:
+            results_path: 结果数据库路径
+            workers: 工作进程数（1表示在当前进程中顺序运行）
+            settings: 回测设置
+            historical_data_manager: 历史数据管理器（不提供时使用模拟数据）
+            underlying_symbol: 标的资产符号
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        
+        self.results = SweepResultStore(results_path)
+        self.workers = workers
+        self.settings = settings or SweepSettings()
+        self.historical_data_manager = historical_data_manager
+        self.underlying_symbol = underlying_symbol
+        
+        logger.info(f"Parameter sweep runner initialized (workers={workers}, results={results_path})")
+    
+    def run(
+        self,
+        configs: Iterable[SweepConfig],
+        market_data: Optional[ColumnarMarketData] = None,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> SweepSummary:
+        """
+        运行参数扫描
+        
+        Args:
+            configs: 回测组合
+            market_data: 列式行情数据（不提供时由historical_data_manager一次性加载）
+            resume: 是否跳过结果表中已完成的组合
+            progress_callback: 进度回调 (已完成数, 待运行总数)
+        
+        Returns:
+            SweepSummary运行摘要
+        """
+        configs = list(configs)
+        started = time.perf_counter()
+        
+        done_ids = self.results.completed_ids() if resume else set()
+        pending = [c for c in dict((c.config_id, c) for c in configs).values() if c.config_id not in done_ids]
+        summary = SweepSummary(
+            total=len(configs),
+            skipped=len(configs) - len(pending),
+            completed=0,
+            failed=0,
+            elapsed_seconds=0.0
+        )
+        
+        logger.info(f"Sweep: {len(pending)} configs to run, {summary.skipped} already completed")
+        
+        if pending:
+            if market_data is None:
+                market_data = self._load_market_data(pending)
+            
+            try:
+                for config, row in self._execute(pending, market_data):
+                    self.results.record(config, row)
+                    if row['error'] is None:
+                        summary.completed += 1
+                    else:
+                        summary.failed += 1
+                        summary.errors[config.config_id] = row['error']
+                    
+                    if progress_callback:
+                        progress_callback(summary.completed + summary.failed, len(pending))
+            finally:
+                self.results.flush()
+        
+        summary.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Sweep finished: {summary.completed} completed, {summary.failed} failed, "
+            f"{summary.skipped} skipped in {summary.elapsed_seconds:.1f}s"
+        )
+        
+        return summary
+    
+    def ranked_results(self, by: str = 'sharpe_ratio', limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """按指标排序的结果（见SweepResultStore.ranked）"""
+        return self.results.ranked(by=by, limit=limit)
+    
+    def close(self):
+        """关闭结果数据库"""
+        self.results.close()
+    
+    def _load_market_data(self, configs: List[SweepConfig]) -> Optional[ColumnarMarketData]:
+        """一次性加载覆盖所有组合的历史数据"""
+        if self.historical_data_manager is None:
+            return None
+        
+        dataset = self.historical_data_manager.get_data_for_backtest(
+            start_date=min(c.entry_date for c in configs),
+            end_date=max(c.exit_date for c in configs),
+            underlying_symbol=self.underlying_symbol,
+            check_completeness=False
+        )
+        return ColumnarMarketData.from_dataset(dataset)
+    
+    def _execute(self, configs: List[SweepConfig], market_data: Optional[ColumnarMarketData]):
+        """按完成顺序逐个产出 (组合, 结果行)"""
+        if self.workers == 1:
+            engine = BacktestEngine(use_historical_data=market_data is not None, market_data=market_data)
+            for config in configs:
+                yield config, evaluate_config(engine, config, self.settings)
+            return
+        
+        shared = SharedMarketData.publish(market_data) if market_data is not None else None
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.handle if shared else None, self.settings)
+            ) as pool:
+                # 组合按批提交以摊薄进程间通信开销；限制在途批次数，结果按完成顺序流式写入
+                batch_size = max(1, min(32, len(configs) // (self.workers * 8)))
+                batches = (configs[i:i + batch_size] for i in range(0, len(configs), batch_size))
+                in_flight = {}
+                for batch in itertools.islice(batches, self.workers * 2):
+                    in_flight[pool.submit(_run_in_worker, batch)] = batch
+                
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        batch = in_flight.pop(future)
+                        try:
+                            rows = future.result()
+                        except Exception as e:
+                            rows = [{'config_id': c.config_id, 'error': str(e)} for c in batch]
+                        yield from zip(batch, rows)
+                        
+                        next_batch = next(batches, None)
+                        if next_batch is not None:
+                            in_flight[pool.submit(_run_in_worker, next_batch)] = next_batch
+        finally:
+            if shared is not None:
+                shared.close()
@@ -67,7 +67,7 @@ class OrderBookCollector:
             logger.info(f"Current {underlying} price: {current_price}")
             
             # 获取所有 option 合约
-            contracts = await self.connector.get_options_chain(underlying)
+            contracts = await self.connector.get_options_chain(underlying, include_greeks=False)
             
             # 提取所有 strike 价位
             strikes = set()
@@ -127,7 +127,7 @@ class OrderBookCollector:
         """异步获取 option 链"""
         try:
             # 获取所有 option 合约
-            contracts = await self.connector.get_options_chain(underlying)
+            contracts = await self.connector.get_options_chain(underlying, include_greeks=False)
             
             # 过滤一个月内的 option
             now = datetime.now(timezone.utc)
@@ -71,6 +71,7 @@ class DeribitSettings(BaseSettings):
     rate_limit_window: int = Field(default=1, env="DERIBIT_RATE_WINDOW")  # seconds
     max_retries: int = Field(default=3, env="DERIBIT_MAX_RETRIES")
     retry_delay: float = Field(default=1.0, env="DERIBIT_RETRY_DELAY")  # seconds
+    ticker_concurrency: int = Field(default=8, env="DERIBIT_TICKER_CONCURRENCY")  # 并发ticker请求数上限
     
     if PYDANTIC_V2:
         model_config = {
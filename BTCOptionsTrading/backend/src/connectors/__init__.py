@@ -3,6 +3,7 @@
 提供与外部API的连接功能
 """
 
-from .deribit_connector import DeribitConnector
+from .deribit_connector import DeribitConnector, OptionChainSnapshot
+from .deribit_stream import DeribitStreamClient, MarketDataStore, OrderBook
 
-__all__ = ['DeribitConnector']
+__all__ = ['DeribitConnector', 'OptionChainSnapshot', 'DeribitStreamClient', 'MarketDataStore', 'OrderBook']
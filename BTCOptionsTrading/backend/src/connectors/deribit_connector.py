@@ -5,9 +5,10 @@ Deribit API连接器实现
 
 import asyncio
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from collections import deque
 
 import httpx
@@ -59,6 +60,25 @@ class RateLimiter:
         self.requests.append(now)
 
 
+@dataclass
+class OptionChainSnapshot:
+    """
+    期权链快照
+    
+    部分合约获取或解析失败时仍返回其余合约，失败原因记录在errors中。
+    """
+    currency: str
+    contracts: List[OptionContract]
+    errors: Dict[str, str] = field(default_factory=dict)  # 合约名称 -> 错误信息
+    ticker_requests: int = 0
+    timestamp: datetime = field(default_factory=datetime.now)
+    
+    @property
+    def is_complete(self) -> bool:
+        """是否所有合约都获取成功"""
+        return not self.errors
+
+
 class DeribitConnector(IDeribitConnector):
     """Deribit API连接器"""
     
@@ -81,6 +101,7 @@ class DeribitConnector(IDeribitConnector):
             max_requests=settings.deribit.rate_limit_requests,
             time_window=settings.deribit.rate_limit_window
         )
+        self.ticker_concurrency = settings.deribit.ticker_concurrency
         
         # 认证状态
         self.access_token: Optional[str] = None
@@ -177,53 +198,187 @@ class DeribitConnector(IDeribitConnector):
             logger.error(f"Authentication failed: {str(e)}")
             return False
     
-    async def get_options_chain(self, currency: str = "BTC") -> List[OptionContract]:
+    async def get_options_chain(
+        self,
+        currency: str = "BTC",
+        include_greeks: bool = True
+    ) -> List[OptionContract]:
         """
         获取期权链数据（包含实时市场数据）
         
         Args:
             currency: 货币类型（默认BTC）
+            include_greeks: 是否获取Greeks（需要逐个合约请求ticker）
             
         Returns:
-            期权合约列表
+            期权合约列表（获取失败的合约被跳过，见get_chain_snapshot）
+        """
+        snapshot = await self.get_chain_snapshot(currency, include_greeks=include_greeks)
+        return snapshot.contracts
+    
+    async def get_chain_snapshot(
+        self,
+        currency: str = "BTC",
+        include_greeks: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> OptionChainSnapshot:
+        """
+        获取期权链快照
+        
+        合约列表和全市场行情摘要（public/get_book_summary_by_currency）各一次请求，
+        只有摘要缺少的字段才并发请求ticker：include_greeks为True时所有合约都需要
+        ticker获取Greeks，否则只有摘要中没有的合约需要。并发数不超过限流器的请求预算。
+        
+        Args:
+            currency: 货币类型（默认BTC）
+            include_greeks: 是否获取Greeks
+            max_concurrency: ticker并发请求数上限（None表示使用配置值）
+        
+        Returns:
+            期权链快照
+        
+        Raises:
+            APIConnectionError: 合约列表获取失败
         """
         try:
-            # 获取所有期权合约
-            result = await self._request(
-                "public/get_instruments",
-                {
-                    "currency": currency,
-                    "kind": "option",
-                    "expired": False
-                }
+            instruments, summaries = await asyncio.gather(
+                self._request(
+                    "public/get_instruments",
+                    {
+                        "currency": currency,
+                        "kind": "option",
+                        "expired": False
+                    }
+                ),
+                self._request(
+                    "public/get_book_summary_by_currency",
+                    {
+                        "currency": currency,
+                        "kind": "option"
+                    }
+                ),
+                return_exceptions=True
             )
             
+            if isinstance(instruments, Exception):
+                raise instruments
+            
+            if isinstance(summaries, Exception):
+                logger.warning(f"Failed to get book summary, falling back to tickers: {str(summaries)}")
+                summaries = []
+            
+            summary_by_name = {
+                summary.get("instrument_name"): self._summary_to_ticker(summary)
+                for summary in summaries or []
+                if isinstance(summary, dict)
+            }
+            
+            # 只为摘要无法提供的字段请求ticker
+            ticker_names = [
+                instrument.get("instrument_name")
+                for instrument in instruments
+                if include_greeks or instrument.get("instrument_name") not in summary_by_name
+            ]
+            tickers, errors = await self._fetch_tickers(ticker_names, max_concurrency)
+            
             contracts = []
-            for instrument in result:
+            for instrument in instruments:
+                name = instrument.get("instrument_name")
+                if name not in tickers and name not in summary_by_name:
+                    errors.setdefault(name, "No market data")
+                    continue
+                
                 try:
-                    # 获取每个合约的实时市场数据
-                    ticker_data = await self._request(
-                        "public/ticker",
-                        {"instrument_name": instrument.get("instrument_name")}
-                    )
-                    
-                    # 合并基本信息和市场数据
-                    instrument_data = {**instrument, **ticker_data}
-                    contract = self._parse_option_contract(instrument_data)
-                    contracts.append(contract)
+                    # 合并基本信息和市场数据（ticker字段优先）
+                    instrument_data = {**instrument, **summary_by_name.get(name, {}), **tickers.get(name, {})}
+                    contracts.append(self._parse_option_contract(instrument_data))
                 except Exception as e:
-                    logger.warning(
-                        f"Failed to parse instrument: {str(e)}",
-                        instrument_name=instrument.get("instrument_name")
-                    )
+                    logger.warning(f"Failed to parse instrument: {str(e)}", instrument_name=name)
+                    errors[name] = str(e)
+            
+            if errors:
+                logger.warning(f"Options chain for {currency} incomplete: {len(errors)} instruments failed")
+            logger.info(
+                f"Retrieved {len(contracts)} option contracts for {currency}",
+                ticker_requests=len(ticker_names)
+            )
             
-            logger.info(f"Retrieved {len(contracts)} option contracts for {currency}")
-            return contracts
+            return OptionChainSnapshot(
+                currency=currency,
+                contracts=contracts,
+                errors=errors,
+                ticker_requests=len(ticker_names)
+            )
             
         except Exception as e:
             logger.error(f"Failed to get options chain: {str(e)}")
             raise APIConnectionError(f"Failed to get options chain: {str(e)}")
     
+    @staticmethod
+    def _summary_to_ticker(summary: Dict) -> Dict:
+        """将行情摘要的字段名转换为ticker的字段名（缺失的字段不包含在结果中）"""
+        fields = {
+            "mark_price": "mark_price",
+            "mark_iv": "mark_iv",
+            "bid_price": "best_bid_price",
+            "ask_price": "best_ask_price",
+            "last": "last_price",
+            "open_interest": "open_interest",
+            "underlying_price": "underlying_price",
+        }
+        data = {
+            ticker_field: summary[summary_field]
+            for summary_field, ticker_field in fields.items()
+            if summary.get(summary_field) is not None
+        }
+        if summary.get("volume") is not None:
+            data["stats"] = {"volume": summary["volume"]}
+        return data
+    
+    async def _fetch_tickers(
+        self,
+        instrument_names: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """
+        并发获取多个合约的ticker
+        
+        并发数不超过max_concurrency和限流器的请求预算，每个请求仍经过限流器。
+        
+        Args:
+            instrument_names: 合约名称列表
+            max_concurrency: 并发请求数上限（None表示使用配置值）
+        
+        Returns:
+            (合约名称 -> ticker数据, 合约名称 -> 错误信息)
+        """
+        if not instrument_names:
+            return {}, {}
+        
+        limit = max_concurrency or self.ticker_concurrency
+        limit = max(1, min(limit, self.rate_limiter.max_requests))
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def fetch(name: str) -> Dict:
+            async with semaphore:
+                return await self._request("public/ticker", {"instrument_name": name})
+        
+        results = await asyncio.gather(
+            *(fetch(name) for name in instrument_names),
+            return_exceptions=True
+        )
+        
+        tickers = {}
+        errors = {}
+        for name, result in zip(instrument_names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to get ticker: {str(result)}", instrument_name=name)
+                errors[name] = str(result)
+            else:
+                tickers[name] = result
+        
+        return tickers, errors
+    
     async def get_index_price(self, currency: str = "BTC") -> float:
         """
         获取指数价格（标的资产价格）
@@ -389,16 +544,22 @@ class DeribitConnector(IDeribitConnector):
             instruments: 合约名称列表
             
         Returns:
-            合约名称到市场数据的映射
+            合约名称到市场数据的映射（获取失败的合约不包含在内）
+        
+        Raises:
+            APIConnectionError: 所有合约都获取失败
         """
         market_data = {}
         
         try:
+            tickers, errors = await self._fetch_tickers(instruments)
+            if instruments and not tickers:
+                raise APIConnectionError(next(iter(errors.values()), "No data"))
+            
             for instrument in instruments:
-                result = await self._request(
-                    "public/ticker",
-                    {"instrument_name": instrument}
-                )
+                result = tickers.get(instrument)
+                if result is None:
+                    continue
                 
                 data = MarketData(
                     symbol=instrument,
@@ -455,23 +616,23 @@ class DeribitConnector(IDeribitConnector):
             波动率曲面对象
         """
         try:
-            # 获取所有期权合约
-            contracts = await self.get_options_chain(currency)
+            # 获取所有期权合约（曲面只需要隐含波动率，不请求Greeks）
+            contracts = await self.get_options_chain(currency, include_greeks=False)
             
             # 提取执行价和到期日
             strikes = sorted(list(set(c.strike_price for c in contracts)))
             expiries = sorted(list(set(c.expiration_date for c in contracts)))
             
+            strike_index = {strike: i for i, strike in enumerate(strikes)}
+            expiry_index = {expiry: i for i, expiry in enumerate(expiries)}
+            
             # 构建波动率矩阵（使用列表而不是 numpy）
             volatilities = [[0.0 for _ in range(len(strikes))] for _ in range(len(expiries))]
             
             for contract in contracts:
-                try:
-                    exp_idx = expiries.index(contract.expiration_date)
-                    strike_idx = strikes.index(contract.strike_price)
-                    volatilities[exp_idx][strike_idx] = contract.implied_volatility
-                except ValueError:
-                    continue
+                exp_idx = expiry_index[contract.expiration_date]
+                strike_idx = strike_index[contract.strike_price]
+                volatilities[exp_idx][strike_idx] = contract.implied_volatility
             
             surface = VolatilitySurface(
                 strikes=strikes,
@@ -0,0 +1,599 @@
+"""
+Deribit WebSocket行情订阅
+通过JSON-RPC over WebSocket订阅ticker、订单簿和指数价格频道，
+在内存中维护增量更新的订单簿和ticker，支持断线重连、change_id缺口检测与重新同步，
+以及从录制文件离线回放
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import websockets
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def ticker_channel(instrument_name: str, interval: str = "100ms") -> str:
+    """ticker频道名"""
+    return f"ticker.{instrument_name}.{interval}"
+
+
+def book_channel(instrument_name: str, interval: str = "100ms") -> str:
+    """订单簿增量频道名"""
+    return f"book.{instrument_name}.{interval}"
+
+
+def index_channel(index_name: str = "btc_usd") -> str:
+    """指数价格频道名"""
+    return f"deribit_price_index.{index_name}"
+
+
+@dataclass
+class StreamUpdate:
+    """一条已应用到行情存储的更新"""
+    channel: str
+    kind: str  # ticker / book / index
+    key: str  # 合约名称或指数名称
+    data: Dict
+    received_at: float
+
+
+class OrderBook:
+    """
+    单个合约的订单簿
+    
+    由快照初始化，之后按change_id顺序应用增量；增量的prev_change_id与当前change_id
+    不一致说明丢失了消息，订单簿标记为未同步，直到收到新的快照。
+    """
+    
+    def __init__(self, instrument_name: str):
+        self.instrument_name = instrument_name
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.change_id: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.in_sync = False
+    
+    def apply(self, data: Dict) -> bool:
+        """
+        应用一条订单簿消息
+        
+        Args:
+            data: book频道的消息数据
+        
+        Returns:
+            是否成功应用（False表示检测到缺口）
+        """
+        # 分组频道（book.{合约}.{group}.{depth}.{interval}）每条消息都是完整快照，不带type
+        if data.get("type", "snapshot") == "snapshot":
+            self.bids.clear()
+            self.asks.clear()
+            self._apply_levels(self.bids, data.get("bids", []))
+            self._apply_levels(self.asks, data.get("asks", []))
+            self.change_id = data.get("change_id")
+            self.timestamp = data.get("timestamp")
+            self.in_sync = True
+            return True
+        
+        if not self.in_sync or data.get("prev_change_id") != self.change_id:
+            self.in_sync = False
+            return False
+        
+        self._apply_levels(self.bids, data.get("bids", []))
+        self._apply_levels(self.asks, data.get("asks", []))
+        self.change_id = data.get("change_id")
+        self.timestamp = data.get("timestamp")
+        return True
+    
+    @staticmethod
+    def _apply_levels(side: Dict[float, float], levels: Iterable[List]):
+        for level in levels:
+            if len(level) == 3:
+                action, price, amount = level
+            else:
+                action = "new"
+                price, amount = level
+            
+            if action == "delete" or amount == 0:
+                side.pop(price, None)
+            else:
+                side[price] = amount
+    
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """最优买价 (价格, 数量)"""
+        if not self.bids:
+            return None
+        price = max(self.bids)
+        return price, self.bids[price]
+    
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """最优卖价 (价格, 数量)"""
+        if not self.asks:
+            return None
+        price = min(self.asks)
+        return price, self.asks[price]
+    
+    def mid_price(self) -> Optional[float]:
+        """中间价（任一侧为空时返回None）"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+    
+    def levels(self, depth: Optional[int] = None) -> Dict:
+        """
+        按价格排序的档位
+        
+        Args:
+            depth: 每侧最多返回的档位数（None表示全部）
+        
+        Returns:
+            与REST get_order_book格式一致的字典
+        """
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return {
+            "instrument_name": self.instrument_name,
+            "timestamp": self.timestamp,
+            "change_id": self.change_id,
+            "bids": [[price, amount] for price, amount in bids],
+            "asks": [[price, amount] for price, amount in asks]
+        }
+
+
+class MarketDataStore:
+    """
+    内存行情存储
+    
+    所有读取都是时间点读取：返回调用时刻的最新数据，可按最大数据年龄过滤过期数据。
+    """
+    
+    def __init__(self):
+        self.tickers: Dict[str, Dict] = {}
+        self.books: Dict[str, OrderBook] = {}
+        self.index_prices: Dict[str, Dict] = {}
+        self._updated_at: Dict[Tuple[str, str], float] = {}
+    
+    def _fresh(self, kind: str, key: str, max_age: Optional[float]) -> bool:
+        updated_at = self._updated_at.get((kind, key))
+        if updated_at is None:
+            return False
+        return max_age is None or time.monotonic() - updated_at <= max_age
+    
+    def update(self, kind: str, key: str, data: Dict):
+        """记录一条ticker或指数更新（订单簿由OrderBook.apply更新）"""
+        if kind == "ticker":
+            self.tickers[key] = data
+        elif kind == "index":
+            self.index_prices[key] = data
+        self._updated_at[(kind, key)] = time.monotonic()
+    
+    def book(self, instrument_name: str) -> OrderBook:
+        """获取（必要时创建）合约的订单簿"""
+        book = self.books.get(instrument_name)
+        if book is None:
+            book = self.books[instrument_name] = OrderBook(instrument_name)
+        return book
+    
+    def touch_book(self, instrument_name: str):
+        self._updated_at[("book", instrument_name)] = time.monotonic()
+    
+    def get_ticker(self, instrument_name: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        获取最新ticker
+        
+        Args:
+            instrument_name: 合约名称
+            max_age: 最大数据年龄（秒），超过则视为没有数据
+        
+        Returns:
+            ticker数据（格式与REST public/ticker一致）
+        """
+        if not self._fresh("ticker", instrument_name, max_age):
+            return None
+        return self.tickers.get(instrument_name)
+    
+    def get_mark_price(self, instrument_name: str, max_age: Optional[float] = None) -> Optional[float]:
+        """最新标记价格"""
+        ticker = self.get_ticker(instrument_name, max_age)
+        if ticker is None or ticker.get("mark_price") is None:
+            return None
+        return float(ticker["mark_price"])
+    
+    def get_book(self, instrument_name: str, max_age: Optional[float] = None) -> Optional[OrderBook]:
+        """已同步的订单簿（未同步或过期时返回None）"""
+        book = self.books.get(instrument_name)
+        if book is None or not book.in_sync or not self._fresh("book", instrument_name, max_age):
+            return None
+        return book
+    
+    def get_index_price(self, index_name: str = "btc_usd", max_age: Optional[float] = None) -> Optional[float]:
+        """最新指数价格"""
+        if not self._fresh("index", index_name, max_age):
+            return None
+        data = self.index_prices.get(index_name)
+        return float(data["price"]) if data and data.get("price") is not None else None
+    
+    def snapshot(self, depth: Optional[int] = 10) -> Dict:
+        """
+        当前所有行情的副本
+        
+        Args:
+            depth: 订单簿每侧的档位数
+        
+        Returns:
+            {"tickers": ..., "books": ..., "index_prices": ...}
+        """
+        return {
+            "tickers": {name: dict(data) for name, data in self.tickers.items()},
+            "books": {
+                name: book.levels(depth)
+                for name, book in self.books.items() if book.in_sync
+            },
+            "index_prices": {name: dict(data) for name, data in self.index_prices.items()}
+        }
+
+
+class UpdateSubscription:
+    """
+    行情更新的异步迭代器
+    
+    队列满时丢弃最旧的更新（行情数据只有最新的有意义），丢弃数记录在dropped中。
+    """
+    
+    _CLOSED = object()
+    
+    def __init__(self, client: 'DeribitStreamClient', prefixes: Tuple[str, ...], queue_size: int):
+        self._client = client
+        self._prefixes = prefixes
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+    
+    def matches(self, channel: str) -> bool:
+        return not self._prefixes or channel.startswith(self._prefixes)
+    
+    def push(self, item):
+        if self.closed:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+    
+    def finish(self):
+        """结束迭代（已入队的更新仍会被读出）"""
+        if self.closed:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(self._CLOSED)
+        self.closed = True
+    
+    def close(self):
+        """取消订阅"""
+        self._client._subscriptions.discard(self)
+        self.finish()
+    
+    def __aiter__(self) -> 'UpdateSubscription':
+        return self
+    
+    async def __anext__(self) -> StreamUpdate:
+        item = await self._queue.get()
+        if item is self._CLOSED:
+            self._client._subscriptions.discard(self)
+            raise StopAsyncIteration
+        return item
+
+
+class DeribitStreamClient:
+    """
+    Deribit WebSocket行情客户端
+    
+    用法：
+        client = DeribitStreamClient()
+        await client.subscribe([ticker_channel("BTC-PERPETUAL"), index_channel()])
+        task = asyncio.create_task(client.run())
+        async for update in client.updates("ticker."):
+            ...
+    
+    replay() 用同样的消息处理逻辑回放录制文件，便于离线测试。
+    """
+    
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        store: Optional[MarketDataStore] = None,
+        heartbeat_interval: int = 30,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        queue_size: int = 1000,
+        record_path: Optional[str] = None
+    ):
+        """
+        初始化客户端
+        
+        Args:
+            url: WebSocket地址（默认使用配置中的地址）
+            store: 行情存储（默认新建）
+            heartbeat_interval: 服务器心跳间隔（秒）
+            reconnect_delay: 首次重连等待时间（秒），之后指数增长
+            max_reconnect_delay: 最大重连等待时间（秒）
+            queue_size: 每个迭代器的默认队列长度
+            record_path: 录制收到的消息的文件路径（None表示不录制）
+        """
+        self.url = url or settings.deribit.websocket_url
+        self.store = store or MarketDataStore()
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.queue_size = queue_size
+        self.record_path = Path(record_path) if record_path else None
+        
+        self.channels: Set[str] = set()
+        self._subscriptions: Set[UpdateSubscription] = set()
+        self._resyncing: Set[str] = set()
+        self._ws = None
+        self._record_file = None
+        self._request_id = 0
+        self._stopping = False
+        
+        self.stats = {
+            'messages': 0,
+            'gaps': 0,
+            'resyncs': 0,
+            'reconnects': 0
+        }
+    
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+    
+    # ── 订阅管理 ──────────────────────────────────────
+    
+    async def subscribe(self, channels: Iterable[str]):
+        """
+        订阅频道（已连接时立即发送，否则在连接后发送）
+        
+        Args:
+            channels: 频道名列表
+        """
+        new_channels = [channel for channel in channels if channel not in self.channels]
+        self.channels.update(new_channels)
+        if new_channels and self.connected:
+            await self._send("public/subscribe", {"channels": new_channels})
+    
+    async def unsubscribe(self, channels: Iterable[str]):
+        """取消订阅频道"""
+        removed = [channel for channel in channels if channel in self.channels]
+        self.channels.difference_update(removed)
+        if removed and self.connected:
+            await self._send("public/unsubscribe", {"channels": removed})
+    
+    def updates(self, *prefixes: str, queue_size: Optional[int] = None) -> UpdateSubscription:
+        """
+        订阅行情更新
+        
+        Args:
+            prefixes: 频道名前缀（如 "ticker."、"book.BTC-"），为空表示全部频道
+            queue_size: 队列长度（None表示使用默认值）
+        
+        Returns:
+            异步迭代器，客户端停止或回放结束时结束迭代
+        """
+        subscription = UpdateSubscription(self, tuple(prefixes), queue_size or self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+    
+    # ── 连接 ──────────────────────────────────────────
+    
+    async def run(self):
+        """
+        连接并处理消息，断线后自动重连，直到调用stop()
+        """
+        self._stopping = False
+        delay = self.reconnect_delay
+        
+        self._open_recording()
+        try:
+            while not self._stopping:
+                try:
+                    async with websockets.connect(self.url, ping_interval=None, max_size=None) as ws:
+                        self._ws = ws
+                        delay = self.reconnect_delay
+                        await self._on_connect()
+                        
+                        async for raw in ws:
+                            await self.handle_message(raw)
+                
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"WebSocket connection lost: {str(e)}", url=self.url)
+                finally:
+                    self._ws = None
+                
+                if self._stopping:
+                    break
+                
+                # 断线期间的增量已经丢失，订单簿需要重新同步
+                self._mark_books_stale()
+                self.stats['reconnects'] += 1
+                logger.info(f"Reconnecting in {delay:.1f}s", url=self.url)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self._close_recording()
+            self._finish_subscriptions()
+    
+    async def stop(self):
+        """停止客户端并结束所有迭代器"""
+        self._stopping = True
+        if self._ws is not None:
+            await self._ws.close()
+        self._finish_subscriptions()
+    
+    async def _on_connect(self):
+        """连接建立后设置心跳并订阅所有频道"""
+        logger.info("WebSocket connected", url=self.url, channels=len(self.channels))
+        self._resyncing.clear()
+        await self._send("public/set_heartbeat", {"interval": self.heartbeat_interval})
+        if self.channels:
+            await self._send("public/subscribe", {"channels": sorted(self.channels)})
+    
+    async def _send(self, method: str, params: Dict):
+        self._request_id += 1
+        await self._ws.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": self._request_id,
+            "method": method,
+            "params": params
+        }))
+    
+    # ── 消息处理 ──────────────────────────────────────
+    
+    async def handle_message(self, raw: Union[str, bytes, Dict]):
+        """
+        处理一条服务器消息（实时连接和回放共用）
+        
+        Args:
+            raw: 原始JSON文本或已解析的消息
+        """
+        if isinstance(raw, dict):
+            message = raw
+        else:
+            message = json.loads(raw)
+            self._record(raw)
+        
+        self.stats['messages'] += 1
+        method = message.get("method")
+        
+        if method == "subscription":
+            params = message.get("params", {})
+            await self._dispatch(params.get("channel", ""), params.get("data", {}))
+        elif method == "heartbeat":
+            if message.get("params", {}).get("type") == "test_request" and self.connected:
+                await self._send("public/test", {})
+        elif "error" in message:
+            logger.warning(f"WebSocket API error: {message['error']}")
+    
+    async def _dispatch(self, channel: str, data: Dict):
+        kind = channel.split(".", 1)[0]
+        
+        if kind == "book":
+            name = data.get("instrument_name") or channel.split(".")[1]
+            book = self.store.book(name)
+            if not book.apply(data):
+                self.stats['gaps'] += 1
+                await self._resync(channel, book)
+                return
+            self._resyncing.discard(channel)
+            self.store.touch_book(name)
+            self._publish(StreamUpdate(channel, "book", name, data, time.time()))
+        
+        elif kind == "ticker":
+            name = data.get("instrument_name") or channel.split(".")[1]
+            self.store.update("ticker", name, data)
+            self._publish(StreamUpdate(channel, "ticker", name, data, time.time()))
+        
+        elif kind == "deribit_price_index":
+            name = data.get("index_name") or channel.split(".", 1)[1]
+            self.store.update("index", name, data)
+            self._publish(StreamUpdate(channel, "index", name, data, time.time()))
+    
+    async def _resync(self, channel: str, book: OrderBook):
+        """
+        订单簿出现缺口时重新订阅该频道，服务器会重新推送快照
+        
+        每个频道同一时间只发起一次重新同步；回放时无法重新订阅，只等待下一个快照。
+        """
+        if channel in self._resyncing:
+            return
+        
+        self._resyncing.add(channel)
+        self.stats['resyncs'] += 1
+        logger.warning(
+            "Order book gap detected, resyncing",
+            channel=channel,
+            change_id=book.change_id
+        )
+        
+        if self.connected:
+            await self._send("public/unsubscribe", {"channels": [channel]})
+            await self._send("public/subscribe", {"channels": [channel]})
+    
+    def _mark_books_stale(self):
+        for book in self.store.books.values():
+            book.in_sync = False
+    
+    def _publish(self, update: StreamUpdate):
+        for subscription in list(self._subscriptions):
+            if subscription.matches(update.channel):
+                subscription.push(update)
+    
+    def _finish_subscriptions(self):
+        for subscription in list(self._subscriptions):
+            subscription.finish()
+        self._subscriptions.clear()
+    
+    # ── 录制与回放 ────────────────────────────────────
+    
+    def _open_recording(self):
+        if self.record_path is not None and self._record_file is None:
+            self.record_path.parent.mkdir(parents=True, exist_ok=True)
+            self._record_file = open(self.record_path, 'a', encoding='utf-8')
+    
+    def _close_recording(self):
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+    
+    def _record(self, raw: Union[str, bytes]):
+        if self._record_file is None:
+            return
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        self._record_file.write(json.dumps({"received_at": time.time(), "message": json.loads(raw)}) + "\n")
+    
+    async def replay(self, path: str, speed: Optional[float] = None):
+        """
+        回放录制的消息文件
+        
+        文件每行一条消息：可以是record_path录制的 {"received_at": ..., "message": {...}}，
+        也可以直接是服务器消息。回放结束后所有迭代器结束迭代。
+        
+        Args:
+            path: 文件路径
+            speed: 按录制时间间隔回放的倍速（None表示不等待，尽快回放）
+        """
+        previous_at = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    entry = json.loads(line)
+                    message = entry.get("message", entry)
+                    received_at = entry.get("received_at")
+                    
+                    if speed and received_at is not None and previous_at is not None:
+                        await asyncio.sleep(max(0.0, (received_at - previous_at) / speed))
+                    previous_at = received_at
+                    
+                    await self.handle_message(message)
+                    # 让迭代器的消费者有机会处理更新
+                    await asyncio.sleep(0)
+        finally:
+            self._finish_subscriptions()
+        
+        logger.info(f"Replayed {self.stats['messages']} messages from {path}")
@@ -22,7 +22,9 @@ from src.historical.downloader import CryptoDataDownloader
 from src.historical.converter import HistoricalDataConverter
 from src.historical.validator import HistoricalDataValidator
 from src.historical.cache import HistoricalDataCache
+from src.historical.importer import StreamingImporter, ImportProgress
 from src.historical.manager import HistoricalDataManager
+from src.historical.columnar_store import ColumnarMarketData, InstrumentSeries, SharedMarketData
 
 __all__ = [
     'HistoricalOptionData',
@@ -42,5 +44,10 @@ __all__ = [
     'HistoricalDataConverter',
     'HistoricalDataValidator',
     'HistoricalDataCache',
+    'StreamingImporter',
+    'ImportProgress',
     'HistoricalDataManager',
+    'ColumnarMarketData',
+    'InstrumentSeries',
+    'SharedMarketData',
 ]
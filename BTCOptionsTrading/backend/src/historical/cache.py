@@ -3,22 +3,30 @@
 提供高效的数据存储和查询功能
 """
 
-import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
-from decimal import Decimal
 from typing import List, Optional, Dict, Tuple
-from collections import OrderedDict
 import json
 
 from src.historical.models import (
-    HistoricalOptionData, CoverageStats, DataSource
+    HistoricalOptionData, CoverageStats
 )
-from src.core.models import OptionType
+from src.historical.converter import OptionDataChunk
+from src.historical.result_cache import QueryResultCache
+from src.historical.sqlite_pool import SQLiteConnectionPool
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+INSERT_SQL = """
+    INSERT OR REPLACE INTO historical_option_data
+    (id, instrument_name, timestamp, open_price, high_price, low_price,
+     close_price, volume, strike_price, expiry_date, option_type,
+     underlying_symbol, data_source, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class HistoricalDataCache:
     """历史数据缓存"""
@@ -26,7 +34,8 @@ class HistoricalDataCache:
     def __init__(
         self,
         db_path: str = "data/historical_options.db",
-        cache_size_mb: int = 100
+        cache_size_mb: int = 100,
+        max_readers: int = 4
     ):
         """
         初始化缓存
@@ -34,15 +43,19 @@ class HistoricalDataCache:
         Args:
             db_path: 数据库文件路径
             cache_size_mb: 内存缓存大小（MB）
+            max_readers: 只读数据库连接数上限
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # LRU 缓存（内存）
+        # 持久连接（WAL模式，读写互不阻塞）
+        self.pool = SQLiteConnectionPool(str(self.db_path), max_readers=max_readers)
+        
+        # LRU 缓存（内存，列式存储，按实际字节数计量）
         self.cache_size_mb = cache_size_mb
-        self.memory_cache: OrderedDict[str, List[HistoricalOptionData]] = OrderedDict()
-        self.cache_size_bytes = 0
         self.max_cache_bytes = cache_size_mb * 1024 * 1024
+        self.memory_cache = QueryResultCache(self.max_cache_bytes)
+        self._cache_lock = threading.Lock()
         
         # 初始化数据库
         self._init_database()
@@ -51,9 +64,13 @@ class HistoricalDataCache:
     
     def _init_database(self):
         """初始化数据库表"""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        with self.pool.writer() as conn:
+            self._create_schema(conn.cursor())
         
+        logger.debug("Database initialized")
+    
+    def _create_schema(self, cursor):
+        """创建表和索引（如果不存在）"""
         # 创建历史数据表（如果不存在）
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS historical_option_data (
@@ -89,11 +106,6 @@ class HistoricalDataCache:
             CREATE INDEX IF NOT EXISTS idx_expiry 
             ON historical_option_data(expiry_date)
         """)
-        
-        conn.commit()
-        conn.close()
-        
-        logger.debug("Database initialized")
     
     def store_historical_data(
         self,
@@ -116,61 +128,83 @@ class HistoricalDataCache:
         
         logger.info(f"Storing {len(data)} records to database")
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         inserted_count = 0
         
         try:
-            # 批量插入
-            for i in range(0, len(data), batch_size):
-                batch = data[i:i + batch_size]
-                
-                records = [
-                    (
-                        str(d.id),
-                        d.instrument_name,
-                        int(d.timestamp.timestamp()),
-                        float(d.open_price),
-                        float(d.high_price),
-                        float(d.low_price),
-                        float(d.close_price),
-                        float(d.volume),
-                        float(d.strike_price),
-                        int(d.expiry_date.timestamp()),
-                        d.option_type.value,
-                        d.underlying_symbol,
-                        d.data_source.value,
-                        int(datetime.now().timestamp())
-                    )
-                    for d in batch
-                ]
+            # 写连接在上下文退出时提交，异常时回滚
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
                 
-                cursor.executemany("""
-                    INSERT OR REPLACE INTO historical_option_data
-                    (id, instrument_name, timestamp, open_price, high_price, low_price,
-                     close_price, volume, strike_price, expiry_date, option_type,
-                     underlying_symbol, data_source, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, records)
-                
-                inserted_count += len(batch)
-                
-                if (i + batch_size) % 10000 == 0:
-                    logger.debug(f"Inserted {inserted_count}/{len(data)} records")
+                # 批量插入
+                for i in range(0, len(data), batch_size):
+                    batch = data[i:i + batch_size]
+                    
+                    records = [
+                        (
+                            str(d.id),
+                            d.instrument_name,
+                            int(d.timestamp.timestamp()),
+                            float(d.open_price),
+                            float(d.high_price),
+                            float(d.low_price),
+                            float(d.close_price),
+                            float(d.volume),
+                            float(d.strike_price),
+                            int(d.expiry_date.timestamp()),
+                            d.option_type.value,
+                            d.underlying_symbol,
+                            d.data_source.value,
+                            int(datetime.now().timestamp())
+                        )
+                        for d in batch
+                    ]
+                    
+                    cursor.executemany(INSERT_SQL, records)
+                    
+                    inserted_count += len(batch)
+                    
+                    if (i + batch_size) % 10000 == 0:
+                        logger.debug(f"Inserted {inserted_count}/{len(data)} records")
             
-            conn.commit()
             logger.info(f"Successfully stored {inserted_count} records")
             
+            # 数据库内容变化，已缓存的查询结果可能过期
+            with self._cache_lock:
+                self.memory_cache.invalidate()
+            
         except Exception as e:
-            conn.rollback()
             logger.error(f"Failed to store data: {e}")
             raise
-        finally:
-            conn.close()
         
         return inserted_count
-
+    
+    def store_chunk(self, chunk: OptionDataChunk) -> int:
+        """
+        在一个事务中写入一块列式数据（流式导入使用）
+        
+        插入参数逐行生成，不会为整块数据创建对象列表。
+        
+        Args:
+            chunk: 列式数据块
+        
+        Returns:
+            写入的记录数
+        """
+        if len(chunk) == 0:
+            return 0
+        
+        try:
+            with self.pool.writer() as conn:
+                conn.executemany(INSERT_SQL, chunk.iter_db_rows(int(datetime.now().timestamp())))
+            
+            with self._cache_lock:
+                self.memory_cache.invalidate()
+        
+        except Exception as e:
+            logger.error(f"Failed to store chunk of {chunk.instrument_name}: {e}")
+            raise
+        
+        return len(chunk)
     
     def query_option_data(
         self,
@@ -193,57 +227,43 @@ class HistoricalDataCache:
         Returns:
             历史数据列表
         """
-        # 生成缓存键
-        cache_key = self._generate_cache_key(
-            instrument_name, start_date, end_date, underlying_symbol
-        )
-        
-        # 检查内存缓存
-        if use_cache and cache_key in self.memory_cache:
-            logger.debug(f"Cache hit: {cache_key}")
-            # 更新 LRU 顺序
-            self.memory_cache.move_to_end(cache_key)
-            return self.memory_cache[cache_key]
+        instrument_name = instrument_name or None
+        underlying_symbol = underlying_symbol or None
+        start, end = QueryResultCache.bounds(start_date, end_date)
+        
+        # 检查内存缓存（包括时间范围覆盖本次查询的缓存结果）
+        if use_cache:
+            with self._cache_lock:
+                rows = self.memory_cache.get(instrument_name, underlying_symbol, start, end)
+                generation = self.memory_cache.generation
+            if rows is not None:
+                logger.debug(f"Cache hit: {instrument_name or 'all'} ({len(rows)} records)")
+                return self.memory_cache.to_records(rows)
         
         # 从数据库查询
-        logger.debug(f"Cache miss, querying database: {cache_key}")
-        data = self._query_from_database(
-            instrument_name, start_date, end_date, underlying_symbol
+        logger.debug(
+            "Cache miss, querying database: %s|%s|%s|%s",
+            instrument_name or "all", start_date, end_date, underlying_symbol or "all"
         )
+        db_rows = self._fetch_rows(instrument_name, start_date, end_date, underlying_symbol)
         
-        # 更新内存缓存
-        if use_cache and data:
-            self._add_to_cache(cache_key, data)
+        with self._cache_lock:
+            rows = self.memory_cache.rows_from_db(db_rows)
+            
+            # 更新内存缓存
+            if use_cache:
+                self.memory_cache.put(instrument_name, underlying_symbol, start, end, rows, generation)
         
-        return data
-    
-    def _generate_cache_key(
-        self,
-        instrument_name: Optional[str],
-        start_date: Optional[datetime],
-        end_date: Optional[datetime],
-        underlying_symbol: Optional[str]
-    ) -> str:
-        """生成缓存键"""
-        parts = [
-            instrument_name or "all",
-            start_date.isoformat() if start_date else "none",
-            end_date.isoformat() if end_date else "none",
-            underlying_symbol or "all"
-        ]
-        return "|".join(parts)
+        return self.memory_cache.to_records(rows)
     
-    def _query_from_database(
+    def _fetch_rows(
         self,
         instrument_name: Optional[str],
         start_date: Optional[datetime],
         end_date: Optional[datetime],
         underlying_symbol: Optional[str]
-    ) -> List[HistoricalOptionData]:
-        """从数据库查询数据"""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
+    ) -> List[tuple]:
+        """从数据库查询原始行（按时间排序）"""
         # 构建查询
         query = "SELECT * FROM historical_option_data WHERE 1=1"
         params = []
@@ -266,53 +286,11 @@ class HistoricalDataCache:
         
         query += " ORDER BY timestamp ASC"
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # 转换为数据模型
-        data = []
-        for row in rows:
-            data.append(HistoricalOptionData(
-                id=row[0],
-                instrument_name=row[1],
-                timestamp=datetime.fromtimestamp(row[2]),
-                open_price=Decimal(str(row[3])),
-                high_price=Decimal(str(row[4])),
-                low_price=Decimal(str(row[5])),
-                close_price=Decimal(str(row[6])),
-                volume=Decimal(str(row[7])),
-                strike_price=Decimal(str(row[8])),
-                expiry_date=datetime.fromtimestamp(row[9]),
-                option_type=OptionType(row[10]),
-                underlying_symbol=row[11],
-                data_source=DataSource(row[12])
-            ))
-        
-        logger.debug(f"Queried {len(data)} records from database")
-        return data
-    
-    def _add_to_cache(self, key: str, data: List[HistoricalOptionData]):
-        """添加数据到内存缓存"""
-        # 估算数据大小（粗略估计）
-        data_size = len(data) * 200  # 每条记录约 200 字节
-        
-        # 如果数据太大，不缓存
-        if data_size > self.max_cache_bytes:
-            logger.debug(f"Data too large to cache: {data_size} bytes")
-            return
-        
-        # LRU 淘汰
-        while self.cache_size_bytes + data_size > self.max_cache_bytes and self.memory_cache:
-            oldest_key, oldest_data = self.memory_cache.popitem(last=False)
-            oldest_size = len(oldest_data) * 200
-            self.cache_size_bytes -= oldest_size
-            logger.debug(f"Evicted from cache: {oldest_key} ({oldest_size} bytes)")
-        
-        # 添加到缓存
-        self.memory_cache[key] = data
-        self.cache_size_bytes += data_size
-        logger.debug(f"Added to cache: {key} ({data_size} bytes)")
+        with self.pool.reader() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        logger.debug(f"Queried {len(rows)} records from database")
+        return rows
     
     def get_available_dates(
         self,
@@ -329,9 +307,6 @@ class HistoricalDataCache:
         Returns:
             日期列表
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         query = "SELECT DISTINCT timestamp FROM historical_option_data WHERE 1=1"
         params = []
         
@@ -345,9 +320,8 @@ class HistoricalDataCache:
         
         query += " ORDER BY timestamp ASC"
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self.pool.reader() as conn:
+            rows = conn.execute(query, params).fetchall()
         
         dates = [datetime.fromtimestamp(row[0]) for row in rows]
         
@@ -371,9 +345,6 @@ class HistoricalDataCache:
         Returns:
             合约名称列表
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         query = "SELECT DISTINCT instrument_name FROM historical_option_data WHERE 1=1"
         params = []
         
@@ -391,9 +362,8 @@ class HistoricalDataCache:
         
         query += " ORDER BY instrument_name ASC"
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self.pool.reader() as conn:
+            rows = conn.execute(query, params).fetchall()
         
         instruments = [row[0] for row in rows]
         
@@ -408,17 +378,14 @@ class HistoricalDataCache:
             clear_database: 是否同时清理数据库
         """
         # 清理内存缓存
-        self.memory_cache.clear()
-        self.cache_size_bytes = 0
+        with self._cache_lock:
+            self.memory_cache.invalidate()
         logger.info("Memory cache cleared")
         
         # 清理数据库
         if clear_database:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM historical_option_data")
-            conn.commit()
-            conn.close()
+            with self.pool.writer() as conn:
+                conn.execute("DELETE FROM historical_option_data")
             logger.info("Database cleared")
     
     def get_cache_stats(self) -> Dict:
@@ -428,26 +395,27 @@ class HistoricalDataCache:
         Returns:
             统计信息字典
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         # 数据库统计
-        cursor.execute("SELECT COUNT(*) FROM historical_option_data")
-        db_record_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT instrument_name) FROM historical_option_data")
-        db_instrument_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM historical_option_data")
-        time_range = cursor.fetchone()
+        with self.pool.reader() as conn:
+            db_record_count = conn.execute(
+                "SELECT COUNT(*) FROM historical_option_data"
+            ).fetchone()[0]
+            
+            db_instrument_count = conn.execute(
+                "SELECT COUNT(DISTINCT instrument_name) FROM historical_option_data"
+            ).fetchone()[0]
+            
+            time_range = conn.execute(
+                "SELECT MIN(timestamp), MAX(timestamp) FROM historical_option_data"
+            ).fetchone()
         
-        conn.close()
+        with self._cache_lock:
+            memory_stats = self.memory_cache.stats()
         
         stats = {
             'memory_cache': {
-                'entries': len(self.memory_cache),
-                'size_bytes': self.cache_size_bytes,
-                'size_mb': self.cache_size_bytes / (1024 * 1024),
+                **memory_stats,
+                'size_mb': memory_stats['size_bytes'] / (1024 * 1024),
                 'max_size_mb': self.cache_size_mb
             },
             'database': {
@@ -462,6 +430,10 @@ class HistoricalDataCache:
         
         return stats
     
+    def close(self):
+        """关闭数据库连接"""
+        self.pool.close()
+    
     def get_coverage_stats(
         self,
         start_date: datetime,
@@ -0,0 +1,404 @@
+"""
+列式历史行情存储
+将BacktestDataSet一次性转换为按合约分列的NumPy数组和按日期的索引，
+回测中的价格查询由线性扫描变为常数时间
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.historical.models import BacktestDataSet, HistoricalOptionData
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# 每个合约的列（均为8字节元素，可放入同一块共享内存）
+SERIES_COLUMNS = ('timestamps', 'open', 'high', 'low', 'close', 'volume')
+
+
+def _to_datetime64(timestamps: List[datetime]) -> np.ndarray:
+    """将datetime列表转换为微秒精度的datetime64数组（保持原始本地时间）"""
+    return np.array([ts.replace(tzinfo=None) for ts in timestamps], dtype='datetime64[us]')
+
+
+def _day_key(when: datetime) -> int:
+    """日期键（自1970-01-01起的天数，与datetime64[D]一致）"""
+    return int(np.datetime64(when.replace(tzinfo=None).date(), 'D').astype(np.int64))
+
+
+class InstrumentSeries:
+    """单个合约的列式数据（按时间排序）"""
+    
+    __slots__ = (
+        'instrument_name', 'strike_price', 'expiry_date', 'option_type',
+        'timestamps', 'open', 'high', 'low', 'close', 'volume', 'first_row_by_day'
+    )
+    
+    def __init__(self, instrument_name: str, records: List[HistoricalOptionData]):
+        """
+        从历史数据记录构建列式序列
+        
+        Args:
+            instrument_name: 合约名称
+            records: 该合约的历史数据记录（顺序任意）
+        """
+        first = records[0]
+        self.instrument_name = instrument_name
+        self.strike_price = float(first.strike_price)
+        self.expiry_date = first.expiry_date
+        self.option_type = first.option_type
+        
+        timestamps = _to_datetime64([r.timestamp for r in records])
+        order = np.argsort(timestamps, kind='stable')
+        
+        self.timestamps = timestamps[order]
+        self.open = np.array([float(r.open_price) for r in records])[order]
+        self.high = np.array([float(r.high_price) for r in records])[order]
+        self.low = np.array([float(r.low_price) for r in records])[order]
+        self.close = np.array([float(r.close_price) for r in records])[order]
+        self.volume = np.array([float(r.volume) for r in records])[order]
+        
+        # 每天的第一条记录（按原始记录顺序，与逐条扫描的结果一致）
+        days = timestamps.astype('datetime64[D]').astype(np.int64)
+        unique_days, first_idx = np.unique(days, return_index=True)
+        position_in_sorted = np.empty_like(order)
+        position_in_sorted[order] = np.arange(order.size)
+        self.first_row_by_day: Dict[int, int] = dict(
+            zip(unique_days.tolist(), position_in_sorted[first_idx].tolist())
+        )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        instrument_name: str,
+        strike_price: float,
+        expiry_date: datetime,
+        option_type,
+        columns: Dict[str, np.ndarray],
+        first_row_by_day: Dict[int, int]
+    ) -> 'InstrumentSeries':
+        """
+        直接由已排序的数组构建序列（数组不做拷贝，可以是共享内存上的视图）
+        
+        Args:
+            instrument_name: 合约名称
+            strike_price: 执行价
+            expiry_date: 到期日
+            option_type: 期权类型
+            columns: SERIES_COLUMNS中每一列的数组
+            first_row_by_day: 日期键 -> 当天第一条记录的行号
+        """
+        series = cls.__new__(cls)
+        series.instrument_name = instrument_name
+        series.strike_price = strike_price
+        series.expiry_date = expiry_date
+        series.option_type = option_type
+        for column in SERIES_COLUMNS:
+            setattr(series, column, columns[column])
+        series.first_row_by_day = first_row_by_day
+        return series
+    
+    def __len__(self) -> int:
+        return int(self.timestamps.size)
+    
+    def row_on(self, when: datetime) -> Optional[int]:
+        """指定日期第一条记录的行号，没有数据时返回None"""
+        return self.first_row_by_day.get(_day_key(when))
+    
+    def row_asof(self, when: datetime) -> Optional[int]:
+        """不晚于指定时间的最后一条记录的行号（as-of查询）"""
+        idx = int(np.searchsorted(self.timestamps, np.datetime64(when.replace(tzinfo=None), 'us'), side='right')) - 1
+        return idx if idx >= 0 else None
+
+
+class ColumnarMarketData:
+    """
+    列式回测行情数据
+    
+    每个合约保存一组按时间排序的NumPy数组，并维护 (日期, 合约) -> 行号 的索引。
+    """
+    
+    def __init__(self, series: Dict[str, InstrumentSeries], source: Optional[BacktestDataSet] = None):
+        """
+        初始化列式行情数据
+        
+        Args:
+            series: 合约名称 -> 列式序列（保持数据集中合约的顺序）
+            source: 构建所用的回测数据集
+        """
+        self.series = series
+        self.source = source
+        self.instruments: List[str] = list(series.keys())
+        self.instrument_index: Dict[str, int] = {name: i for i, name in enumerate(self.instruments)}
+        
+        # 每天的标的价格估算：按合约顺序第一个当天有数据的合约的执行价
+        self._underlying_by_day: Dict[int, float] = {}
+        for s in series.values():
+            for day in s.first_row_by_day:
+                self._underlying_by_day.setdefault(day, s.strike_price)
+    
+    @classmethod
+    def from_dataset(cls, dataset: BacktestDataSet) -> 'ColumnarMarketData':
+        """
+        从回测数据集构建列式数据（只需在回测开始时调用一次）
+        
+        Args:
+            dataset: 回测数据集
+        
+        Returns:
+            ColumnarMarketData对象
+        """
+        series = {
+            name: InstrumentSeries(name, records)
+            for name, records in dataset.options_data.items()
+            if records
+        }
+        store = cls(series, source=dataset)
+        
+        logger.info(
+            f"Columnar market data built: {len(series)} instruments, "
+            f"{store.total_records} records, {len(store._underlying_by_day)} trading days"
+        )
+        
+        return store
+    
+    @property
+    def total_records(self) -> int:
+        """总记录数"""
+        return sum(len(s) for s in self.series.values())
+    
+    def __contains__(self, instrument_name: str) -> bool:
+        return instrument_name in self.series
+    
+    def close_on(self, instrument_name: str, when: datetime) -> Optional[float]:
+        """
+        获取合约在指定日期的收盘价（当天第一条记录）
+        
+        Args:
+            instrument_name: 合约名称
+            when: 日期
+        
+        Returns:
+            收盘价，没有数据时返回None
+        """
+        s = self.series.get(instrument_name)
+        if s is None:
+            return None
+        row = s.row_on(when)
+        return None if row is None else float(s.close[row])
+    
+    def close_asof(self, instrument_name: str, when: datetime) -> Optional[float]:
+        """
+        获取合约在指定时间点（含）之前的最新收盘价
+        
+        Args:
+            instrument_name: 合约名称
+            when: 时间点
+        
+        Returns:
+            收盘价，没有数据时返回None
+        """
+        s = self.series.get(instrument_name)
+        if s is None:
+            return None
+        row = s.row_asof(when)
+        return None if row is None else float(s.close[row])
+    
+    def closes_on(self, instrument_names: List[str], when: datetime) -> np.ndarray:
+        """
+        批量获取多个合约在指定日期的收盘价
+        
+        Returns:
+            收盘价数组，没有数据的合约为NaN
+        """
+        day = _day_key(when)
+        result = np.full(len(instrument_names), np.nan)
+        for i, name in enumerate(instrument_names):
+            s = self.series.get(name)
+            if s is not None:
+                row = s.first_row_by_day.get(day)
+                if row is not None:
+                    result[i] = s.close[row]
+        return result
+    
+    def close_path(
+        self,
+        instrument_name: str,
+        timestamps: np.ndarray,
+        asof: bool = False,
+        max_staleness: Optional[timedelta] = None
+    ) -> np.ndarray:
+        """
+        批量获取合约在一组时间点上的收盘价
+        
+        Args:
+            instrument_name: 合约名称
+            timestamps: datetime64时间点数组
+            asof: True时取每个时间点（含）之前的最新记录，否则取当天第一条记录
+            max_staleness: as-of查询允许的最大数据滞后（None表示不限制）
+        
+        Returns:
+            收盘价数组，没有数据的时间点为NaN
+        """
+        timestamps = np.asarray(timestamps, dtype='datetime64[us]')
+        result = np.full(timestamps.shape, np.nan)
+        s = self.series.get(instrument_name)
+        if s is None:
+            return result
+        
+        if asof:
+            rows = np.searchsorted(s.timestamps, timestamps, side='right') - 1
+            valid = rows >= 0
+            if max_staleness is not None:
+                lag = timestamps - s.timestamps[np.maximum(rows, 0)]
+                valid &= lag <= np.timedelta64(max_staleness)
+        else:
+            days = timestamps.astype('datetime64[D]').astype(np.int64)
+            unique_days, inverse = np.unique(days, return_inverse=True)
+            day_rows = np.array(
+                [s.first_row_by_day.get(day, -1) for day in unique_days.tolist()], dtype=np.int64
+            )
+            rows = day_rows[inverse].reshape(timestamps.shape)
+            valid = rows >= 0
+        
+        result[valid] = s.close[rows[valid]]
+        return result
+    
+    def underlying_prices_for(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        批量估算一组时间点所在日期的标的价格
+        
+        Returns:
+            标的价格数组，当天没有任何数据时为NaN
+        """
+        timestamps = np.asarray(timestamps, dtype='datetime64[us]')
+        days = timestamps.astype('datetime64[D]').astype(np.int64)
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        day_prices = np.array(
+            [self._underlying_by_day.get(day, np.nan) for day in unique_days.tolist()], dtype=np.float64
+        )
+        return day_prices[inverse].reshape(timestamps.shape)
+    
+    def underlying_price_on(self, when: datetime) -> Optional[float]:
+        """
+        估算指定日期的标的价格（与逐条扫描时的平价期权近似相同）
+        
+        Returns:
+            标的价格，当天没有任何数据时返回None
+        """
+        return self._underlying_by_day.get(_day_key(when))
+    
+    def trading_days(self) -> List[datetime]:
+        """所有有数据的日期（升序）"""
+        return [_EPOCH + timedelta(days=day) for day in sorted(self._underlying_by_day)]
+    
+    def close_decimal_on(self, instrument_name: str, when: datetime) -> Optional[Decimal]:
+        """close_on的Decimal版本（供使用Decimal记账的回测引擎调用）"""
+        price = self.close_on(instrument_name, when)
+        return None if price is None else Decimal(str(price))
+
+
+class SharedMarketData:
+    """
+    共享内存中的列式行情数据
+    
+    父进程调用publish()把所有合约的数组拷贝进一块共享内存，
+    子进程用handle调用attach()得到零拷贝的ColumnarMarketData，
+    避免每个工作进程各自加载和转换数据集。
+    """
+    
+    def __init__(self, shm: shared_memory.SharedMemory, layout: List[Dict[str, Any]]):
+        self._shm = shm
+        self.layout = layout
+    
+    @classmethod
+    def publish(cls, market_data: ColumnarMarketData) -> 'SharedMarketData':
+        """
+        将列式数据拷贝到新建的共享内存
+        
+        Args:
+            market_data: 列式行情数据
+        
+        Returns:
+            SharedMarketData对象（使用完毕后需调用close()释放）
+        """
+        layout = []
+        offset = 0
+        for s in market_data.series.values():
+            layout.append({
+                'instrument_name': s.instrument_name,
+                'strike_price': s.strike_price,
+                'expiry_date': s.expiry_date,
+                'option_type': s.option_type,
+                'first_row_by_day': s.first_row_by_day,
+                'offset': offset,
+                'length': len(s)
+            })
+            offset += len(s) * len(SERIES_COLUMNS)
+        
+        # 共享内存大小不能为0
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1) * 8)
+        buffer = np.ndarray((offset,), dtype=np.int64, buffer=shm.buf)
+        
+        for entry, s in zip(layout, market_data.series.values()):
+            start = entry['offset']
+            for column in SERIES_COLUMNS:
+                values = getattr(s, column)
+                buffer[start:start + entry['length']] = values.view(np.int64)
+                start += entry['length']
+        
+        logger.info(f"Published {len(layout)} instruments to shared memory ({shm.size / 1024 / 1024:.1f}MB)")
+        
+        return cls(shm, layout)
+    
+    @property
+    def handle(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """可传给子进程的句柄（共享内存名称和数据布局）"""
+        return self._shm.name, self.layout
+    
+    @staticmethod
+    def attach(handle: Tuple[str, List[Dict[str, Any]]]) -> Tuple[ColumnarMarketData, shared_memory.SharedMemory]:
+        """
+        在子进程中挂载共享内存并重建列式数据
+        
+        Args:
+            handle: publish()所得对象的handle
+        
+        Returns:
+            (列式行情数据, 共享内存对象)；共享内存对象需在数据使用期间保持引用
+        """
+        name, layout = handle
+        shm = shared_memory.SharedMemory(name=name)
+        total = sum(entry['length'] for entry in layout) * len(SERIES_COLUMNS)
+        buffer = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        
+        series = {}
+        for entry in layout:
+            n = entry['length']
+            start = entry['offset']
+            columns = {}
+            for column in SERIES_COLUMNS:
+                view = buffer[start:start + n]
+                columns[column] = view.view('datetime64[us]') if column == 'timestamps' else view.view(np.float64)
+                start += n
+            series[entry['instrument_name']] = InstrumentSeries.from_arrays(
+                entry['instrument_name'],
+                entry['strike_price'],
+                entry['expiry_date'],
+                entry['option_type'],
+                columns,
+                entry['first_row_by_day']
+            )
+        
+        return ColumnarMarketData(series), shm
+    
+    def close(self):
+        """释放共享内存（由创建者调用）"""
+        self._shm.close()
+        self._shm.unlink()
@@ -4,14 +4,19 @@
 """
 
 import csv
+import itertools
 import re
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Iterator, List, Optional, TextIO, Tuple
+from uuid import uuid4
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import numpy as np
+
 from src.historical.models import (
     OptionOHLCV, OptionInfo, HistoricalOptionData, 
     DataSource, ValidationResult
@@ -22,6 +27,107 @@ from src.config.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+@dataclass
+class OptionDataChunk:
+    """
+    单个合约的一块历史数据（列式）
+    
+    流式导入时在工作进程与写入线程之间传递，比逐行的 HistoricalOptionData 列表
+    紧凑得多，序列化开销也小。
+    """
+    instrument_name: str
+    strike_price: float
+    expiry_timestamp: int
+    option_type: str
+    underlying_symbol: str
+    data_source: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    source_file: str = ""
+    
+    def __len__(self) -> int:
+        return int(self.timestamp.size)
+    
+    @property
+    def nbytes(self) -> int:
+        """数组占用的字节数"""
+        return sum(
+            column.nbytes
+            for column in (self.timestamp, self.open, self.high, self.low, self.close, self.volume)
+        )
+    
+    def iter_db_rows(self, created_at: int) -> Iterator[tuple]:
+        """
+        逐行产出 historical_option_data 表的插入参数
+        
+        Args:
+            created_at: 写入时间戳（秒）
+        
+        Yields:
+            与 INSERT 语句列顺序一致的元组
+        """
+        for ts, o, h, lo, c, v in zip(
+            self.timestamp.tolist(),
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+            self.volume.tolist()
+        ):
+            yield (
+                str(uuid4()),
+                self.instrument_name,
+                ts,
+                o,
+                h,
+                lo,
+                c,
+                v,
+                self.strike_price,
+                self.expiry_timestamp,
+                self.option_type,
+                self.underlying_symbol,
+                self.data_source,
+                created_at
+            )
+    
+    def to_records(self) -> List[HistoricalOptionData]:
+        """转换为 HistoricalOptionData 列表（用于数据验证）"""
+        strike_price = Decimal(str(self.strike_price))
+        expiry_date = datetime.fromtimestamp(self.expiry_timestamp)
+        option_type = OptionType(self.option_type)
+        data_source = DataSource(self.data_source)
+        
+        return [
+            HistoricalOptionData(
+                instrument_name=self.instrument_name,
+                timestamp=datetime.fromtimestamp(ts),
+                open_price=Decimal(str(o)),
+                high_price=Decimal(str(h)),
+                low_price=Decimal(str(lo)),
+                close_price=Decimal(str(c)),
+                volume=Decimal(str(v)),
+                strike_price=strike_price,
+                expiry_date=expiry_date,
+                option_type=option_type,
+                underlying_symbol=self.underlying_symbol,
+                data_source=data_source
+            )
+            for ts, o, h, lo, c, v in zip(
+                self.timestamp.tolist(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist()
+            )
+        ]
+
+
 class HistoricalDataConverter:
     """历史数据转换器"""
     
@@ -51,20 +157,7 @@ class HistoricalDataConverter:
         
         try:
             with open(csv_path, 'r', encoding='utf-8') as f:
-                # 跳过可能的头部注释行
-                lines = f.readlines()
-                
-                # 查找实际的 CSV 头部
-                header_index = 0
-                for i, line in enumerate(lines):
-                    if line.strip().startswith('unix') or line.strip().startswith('timestamp'):
-                        header_index = i
-                        break
-                
-                # 从头部开始解析
-                reader = csv.DictReader(lines[header_index:])
-                
-                for row_num, row in enumerate(reader, start=header_index + 1):
+                for row_num, row in self._iter_csv_rows(f):
                     try:
                         # 解析时间戳
                         timestamp = self._parse_timestamp(row)
@@ -98,6 +191,115 @@ class HistoricalDataConverter:
             logger.error(f"Failed to parse CSV file {csv_path}: {str(e)}")
             raise
     
+    def _iter_csv_rows(self, f: TextIO) -> Iterator[Tuple[int, dict]]:
+        """
+        逐行读取 CSV（不把整个文件读入内存）
+        
+        跳过实际表头（以 unix 或 timestamp 开头的行）之前的注释行；
+        找不到这样的行时把第一行当作表头。
+        
+        Args:
+            f: 已打开的文本文件
+        
+        Yields:
+            (行号, 行数据)
+        """
+        header_index = 0
+        while True:
+            line = f.readline()
+            if not line:
+                # 没有可识别的表头，从文件开头解析
+                f.seek(0)
+                header_index = 0
+                reader = csv.DictReader(f)
+                break
+            stripped = line.strip()
+            if stripped.startswith('unix') or stripped.startswith('timestamp'):
+                reader = csv.DictReader(itertools.chain([line], f))
+                break
+            header_index += 1
+        
+        yield from enumerate(reader, start=header_index + 1)
+    
+    def iter_file_chunks(
+        self,
+        csv_path: Path,
+        chunk_size: int = 50000,
+        data_source: DataSource = DataSource.CRYPTO_DATA_DOWNLOAD
+    ) -> Iterator[OptionDataChunk]:
+        """
+        流式解析 CSV 文件，按块产出列式数据
+        
+        与 parse_csv_file + convert_to_internal_format 的结果一致（同样跳过无效行），
+        但不创建逐行对象，内存占用只与 chunk_size 有关。
+        
+        Args:
+            csv_path: CSV 文件路径
+            chunk_size: 每块最多包含的行数
+            data_source: 数据源
+        
+        Yields:
+            OptionDataChunk
+        
+        Raises:
+            ValueError: 文件名格式无效
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        option_info = self.extract_option_info(csv_path.name)
+        instrument_name = option_info.to_instrument_name()
+        
+        def make_chunk(columns: List[list]) -> OptionDataChunk:
+            timestamps, opens, highs, lows, closes, volumes = columns
+            return OptionDataChunk(
+                instrument_name=instrument_name,
+                strike_price=float(option_info.strike_price),
+                expiry_timestamp=int(option_info.expiry_date.timestamp()),
+                option_type=option_info.option_type.value,
+                underlying_symbol=option_info.symbol,
+                data_source=data_source.value,
+                timestamp=np.array(timestamps, dtype=np.int64),
+                open=np.array(opens, dtype=np.float64),
+                high=np.array(highs, dtype=np.float64),
+                low=np.array(lows, dtype=np.float64),
+                close=np.array(closes, dtype=np.float64),
+                volume=np.array(volumes, dtype=np.float64),
+                source_file=str(csv_path)
+            )
+        
+        columns: List[list] = [[] for _ in range(6)]
+        
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            for row_num, row in self._iter_csv_rows(f):
+                try:
+                    timestamp = int(self._parse_timestamp(row).timestamp())
+                    o = float(row.get('open', row.get('Open', '0')))
+                    h = float(row.get('high', row.get('High', '0')))
+                    lo = float(row.get('low', row.get('Low', '0')))
+                    c = float(row.get('close', row.get('Close', '0')))
+                    v = float(row.get('volume', row.get('Volume', '0')))
+                    
+                    # 与 OptionOHLCV 相同的 OHLC 关系检查
+                    if not (lo <= o <= h) or not (lo <= c <= h):
+                        raise ValueError(f"Invalid OHLC relationship: Low={lo}, Open={o}, High={h}, Close={c}")
+                    if lo < 0:
+                        raise ValueError("Prices cannot be negative")
+                
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Failed to parse row {row_num} in {csv_path.name}: {e}")
+                    continue
+                
+                for column, value in zip(columns, (timestamp, o, h, lo, c, v)):
+                    column.append(value)
+                
+                if len(columns[0]) >= chunk_size:
+                    yield make_chunk(columns)
+                    columns = [[] for _ in range(6)]
+        
+        if columns[0]:
+            yield make_chunk(columns)
+    
     def _parse_timestamp(self, row: dict) -> datetime:
         """
         解析时间戳
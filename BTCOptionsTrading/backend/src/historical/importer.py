@@ -0,0 +1,263 @@
+"""
+历史数据流式导入
+CSV按块解析为列式数据（当前线程或工作进程）-> 有界队列 -> 单个写入线程逐块提交。
+队列满时解析端阻塞等待（背压），内存占用只取决于块大小和队列长度，与导入的文件数量无关
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.historical.cache import HistoricalDataCache
+from src.historical.converter import HistoricalDataConverter, OptionDataChunk
+from src.historical.models import DataQualityReport, ImportResult
+from src.historical.validator import HistoricalDataValidator, QualityReportAccumulator
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ChunkResult = Tuple[OptionDataChunk, Optional[DataQualityReport]]
+
+
+@dataclass
+class ImportProgress:
+    """导入进度"""
+    total_files: int
+    files_completed: int = 0
+    records_parsed: int = 0
+    records_written: int = 0
+    queued_chunks: int = 0
+    
+    @property
+    def progress(self) -> float:
+        """已完成文件比例"""
+        if self.total_files == 0:
+            return 1.0
+        return self.files_completed / self.total_files
+
+
+# 工作进程内复用的转换器和验证器
+_worker_converter: Optional[HistoricalDataConverter] = None
+_worker_validator: Optional[HistoricalDataValidator] = None
+
+
+def _convert_chunks(
+    converter: HistoricalDataConverter,
+    validator: Optional[HistoricalDataValidator],
+    csv_path: Path,
+    chunk_size: int
+) -> Iterator[ChunkResult]:
+    """按块解析文件，需要时为每块生成质量报告"""
+    for chunk in converter.iter_file_chunks(csv_path, chunk_size=chunk_size):
+        report = validator.generate_quality_report(chunk.to_records()) if validator else None
+        yield chunk, report
+
+
+def _convert_file_worker(csv_path: Path, chunk_size: int, validate: bool) -> List[ChunkResult]:
+    """
+    工作进程函数：解析单个文件
+    
+    返回列式数据块（而不是HistoricalOptionData列表），传回主进程的数据量小得多。
+    
+    Args:
+        csv_path: CSV 文件路径
+        chunk_size: 每块最多包含的行数
+        validate: 是否生成质量报告
+    
+    Returns:
+        (数据块, 质量报告) 列表
+    """
+    global _worker_converter, _worker_validator
+    if _worker_converter is None:
+        _worker_converter = HistoricalDataConverter()
+        _worker_validator = HistoricalDataValidator()
+    
+    validator = _worker_validator if validate else None
+    return list(_convert_chunks(_worker_converter, validator, csv_path, chunk_size))
+
+
+class StreamingImporter:
+    """
+    流式历史数据导入器
+    
+    - max_workers <= 1 时在调用线程中逐块解析，同一时间只有一块数据在解析端
+    - max_workers > 1 时使用进程池，每个任务解析一个文件，
+      同时在途的任务数限制为 2 * max_workers
+    - 所有写入由单个写入线程完成（SQLite同一时间只允许一个写事务），每块一个事务
+    """
+    
+    def __init__(
+        self,
+        cache: HistoricalDataCache,
+        converter: Optional[HistoricalDataConverter] = None,
+        validator: Optional[HistoricalDataValidator] = None,
+        chunk_size: int = 50000,
+        queue_size: int = 8,
+        max_workers: int = 1,
+        max_report_issues: int = 1000
+    ):
+        """
+        初始化导入器
+        
+        Args:
+            cache: 历史数据缓存（数据写入其数据库）
+            converter: 转换器
+            validator: 验证器
+            chunk_size: 每块最多包含的行数
+            queue_size: 等待写入的最大块数（队列满时解析端阻塞）
+            max_workers: 解析进程数（<= 1 表示在当前线程解析）
+            max_report_issues: 质量报告中最多保留的问题条数
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        
+        self.cache = cache
+        self.converter = converter or HistoricalDataConverter()
+        self.validator = validator or HistoricalDataValidator()
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.max_workers = max_workers
+        self.max_report_issues = max_report_issues
+    
+    def run(
+        self,
+        file_paths: List[Path],
+        validate: bool = True,
+        progress_callback: Optional[Callable[[ImportProgress], None]] = None
+    ) -> ImportResult:
+        """
+        导入文件
+        
+        Args:
+            file_paths: CSV 文件路径列表
+            validate: 是否生成质量报告
+            progress_callback: 进度回调（在写入线程中调用，每提交一块调用一次，结束时再调用一次）
+        
+        Returns:
+            导入结果（没有解析出任何记录或写入失败的文件计为失败）
+        """
+        start_time = time.time()
+        progress = ImportProgress(total_files=len(file_paths))
+        accumulator = QualityReportAccumulator(self.max_report_issues) if validate else None
+        failed: Dict[str, None] = {}
+        
+        chunks: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        writer = threading.Thread(
+            target=self._write_loop,
+            args=(chunks, progress, failed, progress_callback),
+            name="historical-import-writer",
+            daemon=True
+        )
+        writer.start()
+        
+        try:
+            for path, results in self._iter_converted(file_paths, validate):
+                parsed = 0
+                try:
+                    for chunk, report in results:
+                        if accumulator is not None and report is not None:
+                            accumulator.add(report)
+                        parsed += len(chunk)
+                        progress.records_parsed += len(chunk)
+                        # 队列满时阻塞，等待写入线程跟上
+                        chunks.put(chunk)
+                except Exception as e:
+                    logger.error(f"Failed to process {path}: {e}")
+                    failed[str(path)] = None
+                
+                if parsed == 0:
+                    failed[str(path)] = None
+                progress.files_completed += 1
+                
+                logger.debug(f"Progress: {progress.files_completed}/{progress.total_files} files parsed")
+        finally:
+            chunks.put(None)
+            writer.join()
+        
+        self._notify(progress_callback, progress)
+        
+        failed_files = list(failed)
+        return ImportResult(
+            success_count=len(file_paths) - len(failed_files),
+            failure_count=len(failed_files),
+            total_count=len(file_paths),
+            quality_report=accumulator.report() if accumulator is not None and progress.records_parsed else None,
+            failed_files=failed_files,
+            import_duration_seconds=time.time() - start_time,
+            records_imported=progress.records_written
+        )
+    
+    def _iter_converted(
+        self,
+        file_paths: List[Path],
+        validate: bool
+    ) -> Iterator[Tuple[Path, Iterator[ChunkResult]]]:
+        """按文件产出解析结果（解析中的异常在迭代结果时抛出）"""
+        validator = self.validator if validate else None
+        
+        if self.max_workers <= 1:
+            for path in file_paths:
+                yield path, _convert_chunks(self.converter, validator, Path(path), self.chunk_size)
+            return
+        
+        paths = iter(file_paths)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            
+            def submit_next():
+                path = next(paths, None)
+                if path is not None:
+                    future = executor.submit(_convert_file_worker, Path(path), self.chunk_size, validate)
+                    pending[future] = path
+            
+            for _ in range(self.max_workers * 2):
+                submit_next()
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    submit_next()
+                    yield path, self._future_results(future)
+    
+    @staticmethod
+    def _future_results(future) -> Iterator[ChunkResult]:
+        """工作进程中的异常在迭代时抛出"""
+        yield from future.result()
+    
+    def _write_loop(
+        self,
+        chunks: queue.Queue,
+        progress: ImportProgress,
+        failed: Dict[str, None],
+        progress_callback: Optional[Callable[[ImportProgress], None]]
+    ):
+        """写入线程：逐块提交，直到收到结束标记"""
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            
+            try:
+                progress.records_written += self.cache.store_chunk(chunk)
+            except Exception as e:
+                logger.error(f"Failed to store data from {chunk.source_file}: {e}")
+                failed[chunk.source_file] = None
+            
+            progress.queued_chunks = chunks.qsize()
+            self._notify(progress_callback, progress)
+    
+    @staticmethod
+    def _notify(progress_callback: Optional[Callable[[ImportProgress], None]], progress: ImportProgress):
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(progress)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
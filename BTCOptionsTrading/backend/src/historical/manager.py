@@ -7,13 +7,14 @@ import time
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from decimal import Decimal
 
 from src.historical.downloader import CryptoDataDownloader
 from src.historical.converter import HistoricalDataConverter
 from src.historical.validator import HistoricalDataValidator
 from src.historical.cache import HistoricalDataCache
+from src.historical.importer import ImportProgress, StreamingImporter
 from src.historical.models import (
     HistoricalOptionData, ImportResult, UpdateResult,
     BacktestDataSet, DataQualityReport, CoverageStats
@@ -65,18 +66,29 @@ class HistoricalDataManager:
         file_paths: Optional[List[Path]] = None,
         download_first: bool = False,
         validate: bool = True,
-        generate_report: bool = True
+        generate_report: bool = True,
+        max_workers: int = 1,
+        chunk_size: int = 50000,
+        queue_size: int = 8,
+        progress_callback: Optional[Callable[[ImportProgress], None]] = None
     ) -> ImportResult:
         """
         导入历史数据
         
         完整流程：下载 -> 转换 -> 验证 -> 存储
         
+        转换、验证和存储以流水线方式按块进行：解析出的数据块进入有界队列，
+        由单个写入线程逐块提交，内存占用与导入的文件数量无关。
+        
         Args:
             file_paths: CSV 文件路径列表（如果为 None，则处理下载目录中的所有文件）
             download_first: 是否先下载数据
             validate: 是否验证数据
             generate_report: 是否生成质量报告
+            max_workers: 解析进程数（1 表示在当前线程解析）
+            chunk_size: 每块最多包含的行数
+            queue_size: 等待写入的最大块数
+            progress_callback: 进度回调（在写入线程中调用）
             
         Returns:
             导入结果
@@ -109,57 +121,32 @@ class HistoricalDataManager:
                 import_duration_seconds=time.time() - start_time
             )
         
-        # 步骤 3: 转换数据
-        logger.info(f"Step 2: Converting {len(file_paths)} files...")
-        all_data = []
-        failed_files = []
-        
-        for file_path in file_paths:
-            try:
-                data = self.converter.process_file(file_path)
-                if data:
-                    all_data.extend(data)
-                else:
-                    failed_files.append(str(file_path))
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                failed_files.append(str(file_path))
-        
-        logger.info(f"Converted {len(all_data)} records from {len(file_paths)} files")
+        # 步骤 3-5: 流式转换、验证、存储
+        logger.info(f"Step 2: Importing {len(file_paths)} files (streaming)...")
+        importer = StreamingImporter(
+            cache=self.cache,
+            converter=self.converter,
+            validator=self.validator,
+            chunk_size=chunk_size,
+            queue_size=queue_size,
+            max_workers=max_workers
+        )
+        result = importer.run(file_paths, validate=validate, progress_callback=progress_callback)
         
-        # 步骤 4: 验证数据（如果需要）
-        quality_report = None
-        if validate and all_data:
-            logger.info("Step 3: Validating data...")
-            quality_report = self.validator.generate_quality_report(all_data)
+        quality_report = result.quality_report
+        if quality_report is not None:
             logger.info(
                 f"Validation complete: quality_score={quality_report.quality_score:.1f}, "
                 f"issues={len(quality_report.issues)}"
             )
         
-        # 步骤 5: 存储数据
-        records_imported = 0
-        if all_data:
-            logger.info(f"Step 4: Storing {len(all_data)} records...")
-            try:
-                records_imported = self.cache.store_historical_data(all_data)
-                logger.info(f"Successfully stored {records_imported} records")
-            except Exception as e:
-                logger.error(f"Failed to store data: {e}")
-        
         # 计算结果
-        success_count = len(file_paths) - len(failed_files)
+        success_count = result.success_count
+        records_imported = result.records_imported
         duration = time.time() - start_time
         
-        result = ImportResult(
-            success_count=success_count,
-            failure_count=len(failed_files),
-            total_count=len(file_paths),
-            quality_report=quality_report if generate_report else None,
-            failed_files=failed_files,
-            import_duration_seconds=duration,
-            records_imported=records_imported
-        )
+        result.quality_report = quality_report if generate_report else None
+        result.import_duration_seconds = duration
         
         logger.info(
             f"Import complete: {success_count}/{len(file_paths)} files successful, "
@@ -435,6 +422,10 @@ class HistoricalDataManager:
         logger.info(f"Clearing cache (clear_database={clear_database})")
         self.cache.clear_cache(clear_database=clear_database)
     
+    def close(self):
+        """关闭数据库连接"""
+        self.cache.close()
+    
     def export_data(
         self,
         start_date: datetime,
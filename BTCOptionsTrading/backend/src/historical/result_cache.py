@@ -0,0 +1,330 @@
+"""
+历史查询结果的列式内存缓存
+查询结果按列保存为NumPy数组（字符串列使用符号表编码），按实际字节数做LRU淘汰；
+时间范围被已缓存结果覆盖的查询直接在缓存上切片返回，无需访问数据库
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.historical.models import HistoricalOptionData, DataSource
+from src.core.models import OptionType
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 无界时间范围的哨兵值（秒级时间戳）
+UNBOUNDED_START = np.iinfo(np.int64).min
+UNBOUNDED_END = np.iinfo(np.int64).max
+
+
+class ColumnarRows:
+    """
+    按时间排序的一组历史数据行（列式存储）
+    
+    列与historical_option_data表的列一一对应，字符串列保存为符号表中的编码。
+    """
+    
+    __slots__ = (
+        'ids', 'instrument', 'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'strike', 'expiry', 'option_type', 'underlying', 'source'
+    )
+    
+    def __init__(self, **columns: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+    
+    def __len__(self) -> int:
+        return int(self.timestamp.size)
+    
+    @property
+    def nbytes(self) -> int:
+        """所有列占用的字节数"""
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+    
+    def take(self, index) -> 'ColumnarRows':
+        """按切片或布尔掩码选取行"""
+        return ColumnarRows(**{name: getattr(self, name)[index] for name in self.__slots__})
+
+
+class SymbolTable:
+    """字符串 <-> 整数编码（合约名、标的、数据来源等重复度很高的列）"""
+    
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._symbols: List[str] = []
+    
+    def encode(self, values: Sequence[str]) -> np.ndarray:
+        codes = self._codes
+        symbols = self._symbols
+        result = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(symbols)
+                symbols.append(value)
+            result[i] = code
+        return result
+    
+    def code_of(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+    
+    def decode(self, codes: np.ndarray) -> List[str]:
+        symbols = self._symbols
+        return [symbols[c] for c in codes.tolist()]
+    
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+@dataclass
+class _CacheEntry:
+    """一条缓存结果及其覆盖的查询范围"""
+    instrument_name: Optional[str]
+    underlying_symbol: Optional[str]
+    start: int
+    end: int
+    rows: ColumnarRows
+    
+    def covers(self, start: int, end: int) -> bool:
+        return self.start <= start and end <= self.end
+
+
+class QueryResultCache:
+    """
+    历史查询结果缓存
+    
+    查询按 (合约, 标的) 分组；同组中时间范围覆盖新查询的缓存结果可直接切片返回，
+    未指定合约的结果还可以按合约过滤后服务单合约查询。
+    """
+    
+    def __init__(self, max_bytes: int):
+        """
+        初始化缓存
+        
+        Args:
+            max_bytes: 缓存数组占用的最大字节数
+        """
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.symbols = SymbolTable()
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        # 每次失效加一；查询开始后发生过失效的结果不再写入缓存
+        self.generation = 0
+        
+        self.hits = 0
+        self.superset_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def rows_from_db(self, rows: List[tuple]) -> ColumnarRows:
+        """
+        将数据库查询结果（SELECT * 的行）转换为列式数据
+        
+        Args:
+            rows: 按时间排序的数据库行
+        
+        Returns:
+            ColumnarRows
+        """
+        if rows:
+            (ids, instruments, timestamps, opens, highs, lows, closes, volumes,
+             strikes, expiries, option_types, underlyings, sources) = list(zip(*rows))[:13]
+        else:
+            ids = instruments = timestamps = opens = highs = lows = closes = volumes = ()
+            strikes = expiries = option_types = underlyings = sources = ()
+        
+        return ColumnarRows(
+            ids=np.array(ids, dtype='S'),
+            instrument=self.symbols.encode(instruments),
+            timestamp=np.array(timestamps, dtype=np.int64),
+            open=np.array(opens, dtype=np.float64),
+            high=np.array(highs, dtype=np.float64),
+            low=np.array(lows, dtype=np.float64),
+            close=np.array(closes, dtype=np.float64),
+            volume=np.array(volumes, dtype=np.float64),
+            strike=np.array(strikes, dtype=np.float64),
+            expiry=np.array(expiries, dtype=np.int64),
+            option_type=self.symbols.encode(option_types),
+            underlying=self.symbols.encode(underlyings),
+            source=self.symbols.encode(sources)
+        )
+    
+    def to_records(self, rows: ColumnarRows) -> List[HistoricalOptionData]:
+        """
+        将列式数据还原为HistoricalOptionData列表（与直接查询数据库的结果一致）
+        """
+        decode = self.symbols.decode
+        option_types = {name: OptionType(name) for name in set(decode(np.unique(rows.option_type)))}
+        sources = {name: DataSource(name) for name in set(decode(np.unique(rows.source)))}
+        
+        return [
+            HistoricalOptionData(
+                id=record_id.decode('ascii'),
+                instrument_name=instrument,
+                timestamp=datetime.fromtimestamp(ts),
+                open_price=Decimal(str(o)),
+                high_price=Decimal(str(h)),
+                low_price=Decimal(str(lo)),
+                close_price=Decimal(str(c)),
+                volume=Decimal(str(v)),
+                strike_price=Decimal(str(k)),
+                expiry_date=datetime.fromtimestamp(exp),
+                option_type=option_types[option_type],
+                underlying_symbol=underlying,
+                data_source=sources[source]
+            )
+            for record_id, instrument, ts, o, h, lo, c, v, k, exp, option_type, underlying, source in zip(
+                rows.ids.tolist(),
+                decode(rows.instrument),
+                rows.timestamp.tolist(),
+                rows.open.tolist(),
+                rows.high.tolist(),
+                rows.low.tolist(),
+                rows.close.tolist(),
+                rows.volume.tolist(),
+                rows.strike.tolist(),
+                rows.expiry.tolist(),
+                decode(rows.option_type),
+                decode(rows.underlying),
+                decode(rows.source)
+            )
+        ]
+    
+    def get(
+        self,
+        instrument_name: Optional[str],
+        underlying_symbol: Optional[str],
+        start: int,
+        end: int
+    ) -> Optional[ColumnarRows]:
+        """
+        查找能覆盖查询的缓存结果
+        
+        Args:
+            instrument_name: 合约名称（None表示全部合约）
+            underlying_symbol: 标的资产符号（None表示全部）
+            start: 开始时间戳（秒，无界时为UNBOUNDED_START）
+            end: 结束时间戳（秒，无界时为UNBOUNDED_END）
+        
+        Returns:
+            查询结果，未命中时返回None
+        """
+        best_id, best = None, None
+        for entry_id, entry in self._entries.items():
+            if entry.underlying_symbol != underlying_symbol or not entry.covers(start, end):
+                continue
+            if entry.instrument_name != instrument_name and entry.instrument_name is not None:
+                continue
+            # 优先使用同一合约的结果，其次是最小的覆盖范围
+            rank = (entry.instrument_name != instrument_name, len(entry.rows))
+            if best is None or rank < best[0]:
+                best_id, best = entry_id, (rank, entry)
+        
+        if best is None:
+            self.misses += 1
+            return None
+        
+        entry = best[1]
+        self._entries.move_to_end(best_id)
+        
+        rows = entry.rows
+        if entry.instrument_name != instrument_name:
+            code = self.symbols.code_of(instrument_name)
+            rows = rows.take(rows.instrument == code)
+        
+        if (entry.start, entry.end) == (start, end) and entry.instrument_name == instrument_name:
+            self.hits += 1
+            return rows
+        
+        self.superset_hits += 1
+        lo = np.searchsorted(rows.timestamp, start, side='left')
+        hi = np.searchsorted(rows.timestamp, end, side='right')
+        return rows.take(slice(lo, hi))
+    
+    def put(
+        self,
+        instrument_name: Optional[str],
+        underlying_symbol: Optional[str],
+        start: int,
+        end: int,
+        rows: ColumnarRows,
+        generation: Optional[int] = None
+    ):
+        """
+        缓存查询结果（被新结果覆盖的旧结果会被移除）
+        
+        Args:
+            instrument_name: 合约名称（None表示全部合约）
+            underlying_symbol: 标的资产符号（None表示全部）
+            start: 开始时间戳
+            end: 结束时间戳
+            rows: 查询结果
+            generation: 查询开始时的generation（已过期则不缓存）
+        """
+        if generation is not None and generation != self.generation:
+            return
+        
+        size = rows.nbytes
+        if size > self.max_bytes:
+            logger.debug(f"Data too large to cache: {size} bytes")
+            return
+        
+        new_entry = _CacheEntry(instrument_name, underlying_symbol, start, end, rows)
+        for entry_id in [
+            entry_id for entry_id, entry in self._entries.items()
+            if entry.instrument_name == instrument_name
+            and entry.underlying_symbol == underlying_symbol
+            and new_entry.covers(entry.start, entry.end)
+        ]:
+            self.size_bytes -= self._entries.pop(entry_id).rows.nbytes
+        
+        # LRU 淘汰
+        while self.size_bytes + size > self.max_bytes and self._entries:
+            _, oldest = self._entries.popitem(last=False)
+            self.size_bytes -= oldest.rows.nbytes
+            self.evictions += 1
+            logger.debug(f"Evicted from cache: {oldest.instrument_name or 'all'} ({oldest.rows.nbytes} bytes)")
+        
+        self._entries[self._next_id] = new_entry
+        self._next_id += 1
+        self.size_bytes += size
+    
+    def invalidate(self):
+        """清空缓存结果（数据库内容变化后调用）"""
+        if self._entries:
+            self.invalidations += 1
+        self.generation += 1
+        self._entries.clear()
+        self.size_bytes = 0
+    
+    def stats(self) -> Dict:
+        """命中率等统计信息"""
+        lookups = self.hits + self.superset_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes,
+            'hits': self.hits,
+            'superset_hits': self.superset_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.superset_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+    
+    @staticmethod
+    def bounds(start_date: Optional[datetime], end_date: Optional[datetime]) -> Tuple[int, int]:
+        """将查询日期转换为与数据库一致的秒级时间戳范围"""
+        start = int(start_date.timestamp()) if start_date else int(UNBOUNDED_START)
+        end = int(end_date.timestamp()) if end_date else int(UNBOUNDED_END)
+        return start, end
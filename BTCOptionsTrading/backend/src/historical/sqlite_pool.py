@@ -0,0 +1,201 @@
+"""
+SQLite连接管理
+为历史数据库提供持久连接：一个加锁的写连接和一组只读连接池，
+统一开启WAL日志并设置页缓存、mmap等参数，读写互不阻塞
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SQLiteConnectionPool:
+    """
+    SQLite连接池
+    
+    - 写连接只有一个（SQLite同一时间只允许一个写事务），通过锁串行化，
+      在上下文退出时提交或回滚
+    - 读连接以只读模式打开，按需创建并复用，最多max_readers个
+    - 每个连接缓存已编译的语句（cached_statements），相同SQL无需重复解析
+    - 进程fork后自动丢弃继承来的连接，在新进程中重新打开
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        max_readers: int = 4,
+        cache_size_mb: int = 64,
+        mmap_size_mb: int = 256,
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256
+    ):
+        """
+        初始化连接池
+        
+        Args:
+            db_path: 数据库文件路径
+            max_readers: 只读连接数上限
+            cache_size_mb: 每个连接的页缓存大小（MB）
+            mmap_size_mb: 内存映射读取的大小（MB，0表示关闭）
+            busy_timeout_ms: 等待锁的超时时间（毫秒）
+            cached_statements: 每个连接缓存的预编译语句数
+        """
+        if max_readers < 1:
+            raise ValueError("max_readers must be at least 1")
+        
+        self.db_path = Path(db_path)
+        self.max_readers = max_readers
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._reset()
+        
+        # 打开写连接：确保数据库文件存在并切换到WAL（该设置持久保存在数据库中）
+        with self.writer():
+            pass
+        
+        logger.debug(f"SQLite connection pool ready: {self.db_path} (readers={max_readers})")
+    
+    def _reset(self):
+        """清空连接状态（初始化和fork之后调用）"""
+        self._pid = os.getpid()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._idle_readers: queue.LifoQueue = queue.LifoQueue()
+        self._readers: List[sqlite3.Connection] = []
+        self._reader_slots = threading.BoundedSemaphore(self.max_readers)
+    
+    def _check_pid(self):
+        """fork出的子进程不能复用父进程的连接"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+    
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """设置连接级参数"""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_mb) * 1024}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+    
+    def _open_writer(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if str(mode).lower() != 'wal':
+            logger.warning(f"WAL journal mode unavailable for {self.db_path}, using {mode}")
+        # WAL模式下NORMAL不会损坏数据库，只在断电时可能丢失最近的提交
+        conn.execute("PRAGMA synchronous = NORMAL")
+        self._apply_pragmas(conn)
+        return conn
+    
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.execute("PRAGMA query_only = ON")
+        self._apply_pragmas(conn)
+        return conn
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        获取写连接
+        
+        同一时间只有一个线程持有写连接；正常退出时提交，异常时回滚。
+        
+        Yields:
+            写连接
+        """
+        self._check_pid()
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open_writer()
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        从只读连接池借用一个连接
+        
+        连接数达到上限时等待其他线程归还。WAL模式下读操作不会被写事务阻塞。
+        
+        Yields:
+            只读连接
+        """
+        self._check_pid()
+        pid = self._pid
+        slots = self._reader_slots
+        idle = self._idle_readers
+        
+        slots.acquire()
+        try:
+            try:
+                conn = idle.get_nowait()
+            except queue.Empty:
+                conn = self._open_reader()
+                with self._lock:
+                    self._readers.append(conn)
+            
+            try:
+                yield conn
+            finally:
+                if pid == os.getpid():
+                    idle.put(conn)
+        finally:
+            slots.release()
+    
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """
+        将WAL内容写回主数据库文件
+        
+        Args:
+            mode: PASSIVE / FULL / RESTART / TRUNCATE
+        """
+        with self.writer() as conn:
+            conn.execute(f"PRAGMA wal_checkpoint({mode})")
+    
+    def close(self):
+        """关闭所有连接"""
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        
+        with self._lock:
+            readers, self._readers = self._readers, []
+            self._idle_readers = queue.LifoQueue()
+        for conn in readers:
+            conn.close()
+        
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        
+        logger.debug(f"SQLite connection pool closed: {self.db_path}")
@@ -556,3 +556,92 @@ class HistoricalDataValidator:
         )
         
         return stats
+
+
+class QualityReportAccumulator:
+    """
+    逐块合并数据质量报告
+    
+    流式导入时每块数据单独生成报告，这里只累加计数和有限数量的问题，
+    内存占用与导入的数据量无关。
+    """
+    
+    def __init__(self, max_issues: int = 1000):
+        """
+        初始化累加器
+        
+        Args:
+            max_issues: 最多保留的问题条数（超出部分只计数）
+        """
+        self.max_issues = max_issues
+        self.total_records = 0
+        self.missing_records = 0
+        self.anomaly_records = 0
+        self.expected_records = 0
+        self.time_start: Optional[datetime] = None
+        self.time_end: Optional[datetime] = None
+        self.issues: List[DataIssue] = []
+        self.omitted_issues = 0
+    
+    def add(self, report: DataQualityReport):
+        """
+        合并一块数据的报告
+        
+        Args:
+            report: generate_quality_report 生成的报告（未指定日期范围）
+        """
+        if report.total_records == 0:
+            return
+        
+        start, end = report.time_range
+        self.total_records += report.total_records
+        self.missing_records += report.missing_records
+        self.anomaly_records += report.anomaly_records
+        # 与 generate_quality_report 相同：每小时一条记录
+        self.expected_records += int((end - start).total_seconds() / 3600)
+        self.time_start = start if self.time_start is None else min(self.time_start, start)
+        self.time_end = end if self.time_end is None else max(self.time_end, end)
+        
+        room = max(0, self.max_issues - len(self.issues))
+        self.issues.extend(report.issues[:room])
+        self.omitted_issues += max(0, len(report.issues) - room)
+    
+    def report(self) -> DataQualityReport:
+        """
+        生成合并后的报告
+        
+        Returns:
+            数据质量报告
+        """
+        if self.total_records == 0:
+            now = datetime.now()
+            return DataQualityReport(
+                total_records=0,
+                missing_records=0,
+                anomaly_records=0,
+                coverage_percentage=0.0,
+                time_range=(now, now),
+                issues=[]
+            )
+        
+        issues = list(self.issues)
+        if self.omitted_issues:
+            issues.append(DataIssue(
+                severity=ValidationSeverity.INFO,
+                message=f"{self.omitted_issues} more issues omitted"
+            ))
+        
+        coverage_percentage = (
+            min(1.0, self.total_records / self.expected_records)
+            if self.expected_records > 0 else 0.0
+        )
+        
+        return DataQualityReport(
+            total_records=self.total_records,
+            missing_records=self.missing_records,
+            anomaly_records=self.anomaly_records,
+            coverage_percentage=coverage_percentage,
+            time_range=(self.time_start, self.time_end),
+            issues=issues,
+            generated_at=datetime.now()
+        )
@@ -3,6 +3,23 @@
 提供各种期权定价模型和希腊字母计算
 """
 
-from .options_engine import OptionsEngine
+from .options_engine import (
+    OptionsEngine, BatchPricingResult, BinomialBatchResult, ImpliedVolResult
+)
+from .monte_carlo import (
+    MonteCarloEngine, MonteCarloResult, PathPayoff,
+    EuropeanPayoff, AsianPayoff, BarrierPayoff
+)
 
-__all__ = ['OptionsEngine']
+__all__ = [
+    'OptionsEngine',
+    'BatchPricingResult',
+    'BinomialBatchResult',
+    'ImpliedVolResult',
+    'MonteCarloEngine',
+    'MonteCarloResult',
+    'PathPayoff',
+    'EuropeanPayoff',
+    'AsianPayoff',
+    'BarrierPayoff',
+]
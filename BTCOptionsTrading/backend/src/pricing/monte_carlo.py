@@ -0,0 +1,361 @@
+"""
+蒙特卡洛定价引擎
+支持方差缩减（对偶变量、控制变量）、分块模拟、路径依赖收益和多进程分片
+"""
+
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.core.models import OptionType
+from src.pricing.options_engine import _bs_kernel
+from src.core.exceptions import OptionsCalculationError
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 每个分块中正态随机数的最大数量（控制峰值内存，约16MB）
+MAX_CHUNK_ELEMENTS = 2_000_000
+
+
+def _vanilla(values: np.ndarray, strike: float, option_type: OptionType) -> np.ndarray:
+    """普通期权收益 max(phi * (x - K), 0)"""
+    if option_type == OptionType.CALL:
+        return np.maximum(values - strike, 0.0)
+    return np.maximum(strike - values, 0.0)
+
+
+class PathPayoff(ABC):
+    """
+    基于模拟路径的收益函数基类
+    
+    子类实现 __call__(paths)，paths形状为 (路径数, 步数+1)，第0列为初始价格。
+    默认控制变量为同执行价的欧式期权，其期望由Black-Scholes公式给出。
+    """
+    strike: float
+    option_type: OptionType
+    
+    @abstractmethod
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        """每条路径的到期收益"""
+    
+    def control(self, paths: np.ndarray) -> np.ndarray:
+        """控制变量在每条路径上的取值"""
+        return _vanilla(paths[:, -1], self.strike, self.option_type)
+    
+    def control_mean(self, S: float, T: float, r: float, sigma: float) -> float:
+        """控制变量的期望（未折现）"""
+        price = _bs_kernel(
+            np.float64(S), np.float64(self.strike), np.float64(T), np.float64(r), np.float64(sigma),
+            self.option_type == OptionType.CALL
+        )[0]
+        return float(price) * np.exp(r * T)
+
+
+@dataclass
+class EuropeanPayoff(PathPayoff):
+    """欧式期权收益"""
+    strike: float
+    option_type: OptionType
+    
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        return _vanilla(paths[:, -1], self.strike, self.option_type)
+    
+    def control(self, paths: np.ndarray) -> np.ndarray:
+        """控制变量：到期标的价格（欧式期权本身作控制变量会退化为解析价格）"""
+        return paths[:, -1]
+    
+    def control_mean(self, S: float, T: float, r: float, sigma: float) -> float:
+        return S * np.exp(r * T)
+
+
+@dataclass
+class AsianPayoff(PathPayoff):
+    """算术平均亚式期权收益（在各观察时点取平均，不含初始价格）"""
+    strike: float
+    option_type: OptionType
+    
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        return _vanilla(paths[:, 1:].mean(axis=1), self.strike, self.option_type)
+
+
+@dataclass
+class BarrierPayoff(PathPayoff):
+    """
+    离散观察障碍期权收益
+    
+    Attributes:
+        strike: 执行价
+        option_type: 期权类型
+        barrier: 障碍价格
+        direction: 'up' 或 'down'
+        knock: 'out'（触及失效）或 'in'（触及生效）
+        rebate: 失效/未生效时的返还金额
+    """
+    strike: float
+    option_type: OptionType
+    barrier: float
+    direction: str = "up"
+    knock: str = "out"
+    rebate: float = 0.0
+    
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        if self.direction == "up":
+            hit = paths[:, 1:].max(axis=1) >= self.barrier
+        else:
+            hit = paths[:, 1:].min(axis=1) <= self.barrier
+        
+        alive = ~hit if self.knock == "out" else hit
+        return np.where(alive, _vanilla(paths[:, -1], self.strike, self.option_type), self.rebate)
+
+
+@dataclass
+class MonteCarloResult:
+    """蒙特卡洛定价结果（每个收益函数一个元素）"""
+    price: np.ndarray
+    std_error: np.ndarray
+    n_paths: int
+    
+    def confidence_interval(self, z: float = 1.96) -> Tuple[np.ndarray, np.ndarray]:
+        """价格置信区间"""
+        return self.price - z * self.std_error, self.price + z * self.std_error
+
+
+@dataclass
+class _SimulationSpec:
+    """单个分块模拟所需的全部参数（可被序列化发送到子进程）"""
+    S: float
+    T: float
+    r: float
+    sigma: float
+    n_steps: int
+    antithetic: bool
+    control_variate: bool
+    payoffs: Tuple[PathPayoff, ...]
+
+
+def _simulate_chunk(spec: _SimulationSpec, seed: np.random.SeedSequence, n_paths: int) -> np.ndarray:
+    """
+    模拟一个分块并返回充分统计量
+    
+    Returns:
+        形状为 (6, 收益函数数量) 的数组，依次为
+        样本数、ΣY、ΣY²、ΣX、ΣX²、ΣXY（X为控制变量）
+    """
+    rng = np.random.default_rng(seed)
+    dt = spec.T / spec.n_steps
+    drift = (spec.r - 0.5 * spec.sigma ** 2) * dt
+    vol = spec.sigma * np.sqrt(dt)
+    
+    n_draws = (n_paths + 1) // 2 if spec.antithetic else n_paths
+    Z = rng.standard_normal((n_draws, spec.n_steps))
+    
+    def build_paths(z):
+        log_paths = np.empty((z.shape[0], spec.n_steps + 1))
+        log_paths[:, 0] = 0.0
+        np.cumsum(drift + vol * z, axis=1, out=log_paths[:, 1:])
+        return spec.S * np.exp(log_paths)
+    
+    path_sets = [build_paths(Z)]
+    if spec.antithetic:
+        path_sets.append(build_paths(-Z))
+    del Z
+    
+    stats = np.zeros((6, len(spec.payoffs)))
+    for j, payoff in enumerate(spec.payoffs):
+        # 对偶变量：同一对路径的平均值作为一个独立样本
+        y = np.mean([payoff(paths) for paths in path_sets], axis=0)
+        if spec.control_variate:
+            x = np.mean([payoff.control(paths) for paths in path_sets], axis=0)
+        else:
+            x = np.zeros_like(y)
+        
+        stats[:, j] = (y.size, y.sum(), (y * y).sum(), x.sum(), (x * x).sum(), (x * y).sum())
+    
+    return stats
+
+
+def _simulate_chunks(spec: _SimulationSpec, tasks: List[Tuple[np.random.SeedSequence, int]]) -> List[np.ndarray]:
+    """在子进程中依次模拟多个分块"""
+    return [_simulate_chunk(spec, seed, n) for seed, n in tasks]
+
+
+class MonteCarloEngine:
+    """蒙特卡洛定价引擎"""
+    
+    def __init__(
+        self,
+        chunk_size: int = 100_000,
+        antithetic: bool = True,
+        control_variate: bool = True
+    ):
+        """
+        初始化蒙特卡洛引擎
+        
+        Args:
+            chunk_size: 每个分块的最大路径数（另受MAX_CHUNK_ELEMENTS限制）
+            antithetic: 是否使用对偶变量
+            control_variate: 是否使用控制变量
+        """
+        self.chunk_size = chunk_size
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+    
+    def price(
+        self,
+        S: float,
+        T: float,
+        r: float,
+        sigma: float,
+        payoffs: Union[PathPayoff, Sequence[PathPayoff]],
+        n_paths: int,
+        n_steps: int = 1,
+        seed: Optional[int] = None,
+        workers: int = 1
+    ) -> MonteCarloResult:
+        """
+        在同一组模拟路径上为一个或多个收益函数定价
+        
+        路径按分块生成，每个分块从根种子派生独立的随机数流，
+        因此在相同种子下结果与分块分配到多少个进程无关。
+        
+        Args:
+            S: 标的资产当前价格
+            T: 到期时间（年）
+            r: 无风险利率
+            sigma: 波动率
+            payoffs: 收益函数或收益函数列表（组合重估）
+            n_paths: 模拟路径数
+            n_steps: 每条路径的时间步数（路径依赖收益需要大于1）
+            seed: 随机种子（None表示不可重复）
+            workers: 进程数（1表示在当前进程中模拟）
+        
+        Returns:
+            MonteCarloResult对象
+        
+        Raises:
+            OptionsCalculationError: 参数无效或模拟失败时抛出
+        """
+        try:
+            if S <= 0:
+                raise ValueError(f"Underlying price must be positive, got {S}")
+            if T < 0:
+                raise ValueError(f"Time to maturity must be non-negative, got {T}")
+            if sigma <= 0:
+                raise ValueError(f"Volatility must be positive, got {sigma}")
+            if n_paths <= 0:
+                raise ValueError("Simulations must be positive")
+            if n_steps <= 0:
+                raise ValueError("Steps must be positive")
+            
+            if not isinstance(payoffs, (list, tuple)):
+                payoffs = [payoffs]
+            
+            spec = _SimulationSpec(
+                S=float(S), T=float(T), r=float(r), sigma=float(sigma),
+                n_steps=int(n_steps),
+                antithetic=self.antithetic,
+                control_variate=self.control_variate,
+                payoffs=tuple(payoffs)
+            )
+            
+            tasks = self._plan_chunks(n_paths, n_steps, seed)
+            chunk_stats = self._run_chunks(spec, tasks, workers)
+            
+            price, std_error = self._combine(chunk_stats, spec)
+            
+            return MonteCarloResult(price=price, std_error=std_error, n_paths=int(n_paths))
+        
+        except Exception as e:
+            logger.error(f"Monte Carlo simulation failed: {str(e)}")
+            raise OptionsCalculationError(f"Monte Carlo simulation failed: {str(e)}")
+    
+    async def price_async(self, *args, **kwargs) -> MonteCarloResult:
+        """
+        异步定价：在线程池中运行price，避免阻塞事件循环
+        
+        参数与price相同。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.price, *args, **kwargs))
+    
+    def _plan_chunks(
+        self,
+        n_paths: int,
+        n_steps: int,
+        seed: Optional[int]
+    ) -> List[Tuple[np.random.SeedSequence, int]]:
+        """
+        将路径划分为分块并为每个分块派生随机数种子
+        
+        Returns:
+            (种子序列, 分块路径数) 列表
+        """
+        per_chunk = max(2, min(self.chunk_size, MAX_CHUNK_ELEMENTS // n_steps))
+        if self.antithetic:
+            per_chunk -= per_chunk % 2
+        
+        sizes = [per_chunk] * (n_paths // per_chunk)
+        if n_paths % per_chunk:
+            sizes.append(n_paths % per_chunk)
+        
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        return list(zip(seeds, sizes))
+    
+    def _run_chunks(
+        self,
+        spec: _SimulationSpec,
+        tasks: List[Tuple[np.random.SeedSequence, int]],
+        workers: int
+    ) -> List[np.ndarray]:
+        """按顺序返回每个分块的统计量（单进程或进程池）"""
+        if workers <= 1 or len(tasks) <= 1:
+            return _simulate_chunks(spec, tasks)
+        
+        workers = min(workers, len(tasks))
+        # 连续分块交给同一进程，结果按分块顺序合并以保证可重复性
+        bounds = np.linspace(0, len(tasks), workers + 1).astype(int)
+        shards = [tasks[bounds[i]:bounds[i + 1]] for i in range(workers)]
+        
+        logger.debug(f"Sharding {len(tasks)} Monte Carlo chunks across {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_simulate_chunks, [spec] * workers, shards)
+            return [stats for shard in results for stats in shard]
+    
+    def _combine(self, chunk_stats: List[np.ndarray], spec: _SimulationSpec) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        合并分块统计量，应用控制变量并折现
+        
+        Returns:
+            (价格数组, 标准误差数组)
+        """
+        n, sy, syy, sx, sxx, sxy = np.sum(chunk_stats, axis=0)
+        
+        mean_y = sy / n
+        var_y = np.maximum(syy / n - mean_y ** 2, 0.0)
+        
+        if spec.control_variate:
+            expected_x = np.array([
+                payoff.control_mean(spec.S, spec.T, spec.r, spec.sigma)
+                for payoff in spec.payoffs
+            ])
+            mean_x = sx / n
+            var_x = sxx / n - mean_x ** 2
+            cov_xy = sxy / n - mean_x * mean_y
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                beta = np.where(var_x > 1e-300, cov_xy / var_x, 0.0)
+            
+            mean_y = mean_y - beta * (mean_x - expected_x)
+            var_y = np.maximum(var_y - 2 * beta * cov_xy + beta ** 2 * var_x, 0.0)
+        
+        discount = np.exp(-spec.r * spec.T)
+        price = discount * mean_y
+        std_error = discount * np.sqrt(var_y / n)
+        
+        return price, std_error
@@ -4,9 +4,9 @@
 """
 
 import numpy as np
-from scipy.stats import norm
-from scipy.optimize import brentq
-from typing import Optional
+from dataclasses import dataclass
+from scipy.special import ndtr
+from typing import Optional, Sequence, Union
 
 from src.core.interfaces import IOptionsEngine
 from src.core.models import Greeks, OptionType
@@ -15,6 +15,296 @@ from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+# 隐含波动率搜索区间（与black_scholes_price的参数验证一致）
+IV_LOWER_BOUND = 0.001
+IV_UPPER_BOUND = 5.0
+
+
+@dataclass
+class BatchPricingResult:
+    """批量定价结果（每个字段为与输入等长的数组）"""
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray  # 每日Theta
+    vega: np.ndarray   # 波动率变化1%的影响
+    rho: np.ndarray
+    
+    def __len__(self) -> int:
+        return int(self.price.size)
+    
+    def greeks_at(self, i: int) -> Greeks:
+        """获取第i个合约的希腊字母对象"""
+        return Greeks(
+            delta=float(self.delta[i]),
+            gamma=float(self.gamma[i]),
+            theta=float(self.theta[i]),
+            vega=float(self.vega[i]),
+            rho=float(self.rho[i])
+        )
+
+
+@dataclass
+class BinomialBatchResult:
+    """二叉树批量定价结果（希腊字母取自树节点）"""
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray  # 每日Theta
+    
+    def __len__(self) -> int:
+        return int(self.price.size)
+
+
+@dataclass
+class ImpliedVolResult:
+    """批量隐含波动率求解结果"""
+    iv: np.ndarray
+    converged: np.ndarray   # 每个报价是否收敛
+    iterations: np.ndarray  # 每个报价使用的迭代次数
+    
+    def __len__(self) -> int:
+        return int(self.iv.size)
+
+
+def _call_mask(option_types, shape) -> np.ndarray:
+    """
+    将期权类型转换为布尔掩码（True为看涨）
+    
+    支持单个OptionType/字符串/布尔值，或它们组成的序列
+    """
+    if isinstance(option_types, (OptionType, str, bool, np.bool_)):
+        option_types = [option_types]
+    if isinstance(option_types, np.ndarray) and option_types.dtype == bool:
+        mask = option_types
+    else:
+        mask = np.array([
+            bool(t) if isinstance(t, (bool, np.bool_))
+            else (t.value if isinstance(t, OptionType) else str(t).lower()) == OptionType.CALL.value
+            for t in option_types
+        ], dtype=bool)
+    return np.broadcast_to(mask, shape)
+
+
+def _bs_kernel(S, K, T, r, sigma, is_call):
+    """
+    向量化Black-Scholes核心计算（不做参数验证）
+    
+    所有输入需为可广播的NumPy数组；T<=0的元素按到期内在价值处理。
+    
+    Returns:
+        (price, delta, gamma, theta_daily, vega_percent, rho) 数组元组
+    """
+    live = T > 0
+    T_safe = np.where(live, T, 1.0)
+    sqrt_T = np.sqrt(T_safe)
+    sig_sqrt_T = sigma * sqrt_T
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T_safe) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
+    
+    disc_K = K * np.exp(-r * T_safe)
+    pdf_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+    cdf_d1 = ndtr(d1)
+    cdf_d2 = ndtr(d2)
+    cdf_neg_d1 = ndtr(-d1)
+    cdf_neg_d2 = ndtr(-d2)
+    
+    price = np.where(is_call, S * cdf_d1 - disc_K * cdf_d2, disc_K * cdf_neg_d2 - S * cdf_neg_d1)
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+    gamma = pdf_d1 / (S * sig_sqrt_T)
+    vega = S * pdf_d1 * sqrt_T
+    theta_common = -S * pdf_d1 * sigma / (2 * sqrt_T)
+    theta = np.where(is_call, theta_common - r * disc_K * cdf_d2, theta_common + r * disc_K * cdf_neg_d2)
+    rho = np.where(is_call, T_safe * disc_K * cdf_d2, -T_safe * disc_K * cdf_neg_d2)
+    
+    # 到期（或已过期）合约：内在价值与阶跃Delta
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    expired_delta = np.where(is_call, np.where(S > K, 1.0, 0.0), np.where(S < K, -1.0, 0.0))
+    
+    price = np.where(live, price, intrinsic)
+    delta = np.where(live, delta, expired_delta)
+    gamma = np.where(live, gamma, 0.0)
+    theta = np.where(live, theta / 365, 0.0)
+    vega = np.where(live, vega / 100, 0.0)
+    rho = np.where(live, rho, 0.0)
+    
+    return price, delta, gamma, theta, vega, rho
+
+
+def _binomial_kernel(S, K, T, r, sigma, is_call, steps: int, american: bool = True):
+    """
+    向量化CRR二叉树核心计算（不做参数验证）
+    
+    所有合约共用同一步数网格，每个时间切片的回溯只需一次数组运算，
+    覆盖全部合约的全部节点。节点价格由预先计算的 u^j 幂表切片得到，
+    不再逐节点计算 S * u**(step-i) * d**i。
+    
+    Args:
+        S, K, T, r, sigma: 一维数组（长度相同）
+        is_call: 布尔掩码，True为看涨
+        steps: 二叉树步数
+        american: 是否允许提前行权
+        
+    Returns:
+        (price, delta, gamma, theta_daily) 数组元组；步数不足2时gamma/theta为NaN
+    """
+    N = int(steps)
+    live = T > 0
+    T_safe = np.where(live, T, 1.0)
+    
+    dt = T_safe / N
+    sig_sqrt_dt = sigma * np.sqrt(dt)
+    u = np.exp(sig_sqrt_dt)
+    d = 1 / u
+    disc = np.exp(-r * dt)
+    p = (np.exp(r * dt) - d) / (u - d)
+    pu = (disc * p)[:, None]
+    pd = (disc * (1 - p))[:, None]
+    
+    # 幂表：列 N+j 对应 u^j，j ∈ [-N, N]；第k步第i个节点为 u^(k-2i)
+    u_pow = np.exp(np.outer(sig_sqrt_dt, np.arange(-N, N + 1)))
+    S_col = S[:, None]
+    K_col = K[:, None]
+    phi = np.where(is_call, 1.0, -1.0)[:, None]
+    
+    def spot_at(k):
+        stop = N - k - 1
+        return S_col * u_pow[:, N + k:(stop if stop >= 0 else None):-2]
+    
+    values = np.maximum(phi * (spot_at(N) - K_col), 0.0)
+    v1 = v2 = None
+    
+    for k in range(N - 1, -1, -1):
+        values = pu * values[:, :k + 1] + pd * values[:, 1:k + 2]
+        if american:
+            values = np.maximum(values, phi * (spot_at(k) - K_col))
+        if k == 2:
+            v2 = values
+        elif k == 1:
+            v1 = values
+    
+    price = values[:, 0]
+    if v1 is None:
+        v1 = np.maximum(phi * (spot_at(1) - K_col), 0.0)
+    delta = (v1[:, 0] - v1[:, 1]) / (S * (u - d))
+    
+    if v2 is not None:
+        S_uu, S_dd = S * u * u, S * d * d
+        delta_up = (v2[:, 0] - v2[:, 1]) / (S_uu - S)
+        delta_dn = (v2[:, 1] - v2[:, 2]) / (S - S_dd)
+        gamma = (delta_up - delta_dn) / (0.5 * (S_uu - S_dd))
+        theta = (v2[:, 1] - price) / (2 * dt)
+    else:
+        gamma = np.full_like(price, np.nan)
+        theta = np.full_like(price, np.nan)
+    
+    # 到期（或已过期）合约：内在价值与阶跃Delta
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    expired_delta = np.where(is_call, np.where(S > K, 1.0, 0.0), np.where(S < K, -1.0, 0.0))
+    
+    price = np.where(live, price, intrinsic)
+    delta = np.where(live, delta, expired_delta)
+    gamma = np.where(live, gamma, 0.0)
+    theta = np.where(live, theta / 365, 0.0)
+    
+    return price, delta, gamma, theta
+
+
+def _implied_vol_kernel(price, S, K, T, r, is_call, tol: float, max_iter: int):
+    """
+    向量化隐含波动率求解（不做参数验证）
+    
+    先用看涨看跌平价把每个报价换算成虚值期权价格，再以Corrado-Miller
+    有理近似作为初值，进行带区间保护的Halley迭代：每次迭代后根据定价
+    误差的符号收缩 [lo, hi] 区间，落在区间外或Vega过小的报价改用二分步。
+    
+    Returns:
+        (iv, converged, iterations) 数组元组；超出无套利区间的报价被截断到
+        搜索边界并标记为未收敛
+    """
+    disc_K = K * np.exp(-r * T)
+    sqrt_T = np.sqrt(T)
+    
+    # 统一换算为虚值期权价格：K >= 远期 用看涨，否则用看跌
+    use_call = K >= S * np.exp(r * T)
+    target = np.where(
+        use_call,
+        np.where(is_call, price, price + S - disc_K),
+        np.where(is_call, price - S + disc_K, price)
+    )
+    upper = np.where(use_call, S, disc_K)
+    
+    below = target <= 0
+    above = target >= upper
+    valid = ~(below | above) & np.isfinite(target)
+    
+    # Corrado-Miller初值
+    call_price = np.where(use_call, target, target + S - disc_K)
+    half_diff = call_price - 0.5 * (S - disc_K)
+    with np.errstate(invalid='ignore'):
+        radicand = half_diff ** 2 - (S - disc_K) ** 2 / np.pi
+        sigma = np.sqrt(2 * np.pi / T) / (S + disc_K) * (half_diff + np.sqrt(np.maximum(radicand, 0.0)))
+    sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, 0.5)
+    sigma = np.clip(sigma, IV_LOWER_BOUND, IV_UPPER_BOUND)
+    
+    lo = np.full_like(sigma, IV_LOWER_BOUND)
+    hi = np.full_like(sigma, IV_UPPER_BOUND)
+    converged = np.zeros(sigma.shape, dtype=bool)
+    iterations = np.zeros(sigma.shape, dtype=np.int64)
+    price_tol = np.maximum(tol * target, 1e-12 * upper)
+    
+    active = valid.copy()
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        
+        sig = sigma[idx]
+        s_, k_, dk, st, tgt = S[idx], K[idx], disc_K[idx], sqrt_T[idx], target[idx]
+        sig_st = sig * st
+        d1 = (np.log(s_ / k_) + (r[idx] + 0.5 * sig ** 2) * T[idx]) / sig_st
+        d2 = d1 - sig_st
+        uc = use_call[idx]
+        model = np.where(uc, s_ * ndtr(d1) - dk * ndtr(d2), dk * ndtr(-d2) - s_ * ndtr(-d1))
+        diff = model - tgt
+        vega = s_ * np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI * st
+        iterations[idx] += 1
+        
+        done = np.abs(diff) <= price_tol[idx]
+        
+        # 价格关于波动率单调递增，据此收缩区间
+        hi[idx] = np.where(diff > 0, np.minimum(hi[idx], sig), hi[idx])
+        lo[idx] = np.where(diff < 0, np.maximum(lo[idx], sig), lo[idx])
+        
+        # Halley步：Newton步乘以volga修正
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = diff / vega
+            volga_ratio = d1 * d2 / sig
+            step = newton / (1.0 - 0.5 * newton * volga_ratio)
+            step = np.where(np.isfinite(step) & (np.abs(0.5 * newton * volga_ratio) < 0.5), step, newton)
+            candidate = sig - step
+        
+        l_, h_ = lo[idx], hi[idx]
+        bisect = ~np.isfinite(candidate) | (candidate <= l_) | (candidate >= h_)
+        candidate = np.where(bisect, 0.5 * (l_ + h_), candidate)
+        
+        done |= np.abs(candidate - sig) <= tol * np.maximum(sig, 1.0)
+        sigma[idx] = np.where(done, np.where(np.abs(diff) <= price_tol[idx], sig, candidate), candidate)
+        converged[idx] = done
+        active[idx] = ~done
+    
+    sigma = np.where(below, IV_LOWER_BOUND, sigma)
+    sigma = np.where(above, IV_UPPER_BOUND, sigma)
+    sigma = np.where(np.isfinite(target), sigma, np.nan)
+    
+    return sigma, converged & valid, iterations
+
 
 class OptionsEngine(IOptionsEngine):
     """期权定价引擎"""
@@ -53,22 +343,10 @@ class OptionsEngine(IOptionsEngine):
             # 参数验证
             self._validate_parameters(S, K, T, r, sigma)
             
-            # 处理到期情况
-            if T <= 0:
-                if option_type == OptionType.CALL:
-                    return max(S - K, 0)
-                else:
-                    return max(K - S, 0)
-            
-            # 计算d1和d2
-            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-            d2 = d1 - sigma * np.sqrt(T)
-            
-            # 计算期权价格
-            if option_type == OptionType.CALL:
-                price = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-            else:  # PUT
-                price = K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+            price = _bs_kernel(
+                np.float64(S), np.float64(K), np.float64(T), np.float64(r), np.float64(sigma),
+                option_type == OptionType.CALL
+            )[0]
             
             return float(price)
             
@@ -97,62 +375,22 @@ class OptionsEngine(IOptionsEngine):
             option_type: 期权类型
             
         Returns:
-            Greeks对象，包含所有希腊字母
+            Greeks对象，包含所有希腊字母（Theta为每日值，Vega为波动率变化1%的影响）
         """
         try:
             # 参数验证
             self._validate_parameters(S, K, T, r, sigma)
             
-            # 处理到期情况
-            if T <= 0:
-                delta = 1.0 if (option_type == OptionType.CALL and S > K) else 0.0
-                if option_type == OptionType.PUT:
-                    delta = -1.0 if S < K else 0.0
-                return Greeks(delta=delta, gamma=0.0, theta=0.0, vega=0.0, rho=0.0)
-            
-            # 计算d1和d2
-            d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-            d2 = d1 - sigma * np.sqrt(T)
-            
-            # 计算Delta
-            if option_type == OptionType.CALL:
-                delta = norm.cdf(d1)
-            else:  # PUT
-                delta = norm.cdf(d1) - 1
-            
-            # 计算Gamma（看涨和看跌相同）
-            gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-            
-            # 计算Vega（看涨和看跌相同）
-            vega = S * norm.pdf(d1) * np.sqrt(T)
-            
-            # 计算Theta
-            if option_type == OptionType.CALL:
-                theta = (
-                    -S * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                    - r * K * np.exp(-r * T) * norm.cdf(d2)
-                )
-            else:  # PUT
-                theta = (
-                    -S * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
-                    + r * K * np.exp(-r * T) * norm.cdf(-d2)
-                )
-            
-            # 计算Rho
-            if option_type == OptionType.CALL:
-                rho = K * T * np.exp(-r * T) * norm.cdf(d2)
-            else:  # PUT
-                rho = -K * T * np.exp(-r * T) * norm.cdf(-d2)
-            
-            # 转换为每日值（Theta和Vega通常以每日为单位）
-            theta_daily = theta / 365
-            vega_percent = vega / 100  # Vega通常表示为波动率变化1%的影响
+            _, delta, gamma, theta, vega, rho = _bs_kernel(
+                np.float64(S), np.float64(K), np.float64(T), np.float64(r), np.float64(sigma),
+                option_type == OptionType.CALL
+            )
             
             return Greeks(
                 delta=float(delta),
                 gamma=float(gamma),
-                theta=float(theta_daily),
-                vega=float(vega_percent),
+                theta=float(theta),
+                vega=float(vega),
                 rho=float(rho)
             )
             
@@ -160,6 +398,63 @@ class OptionsEngine(IOptionsEngine):
             logger.error(f"Greeks calculation failed: {str(e)}")
             raise OptionsCalculationError(f"Greeks calculation failed: {str(e)}")
     
+    def price_batch(
+        self,
+        S: ArrayLike,
+        K: ArrayLike,
+        T: ArrayLike,
+        r: ArrayLike,
+        sigma: ArrayLike,
+        option_types,
+        validate: bool = True
+    ) -> BatchPricingResult:
+        """
+        批量Black-Scholes定价与希腊字母计算
+        
+        一次向量化计算整条期权链的价格和全部五个希腊字母，
+        输入可以是标量或数组（按NumPy规则广播）。
+        
+        Args:
+            S: 标的资产价格
+            K: 执行价格
+            T: 到期时间（年）
+            r: 无风险利率
+            sigma: 波动率
+            option_types: 期权类型（OptionType、"call"/"put"字符串或布尔值，True为看涨）
+            validate: 是否验证参数
+            
+        Returns:
+            BatchPricingResult，各字段为一维数组
+            
+        Raises:
+            OptionsCalculationError: 参数无效或形状不匹配时抛出
+        """
+        try:
+            S_arr, K_arr, T_arr, r_arr, sigma_arr = np.broadcast_arrays(
+                *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (S, K, T, r, sigma))
+            )
+            is_call = _call_mask(option_types, S_arr.shape)
+            
+            if validate:
+                self._validate_parameter_arrays(S_arr, K_arr, T_arr, r_arr, sigma_arr)
+            
+            price, delta, gamma, theta, vega, rho = _bs_kernel(
+                S_arr, K_arr, T_arr, r_arr, sigma_arr, is_call
+            )
+            
+            return BatchPricingResult(
+                price=price,
+                delta=delta,
+                gamma=gamma,
+                theta=theta,
+                vega=vega,
+                rho=rho
+            )
+            
+        except Exception as e:
+            logger.error(f"Batch pricing failed: {str(e)}")
+            raise OptionsCalculationError(f"Batch pricing failed: {str(e)}")
+    
     def binomial_tree_price(
         self,
         S: float,
@@ -192,47 +487,82 @@ class OptionsEngine(IOptionsEngine):
             if steps <= 0:
                 raise ValueError("Steps must be positive")
             
-            # 计算参数
-            dt = T / steps
-            u = np.exp(sigma * np.sqrt(dt))  # 上涨因子
-            d = 1 / u  # 下跌因子
-            p = (np.exp(r * dt) - d) / (u - d)  # 风险中性概率
-            
-            # 初始化价格树
-            prices = np.zeros(steps + 1)
-            
-            # 计算到期时的标的价格
-            for i in range(steps + 1):
-                prices[i] = S * (u ** (steps - i)) * (d ** i)
-            
-            # 计算到期时的期权价值
-            if option_type == OptionType.CALL:
-                values = np.maximum(prices - K, 0)
-            else:  # PUT
-                values = np.maximum(K - prices, 0)
-            
-            # 向后递推计算期权价值
-            for step in range(steps - 1, -1, -1):
-                for i in range(step + 1):
-                    # 计算持有价值
-                    hold_value = np.exp(-r * dt) * (p * values[i] + (1 - p) * values[i + 1])
-                    
-                    # 计算提前行权价值（美式期权）
-                    current_price = S * (u ** (step - i)) * (d ** i)
-                    if option_type == OptionType.CALL:
-                        exercise_value = max(current_price - K, 0)
-                    else:  # PUT
-                        exercise_value = max(K - current_price, 0)
-                    
-                    # 取最大值（美式期权可以提前行权）
-                    values[i] = max(hold_value, exercise_value)
-            
-            return float(values[0])
+            price = _binomial_kernel(
+                np.array([S], dtype=np.float64),
+                np.array([K], dtype=np.float64),
+                np.array([T], dtype=np.float64),
+                np.array([r], dtype=np.float64),
+                np.array([sigma], dtype=np.float64),
+                np.array([option_type == OptionType.CALL]),
+                steps
+            )[0]
+            
+            return float(price[0])
             
         except Exception as e:
             logger.error(f"Binomial tree pricing failed: {str(e)}")
             raise OptionsCalculationError(f"Binomial tree pricing failed: {str(e)}")
     
+    def binomial_batch(
+        self,
+        S: ArrayLike,
+        K: ArrayLike,
+        T: ArrayLike,
+        r: ArrayLike,
+        sigma: ArrayLike,
+        option_types,
+        steps: int = 200,
+        american: bool = True,
+        validate: bool = True
+    ) -> BinomialBatchResult:
+        """
+        批量二叉树定价（美式/欧式）
+        
+        多个执行价和到期日在同一步数网格上一次性回溯，
+        同时从树节点中读取Delta、Gamma和Theta。
+        
+        Args:
+            S: 标的资产价格
+            K: 执行价格
+            T: 到期时间（年）
+            r: 无风险利率
+            sigma: 波动率
+            option_types: 期权类型（OptionType、"call"/"put"字符串或布尔值，True为看涨）
+            steps: 二叉树步数（至少2步才能得到Gamma和Theta）
+            american: 是否允许提前行权
+            validate: 是否验证参数
+            
+        Returns:
+            BinomialBatchResult，各字段为一维数组
+            
+        Raises:
+            OptionsCalculationError: 参数无效时抛出
+        """
+        try:
+            if steps <= 0:
+                raise ValueError("Steps must be positive")
+            
+            S_arr, K_arr, T_arr, r_arr, sigma_arr = (
+                np.ascontiguousarray(a) for a in np.broadcast_arrays(
+                    *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (S, K, T, r, sigma))
+                )
+            )
+            is_call = np.ascontiguousarray(_call_mask(option_types, S_arr.shape))
+            
+            if validate:
+                self._validate_parameter_arrays(S_arr, K_arr, T_arr, r_arr, sigma_arr)
+            
+            price, delta, gamma, theta = _binomial_kernel(
+                S_arr.ravel(), K_arr.ravel(), T_arr.ravel(), r_arr.ravel(), sigma_arr.ravel(),
+                is_call.ravel(), steps, american
+            )
+            
+            return BinomialBatchResult(price=price, delta=delta, gamma=gamma, theta=theta)
+            
+        except Exception as e:
+            logger.error(f"Binomial batch pricing failed: {str(e)}")
+            raise OptionsCalculationError(f"Binomial batch pricing failed: {str(e)}")
+    
     def monte_carlo_price(
         self,
         S: float,
@@ -241,11 +571,15 @@ class OptionsEngine(IOptionsEngine):
         r: float,
         sigma: float,
         simulations: int,
-        option_type: OptionType
+        option_type: OptionType,
+        seed: Optional[int] = 42
     ) -> float:
         """
         蒙特卡洛模拟期权定价
         
+        使用独立的随机数流（不修改全局NumPy随机状态），
+        并启用对偶变量和控制变量降低方差。
+        
         Args:
             S: 标的资产当前价格
             K: 执行价格
@@ -254,10 +588,13 @@ class OptionsEngine(IOptionsEngine):
             sigma: 波动率
             simulations: 模拟次数
             option_type: 期权类型
+            seed: 随机种子（默认42以保证可重复性）
             
         Returns:
             期权价格
         """
+        from src.pricing.monte_carlo import MonteCarloEngine, EuropeanPayoff
+        
         try:
             # 参数验证
             self._validate_parameters(S, K, T, r, sigma)
@@ -265,23 +602,17 @@ class OptionsEngine(IOptionsEngine):
             if simulations <= 0:
                 raise ValueError("Simulations must be positive")
             
-            # 设置随机种子以保证可重复性
-            np.random.seed(42)
-            
-            # 生成随机路径
-            Z = np.random.standard_normal(simulations)
-            ST = S * np.exp((r - 0.5 * sigma ** 2) * T + sigma * np.sqrt(T) * Z)
-            
-            # 计算期权收益
-            if option_type == OptionType.CALL:
-                payoffs = np.maximum(ST - K, 0)
-            else:  # PUT
-                payoffs = np.maximum(K - ST, 0)
-            
-            # 折现到现在
-            price = np.exp(-r * T) * np.mean(payoffs)
+            result = MonteCarloEngine().price(
+                S=S,
+                T=T,
+                r=r,
+                sigma=sigma,
+                payoffs=EuropeanPayoff(strike=K, option_type=option_type),
+                n_paths=simulations,
+                seed=seed
+            )
             
-            return float(price)
+            return float(result.price[0])
             
         except Exception as e:
             logger.error(f"Monte Carlo pricing failed: {str(e)}")
@@ -297,7 +628,7 @@ class OptionsEngine(IOptionsEngine):
         option_type: OptionType
     ) -> float:
         """
-        计算隐含波动率（使用Newton-Raphson方法）
+        计算隐含波动率（带区间保护的Halley迭代）
         
         Args:
             market_price: 市场价格
@@ -308,7 +639,7 @@ class OptionsEngine(IOptionsEngine):
             option_type: 期权类型
             
         Returns:
-            隐含波动率
+            隐含波动率；报价超出无套利区间时返回搜索边界
         """
         try:
             # 参数验证
@@ -319,42 +650,82 @@ class OptionsEngine(IOptionsEngine):
             if T <= 0:
                 raise ValueError("Time to maturity must be positive")
             
-            # 定义目标函数
-            def objective(sigma):
-                try:
-                    bs_price = self.black_scholes_price(S, K, T, r, sigma, option_type)
-                    return bs_price - market_price
-                except:
-                    return float('inf')
-            
-            # 使用Brent方法求解
-            try:
-                iv = brentq(objective, 0.001, 5.0, maxiter=100)
-                return float(iv)
-            except ValueError:
-                # 如果Brent方法失败，尝试使用简单的二分法
-                logger.warning("Brent method failed, using bisection")
-                
-                # 二分法
-                low, high = 0.001, 5.0
-                for _ in range(100):
-                    mid = (low + high) / 2
-                    price = self.black_scholes_price(S, K, T, r, mid, option_type)
-                    
-                    if abs(price - market_price) < 0.001:
-                        return float(mid)
-                    
-                    if price < market_price:
-                        low = mid
-                    else:
-                        high = mid
-                
-                return float((low + high) / 2)
+            result = self.implied_volatility_batch(
+                market_price, S, K, T, r, option_type, validate=False
+            )
+            
+            if not result.converged[0]:
+                logger.warning(
+                    f"Implied volatility did not converge (price={market_price}, K={K}, T={T}), "
+                    f"returning {result.iv[0]:.4f}"
+                )
+            
+            return float(result.iv[0])
                 
         except Exception as e:
             logger.error(f"Implied volatility calculation failed: {str(e)}")
             raise OptionsCalculationError(f"Implied volatility calculation failed: {str(e)}")
     
+    def implied_volatility_batch(
+        self,
+        market_prices: ArrayLike,
+        S: ArrayLike,
+        K: ArrayLike,
+        T: ArrayLike,
+        r: ArrayLike,
+        option_types,
+        tol: float = 1e-8,
+        max_iter: int = 50,
+        validate: bool = True
+    ) -> ImpliedVolResult:
+        """
+        批量计算隐含波动率
+        
+        一次性反解整条期权链的报价，每次迭代只对尚未收敛的报价做数组运算。
+        
+        Args:
+            market_prices: 市场价格
+            S: 标的资产价格
+            K: 执行价格
+            T: 到期时间（年）
+            r: 无风险利率
+            option_types: 期权类型（OptionType、"call"/"put"字符串或布尔值，True为看涨）
+            tol: 收敛容差（相对价格误差或波动率步长）
+            max_iter: 最大迭代次数
+            validate: 是否验证参数
+            
+        Returns:
+            ImpliedVolResult，包含隐含波动率、收敛标志和迭代次数
+            
+        Raises:
+            OptionsCalculationError: 参数无效时抛出
+        """
+        try:
+            price_arr, S_arr, K_arr, T_arr, r_arr = (
+                np.ascontiguousarray(a).ravel() for a in np.broadcast_arrays(
+                    *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (market_prices, S, K, T, r))
+                )
+            )
+            is_call = np.ascontiguousarray(_call_mask(option_types, price_arr.shape))
+            
+            if validate:
+                if not (price_arr > 0).all():
+                    raise ValueError("Market price must be positive")
+                if not ((S_arr > 0) & (K_arr > 0)).all():
+                    raise ValueError("Prices must be positive")
+                if not (T_arr > 0).all():
+                    raise ValueError("Time to maturity must be positive")
+            
+            iv, converged, iterations = _implied_vol_kernel(
+                price_arr, S_arr, K_arr, T_arr, r_arr, is_call, tol, max_iter
+            )
+            
+            return ImpliedVolResult(iv=iv, converged=converged, iterations=iterations)
+            
+        except Exception as e:
+            logger.error(f"Batch implied volatility calculation failed: {str(e)}")
+            raise OptionsCalculationError(f"Batch implied volatility calculation failed: {str(e)}")
+    
     def _validate_parameters(
         self,
         S: float,
@@ -386,3 +757,32 @@ class OptionsEngine(IOptionsEngine):
             raise ValueError(f"Risk-free rate must be between 0 and 1, got {r}")
         if sigma <= 0 or sigma > 5:
             raise ValueError(f"Volatility must be between 0 and 5, got {sigma}")
+    
+    def _validate_parameter_arrays(
+        self,
+        S: np.ndarray,
+        K: np.ndarray,
+        T: np.ndarray,
+        r: np.ndarray,
+        sigma: np.ndarray
+    ):
+        """
+        向量化验证定价参数（规则与_validate_parameters一致）
+        
+        Raises:
+            ValueError: 任一元素无效时抛出，消息中包含首个无效元素的位置
+        """
+        checks = (
+            (~(S > 0), "Underlying price must be positive", S),
+            (~(K > 0), "Strike price must be positive", K),
+            (~(T >= 0), "Time to maturity must be non-negative", T),
+            (~((r >= 0) & (r <= 1)), "Risk-free rate must be between 0 and 1", r),
+            (~((sigma > 0) & (sigma <= 5)), "Volatility must be between 0 and 5", sigma),
+        )
+        for invalid, message, values in checks:
+            if invalid.any():
+                idx = int(np.flatnonzero(invalid)[0])
+                raise ValueError(
+                    f"{message}, got {values.ravel()[idx]} at index {idx} "
+                    f"({int(invalid.sum())} invalid)"
+                )
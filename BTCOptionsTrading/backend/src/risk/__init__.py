@@ -2,6 +2,6 @@
 Risk calculation module for portfolio risk analysis.
 """
 
-from .risk_calculator import RiskCalculator
+from .risk_calculator import HISTORICAL_STRESS_SCENARIOS, RiskCalculator, ScenarioSet, StressCube
 
-__all__ = ['RiskCalculator']
+__all__ = ['RiskCalculator', 'ScenarioSet', 'StressCube', 'HISTORICAL_STRESS_SCENARIOS']
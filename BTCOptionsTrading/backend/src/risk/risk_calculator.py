@@ -3,14 +3,18 @@ Risk Calculator for portfolio risk analysis.
 
 Implements:
 - Portfolio Greeks aggregation
-- Value at Risk (VaR) calculation
+- Value at Risk (VaR) calculation (delta-normal, Monte Carlo and historical
+  simulation with full revaluation)
 - Margin requirements (Deribit rules)
 - Risk limit monitoring
 - Stress testing
 """
 
+import hashlib
 import logging
-from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Dict, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from scipy import stats
@@ -20,19 +24,324 @@ from ..pricing.options_engine import OptionsEngine
 
 logger = logging.getLogger(__name__)
 
+# Approximate peak-to-trough BTC moves of past stress episodes. Shocks are
+# relative (spot * (1 + spot_shock), IV * (1 + vol_shock)); days_forward is
+# how long the move took, so theta decay over the episode is included.
+HISTORICAL_STRESS_SCENARIOS = [
+    {'name': 'covid_crash_2020_03', 'spot_shock': -0.50, 'vol_shock': 1.50, 'days_forward': 2},
+    {'name': 'china_ban_2021_05', 'spot_shock': -0.30, 'vol_shock': 0.80, 'days_forward': 1},
+    {'name': 'luna_collapse_2022_05', 'spot_shock': -0.28, 'vol_shock': 0.60, 'days_forward': 7},
+    {'name': 'ftx_collapse_2022_11', 'spot_shock': -0.25, 'vol_shock': 0.70, 'days_forward': 3},
+    {'name': 'etf_rally_2023_10', 'spot_shock': 0.30, 'vol_shock': 0.50, 'days_forward': 10},
+    {'name': 'election_rally_2024_11', 'spot_shock': 0.30, 'vol_shock': 0.30, 'days_forward': 7},
+]
+
+# Cap on shocked-state x position elements priced per batch (bounds memory)
+_MAX_BATCH_ELEMENTS = 1 << 20
+
+
+@dataclass
+class ScenarioSet:
+    """Joint spot/volatility scenarios over a fixed horizon."""
+    spot_returns: np.ndarray  # log return of the underlying per scenario
+    vol_shocks: np.ndarray    # log change of implied volatility per scenario
+    horizon_days: float
+    method: str               # 'monte_carlo' or 'historical'
+    
+    def __len__(self) -> int:
+        return int(self.spot_returns.size)
+
+
+@dataclass
+class _BookArrays:
+    """Live (unexpired) positions of a portfolio as parallel arrays."""
+    names: List[str]
+    quantity: np.ndarray
+    strike: np.ndarray
+    expiry: np.ndarray  # years to expiry
+    sigma: np.ndarray
+    is_call: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, index: slice) -> '_BookArrays':
+        return _BookArrays(
+            names=self.names[index],
+            quantity=self.quantity[index],
+            strike=self.strike[index],
+            expiry=self.expiry[index],
+            sigma=self.sigma[index],
+            is_call=self.is_call[index]
+        )
+
+
+@dataclass
+class StressCube:
+    """Portfolio P&L over a spot shock x vol shock x days-forward grid."""
+    spot_shocks: np.ndarray
+    vol_shocks: np.ndarray
+    days_forward: np.ndarray
+    pnl: np.ndarray  # shape (len(spot_shocks), len(vol_shocks), len(days_forward))
+    base_value: float
+    spot_price: float
+    
+    def _point(self, i: int, j: int, k: int) -> Dict[str, float]:
+        return {
+            'spot_shock': float(self.spot_shocks[i]),
+            'shocked_price': float(self.spot_price * (1 + self.spot_shocks[i])),
+            'vol_shock': float(self.vol_shocks[j]),
+            'days_forward': float(self.days_forward[k]),
+            'pnl': float(self.pnl[i, j, k])
+        }
+    
+    def worst_case(self) -> Dict[str, float]:
+        """Grid point with the largest loss."""
+        return self._point(*np.unravel_index(np.argmin(self.pnl), self.pnl.shape))
+    
+    def worst_slice(self) -> np.ndarray:
+        """Spot x vol P&L slice at the days-forward of the worst case."""
+        k = np.unravel_index(np.argmin(self.pnl), self.pnl.shape)[2]
+        return self.pnl[:, :, k]
+    
+    def worst_by_day(self) -> List[Dict[str, float]]:
+        """Worst grid point for each days-forward value."""
+        flat = self.pnl.reshape(-1, self.pnl.shape[2])
+        worst = []
+        for k, idx in enumerate(np.argmin(flat, axis=0)):
+            i, j = np.unravel_index(idx, self.pnl.shape[:2])
+            worst.append(self._point(i, j, k))
+        return worst
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable representation."""
+        return {
+            'base_value': self.base_value,
+            'spot_price': self.spot_price,
+            'spot_shocks': self.spot_shocks.tolist(),
+            'vol_shocks': self.vol_shocks.tolist(),
+            'days_forward': self.days_forward.tolist(),
+            'pnl': self.pnl.tolist(),
+            'worst_case': self.worst_case(),
+            'worst_by_day': self.worst_by_day()
+        }
+
+
+def _payoff_analytics(
+    strike: np.ndarray,
+    quantity: np.ndarray,
+    is_call: np.ndarray,
+    initial_cost: np.ndarray,
+    spot_price: float,
+    expiry: np.ndarray,
+    risk_free_rate: float,
+    volatility: float,
+    volatility_surface=None
+) -> Dict[str, Any]:
+    """
+    Exact expiry-payoff analytics for a batch of strategies.
+    
+    Inputs are (n_strategies, n_legs) arrays (NaN strike / zero quantity
+    pads shorter strategies) plus per-strategy initial cost and expiry.
+    The payoff is linear between the sorted strikes, so it is fully
+    described by its values at 0 and at each strike plus the slope above
+    the highest strike; probability of profit integrates the terminal
+    distribution over the profitable part of each linear segment.
+    """
+    n = strike.shape[0]
+    strike = np.where(np.isnan(strike), np.nanmin(strike, axis=1, keepdims=True), strike)
+    nodes = np.concatenate([np.zeros((n, 1)), np.sort(strike, axis=1)], axis=1)
+    
+    intrinsic = np.where(
+        is_call[:, None, :],
+        np.maximum(nodes[:, :, None] - strike[:, None, :], 0.0),
+        np.maximum(strike[:, None, :] - nodes[:, :, None], 0.0)
+    )
+    values = (intrinsic * quantity[:, None, :]).sum(axis=2) - initial_cost[:, None]
+    slope_right = np.where(is_call, quantity, 0.0).sum(axis=1)
+    
+    # Segments [nodes[j], nodes[j+1]) and [highest strike, inf)
+    lo = nodes
+    hi = np.concatenate([nodes[:, 1:], np.full((n, 1), np.inf)], axis=1)
+    width = np.diff(nodes, axis=1)
+    slope = np.empty_like(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope[:, :-1] = np.where(width > 0, np.diff(values, axis=1) / width, 0.0)
+        slope[:, -1] = slope_right
+        root = lo - values / slope
+    
+    sloped = slope != 0
+    crossing = sloped & (root >= lo) & (root < hi) & (root > 0)
+    
+    # Profitable sub-interval of each segment
+    profit_lo = np.where(sloped & (slope > 0), np.maximum(lo, np.where(sloped, root, lo)), lo)
+    profit_hi = np.where(sloped & (slope < 0), np.minimum(hi, np.where(sloped, root, hi)), hi)
+    profitable = np.where(sloped, profit_hi > profit_lo, values > 0)
+    
+    survival = _survival_function(spot_price, expiry, risk_free_rate, volatility, volatility_surface)
+    probability = np.where(profitable, survival(profit_lo) - survival(profit_hi), 0.0).sum(axis=1)
+    
+    max_profit = np.where(slope_right > 0, np.inf, values.max(axis=1))
+    max_loss = np.where(slope_right < 0, -np.inf, values.min(axis=1))
+    
+    breakeven_points = [[float(x) for x in root[i][crossing[i]]] for i in range(n)]
+    
+    return {
+        'max_profit': max_profit,
+        'max_loss': max_loss,
+        'breakeven_points': breakeven_points,
+        'probability_of_profit': np.clip(probability, 0.0, 1.0) * 100
+    }
+
+
+def _survival_function(spot_price: float, expiry: np.ndarray, risk_free_rate: float,
+                       volatility: float, volatility_surface=None):
+    """
+    P(S_T > x) under the risk-neutral measure, vectorized over x of shape
+    (n_strategies, m).
+    
+    Without a surface this is the lognormal N(d2). With a surface, the smile
+    term from differentiating the call price by strike is included:
+    P(S_T > K) = N(d2) - F * pdf(d1) * sqrt(T) * dsigma/dK.
+    """
+    T = np.asarray(expiry, dtype=float)[:, None]
+    forward = spot_price * np.exp(risk_free_rate * T)
+    sqrt_T = np.sqrt(T)
+    
+    def survival(x):
+        x = np.asarray(x, dtype=float)
+        inside = (x > 0) & np.isfinite(x)
+        x_safe = np.where(inside, x, spot_price)
+        T_full = np.broadcast_to(T, x.shape)
+        
+        if volatility_surface is None:
+            sigma = volatility
+            smile = 0.0
+        else:
+            sigma = volatility_surface.implied_vol(x_safe, T_full)
+            h = x_safe * 1e-4
+            dsigma = (volatility_surface.implied_vol(x_safe + h, T_full)
+                      - volatility_surface.implied_vol(x_safe - h, T_full)) / (2 * h)
+        
+        sig_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(forward / x_safe) + 0.5 * sig_sqrt_T ** 2) / sig_sqrt_T
+        d2 = d1 - sig_sqrt_T
+        if volatility_surface is not None:
+            smile = forward * np.exp(-0.5 * d1 * d1) / np.sqrt(2 * np.pi) * sqrt_T * dsigma
+        
+        prob = np.clip(stats.norm.cdf(d2) - smile, 0.0, 1.0)
+        return np.where(inside, prob, np.where(x <= 0, 1.0, 0.0))
+    
+    return survival
+
 
 class RiskCalculator:
     """Calculate portfolio risk metrics and perform stress testing."""
     
-    def __init__(self, options_engine: OptionsEngine):
+    def __init__(self, options_engine: OptionsEngine, scenario_cache_size: int = 8):
         """
         Initialize risk calculator.
         
         Args:
             options_engine: Options pricing engine for Greeks calculation
+            scenario_cache_size: Scenario sets kept for reuse (least recently
+                used are dropped first)
         """
         self.options_engine = options_engine
+        self.scenario_cache_size = scenario_cache_size
+        self._scenario_cache: "OrderedDict[tuple, ScenarioSet]" = OrderedDict()
+    
+    def _cached_scenarios(self, key: tuple) -> Optional[ScenarioSet]:
+        scenarios = self._scenario_cache.get(key)
+        if scenarios is not None:
+            self._scenario_cache.move_to_end(key)
+        return scenarios
+    
+    def _cache_scenarios(self, key: tuple, scenarios: ScenarioSet) -> None:
+        self._scenario_cache[key] = scenarios
+        self._scenario_cache.move_to_end(key)
+        while len(self._scenario_cache) > self.scenario_cache_size:
+            self._scenario_cache.popitem(last=False)
+    
+    def _book_arrays(self, portfolio: Portfolio) -> _BookArrays:
+        """Collect live positions into arrays (expired options are skipped)."""
+        now = datetime.now()
+        live = []
+        for position in portfolio.positions:
+            contract = position.option_contract
+            time_to_expiry = (contract.expiration_date - now).days / 365.0
+            if time_to_expiry > 0:
+                live.append((contract, position.quantity, time_to_expiry))
+        
+        return _BookArrays(
+            names=[c.instrument_name for c, _, _ in live],
+            quantity=np.array([float(q) for _, q, _ in live]),
+            strike=np.array([float(c.strike_price) for c, _, _ in live]),
+            expiry=np.array([t for _, _, t in live]),
+            sigma=np.array([c.implied_volatility for c, _, _ in live]),
+            is_call=np.array([c.option_type == OptionType.CALL for c, _, _ in live], dtype=bool)
+        )
+    
+    def _portfolio_value(self, book: _BookArrays, spot_price: float, risk_free_rate: float) -> np.ndarray:
+        """Per-position market value (price * quantity) at the current spot."""
+        if not len(book):
+            return np.zeros(0)
+        result = self.options_engine.price_batch(
+            spot_price, book.strike, book.expiry, risk_free_rate, book.sigma, book.is_call
+        )
+        return result.price * book.quantity
+    
+    def _book_from_legs(self, strategy_legs: List[Dict], volatility: float) -> _BookArrays:
+        """Collect strategy legs (as passed to calculate_strategy_risk) into arrays."""
+        names, quantity, strike, expiry, sigma, is_call = [], [], [], [], [], []
+        for leg in strategy_legs:
+            contract_data = leg['option_contract']
+            expiration = contract_data['expiration_date']
+            if isinstance(expiration, str):
+                expiration = datetime.fromisoformat(expiration.replace('Z', '+00:00'))
+            
+            names.append(contract_data.get('instrument_name', ''))
+            quantity.append(float(leg['quantity']) * (1 if leg['action'] == 'buy' else -1))
+            strike.append(float(contract_data['strike_price']))
+            expiry.append(max((expiration - datetime.now()).days / 365.0, 0.001))
+            sigma.append(contract_data.get('implied_volatility', volatility))
+            is_call.append(contract_data['option_type'].lower() == 'call')
         
+        return _BookArrays(
+            names=names,
+            quantity=np.array(quantity),
+            strike=np.array(strike),
+            expiry=np.array(expiry),
+            sigma=np.array(sigma, dtype=float),
+            is_call=np.array(is_call, dtype=bool)
+        )
+    
+    def _revalue(
+        self,
+        book: _BookArrays,
+        spot,
+        vol_multiplier,
+        days_forward,
+        risk_free_rate: float
+    ) -> np.ndarray:
+        """
+        Quantity-weighted position values under shocked market states.
+        
+        spot, vol_multiplier and days_forward broadcast against each other;
+        the result has their broadcast shape plus a trailing position axis.
+        Options that expire within days_forward are valued at intrinsic.
+        """
+        spot = np.asarray(spot, dtype=float)[..., None]
+        vol = book.sigma * np.asarray(vol_multiplier, dtype=float)[..., None]
+        remaining = np.maximum(book.expiry - np.asarray(days_forward, dtype=float)[..., None] / 365.0, 0.0)
+        if not len(book):
+            return np.zeros(np.broadcast_shapes(spot.shape, vol.shape, remaining.shape))
+        
+        shocked = self.options_engine.price_batch(
+            spot, book.strike, remaining, risk_free_rate, vol, book.is_call, validate=False
+        )
+        return shocked.price * book.quantity
+    
     def calculate_portfolio_greeks(
         self,
         portfolio: Portfolio,
@@ -58,31 +367,14 @@ class RiskCalculator:
             'rho': 0.0
         }
         
-        for position in portfolio.positions:
-            contract = position.option_contract
-            quantity = position.quantity
-            
-            # Calculate time to expiry in years
-            time_to_expiry = (contract.expiration_date - datetime.now()).days / 365.0
-            if time_to_expiry <= 0:
-                continue  # Skip expired options
-            
-            # Calculate Greeks for this position
-            greeks = self.options_engine.calculate_greeks(
-                S=spot_price,
-                K=float(contract.strike_price),
-                T=time_to_expiry,
-                sigma=contract.implied_volatility,
-                r=risk_free_rate,
-                option_type=contract.option_type
+        book = self._book_arrays(portfolio)
+        if len(book):
+            # One vectorized pass over the whole book, weighted by quantity
+            greeks = self.options_engine.price_batch(
+                spot_price, book.strike, book.expiry, risk_free_rate, book.sigma, book.is_call
             )
-            
-            # Aggregate Greeks (multiply by quantity)
-            total_greeks['delta'] += greeks.delta * quantity
-            total_greeks['gamma'] += greeks.gamma * quantity
-            total_greeks['theta'] += greeks.theta * quantity
-            total_greeks['vega'] += greeks.vega * quantity
-            total_greeks['rho'] += greeks.rho * quantity
+            for name in total_greeks:
+                total_greeks[name] = float(np.dot(getattr(greeks, name), book.quantity))
             
         logger.info(f"Portfolio Greeks calculated: {total_greeks}")
         return total_greeks
@@ -99,6 +391,9 @@ class RiskCalculator:
         """
         Calculate Value at Risk (VaR) using delta-normal method.
         
+        Delta-normal ignores gamma and vega; use calculate_monte_carlo_var or
+        calculate_historical_var for option books with material convexity.
+        
         Args:
             portfolio: Portfolio containing option positions
             spot_price: Current spot price
@@ -114,22 +409,7 @@ class RiskCalculator:
         greeks = self.calculate_portfolio_greeks(portfolio, spot_price, risk_free_rate)
         
         # Calculate current portfolio value
-        portfolio_value = 0.0
-        for position in portfolio.positions:
-            contract = position.option_contract
-            time_to_expiry = (contract.expiration_date - datetime.now()).days / 365.0
-            if time_to_expiry <= 0:
-                continue
-                
-            price = self.options_engine.black_scholes_price(
-                S=spot_price,
-                K=float(contract.strike_price),
-                T=time_to_expiry,
-                r=risk_free_rate,
-                sigma=contract.implied_volatility,
-                option_type=contract.option_type
-            )
-            portfolio_value += price * position.quantity
+        portfolio_value = float(self._portfolio_value(self._book_arrays(portfolio), spot_price, risk_free_rate).sum())
         
         # Delta-normal VaR calculation
         # VaR = Portfolio_Delta * Spot_Price * Volatility * sqrt(time_horizon) * z_score
@@ -156,6 +436,245 @@ class RiskCalculator:
         logger.info(f"VaR calculated: {var_amount:.2f} ({result['var_percentage']:.2f}%)")
         return result
     
+    def monte_carlo_scenarios(
+        self,
+        volatility: float,
+        time_horizon_days: float = 1,
+        n_scenarios: int = 10000,
+        vol_of_vol: float = 1.0,
+        spot_vol_correlation: float = -0.3,
+        seed: Optional[int] = None,
+        refresh: bool = False
+    ) -> ScenarioSet:
+        """
+        Generate (and cache) joint spot/implied-vol scenarios.
+        
+        Spot follows a lognormal move with the given annualized volatility;
+        implied vols move by a correlated lognormal shock with annualized
+        vol-of-vol. Identical arguments return the cached set unless refresh
+        is True, so repeated VaR runs are comparable and skip generation.
+        
+        Args:
+            volatility: Annualized volatility of the underlying
+            time_horizon_days: Horizon in days
+            n_scenarios: Number of scenarios
+            vol_of_vol: Annualized volatility of implied-vol log changes
+            spot_vol_correlation: Correlation between spot and vol shocks
+            seed: Random seed
+            refresh: Regenerate even if a cached set exists
+        
+        Returns:
+            ScenarioSet
+        """
+        key = ('monte_carlo', volatility, time_horizon_days, n_scenarios, vol_of_vol, spot_vol_correlation, seed)
+        cached = None if refresh else self._cached_scenarios(key)
+        if cached is not None:
+            return cached
+        
+        rng = np.random.default_rng(seed)
+        z_spot = rng.standard_normal(n_scenarios)
+        z_vol = spot_vol_correlation * z_spot + np.sqrt(1 - spot_vol_correlation ** 2) * rng.standard_normal(n_scenarios)
+        
+        h = time_horizon_days / 365.0
+        scenarios = ScenarioSet(
+            spot_returns=-0.5 * volatility ** 2 * h + volatility * np.sqrt(h) * z_spot,
+            vol_shocks=-0.5 * vol_of_vol ** 2 * h + vol_of_vol * np.sqrt(h) * z_vol,
+            horizon_days=time_horizon_days,
+            method='monte_carlo'
+        )
+        self._cache_scenarios(key, scenarios)
+        return scenarios
+    
+    def historical_scenarios(
+        self,
+        spot_history: Sequence[float],
+        iv_history: Optional[Sequence[float]] = None,
+        time_horizon_days: int = 1,
+        periods_per_day: int = 1,
+        refresh: bool = False
+    ) -> ScenarioSet:
+        """
+        Build (and cache) scenarios from overlapping historical moves.
+        
+        Args:
+            spot_history: Historical underlying prices (oldest first)
+            iv_history: Matching implied vol history (e.g. DVOL); if omitted
+                vols are held at their current level
+            time_horizon_days: Horizon in days
+            periods_per_day: Observations per day in the histories
+            refresh: Rebuild even if a cached set exists
+        
+        Returns:
+            ScenarioSet
+        
+        Raises:
+            ValueError: If the history is shorter than the horizon
+        """
+        spot = np.asarray(spot_history, dtype=float)
+        iv = np.asarray(iv_history, dtype=float) if iv_history is not None else None
+        if iv is not None and iv.shape != spot.shape:
+            raise ValueError("iv_history must have the same length as spot_history")
+        
+        step = int(round(time_horizon_days * periods_per_day))
+        if step < 1 or spot.size <= step:
+            raise ValueError(f"Need more than {step} observations for a {time_horizon_days}-day horizon")
+        
+        digest = hashlib.sha1(spot.tobytes() + (iv.tobytes() if iv is not None else b'')).hexdigest()
+        key = ('historical', digest, time_horizon_days, periods_per_day)
+        cached = None if refresh else self._cached_scenarios(key)
+        if cached is not None:
+            return cached
+        
+        log_spot = np.log(spot)
+        spot_returns = log_spot[step:] - log_spot[:-step]
+        if iv is not None:
+            log_iv = np.log(iv)
+            vol_shocks = log_iv[step:] - log_iv[:-step]
+        else:
+            vol_shocks = np.zeros_like(spot_returns)
+        
+        scenarios = ScenarioSet(
+            spot_returns=spot_returns,
+            vol_shocks=vol_shocks,
+            horizon_days=time_horizon_days,
+            method='historical'
+        )
+        self._cache_scenarios(key, scenarios)
+        return scenarios
+    
+    def revalue_scenarios(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        scenarios: ScenarioSet,
+        risk_free_rate: float = 0.05
+    ) -> Tuple[np.ndarray, np.ndarray, _BookArrays]:
+        """
+        Fully reprice every position under every scenario in one pass.
+        
+        Each scenario moves spot by exp(spot_return), scales every implied vol
+        by exp(vol_shock) and rolls time forward by the horizon.
+        
+        Returns:
+            (current per-position values, P&L matrix of shape
+            (n_scenarios, n_positions), book arrays)
+        """
+        book = self._book_arrays(portfolio)
+        base_values = self._portfolio_value(book, spot_price, risk_free_rate)
+        if not len(book):
+            return base_values, np.zeros((len(scenarios), 0)), book
+        
+        values = self._revalue(
+            book, spot_price * np.exp(scenarios.spot_returns), np.exp(scenarios.vol_shocks),
+            scenarios.horizon_days, risk_free_rate
+        )
+        return base_values, values - base_values, book
+    
+    def calculate_scenario_var(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        scenarios: ScenarioSet,
+        confidence_level: float = 0.95,
+        risk_free_rate: float = 0.05
+    ) -> Dict[str, any]:
+        """
+        Full-revaluation VaR and CVaR over a scenario set.
+        
+        Position contributions are the expected position P&L in the tail
+        scenarios (Euler allocation), so they sum to the portfolio CVaR.
+        
+        Args:
+            portfolio: Portfolio containing option positions
+            spot_price: Current spot price
+            scenarios: Scenario set from monte_carlo_scenarios or historical_scenarios
+            confidence_level: Confidence level (e.g., 0.95 for 95%)
+            risk_free_rate: Risk-free interest rate
+        
+        Returns:
+            Dictionary with VaR, CVaR, portfolio value and per-position contributions
+        """
+        base_values, pnl, book = self.revalue_scenarios(portfolio, spot_price, scenarios, risk_free_rate)
+        total_pnl = pnl.sum(axis=1)
+        portfolio_value = float(base_values.sum())
+        
+        var_amount = max(-float(np.quantile(total_pnl, 1 - confidence_level)), 0.0) if len(scenarios) else 0.0
+        tail = total_pnl <= -var_amount
+        cvar_amount = max(-float(total_pnl[tail].mean()), 0.0) if tail.any() and len(book) else 0.0
+        
+        contributions = []
+        if len(book):
+            tail_pnl = pnl[tail].mean(axis=0)
+            standalone = -np.quantile(pnl, 1 - confidence_level, axis=0)
+            for i, name in enumerate(book.names):
+                contributions.append({
+                    'instrument_name': name,
+                    'quantity': float(book.quantity[i]),
+                    'value': float(base_values[i]),
+                    'standalone_var': max(float(standalone[i]), 0.0),
+                    'cvar_contribution': -float(tail_pnl[i])
+                })
+        
+        result = {
+            'var': var_amount,
+            'cvar': cvar_amount,
+            'portfolio_value': portfolio_value,
+            'var_percentage': (var_amount / portfolio_value * 100) if portfolio_value > 0 else 0,
+            'confidence_level': confidence_level,
+            'time_horizon_days': scenarios.horizon_days,
+            'method': scenarios.method,
+            'n_scenarios': len(scenarios),
+            'worst_loss': max(-float(total_pnl.min()), 0.0) if len(scenarios) and len(book) else 0.0,
+            'contributions': contributions
+        }
+        
+        logger.info(f"{scenarios.method} VaR calculated: {var_amount:.2f} over {len(scenarios)} scenarios")
+        return result
+    
+    def calculate_monte_carlo_var(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        volatility: float,
+        confidence_level: float = 0.95,
+        time_horizon_days: float = 1,
+        risk_free_rate: float = 0.05,
+        n_scenarios: int = 10000,
+        vol_of_vol: float = 1.0,
+        spot_vol_correlation: float = -0.3,
+        seed: Optional[int] = None
+    ) -> Dict[str, any]:
+        """
+        Monte Carlo VaR/CVaR with full revaluation of the option book.
+        
+        See monte_carlo_scenarios for the scenario model and
+        calculate_scenario_var for the returned fields.
+        """
+        scenarios = self.monte_carlo_scenarios(
+            volatility, time_horizon_days, n_scenarios, vol_of_vol, spot_vol_correlation, seed
+        )
+        return self.calculate_scenario_var(portfolio, spot_price, scenarios, confidence_level, risk_free_rate)
+    
+    def calculate_historical_var(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        spot_history: Sequence[float],
+        iv_history: Optional[Sequence[float]] = None,
+        confidence_level: float = 0.95,
+        time_horizon_days: int = 1,
+        risk_free_rate: float = 0.05,
+        periods_per_day: int = 1
+    ) -> Dict[str, any]:
+        """
+        Historical-simulation VaR/CVaR with full revaluation of the option book.
+        
+        See historical_scenarios for how moves are extracted and
+        calculate_scenario_var for the returned fields.
+        """
+        scenarios = self.historical_scenarios(spot_history, iv_history, time_horizon_days, periods_per_day)
+        return self.calculate_scenario_var(portfolio, spot_price, scenarios, confidence_level, risk_free_rate)
+    
     def calculate_margin_requirement(
         self,
         portfolio: Portfolio,
@@ -353,85 +872,39 @@ class RiskCalculator:
         if volatility_shocks is None:
             volatility_shocks = [-0.50, -0.25, 0.25, 0.50, 1.0]
         
-        # Calculate base portfolio value
-        base_value = 0.0
-        for position in portfolio.positions:
-            contract = position.option_contract
-            time_to_expiry = (contract.expiration_date - datetime.now()).days / 365.0
-            if time_to_expiry <= 0:
-                continue
-                
-            price = self.options_engine.black_scholes_price(
-                S=spot_price,
-                K=float(contract.strike_price),
-                T=time_to_expiry,
-                r=risk_free_rate,
-                sigma=contract.implied_volatility,
-                option_type=contract.option_type
-            )
-            base_value += price * position.quantity
+        book = self._book_arrays(portfolio)
+        base_value = float(self._portfolio_value(book, spot_price, risk_free_rate).sum())
         
         # Test price shocks
+        shocked_prices = spot_price * (1 + np.asarray(price_shocks, dtype=float))
+        price_values = self._revalue(book, shocked_prices, 1.0, 0.0, risk_free_rate).sum(axis=-1)
+        
         price_scenarios = []
-        for shock in price_shocks:
-            shocked_price = spot_price * (1 + shock)
-            portfolio_value = 0.0
-            
-            for position in portfolio.positions:
-                contract = position.option_contract
-                time_to_expiry = (contract.expiration_date - datetime.now()).days / 365.0
-                if time_to_expiry <= 0:
-                    continue
-                    
-                price = self.options_engine.black_scholes_price(
-                    S=shocked_price,
-                    K=float(contract.strike_price),
-                    T=time_to_expiry,
-                    r=risk_free_rate,
-                    sigma=contract.implied_volatility,
-                    option_type=contract.option_type
-                )
-                portfolio_value += price * position.quantity
-            
-            pnl = portfolio_value - base_value
+        for shock, shocked_price, portfolio_value in zip(price_shocks, shocked_prices, price_values):
+            pnl = float(portfolio_value) - base_value
             pnl_percentage = (pnl / base_value * 100) if base_value != 0 else 0
             
             price_scenarios.append({
                 'shock_percentage': shock * 100,
-                'shocked_price': shocked_price,
-                'portfolio_value': portfolio_value,
+                'shocked_price': float(shocked_price),
+                'portfolio_value': float(portfolio_value),
                 'pnl': pnl,
                 'pnl_percentage': pnl_percentage
             })
         
         # Test volatility shocks
+        vol_values = self._revalue(
+            book, spot_price, 1 + np.asarray(volatility_shocks, dtype=float), 0.0, risk_free_rate
+        ).sum(axis=-1)
+        
         volatility_scenarios = []
-        for shock in volatility_shocks:
-            portfolio_value = 0.0
-            
-            for position in portfolio.positions:
-                contract = position.option_contract
-                time_to_expiry = (contract.expiration_date - datetime.now()).days / 365.0
-                if time_to_expiry <= 0:
-                    continue
-                    
-                shocked_vol = contract.implied_volatility * (1 + shock)
-                price = self.options_engine.black_scholes_price(
-                    S=spot_price,
-                    K=float(contract.strike_price),
-                    T=time_to_expiry,
-                    r=risk_free_rate,
-                    sigma=shocked_vol,
-                    option_type=contract.option_type
-                )
-                portfolio_value += price * position.quantity
-            
-            pnl = portfolio_value - base_value
+        for shock, portfolio_value in zip(volatility_shocks, vol_values):
+            pnl = float(portfolio_value) - base_value
             pnl_percentage = (pnl / base_value * 100) if base_value != 0 else 0
             
             volatility_scenarios.append({
                 'shock_percentage': shock * 100,
-                'portfolio_value': portfolio_value,
+                'portfolio_value': float(portfolio_value),
                 'pnl': pnl,
                 'pnl_percentage': pnl_percentage
             })
@@ -452,225 +925,293 @@ class RiskCalculator:
         logger.info(f"Stress test completed. Max loss: {result['max_loss']:.2f}")
         return result
     
+    def stress_cube(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        spot_shocks: Optional[Sequence[float]] = None,
+        vol_shocks: Optional[Sequence[float]] = None,
+        days_forward: Optional[Sequence[float]] = None,
+        risk_free_rate: float = 0.05
+    ) -> StressCube:
+        """
+        Reprice the portfolio on a full spot x vol x days-forward grid.
+        
+        Every combination of shocks is evaluated in one broadcasted pricing
+        call (chunked over positions for large books).
+        
+        Args:
+            portfolio: Portfolio to stress test
+            spot_price: Current spot price
+            spot_shocks: Relative spot moves (default -50%..+50% in 5% steps)
+            vol_shocks: Relative implied vol moves (default -50%..+100%)
+            days_forward: Days to roll time forward (default 0, 1, 3, 7, 14, 30)
+            risk_free_rate: Risk-free interest rate
+        
+        Returns:
+            StressCube with the P&L tensor and worst-case helpers
+        """
+        return self._stress_cube(
+            self._book_arrays(portfolio), spot_price, spot_shocks, vol_shocks, days_forward, risk_free_rate
+        )
+    
+    def _stress_cube(
+        self,
+        book: _BookArrays,
+        spot_price: float,
+        spot_shocks: Optional[Sequence[float]],
+        vol_shocks: Optional[Sequence[float]],
+        days_forward: Optional[Sequence[float]],
+        risk_free_rate: float
+    ) -> StressCube:
+        spot_shocks = np.asarray(np.linspace(-0.5, 0.5, 21) if spot_shocks is None else spot_shocks, dtype=float)
+        vol_shocks = np.asarray([-0.5, -0.25, 0.0, 0.25, 0.5, 0.75, 1.0] if vol_shocks is None else vol_shocks, dtype=float)
+        days_forward = np.asarray([0, 1, 3, 7, 14, 30] if days_forward is None else days_forward, dtype=float)
+        
+        if np.any(spot_shocks <= -1) or np.any(vol_shocks <= -1) or np.any(days_forward < 0):
+            raise ValueError("Shocks must be greater than -100% and days_forward non-negative")
+        
+        spot = (spot_price * (1 + spot_shocks))[:, None, None]
+        vol_multiplier = (1 + vol_shocks)[None, :, None]
+        days = days_forward[None, None, :]
+        shape = (spot_shocks.size, vol_shocks.size, days_forward.size)
+        
+        base_value = float(self._portfolio_value(book, spot_price, risk_free_rate).sum())
+        values = np.zeros(shape)
+        chunk = max(1, _MAX_BATCH_ELEMENTS // max(int(np.prod(shape)), 1))
+        for start in range(0, len(book), chunk):
+            values += self._revalue(book[start:start + chunk], spot, vol_multiplier, days, risk_free_rate).sum(axis=-1)
+        
+        cube = StressCube(
+            spot_shocks=spot_shocks,
+            vol_shocks=vol_shocks,
+            days_forward=days_forward,
+            pnl=values - base_value,
+            base_value=base_value,
+            spot_price=spot_price
+        )
+        logger.info(f"Stress cube {shape} completed. Max loss: {cube.pnl.min():.2f}")
+        return cube
+    
+    def historical_stress(
+        self,
+        portfolio: Portfolio,
+        spot_price: float,
+        scenarios: Optional[List[Dict]] = None,
+        risk_free_rate: float = 0.05
+    ) -> List[Dict[str, Any]]:
+        """
+        Replay historical (or user-defined) stress episodes.
+        
+        Args:
+            portfolio: Portfolio to stress test
+            spot_price: Current spot price
+            scenarios: Dicts with name, spot_shock, vol_shock and days_forward
+                (default HISTORICAL_STRESS_SCENARIOS)
+            risk_free_rate: Risk-free interest rate
+        
+        Returns:
+            Scenario results sorted from worst to best P&L
+        """
+        return self._historical_stress(self._book_arrays(portfolio), spot_price, scenarios, risk_free_rate)
+    
+    def _historical_stress(
+        self,
+        book: _BookArrays,
+        spot_price: float,
+        scenarios: Optional[List[Dict]],
+        risk_free_rate: float
+    ) -> List[Dict[str, Any]]:
+        if scenarios is None:
+            scenarios = HISTORICAL_STRESS_SCENARIOS
+        if not scenarios:
+            return []
+        
+        spot_shocks = np.array([float(sc.get('spot_shock', 0.0)) for sc in scenarios])
+        vol_shocks = np.array([float(sc.get('vol_shock', 0.0)) for sc in scenarios])
+        days_forward = np.array([float(sc.get('days_forward', 0)) for sc in scenarios])
+        if np.any(spot_shocks <= -1) or np.any(vol_shocks <= -1) or np.any(days_forward < 0):
+            raise ValueError("Shocks must be greater than -100% and days_forward non-negative")
+        
+        base_value = float(self._portfolio_value(book, spot_price, risk_free_rate).sum())
+        shocked_prices = spot_price * (1 + spot_shocks)
+        values = self._revalue(book, shocked_prices, 1 + vol_shocks, days_forward, risk_free_rate).sum(axis=-1)
+        
+        results = []
+        for i, scenario in enumerate(scenarios):
+            pnl = float(values[i]) - base_value
+            results.append({
+                'name': scenario.get('name', f'scenario_{i}'),
+                'spot_shock': float(spot_shocks[i]),
+                'vol_shock': float(vol_shocks[i]),
+                'days_forward': float(days_forward[i]),
+                'shocked_price': float(shocked_prices[i]),
+                'portfolio_value': float(values[i]),
+                'pnl': pnl,
+                'pnl_percentage': (pnl / base_value * 100) if base_value != 0 else 0
+            })
+        
+        results.sort(key=lambda x: x['pnl'])
+        return results
+    
+    def strategy_stress_test(
+        self,
+        strategy_legs: List[Dict],
+        spot_price: float,
+        risk_free_rate: float = 0.05,
+        volatility: float = 0.8,
+        spot_shocks: Optional[Sequence[float]] = None,
+        vol_shocks: Optional[Sequence[float]] = None,
+        days_forward: Optional[Sequence[float]] = None,
+        scenarios: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        """
+        Stress cube and historical scenarios for a strategy definition.
+        
+        Args:
+            strategy_legs: Strategy legs in the calculate_strategy_risk format
+            spot_price: Current spot price
+            risk_free_rate: Risk-free interest rate
+            volatility: Implied vol for legs that do not carry one
+            spot_shocks, vol_shocks, days_forward: Cube axes (see stress_cube)
+            scenarios: Historical scenarios (see historical_stress)
+        
+        Returns:
+            Dictionary with 'cube' (StressCube) and 'historical' results
+        """
+        book = self._book_from_legs(strategy_legs, volatility)
+        return {
+            'cube': self._stress_cube(book, spot_price, spot_shocks, vol_shocks, days_forward, risk_free_rate),
+            'historical': self._historical_stress(book, spot_price, scenarios, risk_free_rate)
+        }
+    
     def calculate_strategy_risk(
         self,
         strategy_legs: List[Dict],
         spot_price: float,
         risk_free_rate: float = 0.05,
-        volatility: float = 0.8
+        volatility: float = 0.8,
+        volatility_surface=None
     ) -> Dict[str, any]:
         """
         Calculate comprehensive risk metrics for a strategy.
         
+        Max profit/loss and breakevens are exact for the expiry payoff, which
+        is piecewise linear between sorted strikes; an unbounded side is
+        reported as +/-inf with unlimited_profit/unlimited_loss set.
+        
         Args:
             strategy_legs: List of strategy legs with option contracts
             spot_price: Current spot price of underlying
             risk_free_rate: Risk-free interest rate
-            volatility: Historical volatility for VaR calculation
+            volatility: Volatility for legs without an implied vol and for the
+                lognormal probability of profit
+            volatility_surface: Optional surface with implied_vol(strikes, expiries)
+                (e.g. SVIVolatilitySurface); if given, probability of profit
+                uses the smile-implied distribution instead of the lognormal
             
         Returns:
             Dictionary with Greeks, max profit/loss, breakeven points, and risk metrics
         """
-        from ..core.models import OptionContract, OptionType
-        from decimal import Decimal
-        
-        # Aggregate Greeks
-        total_greeks = {
-            'delta': 0.0,
-            'gamma': 0.0,
-            'theta': 0.0,
-            'vega': 0.0,
-            'rho': 0.0
-        }
-        
-        # Calculate initial cost and Greeks
-        initial_cost = 0.0
-        legs_data = []
-        
-        for leg in strategy_legs:
-            contract_data = leg['option_contract']
-            action = leg['action']
-            quantity = leg['quantity']
-            
-            # Parse expiration date
-            if isinstance(contract_data['expiration_date'], str):
-                expiry = datetime.fromisoformat(contract_data['expiration_date'].replace('Z', '+00:00'))
-            else:
-                expiry = contract_data['expiration_date']
-            
-            time_to_expiry = (expiry - datetime.now()).days / 365.0
-            if time_to_expiry <= 0:
-                time_to_expiry = 0.001  # Minimum time to avoid division by zero
-            
-            # Determine option type
-            option_type = OptionType.CALL if contract_data['option_type'].lower() == 'call' else OptionType.PUT
-            strike = float(contract_data['strike_price'])
-            
-            # Get implied volatility from contract or use default
-            iv = contract_data.get('implied_volatility', volatility)
-            
-            # Calculate option price
-            price = self.options_engine.black_scholes_price(
-                S=spot_price,
-                K=strike,
-                T=time_to_expiry,
-                r=risk_free_rate,
-                sigma=iv,
-                option_type=option_type
-            )
-            
-            # Calculate Greeks
-            greeks = self.options_engine.calculate_greeks(
-                S=spot_price,
-                K=strike,
-                T=time_to_expiry,
-                sigma=iv,
-                r=risk_free_rate,
-                option_type=option_type
-            )
-            
-            # Determine multiplier based on action
-            multiplier = 1 if action == 'buy' else -1
-            
-            # Update initial cost
-            initial_cost += price * quantity * multiplier
-            
-            # Aggregate Greeks
-            total_greeks['delta'] += greeks.delta * quantity * multiplier
-            total_greeks['gamma'] += greeks.gamma * quantity * multiplier
-            total_greeks['theta'] += greeks.theta * quantity * multiplier
-            total_greeks['vega'] += greeks.vega * quantity * multiplier
-            total_greeks['rho'] += greeks.rho * quantity * multiplier
-            
-            # Store leg data for payoff calculation
-            legs_data.append({
-                'strike': strike,
-                'option_type': option_type,
-                'action': action,
-                'quantity': quantity,
-                'price': price
-            })
-        
-        # Calculate max profit, max loss, and breakeven points
-        payoff_analysis = self._calculate_payoff_profile(legs_data, spot_price)
-        
-        result = {
-            'greeks': total_greeks,
-            'initial_cost': initial_cost,
-            'max_profit': payoff_analysis['max_profit'],
-            'max_loss': payoff_analysis['max_loss'],
-            'breakeven_points': payoff_analysis['breakeven_points'],
-            'risk_reward_ratio': payoff_analysis['risk_reward_ratio'],
-            'probability_of_profit': payoff_analysis.get('probability_of_profit', None)
-        }
+        result = self.calculate_strategies_risk(
+            [strategy_legs], spot_price, risk_free_rate, volatility, volatility_surface
+        )[0]
         
         logger.info(f"Strategy risk calculated: Max Profit={result['max_profit']:.2f}, Max Loss={result['max_loss']:.2f}")
         return result
     
-    def _calculate_payoff_profile(
+    def calculate_strategies_risk(
         self,
-        legs_data: List[Dict],
+        strategies: List[List[Dict]],
         spot_price: float,
-        num_points: int = 200
-    ) -> Dict[str, any]:
+        risk_free_rate: float = 0.05,
+        volatility: float = 0.8,
+        volatility_surface=None
+    ) -> List[Dict[str, any]]:
         """
-        Calculate payoff profile for a strategy.
+        Score many candidate strategies at once.
+        
+        All legs of all candidates are priced in one batch and the payoff
+        analytics run on padded (candidates x legs) arrays, so scoring
+        hundreds of structures costs a handful of NumPy calls.
         
         Args:
-            legs_data: List of leg data with strike, type, action, quantity
-            spot_price: Current spot price
-            num_points: Number of points to evaluate
+            strategies: Candidate strategies, each a list of legs in the
+                calculate_strategy_risk format
+            spot_price: Current spot price of underlying
+            risk_free_rate: Risk-free interest rate
+            volatility: See calculate_strategy_risk
+            volatility_surface: See calculate_strategy_risk
             
         Returns:
-            Dictionary with max profit, max loss, breakeven points
-        """
-        from ..core.models import OptionType
-        
-        # Determine price range for evaluation
-        strikes = [leg['strike'] for leg in legs_data]
-        min_strike = min(strikes)
-        max_strike = max(strikes)
-        
-        # Extend range significantly for strategies with wide strikes
-        price_range = max_strike - min_strike
-        if price_range == 0:
-            # For same-strike strategies (straddle), use spot price as reference
-            price_range = spot_price * 0.5
-            min_price = max(1, spot_price - price_range)
-            max_price = spot_price + price_range
-        else:
-            # For different-strike strategies, extend beyond strikes
-            extension = max(price_range * 0.5, spot_price * 0.3)
-            min_price = max(1, min_strike - extension)
-            max_price = max_strike + extension
-        
-        # Generate price points
-        prices = np.linspace(min_price, max_price, num_points)
-        payoffs = []
-        
-        # Calculate initial cost
-        initial_cost = sum(leg['price'] * leg['quantity'] * (1 if leg['action'] == 'buy' else -1) 
-                          for leg in legs_data)
-        
-        # Calculate payoff at each price point
-        for price in prices:
-            payoff = -initial_cost  # Start with initial cost
-            
-            for leg in legs_data:
-                strike = leg['strike']
-                option_type = leg['option_type']
-                action = leg['action']
-                quantity = leg['quantity']
-                
-                # Calculate intrinsic value at expiration
-                if option_type == OptionType.CALL:
-                    intrinsic = max(0, price - strike)
-                else:  # PUT
-                    intrinsic = max(0, strike - price)
-                
-                # Apply action and quantity
-                if action == 'buy':
-                    payoff += intrinsic * quantity
-                else:  # sell
-                    payoff -= intrinsic * quantity
+            One result dictionary per candidate, in input order
             
-            payoffs.append(payoff)
-        
-        payoffs = np.array(payoffs)
-        
-        # Find max profit and max loss
-        max_profit = float(np.max(payoffs))
-        max_loss = float(np.min(payoffs))
-        
-        # Find breakeven points (where payoff crosses zero)
-        breakeven_points = []
-        for i in range(len(payoffs) - 1):
-            # Check if payoff crosses zero between consecutive points
-            if (payoffs[i] < 0 and payoffs[i + 1] >= 0) or (payoffs[i] > 0 and payoffs[i + 1] <= 0) or \
-               (payoffs[i] <= 0 and payoffs[i + 1] > 0) or (payoffs[i] >= 0 and payoffs[i + 1] < 0):
-                # Linear interpolation to find exact breakeven
-                x1, x2 = prices[i], prices[i + 1]
-                y1, y2 = payoffs[i], payoffs[i + 1]
-                if abs(y2 - y1) > 1e-10:  # Avoid division by zero
-                    breakeven = x1 - y1 * (x2 - x1) / (y2 - y1)
-                    # Avoid duplicate breakeven points
-                    if not breakeven_points or abs(breakeven - breakeven_points[-1]) > 1.0:
-                        breakeven_points.append(float(breakeven))
-        
-        # Calculate risk-reward ratio
-        if max_loss != 0:
-            risk_reward_ratio = abs(max_profit / max_loss)
-        else:
-            risk_reward_ratio = float('inf') if max_profit > 0 else 0
+        Raises:
+            ValueError: If a candidate has no legs
+        """
+        if not strategies:
+            return []
         
-        # Estimate probability of profit (simplified)
-        profitable_points = np.sum(payoffs > 0)
-        probability_of_profit = (profitable_points / len(payoffs)) * 100
+        books = [self._book_from_legs(legs, volatility) for legs in strategies]
+        sizes = np.array([len(book) for book in books])
+        if np.any(sizes == 0):
+            raise ValueError("Strategy must have at least one leg")
         
-        return {
-            'max_profit': max_profit,
-            'max_loss': max_loss,
-            'breakeven_points': breakeven_points,
-            'risk_reward_ratio': risk_reward_ratio,
-            'probability_of_profit': probability_of_profit
-        }
+        strike = np.concatenate([book.strike for book in books])
+        expiry = np.concatenate([book.expiry for book in books])
+        quantity = np.concatenate([book.quantity for book in books])
+        is_call = np.concatenate([book.is_call for book in books])
+        sigma = np.concatenate([book.sigma for book in books])
+        
+        priced = self.options_engine.price_batch(spot_price, strike, expiry, risk_free_rate, sigma, is_call)
+        
+        # Pad to (candidates, max legs); padding legs have zero quantity
+        mask = np.arange(sizes.max()) < sizes[:, None]
+        
+        def padded(values, fill=0.0):
+            out = np.full(mask.shape, fill, dtype=np.asarray(values).dtype)
+            out[mask] = values
+            return out
+        
+        q = padded(quantity)
+        initial_cost = (padded(priced.price) * q).sum(axis=1)
+        greeks = {name: (padded(getattr(priced, name)) * q).sum(axis=1)
+                  for name in ('delta', 'gamma', 'theta', 'vega', 'rho')}
+        
+        # Payoff is evaluated at the first expiry of each candidate
+        payoff = _payoff_analytics(
+            strike=padded(strike, np.nan),
+            quantity=q,
+            is_call=padded(is_call, False),
+            initial_cost=initial_cost,
+            spot_price=spot_price,
+            expiry=np.where(mask, padded(expiry), np.inf).min(axis=1),
+            risk_free_rate=risk_free_rate,
+            volatility=volatility,
+            volatility_surface=volatility_surface
+        )
+        
+        results = []
+        for i in range(len(books)):
+            max_profit = float(payoff['max_profit'][i])
+            max_loss = float(payoff['max_loss'][i])
+            if np.isinf(max_profit):
+                risk_reward_ratio = float('inf')
+            elif max_loss != 0:
+                risk_reward_ratio = abs(max_profit / max_loss)
+            else:
+                risk_reward_ratio = float('inf') if max_profit > 0 else 0
+            
+            results.append({
+                'greeks': {name: float(values[i]) for name, values in greeks.items()},
+                'initial_cost': float(initial_cost[i]),
+                'max_profit': max_profit,
+                'max_loss': max_loss,
+                'unlimited_profit': bool(np.isposinf(max_profit)),
+                'unlimited_loss': bool(np.isneginf(max_loss)),
+                'breakeven_points': payoff['breakeven_points'][i],
+                'risk_reward_ratio': risk_reward_ratio,
+                'probability_of_profit': float(payoff['probability_of_profit'][i])
+            })
+        
+        return results
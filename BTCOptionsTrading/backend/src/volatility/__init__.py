@@ -3,5 +3,7 @@
 """
 
 from src.volatility.volatility_analyzer import VolatilityAnalyzer
+from src.volatility.garch import GarchFit, fit_garch
+from src.volatility.svi_surface import SVIParams, SVISurfaceFitter, SVIVolatilitySurface, fit_svi_slice
 
-__all__ = ['VolatilityAnalyzer']
+__all__ = ['VolatilityAnalyzer', 'GarchFit', 'fit_garch', 'SVIParams', 'SVISurfaceFitter', 'SVIVolatilitySurface', 'fit_svi_slice']
@@ -0,0 +1,194 @@
+"""
+GARCH(1,1) / GJR-GARCH(1,1) 最大似然估计
+条件方差递推用 scipy.signal.lfilter 在C中完成，单次似然计算为O(n)
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 少于该样本数时不做估计，使用默认参数
+MIN_OBSERVATIONS = 30
+
+# 默认参数（估计失败时使用，omega按方差目标法确定）
+DEFAULT_ALPHA = 0.1
+DEFAULT_BETA = 0.85
+
+_LOG_2PI = np.log(2 * np.pi)
+
+
+@dataclass
+class GarchFit:
+    """GARCH拟合结果（参数对应原始收益率尺度）"""
+    model: str                      # 'garch' 或 'gjr'
+    omega: float
+    alpha: float
+    beta: float
+    gamma: float                    # GJR杠杆项（garch模型为0）
+    mean: float                     # 收益率均值
+    log_likelihood: float
+    conditional_variance: np.ndarray
+    converged: bool
+    last_residual: float = 0.0
+    
+    @property
+    def persistence(self) -> float:
+        """方差持续性 alpha + beta + gamma/2"""
+        return self.alpha + self.beta + 0.5 * self.gamma
+    
+    @property
+    def long_run_variance(self) -> float:
+        """长期方差（非平稳时返回样本最后的条件方差）"""
+        if self.persistence >= 1:
+            return float(self.conditional_variance[-1])
+        return self.omega / (1 - self.persistence)
+    
+    def forecast_variance(self, horizon: int = 1) -> np.ndarray:
+        """
+        预测未来1..horizon期的条件方差
+        
+        Args:
+            horizon: 预测期数
+        
+        Returns:
+            长度为horizon的方差数组
+        """
+        e = self.last_residual
+        next_var = (self.omega + (self.alpha + self.gamma * (e < 0)) * e * e
+                    + self.beta * float(self.conditional_variance[-1]))
+        steps = np.arange(horizon)
+        long_run = self.long_run_variance
+        return long_run + self.persistence ** steps * (next_var - long_run)
+
+
+def garch_variance(
+    residuals: np.ndarray,
+    omega: float,
+    alpha: float,
+    beta: float,
+    gamma: float = 0.0,
+    initial_variance: float = None
+) -> np.ndarray:
+    """
+    计算条件方差序列
+    
+    sigma2[t] = omega + (alpha + gamma * 1[e[t-1] < 0]) * e[t-1]^2 + beta * sigma2[t-1]
+    
+    递推对sigma2是线性的，等价于一个一阶IIR滤波器。
+    
+    Args:
+        residuals: 去均值后的收益率
+        omega, alpha, beta, gamma: 模型参数
+        initial_variance: sigma2[0]，默认取样本方差
+    
+    Returns:
+        条件方差数组（与residuals等长）
+    """
+    e = np.asarray(residuals, dtype=float)
+    var0 = float(np.mean(e * e)) if initial_variance is None else initial_variance
+    sq = e[:-1] * e[:-1]
+    shock = omega + alpha * sq
+    if gamma:
+        shock = shock + gamma * sq * (e[:-1] < 0)
+    variance = np.empty_like(e)
+    variance[0] = var0
+    variance[1:] = lfilter([1.0], [1.0, -beta], shock, zi=[beta * var0])[0]
+    return variance
+
+
+def _negative_log_likelihood(params: np.ndarray, e: np.ndarray, var0: float) -> float:
+    """平均负对数似然（按样本数归一，长序列下优化器的梯度尺度不随n增长）"""
+    omega, alpha, beta, gamma = params
+    variance = garch_variance(e, omega, alpha, beta, gamma, var0)
+    if np.any(variance <= 0) or not np.all(np.isfinite(variance)):
+        return 1e10
+    return 0.5 * float(np.mean(_LOG_2PI + np.log(variance) + e * e / variance))
+
+
+def fit_garch(returns: Sequence[float], model: str = 'garch') -> GarchFit:
+    """
+    最大似然估计GARCH(1,1)或GJR-GARCH(1,1)
+    
+    收益率先标准化到单位方差再优化（避免omega量级过小），结果换算回原尺度。
+    约束 alpha + beta + gamma/2 < 1 保证平稳。
+    
+    Args:
+        returns: 收益率序列
+        model: 'garch' 或 'gjr'
+    
+    Returns:
+        GarchFit
+    
+    Raises:
+        ValueError: 未知模型
+    """
+    if model not in ('garch', 'gjr'):
+        raise ValueError(f"未知GARCH模型: {model}")
+    
+    r = np.asarray(returns, dtype=float)
+    mean = float(np.mean(r)) if r.size else 0.0
+    e = r - mean
+    sample_var = float(np.mean(e * e)) if r.size else 0.0
+    
+    if r.size < MIN_OBSERVATIONS or sample_var <= 0:
+        logger.warning(f"样本数不足（{r.size}），GARCH使用默认参数")
+        return _default_fit(model, e, mean, sample_var)
+    
+    scale = np.sqrt(sample_var)
+    z = e / scale
+    use_gamma = model == 'gjr'
+    
+    x0 = np.array([0.05, 0.05, 0.9, 0.05 if use_gamma else 0.0])
+    x0[0] = 1 - x0[1] - x0[2] - 0.5 * x0[3]
+    bounds = [(1e-8, 10.0), (0.0, 1.0), (0.0, 1.0), (0.0, 1.0) if use_gamma else (0.0, 0.0)]
+    constraints = [{'type': 'ineq', 'fun': lambda x: 0.9999 - x[1] - x[2] - 0.5 * x[3]}]
+    
+    result = minimize(_negative_log_likelihood, x0, args=(z, 1.0), method='SLSQP',
+                      bounds=bounds, constraints=constraints, options={'maxiter': 200, 'ftol': 1e-10})
+    if not result.success or not np.all(np.isfinite(result.x)):
+        logger.warning(f"GARCH参数估计未收敛: {result.message}，使用默认参数")
+        return _default_fit(model, e, mean, sample_var)
+    
+    omega, alpha, beta, gamma = (float(v) for v in result.x)
+    omega *= sample_var
+    variance = garch_variance(e, omega, alpha, beta, gamma, sample_var)
+    # 标准化后的似然加上尺度变换的雅可比项
+    log_likelihood = -float(result.fun) * r.size - r.size * np.log(scale)
+    
+    return GarchFit(
+        model=model,
+        omega=omega,
+        alpha=alpha,
+        beta=beta,
+        gamma=gamma,
+        mean=mean,
+        log_likelihood=log_likelihood,
+        conditional_variance=variance,
+        converged=True,
+        last_residual=float(e[-1])
+    )
+
+
+def _default_fit(model: str, e: np.ndarray, mean: float, sample_var: float) -> GarchFit:
+    omega = sample_var * (1 - DEFAULT_ALPHA - DEFAULT_BETA)
+    variance = (garch_variance(e, omega, DEFAULT_ALPHA, DEFAULT_BETA, 0.0, sample_var)
+                if e.size else np.zeros(0))
+    return GarchFit(
+        model=model,
+        omega=omega,
+        alpha=DEFAULT_ALPHA,
+        beta=DEFAULT_BETA,
+        gamma=0.0,
+        mean=mean,
+        log_likelihood=float('nan'),
+        conditional_variance=variance,
+        converged=False,
+        last_residual=float(e[-1]) if e.size else 0.0
+    )
@@ -0,0 +1,351 @@
+"""
+SVI参数化波动率曲面
+按到期日分别拟合raw SVI切片，时间方向在总方差上线性插值
+"""
+
+import bisect
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 每个切片至少需要的报价数，不足时退化为平坦切片
+MIN_SLICE_POINTS = 3
+
+# Roger Lee矩公式要求 b(1+|rho|) <= 4，取 b <= 2 即可满足
+MAX_B = 2.0
+MAX_RHO = 0.999
+
+
+@dataclass
+class SVIParams:
+    """
+    raw SVI参数
+    
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+    其中 k = ln(K/S)，w 为总方差 iv^2 * T
+    """
+    a: float
+    b: float
+    rho: float
+    m: float
+    sigma: float
+    
+    def total_variance(self, k) -> np.ndarray:
+        """计算对数执行价k处的总方差"""
+        d = np.asarray(k, dtype=float) - self.m
+        return self.a + self.b * (self.rho * d + np.sqrt(d * d + self.sigma * self.sigma))
+    
+    def min_variance(self) -> float:
+        """切片上的最小总方差"""
+        return self.a + self.b * self.sigma * math.sqrt(1.0 - self.rho * self.rho)
+    
+    def as_array(self) -> np.ndarray:
+        return np.array([self.a, self.b, self.rho, self.m, self.sigma])
+
+
+def _to_raw(x: np.ndarray) -> np.ndarray:
+    """优化变量 (v, b, rho, m, sigma) 转换为raw参数 (a, b, rho, m, sigma)，v为最小总方差"""
+    v, b, rho, m, sigma = x
+    return np.array([v - b * sigma * math.sqrt(1.0 - rho * rho), b, rho, m, sigma])
+
+
+def _from_raw(params: np.ndarray) -> np.ndarray:
+    a, b, rho, m, sigma = params
+    return np.array([a + b * sigma * math.sqrt(1.0 - rho * rho), b, rho, m, sigma])
+
+
+def _initial_guess(k: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """由切片形状估计初值（优化变量空间）"""
+    i = int(np.argmin(w))
+    span = max(float(k.max() - k.min()), 1e-3)
+    slope = (float(w[-1]) - float(w[0])) / span if len(w) > 1 else 0.0
+    wing = (float(w[0]) + float(w[-1]) - 2 * float(w[i])) / span if len(w) > 2 else 0.0
+    b = min(max(wing, 1e-3), MAX_B)
+    rho = float(np.clip(slope / b, -0.9, 0.9)) if b > 0 else 0.0
+    return np.array([max(float(w[i]), 1e-6), b, rho, float(k[i]), 0.1])
+
+
+def fit_svi_slice(
+    k: Sequence[float],
+    w: Sequence[float],
+    weights: Optional[Sequence[float]] = None,
+    initial: Optional[SVIParams] = None
+) -> Tuple[SVIParams, float]:
+    """
+    拟合单个到期日的SVI切片
+    
+    优化变量取 (最小总方差, b, rho, m, sigma)，边界约束保证总方差非负且满足Lee翼部斜率条件。
+    残差与雅可比矩阵按向量一次计算。
+    
+    Args:
+        k: 对数执行价 ln(K/S)
+        w: 总方差 iv^2 * T
+        weights: 各报价权重（如vega），默认等权
+        initial: 初始参数（通常为上一次拟合结果，用于热启动）
+    
+    Returns:
+        (SVI参数, 加权均方根误差)
+    """
+    k = np.asarray(k, dtype=float)
+    w = np.asarray(w, dtype=float)
+    order = np.argsort(k)
+    k, w = k[order], w[order]
+    sw = np.sqrt(np.asarray(weights, dtype=float)[order]) if weights is not None else np.ones_like(k)
+    
+    if k.size < MIN_SLICE_POINTS:
+        flat = float(np.average(w, weights=sw * sw))
+        return SVIParams(a=flat, b=0.0, rho=0.0, m=0.0, sigma=0.1), float(np.sqrt(np.mean((sw * (w - flat)) ** 2)))
+    
+    lower = np.array([0.0, 0.0, -MAX_RHO, float(k.min()) - 1.0, 1e-4])
+    upper = np.array([max(float(w.max()), 1e-6) * 2, MAX_B, MAX_RHO, float(k.max()) + 1.0, 5.0])
+    x0 = _from_raw(initial.as_array()) if initial is not None else _initial_guess(k, w)
+    x0 = np.clip(x0, lower + 1e-9, upper - 1e-9)
+    
+    def residuals(x):
+        a, b, rho, m, sigma = _to_raw(x)
+        d = k - m
+        return sw * (a + b * (rho * d + np.sqrt(d * d + sigma * sigma)) - w)
+    
+    def jacobian(x):
+        v, b, rho, m, sigma = x
+        root = math.sqrt(1.0 - rho * rho)
+        d = k - m
+        s = np.sqrt(d * d + sigma * sigma)
+        jac = np.empty((k.size, 5))
+        jac[:, 0] = 1.0
+        jac[:, 1] = rho * d + s - sigma * root
+        jac[:, 2] = b * d + b * sigma * rho / root
+        jac[:, 3] = -b * (rho + d / s)
+        jac[:, 4] = b * sigma / s - b * root
+        return jac * sw[:, None]
+    
+    result = least_squares(residuals, x0, jac=jacobian, bounds=(lower, upper), method='trf',
+                           xtol=1e-12, ftol=1e-12, gtol=1e-12, max_nfev=200)
+    a, b, rho, m, sigma = _to_raw(result.x)
+    rmse = float(np.sqrt(np.mean(result.fun ** 2)))
+    return SVIParams(a=float(a), b=float(b), rho=float(rho), m=float(m), sigma=float(sigma)), rmse
+
+
+class SVIVolatilitySurface:
+    """
+    SVI波动率曲面
+    
+    每个到期日一组SVI参数；查询时先定位相邻的两个切片，再在总方差上按时间线性插值，
+    单次查询的计算量与报价数量无关。各切片的总方差沿到期方向取累计最大值，
+    远月不低于任何更近的切片（防止日历套利）；首个切片之前和最后一个切片之后按波动率不变外推。
+    """
+    
+    def __init__(self, spot_price: float, expiries: Sequence[float], params: np.ndarray,
+                 rmse: Optional[Sequence[float]] = None):
+        """
+        Args:
+            spot_price: 标的现价
+            expiries: 各切片到期时间（年，升序）
+            params: 形状为 (切片数, 5) 的raw SVI参数 (a, b, rho, m, sigma)
+            rmse: 各切片拟合误差
+        """
+        self.spot_price = float(spot_price)
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.params = np.asarray(params, dtype=float).reshape(-1, 5)
+        self.rmse = np.asarray(rmse if rmse is not None else np.zeros(len(self.expiries)), dtype=float)
+        if self.expiries.size == 0 or self.expiries.size != len(self.params):
+            raise ValueError("曲面至少需要一个切片，且到期时间与参数数量一致")
+        self._expiry_list = self.expiries.tolist()
+        self._param_list = [tuple(p) for p in self.params.tolist()]
+    
+    def __len__(self) -> int:
+        return int(self.expiries.size)
+    
+    def slice(self, i: int) -> SVIParams:
+        """第i个切片的参数"""
+        return SVIParams(*self._param_list[i])
+    
+    def total_variance(self, k, expiry) -> np.ndarray:
+        """
+        批量计算总方差
+        
+        Args:
+            k: 对数执行价 ln(K/S)
+            expiry: 到期时间（年），与k广播
+        
+        Returns:
+            总方差数组
+        """
+        k, t = np.broadcast_arrays(np.asarray(k, dtype=float), np.asarray(expiry, dtype=float))
+        n = self.expiries.size
+        idx = np.searchsorted(self.expiries, t, side='right')
+        lo = np.clip(idx - 1, 0, n - 1)
+        hi = np.clip(idx, 0, n - 1)
+        
+        # 各切片在k处的总方差沿到期方向取累计最大值，保证总方差随T单调不减
+        params = self.params.reshape((n,) + (1,) * k.ndim + (5,))
+        w = np.maximum.accumulate(self._slice_variance(params, k), axis=0)
+        w_lo = np.take_along_axis(w, lo[None], axis=0)[0]
+        w_hi = np.take_along_axis(w, hi[None], axis=0)[0]
+        t_lo = self.expiries[lo]
+        t_hi = self.expiries[hi]
+        
+        inside = hi != lo
+        frac = np.where(inside, (t - t_lo) / np.where(inside, t_hi - t_lo, 1.0), 0.0)
+        return np.where(inside, w_lo + frac * (w_hi - w_lo), w_lo * t / t_lo)
+    
+    @staticmethod
+    def _slice_variance(p: np.ndarray, k: np.ndarray) -> np.ndarray:
+        d = k - p[..., 3]
+        return p[..., 0] + p[..., 1] * (p[..., 2] * d + np.sqrt(d * d + p[..., 4] ** 2))
+    
+    def implied_vol(self, strikes, expiries) -> np.ndarray:
+        """
+        批量查询隐含波动率
+        
+        Args:
+            strikes: 执行价（标量或数组）
+            expiries: 到期时间（年，需大于0），与strikes广播
+        
+        Returns:
+            隐含波动率数组
+        """
+        t = np.asarray(expiries, dtype=float)
+        k = np.log(np.asarray(strikes, dtype=float) / self.spot_price)
+        return np.sqrt(np.maximum(self.total_variance(k, t), 0.0) / t)
+    
+    def vol(self, strike: float, expiry: float) -> float:
+        """单点查询隐含波动率（标量快速路径）"""
+        k = math.log(strike / self.spot_price)
+        n = len(self._expiry_list)
+        i = bisect.bisect_right(self._expiry_list, expiry)
+        # 截至较近切片的累计最大总方差（与批量路径一致）
+        w_lo = max(self._svi(p, k) for p in self._param_list[:max(i, 1)])
+        if 0 < i < n:
+            t_lo, t_hi = self._expiry_list[i - 1], self._expiry_list[i]
+            w_hi = max(self._svi(self._param_list[i], k), w_lo)
+            w = w_lo + (expiry - t_lo) / (t_hi - t_lo) * (w_hi - w_lo)
+        else:
+            w = w_lo * expiry / self._expiry_list[max(i - 1, 0)]
+        return math.sqrt(max(w, 0.0) / expiry)
+    
+    @staticmethod
+    def _svi(p: tuple, k: float) -> float:
+        a, b, rho, m, sigma = p
+        d = k - m
+        return a + b * (rho * d + math.sqrt(d * d + sigma * sigma))
+    
+    def grid(self, moneyness: Sequence[float], expiries: Sequence[float]) -> np.ndarray:
+        """
+        在网格上计算隐含波动率
+        
+        Args:
+            moneyness: K/S 网格
+            expiries: 到期时间网格（年）
+        
+        Returns:
+            形状为 (len(expiries), len(moneyness)) 的波动率矩阵
+        """
+        m = np.asarray(moneyness, dtype=float)[None, :]
+        t = np.asarray(expiries, dtype=float)[:, None]
+        return self.implied_vol(m * self.spot_price, t)
+    
+    def calendar_violations(self, k: Optional[Sequence[float]] = None) -> List[Tuple[float, float]]:
+        """
+        检查相邻切片原始拟合结果之间的日历套利（远月总方差低于近月）
+        
+        Args:
+            k: 检查用的对数执行价网格，默认 [-1, 1]
+        
+        Returns:
+            存在交叉的相邻到期时间对
+        """
+        k = np.linspace(-1.0, 1.0, 41) if k is None else np.asarray(k, dtype=float)
+        w = self._slice_variance(self.params[:, None, :], k[None, :])
+        bad = np.any(np.diff(w, axis=0) < -1e-10, axis=1)
+        return [(float(self.expiries[i]), float(self.expiries[i + 1])) for i in np.flatnonzero(bad)]
+
+
+class SVISurfaceFitter:
+    """
+    SVI曲面拟合器
+    
+    保存上一次各切片的拟合结果；再次拟合时到期时间相近的切片以旧参数作为初值，
+    行情小幅变化时只需少量迭代。
+    """
+    
+    def __init__(self, warm_start_tolerance: float = 2.0 / 365):
+        """
+        Args:
+            warm_start_tolerance: 热启动匹配到期时间的容差（年）
+        """
+        self.warm_start_tolerance = warm_start_tolerance
+        self._previous: Dict[float, SVIParams] = {}
+    
+    def reset(self):
+        """丢弃热启动参数"""
+        self._previous.clear()
+    
+    def _warm_start(self, expiry: float) -> Optional[SVIParams]:
+        if not self._previous:
+            return None
+        nearest = min(self._previous, key=lambda t: abs(t - expiry))
+        if abs(nearest - expiry) <= self.warm_start_tolerance:
+            return self._previous[nearest]
+        return None
+    
+    def fit(
+        self,
+        strikes: Sequence[float],
+        expiries: Sequence[float],
+        implied_vols: Sequence[float],
+        spot_price: float,
+        weights: Optional[Sequence[float]] = None
+    ) -> SVIVolatilitySurface:
+        """
+        拟合曲面
+        
+        Args:
+            strikes: 执行价
+            expiries: 到期时间（年）
+            implied_vols: 隐含波动率（小数）
+            spot_price: 标的现价
+            weights: 各报价权重，默认等权
+        
+        Returns:
+            SVIVolatilitySurface
+        
+        Raises:
+            ValueError: 没有有效报价
+        """
+        strikes = np.asarray(strikes, dtype=float)
+        expiries = np.asarray(expiries, dtype=float)
+        vols = np.asarray(implied_vols, dtype=float)
+        weights = np.ones_like(vols) if weights is None else np.asarray(weights, dtype=float)
+        
+        valid = (strikes > 0) & (expiries > 0) & (vols > 0) & np.isfinite(vols)
+        if not np.any(valid):
+            raise ValueError("没有有效的隐含波动率报价")
+        strikes, expiries, vols, weights = strikes[valid], expiries[valid], vols[valid], weights[valid]
+        
+        k = np.log(strikes / spot_price)
+        w = vols * vols * expiries
+        slice_expiries, inverse = np.unique(np.round(expiries, 10), return_inverse=True)
+        
+        params = np.empty((slice_expiries.size, 5))
+        rmse = np.empty(slice_expiries.size)
+        fitted = {}
+        for i, expiry in enumerate(slice_expiries):
+            mask = inverse == i
+            svi, rmse[i] = fit_svi_slice(k[mask], w[mask], weights[mask], initial=self._warm_start(expiry))
+            params[i] = svi.as_array()
+            fitted[float(expiry)] = svi
+        
+        self._previous = fitted
+        surface = SVIVolatilitySurface(spot_price, slice_expiries, params, rmse)
+        violations = surface.calendar_violations()
+        if violations:
+            logger.warning(f"SVI切片存在日历套利，查询时已按总方差单调处理: {violations}")
+        return surface
@@ -7,9 +7,11 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
-from scipy.interpolate import griddata
 from scipy.optimize import minimize
 
+from src.pricing.options_engine import OptionsEngine
+from src.volatility.garch import GarchFit, fit_garch
+from src.volatility.svi_surface import SVISurfaceFitter, SVIVolatilitySurface
 from src.config.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -21,20 +23,24 @@ class VolatilityAnalyzer:
     def __init__(self):
         """初始化波动率分析器"""
         self.logger = logger
+        # 保存上一次的切片参数，重复构建曲面时热启动
+        self.surface_fitter = SVISurfaceFitter()
     
     def calculate_historical_volatility(
         self,
         prices: List[float],
         window: int = 30,
-        annualize: bool = True
+        annualize: bool = True,
+        periods_per_year: int = 252
     ) -> float:
         """
         计算历史波动率
         
         Args:
             prices: 价格序列
-            window: 时间窗口（天数）
+            window: 时间窗口（数据点数）
             annualize: 是否年化
+            periods_per_year: 每年的数据点数（日线252，分钟线525600）
             
         Returns:
             历史波动率
@@ -48,135 +54,256 @@ class VolatilityAnalyzer:
         # 计算标准差
         volatility = np.std(log_returns, ddof=1)
         
-        # 年化（假设一年252个交易日）
         if annualize:
-            volatility = volatility * np.sqrt(252)
+            volatility = volatility * np.sqrt(periods_per_year)
         
         return float(volatility)
     
     def calculate_rolling_volatility(
         self,
         prices: List[float],
-        windows: List[int] = [30, 60, 90]
+        windows: List[int] = [30, 60, 90],
+        periods_per_year: int = 252
     ) -> Dict[int, float]:
         """
-        计算多个时间窗口的滚动波动率
+        计算多个时间窗口的当前波动率
         
         Args:
             prices: 价格序列
             windows: 时间窗口列表
+            periods_per_year: 每年的数据点数
             
         Returns:
-            各窗口的波动率字典
+            各窗口的波动率字典（数据不足的窗口为None）
         """
+        log_returns = np.diff(np.log(np.asarray(prices, dtype=float)))
         result = {}
         
         for window in windows:
-            try:
-                vol = self.calculate_historical_volatility(prices, window)
-                result[window] = vol
-            except ValueError as e:
-                self.logger.warning(f"计算{window}天波动率失败: {str(e)}")
+            if len(prices) < window:
+                self.logger.warning(f"计算{window}天波动率失败: 价格数据不足，需要至少{window}个数据点")
                 result[window] = None
+                continue
+            vol = np.std(log_returns[len(log_returns) - (window - 1):], ddof=1)
+            result[window] = float(vol * np.sqrt(periods_per_year))
         
         return result
     
+    def calculate_rolling_volatility_series(
+        self,
+        prices: List[float],
+        window: int,
+        periods_per_year: int = 252
+    ) -> np.ndarray:
+        """
+        计算滚动历史波动率序列
+        
+        第i个值等于 calculate_historical_volatility(prices[i:i+window])，
+        由收益率的累积和一次算出，复杂度O(n)，与窗口长度无关。
+        
+        Args:
+            prices: 价格序列
+            window: 时间窗口（数据点数，至少3）
+            periods_per_year: 每年的数据点数
+        
+        Returns:
+            长度为 len(prices) - window + 1 的年化波动率数组
+        """
+        if window < 3:
+            raise ValueError("窗口至少需要3个数据点")
+        if len(prices) < window:
+            raise ValueError(f"价格数据不足，需要至少{window}个数据点")
+        
+        log_returns = np.diff(np.log(np.asarray(prices, dtype=float)))
+        sums, squares = self._cumulative_moments(log_returns)
+        return self._rolling_std(sums, squares, window - 1) * np.sqrt(periods_per_year)
+    
+    @staticmethod
+    def _cumulative_moments(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """去均值后的一阶、二阶累积和（首项补0）"""
+        centered = values - values.mean()
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        return sums, squares
+    
+    @staticmethod
+    def _rolling_std(sums: np.ndarray, squares: np.ndarray, n: int) -> np.ndarray:
+        """由累积和计算长度为n的滚动样本标准差（ddof=1）"""
+        s1 = sums[n:] - sums[:-n]
+        s2 = squares[n:] - squares[:-n]
+        variance = (s2 - s1 * s1 / n) / (n - 1)
+        return np.sqrt(np.maximum(variance, 0.0))
+    
     def calculate_garch_volatility(
         self,
         returns: List[float],
-        forecast_horizon: int = 1
+        forecast_horizon: int = 1,
+        model: str = 'garch',
+        periods_per_year: int = 252
     ) -> Tuple[float, List[float]]:
         """
-        使用简化的GARCH(1,1)模型预测波动率
+        使用最大似然估计的GARCH(1,1)/GJR-GARCH(1,1)预测波动率
         
         Args:
             returns: 收益率序列
             forecast_horizon: 预测期数
+            model: 'garch' 或 'gjr'
+            periods_per_year: 每年的数据点数（用于年化）
             
         Returns:
             (预测波动率, 历史条件波动率序列)
         """
-        returns = np.array(returns)
-        n = len(returns)
-        
-        # GARCH(1,1)参数初始值
-        omega = 0.000001  # 常数项
-        alpha = 0.1       # ARCH项系数
-        beta = 0.85       # GARCH项系数
+        fit = self.fit_garch(returns, model)
+        forecast_var = fit.forecast_variance(forecast_horizon)[-1]
         
-        # 初始化条件方差
-        variance = np.zeros(n)
-        variance[0] = np.var(returns)
+        forecast_vol = np.sqrt(forecast_var * periods_per_year)  # 年化
+        historical_vol = np.sqrt(fit.conditional_variance * periods_per_year)
         
-        # 计算条件方差序列
-        for t in range(1, n):
-            variance[t] = omega + alpha * returns[t-1]**2 + beta * variance[t-1]
-        
-        # 预测未来波动率
-        forecast_var = omega + alpha * returns[-1]**2 + beta * variance[-1]
-        
-        # 多步预测
-        for _ in range(1, forecast_horizon):
-            forecast_var = omega + (alpha + beta) * forecast_var
+        return float(forecast_vol), historical_vol.tolist()
+    
+    def fit_garch(self, returns: List[float], model: str = 'garch') -> GarchFit:
+        """
+        最大似然估计GARCH模型参数
         
-        forecast_vol = np.sqrt(forecast_var * 252)  # 年化
-        historical_vol = np.sqrt(variance * 252)
+        Args:
+            returns: 收益率序列
+            model: 'garch' 或 'gjr'
         
-        return float(forecast_vol), historical_vol.tolist()
+        Returns:
+            GarchFit（参数、对数似然、条件方差序列）
+        """
+        fit = fit_garch(returns, model)
+        if fit.converged:
+            self.logger.info(
+                f"{model}参数估计: omega={fit.omega:.3e}, alpha={fit.alpha:.4f}, "
+                f"beta={fit.beta:.4f}, gamma={fit.gamma:.4f}"
+            )
+        return fit
     
-    def build_volatility_surface(
+    def fit_volatility_surface(
         self,
         option_data: List[Dict],
-        spot_price: float
-    ) -> Dict:
+        spot_price: float,
+        risk_free_rate: float = 0.05
+    ) -> SVIVolatilitySurface:
         """
-        构建隐含波动率曲面
+        拟合SVI隐含波动率曲面
+        
+        每个到期日拟合一个SVI切片，以上一次拟合结果作为初值。
         
         Args:
             option_data: 期权数据列表，每个元素包含:
                 - strike: 执行价
                 - expiry: 到期时间（年）
-                - implied_vol: 隐含波动率
+                - implied_vol: 隐含波动率（缺失时由market_price反解）
+                - market_price: 期权市场价格（可选）
                 - option_type: 'call' 或 'put'
+                - weight: 拟合权重（可选，如vega）
             spot_price: 标的资产现价
+            risk_free_rate: 反解隐含波动率时使用的无风险利率
             
         Returns:
-            波动率曲面数据
+            SVIVolatilitySurface，可按 vol(K, T) / implied_vol(K数组, T数组) 查询
         """
         if not option_data:
             raise ValueError("期权数据为空")
         
-        # 提取数据
-        strikes = np.array([d['strike'] for d in option_data])
-        expiries = np.array([d['expiry'] for d in option_data])
-        vols = np.array([d['implied_vol'] for d in option_data])
-        
-        # 计算moneyness (K/S)
-        moneyness = strikes / spot_price
+        option_data = self._fill_implied_vols(option_data, spot_price, risk_free_rate)
+        if not option_data:
+            raise ValueError("没有可用的隐含波动率数据")
+        
+        return self.surface_fitter.fit(
+            strikes=[d['strike'] for d in option_data],
+            expiries=[d['expiry'] for d in option_data],
+            implied_vols=[d['implied_vol'] for d in option_data],
+            spot_price=spot_price,
+            weights=[d.get('weight', 1.0) for d in option_data]
+        )
+    
+    def build_volatility_surface(
+        self,
+        option_data: List[Dict],
+        spot_price: float,
+        risk_free_rate: float = 0.05,
+        grid_size: int = 50
+    ) -> Dict:
+        """
+        构建隐含波动率曲面网格
         
-        # 创建网格
-        moneyness_grid = np.linspace(moneyness.min(), moneyness.max(), 50)
-        expiry_grid = np.linspace(expiries.min(), expiries.max(), 50)
+        Args:
+            option_data: 期权数据列表（格式同fit_volatility_surface）
+            spot_price: 标的资产现价
+            risk_free_rate: 反解隐含波动率时使用的无风险利率
+            grid_size: 每个维度的网格点数
         
-        # 创建2D网格
-        M, T = np.meshgrid(moneyness_grid, expiry_grid)
+        Returns:
+            波动率曲面数据（moneyness/expiry/volatility为NumPy数组，surface为拟合的曲面对象）
+        """
+        surface = self.fit_volatility_surface(option_data, spot_price, risk_free_rate)
         
-        # 插值构建曲面
-        points = np.column_stack([moneyness, expiries])
-        vol_surface = griddata(points, vols, (M, T), method='cubic')
+        strikes = np.array([d['strike'] for d in option_data], dtype=float)
+        expiries = np.array([d['expiry'] for d in option_data], dtype=float)
+        moneyness = strikes / spot_price
         
-        # 处理NaN值（使用最近邻插值填充）
-        if np.any(np.isnan(vol_surface)):
-            vol_surface_linear = griddata(points, vols, (M, T), method='nearest')
-            vol_surface = np.where(np.isnan(vol_surface), vol_surface_linear, vol_surface)
+        moneyness_grid = np.linspace(moneyness.min(), moneyness.max(), grid_size)
+        expiry_grid = np.linspace(expiries.min(), expiries.max(), grid_size)
         
         return {
-            'moneyness': moneyness_grid.tolist(),
-            'expiry': expiry_grid.tolist(),
-            'volatility': vol_surface.tolist(),
-            'spot_price': spot_price
+            'moneyness': moneyness_grid,
+            'expiry': expiry_grid,
+            'volatility': surface.grid(moneyness_grid, expiry_grid),
+            'spot_price': spot_price,
+            'surface': surface
         }
     
+    def _fill_implied_vols(
+        self,
+        option_data: List[Dict],
+        spot_price: float,
+        risk_free_rate: float
+    ) -> List[Dict]:
+        """
+        为缺少implied_vol的期权数据批量反解隐含波动率
+        
+        所有缺失的报价一次性交给批量求解器，未收敛的报价被丢弃。
+        
+        Args:
+            option_data: 期权数据列表
+            spot_price: 标的资产现价
+            risk_free_rate: 无风险利率
+            
+        Returns:
+            每个元素都带有implied_vol的期权数据列表
+        """
+        missing = [
+            d for d in option_data
+            if d.get('implied_vol') is None and d.get('market_price')
+        ]
+        complete = [d for d in option_data if d.get('implied_vol') is not None]
+        
+        if not missing:
+            return complete
+        
+        result = OptionsEngine().implied_volatility_batch(
+            market_prices=[d['market_price'] for d in missing],
+            S=spot_price,
+            K=[d['strike'] for d in missing],
+            T=[d['expiry'] for d in missing],
+            r=risk_free_rate,
+            option_types=[d.get('option_type', 'call') for d in missing],
+            validate=False
+        )
+        
+        solved = [
+            {**d, 'implied_vol': float(iv)}
+            for d, iv, ok in zip(missing, result.iv, result.converged)
+            if ok
+        ]
+        if len(solved) < len(missing):
+            self.logger.warning(f"{len(missing) - len(solved)}个报价的隐含波动率未收敛，已忽略")
+        
+        return complete + solved
+    
     def calculate_term_structure(
         self,
         option_data: List[Dict],
@@ -346,46 +473,45 @@ class VolatilityAnalyzer:
     def calculate_volatility_cone(
         self,
         prices: List[float],
-        windows: List[int] = [10, 20, 30, 60, 90, 120]
+        windows: List[int] = [10, 20, 30, 60, 90, 120],
+        periods_per_year: int = 252
     ) -> Dict:
         """
         计算波动率锥（不同时间窗口的波动率分布）
         
+        所有窗口共用一次对数收益率和累积和计算，每个窗口的滚动波动率为O(n)。
+        
         Args:
             prices: 价格序列
             windows: 时间窗口列表
+            periods_per_year: 每年的数据点数（日线252，分钟线525600）
             
         Returns:
             波动率锥数据
         """
         cone_data = []
+        windows = [w for w in windows if w >= 3 and len(prices) >= w * 2]
+        if windows:
+            log_returns = np.diff(np.log(np.asarray(prices, dtype=float)))
+            sums, squares = self._cumulative_moments(log_returns)
         
         for window in windows:
-            if len(prices) < window * 2:
-                continue
             
             # 计算滚动波动率
-            rolling_vols = []
-            for i in range(window, len(prices)):
-                vol = self.calculate_historical_volatility(
-                    prices[i-window:i],
-                    window=window,
-                    annualize=True
-                )
-                rolling_vols.append(vol)
+            rolling_vols = self._rolling_std(sums, squares, window - 1) * np.sqrt(periods_per_year)
             
-            if rolling_vols:
-                cone_data.append({
-                    'window': window,
-                    'min': float(np.min(rolling_vols)),
-                    'percentile_10': float(np.percentile(rolling_vols, 10)),
-                    'percentile_25': float(np.percentile(rolling_vols, 25)),
-                    'median': float(np.median(rolling_vols)),
-                    'percentile_75': float(np.percentile(rolling_vols, 75)),
-                    'percentile_90': float(np.percentile(rolling_vols, 90)),
-                    'max': float(np.max(rolling_vols)),
-                    'current': float(rolling_vols[-1])
-                })
+            q = np.percentile(rolling_vols, [0, 10, 25, 50, 75, 90, 100])
+            cone_data.append({
+                'window': window,
+                'min': float(q[0]),
+                'percentile_10': float(q[1]),
+                'percentile_25': float(q[2]),
+                'median': float(q[3]),
+                'percentile_75': float(q[4]),
+                'percentile_90': float(q[5]),
+                'max': float(q[6]),
+                'current': float(rolling_vols[-1])
+            })
         
         return {
             'cone': cone_data,
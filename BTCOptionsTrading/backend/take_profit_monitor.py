@@ -16,11 +16,13 @@ import aiohttp
 import json
 import logging
 import os
-import re
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+from market_snapshot import MarketSnapshot
+from trade_store import TradeStore, select_fields
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).parent
@@ -43,101 +45,40 @@ TESTNET = True
 
 
 def parse_active_positions() -> list:
-    """从 trades.log 解析活跃持仓（未到期的）"""
-    if not TRADE_LOG.exists():
-        return []
-
-    from datetime import timedelta
-    EXCLUDED = ('27MAR26', '20MAR26')
-    positions = []
-
+    """读取未到期的活跃持仓（交易存储按到期时间索引查询）"""
     try:
-        content = TRADE_LOG.read_text(encoding='utf-8')
-        for entry in content.split('=' * 80):
-            entry = entry.strip()
-            if not entry or '交易成功: True' not in entry:
-                continue
-
-            pos = {}
-            current_side = None
-            for line in entry.split('\n'):
-                line = line.strip()
-                if ':' not in line:
-                    continue
-                k, v = line.split(':', 1)
-                k, v = k.strip(), v.strip()
-                if k == '交易时间':
-                    pos['trade_time'] = v
-                elif k == '现货价格':
-                    try:
-                        pos['entry_spot'] = float(v.replace('$', '').replace(',', ''))
-                    except Exception:
-                        pass
-                elif k == '看涨期权':
-                    pos['call_instrument'] = v
-                    current_side = 'call'
-                elif k == '看跌期权':
-                    pos['put_instrument'] = v
-                    current_side = 'put'
-                elif k == '入场价(BTC)':
-                    if current_side == 'call':
-                        pos['call_entry'] = float(v)
-                    elif current_side == 'put':
-                        pos['put_entry'] = float(v)
-                elif k == '权利金' and current_side:
-                    btc_val = float(v.replace(' BTC', ''))
-                    if current_side == 'call' and 'call_entry' not in pos:
-                        pos['call_entry'] = btc_val
-                    elif current_side == 'put' and 'put_entry' not in pos:
-                        pos['put_entry'] = btc_val
-                elif k == '下单数量':
-                    try:
-                        pos['quantity'] = float(v.replace(' BTC', ''))
-                    except Exception:
-                        pos['quantity'] = 0.1
-
-            if 'call_instrument' not in pos or 'put_instrument' not in pos:
-                continue
-            if any(ex in pos.get('call_instrument', '') for ex in EXCLUDED):
-                continue
-
-            # 检查是否已到期
-            call_inst = pos['call_instrument']
-            m = re.search(r'BTC-(\d{1,2})([A-Z]{3})(\d{2})-', call_inst)
-            if m:
-                try:
-                    expiry = datetime.strptime(
-                        f"{m.group(1)}{m.group(2)}20{m.group(3)} 08:00", "%d%b%Y %H:%M"
-                    ).replace(tzinfo=timezone.utc)
-                    if datetime.now(timezone.utc) >= expiry:
-                        continue  # 已到期，跳过
-                except Exception:
-                    pass
-
-            positions.append(pos)
-
+        trades = TradeStore(log_path=TRADE_LOG).open_positions()
     except Exception as e:
-        logger.error(f"解析持仓失败: {e}")
+        logger.error(f"读取持仓失败: {e}")
+        return []
 
-    return positions
+    return [
+        select_fields(t, {
+            'trade_time': 'trade_time',
+            'entry_spot': 'spot_price',
+            'call_instrument': 'call_instrument',
+            'put_instrument': 'put_instrument',
+            'call_entry': 'call_entry_btc',
+            'put_entry': 'put_entry_btc',
+            'quantity': 'quantity',
+        })
+        for t in trades
+        if t['call_instrument'] and t['put_instrument']
+    ]
 
 
 async def get_spot_price(session: aiohttp.ClientSession) -> float:
     try:
-        async with session.get(f"{MAINNET_URL}/public/get_index_price",
-                               params={"index_name": "btc_usd"}) as r:
-            d = await r.json()
-            return d['result']['index_price']
+        # 止盈止损不使用旧数据：请求失败时返回 0，本轮跳过
+        return await MarketSnapshot(session).get_index_price(max_stale=0)
     except Exception:
         return 0.0
 
 
 async def get_mark_price(session: aiohttp.ClientSession, instrument: str) -> float:
     try:
-        async with session.get(f"{MAINNET_URL}/public/ticker",
-                               params={"instrument_name": instrument}) as r:
-            d = await r.json()
-            return d.get('result', {}).get('mark_price', 0.0)
+        ticker = await MarketSnapshot(session).get_ticker(instrument, max_stale=0)
+        return ticker.get('mark_price', 0.0)
     except Exception:
         return 0.0
 
@@ -276,6 +276,92 @@ class TestAPIIntegration:
         # 4. 验证策略已删除
         get_deleted_response = client.get(f"/api/strategies/{strategy_id}")
         assert get_deleted_response.status_code == 404
+    
+    def test_stress_cube(self, client):
+        """测试策略压力测试立方体"""
+        expiry = (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%dT%H:%M:%S")
+        legs = [
+            {
+                "option_contract": {
+                    "instrument_name": f"BTC-40000-{suffix}",
+                    "underlying": "BTC",
+                    "option_type": option_type,
+                    "strike_price": 40000.0,
+                    "expiration_date": expiry
+                },
+                "action": "sell",
+                "quantity": 1
+            }
+            for option_type, suffix in (("call", "C"), ("put", "P"))
+        ]
+        request = {
+            "legs": legs,
+            "spot_price": 40000.0,
+            "volatility": 0.6,
+            "spot_shocks": [round(-0.5 + 0.02 * i, 2) for i in range(50)],
+            "vol_shocks": [round(-0.5 + 0.1 * i, 1) for i in range(20)],
+            "days_forward": list(range(10))
+        }
+        
+        response = client.post("/api/strategies/stress-cube", json=request)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["pnl"]) == 50
+        assert len(data["pnl"][0]) == 20
+        assert len(data["pnl"][0][0]) == 10
+        assert data["worst_case"]["pnl"] == min(min(min(row) for row in plane) for plane in data["pnl"])
+        assert abs(data["worst_case"]["spot_shock"]) >= 0.4
+        assert len(data["worst_by_day"]) == 10
+        assert data["historical"][0]["name"] == "covid_crash_2020_03"
+        
+        # 网格过大时直接拒绝，不分配立方体
+        request["spot_shocks"] = [0.0] * 1000
+        request["vol_shocks"] = [0.0] * 1000
+        response = client.post("/api/strategies/stress-cube", json=request)
+        assert response.status_code == 422
+    
+    def test_batch_risk_ranking(self, client):
+        """测试批量候选策略打分与排序"""
+        expiry = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S")
+        
+        def leg(option_type, strike, action):
+            return {
+                "option_contract": {
+                    "instrument_name": f"BTC-{strike}-{option_type[0].upper()}",
+                    "underlying": "BTC",
+                    "option_type": option_type,
+                    "strike_price": strike,
+                    "expiration_date": expiry
+                },
+                "action": action,
+                "quantity": 1
+            }
+        
+        request = {
+            "candidates": [
+                [leg("call", 45000.0, "buy")],
+                [leg("put", 36000.0, "sell")],
+                [leg("put", 38000.0, "buy"), leg("put", 39000.0, "sell"), leg("call", 41000.0, "sell"), leg("call", 42000.0, "buy")],
+            ],
+            "spot_price": 40000.0,
+            "volatility": 0.6,
+            "sort_by": "probability_of_profit"
+        }
+        
+        response = client.post("/api/strategies/calculate-risk/batch", json=request)
+        assert response.status_code == 200
+        data = response.json()
+        results = data["results"]
+        assert len(results) == 3
+        
+        # 买入看涨收益无限，以null表示
+        assert results[0]["max_profit"] is None
+        assert results[0]["unlimited_profit"] is True
+        assert len(results[2]["breakeven_points"]) == 2
+        
+        probabilities = [results[i]["probability_of_profit"] for i in data["ranking"]]
+        assert probabilities == sorted(probabilities, reverse=True)
+        assert data["ranking"][0] == 1
 
 
 if __name__ == "__main__":
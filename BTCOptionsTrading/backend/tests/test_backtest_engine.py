@@ -9,6 +9,7 @@ from decimal import Decimal
 from src.backtest.backtest_engine import BacktestEngine
 from src.strategy.strategy_manager import StrategyManager
 from src.core.models import OptionType, OptionContract
+from src.historical.models import BacktestDataSet, HistoricalOptionData
 
 
 @pytest.mark.asyncio
@@ -277,3 +278,172 @@ class TestBacktestEngine:
         # 验证有到期交易
         expire_trades = [t for t in result.trades if t.action == "expire"]
         assert len(expire_trades) > 0
+
+    
+    async def test_legacy_realized_pnl_after_expiry(self, strategy_manager):
+        """测试逐日循环在到期日起把到期盈亏计入已实现盈亏"""
+        strategy = strategy_manager.create_single_leg_strategy(
+            option_type=OptionType.CALL,
+            action="buy",
+            strike=Decimal("48000"),
+            expiry=datetime(2024, 3, 6),
+            quantity=1
+        )
+        strategy.legs[0].option_contract.current_price = Decimal("1500")
+        strategy.legs[0].option_contract.implied_volatility = 0.6
+        
+        engine = BacktestEngine(use_historical_data=False)
+        result = await engine.run_backtest(
+            strategy=strategy,
+            start_date=datetime(2024, 3, 1),
+            end_date=datetime(2024, 3, 10),
+            initial_capital=Decimal("10000")
+        )
+        
+        # 标的50000：到期价值2000，权利金1500
+        realized = [day.realized_pnl for day in result.daily_pnl]
+        assert realized[:5] == [Decimal(0)] * 5
+        assert realized[5:] == [Decimal("500")] * 5
+
+@pytest.mark.asyncio
+class TestVectorizedBacktest:
+    """向量化回测测试类"""
+    
+    @pytest.fixture
+    def strategy_manager(self):
+        """创建策略管理器实例"""
+        return StrategyManager()
+    
+    @pytest.fixture
+    def short_straddle(self, strategy_manager):
+        """创建5天后到期的卖出跨式策略（权利金1500，波动率60%）"""
+        strategy = strategy_manager.create_straddle(
+            strike=Decimal("48000"),
+            expiry=datetime(2024, 3, 6),
+            quantity=1,
+            long=False
+        )
+        for leg in strategy.legs:
+            leg.option_contract.current_price = Decimal("1500")
+            leg.option_contract.implied_volatility = 0.6
+        return strategy
+    
+    async def test_expiry_settlement_and_realized_pnl(self, short_straddle):
+        """测试到期结算按持仓方向收付现金并累计已实现盈亏"""
+        engine = BacktestEngine(use_historical_data=False)
+        
+        result = await engine.run_backtest(
+            strategy=short_straddle,
+            start_date=datetime(2024, 3, 1),
+            end_date=datetime(2024, 3, 10),
+            initial_capital=Decimal("100000"),
+            vectorized=True
+        )
+        
+        # 标的50000：看涨赔付2000，看跌作废，净收益 3000 - 2000
+        assert result.final_capital == Decimal("101000")
+        assert len(result.daily_pnl) == 10
+        assert result.daily_pnl[-1].realized_pnl == Decimal("1000")
+        assert result.daily_pnl[-1].unrealized_pnl == 0
+        
+        expire_trades = [t for t in result.trades if t.action == "expire"]
+        assert len(expire_trades) == 2
+        assert all(t.timestamp == datetime(2024, 3, 6) for t in expire_trades)
+    
+    async def test_intraday_timesteps(self, short_straddle):
+        """测试分钟级时间步：期限按实际时间递减，期权价值随之衰减"""
+        engine = BacktestEngine(use_historical_data=False)
+        
+        result = await engine.run_backtest(
+            strategy=short_straddle,
+            start_date=datetime(2024, 3, 1),
+            end_date=datetime(2024, 3, 2),
+            initial_capital=Decimal("100000"),
+            vectorized=True,
+            timestep=timedelta(minutes=1)
+        )
+        
+        assert len(result.daily_pnl) == 24 * 60 + 1
+        assert result.daily_pnl[1].date == datetime(2024, 3, 1, 0, 1)
+        # 卖出期权持仓随时间价值衰减而盈利
+        assert result.daily_pnl[-1].portfolio_value > result.daily_pnl[1].portfolio_value
+        
+        close_trades = [t for t in result.trades if t.action == "close"]
+        assert len(close_trades) == 2
+        assert result.final_capital == result.daily_pnl[-1].portfolio_value
+    
+    async def test_intraday_uses_historical_prices(self, strategy_manager):
+        """测试日内时间步使用不晚于当前时间的最新历史价格"""
+        start = datetime(2024, 3, 1)
+        records = [
+            HistoricalOptionData(
+                instrument_name="BTC-29MAR24-50000-C",
+                timestamp=start + timedelta(hours=h),
+                open_price=Decimal("1000"),
+                high_price=Decimal("1000"),
+                low_price=Decimal("1000"),
+                close_price=Decimal(1000 + 10 * h),
+                volume=Decimal("1"),
+                strike_price=Decimal("50000"),
+                expiry_date=datetime(2024, 3, 29),
+                option_type=OptionType.CALL,
+                underlying_symbol="BTC"
+            )
+            for h in range(0, 24, 4)
+        ]
+        engine = BacktestEngine(use_historical_data=True)
+        engine.historical_dataset = BacktestDataSet(
+            start_date=start,
+            end_date=start + timedelta(days=1),
+            options_data={"BTC-29MAR24-50000-C": records}
+        )
+        strategy = strategy_manager.create_single_leg_strategy(
+            option_type=OptionType.CALL,
+            action="buy",
+            strike=Decimal("50000"),
+            expiry=datetime(2024, 3, 29),
+            quantity=2
+        )
+        strategy.legs[0].option_contract.current_price = Decimal("1000")
+        
+        result = await engine.run_backtest(
+            strategy=strategy,
+            start_date=start,
+            end_date=start + timedelta(hours=23),
+            initial_capital=Decimal("10000"),
+            vectorized=True,
+            timestep=timedelta(hours=1)
+        )
+        
+        # 9点的价格来自8点的记录（1080）
+        assert result.daily_pnl[9].unrealized_pnl == Decimal("160")
+        assert result.daily_pnl[-1].portfolio_value == Decimal("10400")
+        assert result.final_capital == Decimal("10400")
+    
+    async def test_daily_matches_legacy_for_long_option(self, strategy_manager):
+        """测试日级向量化回测与逐日循环对多头持仓的估值一致（不含额外theta衰减）"""
+        def make_strategy():
+            strategy = strategy_manager.create_single_leg_strategy(
+                option_type=OptionType.CALL,
+                action="buy",
+                strike=Decimal("50000"),
+                expiry=datetime(2024, 4, 1),
+                quantity=1
+            )
+            strategy.legs[0].option_contract.current_price = Decimal("2000")
+            strategy.legs[0].option_contract.implied_volatility = 0.5
+            return strategy
+        
+        engine = BacktestEngine(use_historical_data=False)
+        result = await engine.run_backtest(
+            strategy=make_strategy(),
+            start_date=datetime(2024, 3, 1),
+            end_date=datetime(2024, 3, 5),
+            initial_capital=Decimal("10000"),
+            vectorized=True
+        )
+        
+        expected = engine.options_engine.black_scholes_price(
+            S=50000.0, K=50000.0, T=27 / 365.0, r=0.05, sigma=0.5, option_type=OptionType.CALL
+        )
+        assert float(result.daily_pnl[-1].portfolio_value) == pytest.approx(8000 + expected, abs=1e-6)
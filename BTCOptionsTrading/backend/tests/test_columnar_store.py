@@ -0,0 +1,114 @@
+"""
+列式历史行情存储测试
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from src.backtest.backtest_engine import BacktestEngine
+from src.historical.columnar_store import ColumnarMarketData
+from src.historical.models import BacktestDataSet, HistoricalOptionData
+from src.core.models import OptionType
+
+
+def _record(instrument, strike, timestamp, close):
+    return HistoricalOptionData(
+        instrument_name=instrument,
+        timestamp=timestamp,
+        open_price=close,
+        high_price=close,
+        low_price=close,
+        close_price=close,
+        volume=Decimal("1"),
+        strike_price=Decimal(strike),
+        expiry_date=datetime(2024, 3, 29),
+        option_type=OptionType.CALL,
+        underlying_symbol="BTC"
+    )
+
+
+@pytest.fixture
+def dataset():
+    """两个合约、每天两条记录（第二个合约的记录逆序存放）"""
+    start = datetime(2024, 3, 1)
+    first = [
+        _record("BTC-29MAR24-50000-C", "50000", start + timedelta(days=d, hours=h), Decimal(str(0.05 + d / 100 + h / 1000)))
+        for d in range(5) for h in (0, 12)
+    ]
+    second = [
+        _record("BTC-29MAR24-60000-C", "60000", start + timedelta(days=d, hours=h), Decimal(str(0.01 + d / 100 + h / 1000)))
+        for d in range(3, 8) for h in (12, 0)
+    ]
+    return BacktestDataSet(
+        start_date=start,
+        end_date=start + timedelta(days=7),
+        options_data={
+            "BTC-29MAR24-50000-C": first,
+            "BTC-29MAR24-60000-C": second
+        }
+    )
+
+
+def test_close_on_matches_first_record_of_day(dataset):
+    """测试按日期查询返回当天第一条记录的收盘价"""
+    store = ColumnarMarketData.from_dataset(dataset)
+    
+    assert store.close_on("BTC-29MAR24-50000-C", datetime(2024, 3, 2, 18)) == pytest.approx(0.06)
+    # 原始顺序中第二个合约当天第一条记录是12点的
+    assert store.close_on("BTC-29MAR24-60000-C", datetime(2024, 3, 4)) == pytest.approx(0.052)
+    assert store.close_on("BTC-29MAR24-50000-C", datetime(2024, 3, 9)) is None
+    assert store.close_on("UNKNOWN", datetime(2024, 3, 2)) is None
+
+
+def test_close_asof(dataset):
+    """测试as-of查询返回不晚于指定时间的最新记录"""
+    store = ColumnarMarketData.from_dataset(dataset)
+    
+    assert store.close_asof("BTC-29MAR24-50000-C", datetime(2024, 3, 2, 13)) == pytest.approx(0.072)
+    assert store.close_asof("BTC-29MAR24-50000-C", datetime(2024, 2, 28)) is None
+
+
+def test_underlying_price_uses_first_instrument_with_data(dataset):
+    """测试标的价格估算与逐条扫描结果一致"""
+    store = ColumnarMarketData.from_dataset(dataset)
+    
+    assert store.underlying_price_on(datetime(2024, 3, 1)) == 50000.0
+    assert store.underlying_price_on(datetime(2024, 3, 7)) == 60000.0
+    assert store.underlying_price_on(datetime(2024, 3, 20)) is None
+    assert len(store.trading_days()) == 8
+
+
+def test_backtest_engine_lookups(dataset):
+    """测试回测引擎通过列式数据查询价格"""
+    engine = BacktestEngine(use_historical_data=True)
+    engine.historical_dataset = dataset
+    
+    assert engine._get_option_price_from_data("BTC-29MAR24-50000-C", datetime(2024, 3, 3)) == Decimal("0.07")
+    assert engine._get_option_price_from_data("BTC-29MAR24-50000-C", datetime(2024, 3, 8)) is None
+    assert engine._get_underlying_price_from_data(datetime(2024, 3, 6)) == 60000.0
+    assert engine._get_underlying_price_from_data(datetime(2024, 4, 1)) == 50000.0
+
+
+def test_close_path(dataset):
+    """测试批量时间点查询与逐点查询一致"""
+    store = ColumnarMarketData.from_dataset(dataset)
+    times = np.arange(
+        np.datetime64("2024-03-01T06"), np.datetime64("2024-03-10"), np.timedelta64(6, "h")
+    ).astype("datetime64[us]")
+    
+    daily = store.close_path("BTC-29MAR24-60000-C", times)
+    asof = store.close_path("BTC-29MAR24-50000-C", times, asof=True, max_staleness=timedelta(days=1))
+    
+    for i, when in enumerate(times.tolist()):
+        expected_daily = store.close_on("BTC-29MAR24-60000-C", when)
+        expected_asof = store.close_asof("BTC-29MAR24-50000-C", when)
+        if expected_asof is not None and when - datetime(2024, 3, 5, 12) > timedelta(days=1):
+            expected_asof = None
+        assert (np.isnan(daily[i]) if expected_daily is None else daily[i] == pytest.approx(expected_daily))
+        assert (np.isnan(asof[i]) if expected_asof is None else asof[i] == pytest.approx(expected_asof))
+    
+    assert np.isnan(store.close_path("UNKNOWN", times)).all()
+    assert store.underlying_prices_for(times)[0] == 50000.0
@@ -183,6 +183,65 @@ class TestDeribitConnector:
             assert contracts[0].instrument_name == "BTC-25DEC26-50000-C"
             assert contracts[0].option_type == OptionType.CALL
     
+    @pytest.mark.asyncio
+    async def test_chain_snapshot_uses_book_summary(self, connector):
+        """测试期权链快照：摘要覆盖的合约不再请求ticker，失败合约记录在errors中"""
+        names = [f"BTC-25DEC26-{40000 + i * 1000}-C" for i in range(5)]
+        mock_instruments = [
+            {
+                "instrument_name": name,
+                "base_currency": "BTC",
+                "option_type": "call",
+                "strike": 40000 + i * 1000,
+                "expiration_timestamp": 1798156800000
+            }
+            for i, name in enumerate(names)
+        ]
+        # 最后两个合约不在摘要中
+        mock_summaries = [
+            {"instrument_name": name, "mark_price": 0.05, "mark_iv": 60, "bid_price": 0.049,
+             "ask_price": None, "volume": 12, "open_interest": 3}
+            for name in names[:3]
+        ]
+        
+        in_flight = [0]
+        max_in_flight = [0]
+        ticker_calls = []
+        
+        async def mock_request(method, params=None):
+            if "get_instruments" in method:
+                return mock_instruments
+            if "get_book_summary_by_currency" in method:
+                return mock_summaries
+            ticker_calls.append(params["instrument_name"])
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            if params["instrument_name"] == names[4]:
+                raise APIConnectionError("ticker failed")
+            return {"mark_price": 0.02, "mark_iv": 70, "greeks": {"delta": 0.3}}
+        
+        with patch.object(connector, '_request', side_effect=mock_request):
+            snapshot = await connector.get_chain_snapshot("BTC", include_greeks=False)
+            
+            assert sorted(ticker_calls) == sorted(names[3:])
+            assert [c.instrument_name for c in snapshot.contracts] == names[:4]
+            assert snapshot.contracts[0].implied_volatility == 0.6
+            assert snapshot.contracts[0].bid_price == Decimal("0.049")
+            assert snapshot.contracts[0].volume == 12
+            assert snapshot.contracts[3].delta == 0.3
+            assert list(snapshot.errors) == [names[4]]
+            assert not snapshot.is_complete
+            
+            # 需要Greeks时所有合约都请求ticker，并发数受限
+            ticker_calls.clear()
+            snapshot = await connector.get_chain_snapshot("BTC", include_greeks=True, max_concurrency=2)
+            assert len(ticker_calls) == 5
+            assert max_in_flight[0] <= 2
+            # ticker失败但摘要中有数据的合约仍然返回
+            assert len(snapshot.contracts) == 4
+    
     @pytest.mark.asyncio
     async def test_get_real_time_data_with_mock(self, connector):
         """测试获取实时数据（使用模拟数据）"""
@@ -0,0 +1,148 @@
+"""
+Deribit WebSocket行情客户端测试
+"""
+
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from src.connectors.deribit_stream import (
+    DeribitStreamClient, OrderBook, book_channel, index_channel, ticker_channel
+)
+
+INSTRUMENT = "BTC-27DEC26-100000-C"
+BOOK = book_channel(INSTRUMENT)
+
+
+def notification(channel, data):
+    return {"jsonrpc": "2.0", "method": "subscription", "params": {"channel": channel, "data": data}}
+
+
+def snapshot(change_id, bid=0.05, ask=0.06):
+    return notification(BOOK, {
+        "type": "snapshot", "instrument_name": INSTRUMENT, "change_id": change_id, "timestamp": 1,
+        "bids": [["new", bid, 10.0], ["new", round(bid - 0.005, 4), 5.0]],
+        "asks": [["new", ask, 8.0]]
+    })
+
+
+def change(prev_change_id, change_id, bids=(), asks=()):
+    return notification(BOOK, {
+        "type": "change", "instrument_name": INSTRUMENT, "timestamp": 2,
+        "prev_change_id": prev_change_id, "change_id": change_id,
+        "bids": list(bids), "asks": list(asks)
+    })
+
+
+class TestOrderBook:
+    """测试订单簿增量更新"""
+    
+    def test_snapshot_and_changes(self):
+        """快照后按顺序应用增量"""
+        book = OrderBook(INSTRUMENT)
+        assert book.apply(snapshot(1)["params"]["data"])
+        assert book.best_bid() == (0.05, 10.0)
+        
+        assert book.apply(change(1, 2, bids=[["delete", 0.05, 0]], asks=[["new", 0.055, 1.0]])["params"]["data"])
+        assert book.best_bid() == (0.045, 5.0)
+        assert book.best_ask() == (0.055, 1.0)
+        assert book.mid_price() == pytest.approx(0.05)
+        assert book.levels(depth=1)["asks"] == [[0.055, 1.0]]
+    
+    def test_gap_marks_book_out_of_sync(self):
+        """prev_change_id不连续时订单簿失去同步，直到新快照"""
+        book = OrderBook(INSTRUMENT)
+        book.apply(snapshot(1)["params"]["data"])
+        
+        assert not book.apply(change(5, 6)["params"]["data"])
+        assert not book.in_sync
+        assert not book.apply(change(6, 7)["params"]["data"])
+        
+        assert book.apply(snapshot(10)["params"]["data"])
+        assert book.in_sync
+
+
+class TestDeribitStreamClient:
+    """测试消息处理、回放和重新同步"""
+    
+    @pytest.mark.asyncio
+    async def test_replay_recorded_messages(self, tmp_path):
+        """回放录制文件：更新存储并推送给迭代器"""
+        messages = [
+            notification(index_channel(), {"index_name": "btc_usd", "price": 95000.0, "timestamp": 1}),
+            notification(ticker_channel(INSTRUMENT), {"instrument_name": INSTRUMENT, "mark_price": 0.052, "mark_iv": 55.0}),
+            snapshot(1),
+            change(1, 2, bids=[["change", 0.05, 12.0]]),
+            change(3, 4),  # 缺口
+            snapshot(7, bid=0.051),
+        ]
+        path = tmp_path / "stream.jsonl"
+        path.write_text("\n".join(json.dumps({"received_at": i, "message": m}) for i, m in enumerate(messages)))
+        
+        client = DeribitStreamClient()
+        books = client.updates("book.")
+        everything = client.updates()
+        
+        received = []
+        
+        async def consume():
+            async for update in everything:
+                received.append(update.kind)
+        
+        consumer = asyncio.create_task(consume())
+        await client.replay(str(path))
+        await asyncio.wait_for(consumer, timeout=1)
+        
+        assert received == ["index", "ticker", "book", "book", "book"]
+        assert [u.data["change_id"] async for u in books] == [1, 2, 7]
+        
+        store = client.store
+        assert store.get_index_price("btc_usd") == 95000.0
+        assert store.get_mark_price(INSTRUMENT) == 0.052
+        assert store.get_book(INSTRUMENT).best_bid() == (0.051, 10.0)
+        assert client.stats["gaps"] == 1
+        assert client.stats["resyncs"] == 1
+        assert INSTRUMENT in store.snapshot()["books"]
+    
+    @pytest.mark.asyncio
+    async def test_live_gap_triggers_resubscribe(self):
+        """实时连接中检测到缺口后重新订阅，并用新快照恢复同步"""
+        requests = []
+        
+        async def handler(ws):
+            async for raw in ws:
+                request = json.loads(raw)
+                requests.append((request["method"], request["params"].get("channels")))
+                if request["method"] == "public/subscribe" and len(requests) == 2:
+                    await ws.send(json.dumps(snapshot(1)))
+                    await ws.send(json.dumps(change(2, 3)))
+                elif request["method"] == "public/subscribe":
+                    await ws.send(json.dumps(snapshot(9, bid=0.049)))
+        
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = DeribitStreamClient(url=f"ws://127.0.0.1:{port}")
+            await client.subscribe([BOOK])
+            updates = client.updates("book.")
+            task = asyncio.create_task(client.run())
+            
+            change_ids = []
+            async for update in updates:
+                change_ids.append(update.data["change_id"])
+                if update.data["change_id"] == 9:
+                    break
+            
+            await client.stop()
+            await asyncio.wait_for(task, timeout=2)
+        
+        assert change_ids == [1, 9]
+        assert requests[0][0] == "public/set_heartbeat"
+        assert requests[1:] == [
+            ("public/subscribe", [BOOK]),
+            ("public/unsubscribe", [BOOK]),
+            ("public/subscribe", [BOOK]),
+        ]
+        assert client.store.get_book(INSTRUMENT).best_bid() == (0.049, 10.0)
+        assert client.stats["resyncs"] == 1
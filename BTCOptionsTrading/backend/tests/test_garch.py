@@ -0,0 +1,92 @@
+"""
+GARCH估计与滚动波动率测试
+"""
+
+import numpy as np
+import pytest
+
+from src.volatility.garch import fit_garch, garch_variance
+from src.volatility.volatility_analyzer import VolatilityAnalyzer
+
+
+def simulate(n, omega, alpha, beta, gamma=0.0, seed=0):
+    """模拟GJR-GARCH(1,1)收益率"""
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(n)
+    r = np.empty(n)
+    var = omega / (1 - alpha - beta - 0.5 * gamma)
+    for t in range(n):
+        r[t] = np.sqrt(var) * z[t]
+        var = omega + (alpha + gamma * (r[t] < 0)) * r[t] ** 2 + beta * var
+    return r
+
+
+def test_variance_recursion_matches_loop():
+    """滤波器递推与逐步循环一致"""
+    e = np.random.default_rng(1).standard_normal(500) * 0.01
+    variance = garch_variance(e, 2e-6, 0.08, 0.9, 0.05, initial_variance=1e-4)
+    
+    expected = np.empty_like(e)
+    expected[0] = 1e-4
+    for t in range(1, len(e)):
+        expected[t] = 2e-6 + (0.08 + 0.05 * (e[t - 1] < 0)) * e[t - 1] ** 2 + 0.9 * expected[t - 1]
+    
+    np.testing.assert_allclose(variance, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("model,gamma", [("garch", 0.0), ("gjr", 0.1)])
+def test_mle_recovers_parameters(model, gamma):
+    """模拟数据上估计出接近真实值的参数"""
+    returns = simulate(20000, omega=2e-6, alpha=0.06, beta=0.88, gamma=gamma, seed=4)
+    fit = fit_garch(returns, model=model)
+    
+    assert fit.converged
+    assert fit.alpha == pytest.approx(0.06, abs=0.02)
+    assert fit.beta == pytest.approx(0.88, abs=0.03)
+    assert fit.gamma == pytest.approx(gamma, abs=0.04)
+    assert fit.persistence < 1
+    
+    forecast = fit.forecast_variance(2000)
+    assert forecast[-1] == pytest.approx(fit.long_run_variance, rel=1e-3)
+
+
+def test_short_series_uses_defaults():
+    """样本太少时使用默认参数"""
+    fit = fit_garch([0.01, -0.02, 0.015])
+    assert not fit.converged
+    assert len(fit.conditional_variance) == 3
+
+
+class TestRollingVolatility:
+    """测试累积和滚动波动率"""
+    
+    @pytest.fixture
+    def prices(self):
+        rng = np.random.default_rng(42)
+        return 45000 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    
+    def test_series_matches_direct_computation(self, prices):
+        """滚动序列与逐窗口计算一致"""
+        analyzer = VolatilityAnalyzer()
+        series = analyzer.calculate_rolling_volatility_series(prices, window=30)
+        
+        assert len(series) == len(prices) - 29
+        for i in (0, 100, len(series) - 1):
+            expected = analyzer.calculate_historical_volatility(list(prices[i:i + 30]), window=30)
+            assert series[i] == pytest.approx(expected, rel=1e-9)
+        
+        current = analyzer.calculate_rolling_volatility(list(prices), windows=[30, 500])
+        assert current[30] == pytest.approx(series[-1], rel=1e-9)
+        assert current[500] is None
+    
+    def test_cone_percentiles(self, prices):
+        """波动率锥的分位数来自所有滚动窗口"""
+        analyzer = VolatilityAnalyzer()
+        cone = analyzer.calculate_volatility_cone(list(prices), windows=[10, 60, 300])
+        
+        assert [c['window'] for c in cone['cone']] == [10, 60]
+        item = cone['cone'][1]
+        series = analyzer.calculate_rolling_volatility_series(prices, window=60)
+        assert item['median'] == pytest.approx(np.median(series))
+        assert item['current'] == pytest.approx(series[-1])
+        assert item['min'] <= item['percentile_25'] <= item['percentile_75'] <= item['max']
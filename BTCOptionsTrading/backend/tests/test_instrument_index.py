@@ -0,0 +1,122 @@
+"""
+测试期权合约索引
+"""
+
+import random
+
+import pytest
+
+from instrument_index import DAY_MS, InstrumentIndex, load_instrument_index
+from market_snapshot import MarketSnapshot
+
+NOW_MS = 1_800_000_000_000
+
+
+def make_instruments(expiry_days=(0.5, 1.5, 2.5, 7.5, 30.5), strikes=range(80000, 120001, 1000)):
+    instruments = []
+    for days in expiry_days:
+        expiry = NOW_MS + int(days * DAY_MS)
+        for strike in strikes:
+            for option_type in ('call', 'put'):
+                instruments.append({
+                    "instrument_name": f"BTC-{days}-{strike}-{option_type[0].upper()}",
+                    "expiration_timestamp": expiry,
+                    "strike": strike,
+                    "option_type": option_type,
+                })
+    return instruments
+
+
+def linear_atm(instruments, spot, target_days):
+    """原来的线性扫描实现（作为对照）"""
+    target = NOW_MS + target_days * DAY_MS
+    expiries = sorted({i['expiration_timestamp'] for i in instruments if i['expiration_timestamp'] > NOW_MS})
+    chosen = min(expiries, key=lambda e: abs(e - target))
+    calls = sorted(((i['instrument_name'], i['strike']) for i in instruments
+                    if i['expiration_timestamp'] == chosen and i['option_type'] == 'call'),
+                   key=lambda x: (abs(x[1] - spot), x[1]))
+    puts = [(i['instrument_name'], i['strike']) for i in instruments
+            if i['expiration_timestamp'] == chosen and i['option_type'] == 'put']
+    same = [p for p in puts if p[1] == calls[0][1]]
+    return calls[0][0], (same or sorted(puts, key=lambda x: abs(x[1] - spot)))[0][0]
+
+
+class TestInstrumentIndex:
+    """测试索引查询与增量更新"""
+    
+    def test_matches_linear_scan(self):
+        """二分查找结果与线性扫描一致"""
+        instruments = make_instruments()
+        index = InstrumentIndex()
+        index.update(instruments)
+        
+        rng = random.Random(7)
+        for _ in range(200):
+            spot = rng.uniform(75000, 125000)
+            days = rng.uniform(0, 40)
+            expiry = index.nearest_expiry(days, now_ms=NOW_MS)
+            pair = index.atm_pair(expiry, spot)
+            assert (pair.call, pair.put) == linear_atm(instruments, spot, days)
+            assert pair.same_strike
+    
+    def test_put_falls_back_to_nearest_strike(self):
+        """没有同执行价 Put 时取最接近现货的 Put"""
+        instruments = [i for i in make_instruments(expiry_days=(3.5,)) if not (i['strike'] == 100000 and i['option_type'] == 'put')]
+        index = InstrumentIndex()
+        index.update(instruments)
+        
+        pair = index.atm_pair(index.nearest_expiry(3, now_ms=NOW_MS), 100200)
+        assert pair.call_strike == 100000
+        assert pair.put_strike == 101000
+        assert not pair.same_strike
+    
+    def test_incremental_update_and_expiry(self):
+        """新增/下架合约增量更新，已到期的到期日被跳过"""
+        instruments = make_instruments(expiry_days=(0.5, 3.5), strikes=[90000, 100000])
+        index = InstrumentIndex()
+        assert index.update(instruments) == (8, 0)
+        assert index.update(instruments) == (0, 0)
+        
+        # 下架一个执行价，新增一个到期日
+        changed = [i for i in instruments if i['strike'] != 90000] + make_instruments(expiry_days=(10.5,), strikes=[100000])
+        assert index.update(changed) == (2, 4)
+        assert "BTC-0.5-90000-C" not in index
+        assert len(index.expiries) == 3
+        
+        # 第一个到期日过期后查询跳过它
+        later = NOW_MS + DAY_MS
+        assert index.nearest_expiry(0, now_ms=later) == NOW_MS + int(3.5 * DAY_MS)
+        assert len(index) == 4
+    
+    def test_expiries_between_and_best_pair(self):
+        """到期窗口内选执行价最接近的组合，两条腿同一到期日"""
+        instruments = make_instruments(expiry_days=(1.5, 2.5), strikes=[95000, 100000, 105000])
+        instruments += make_instruments(expiry_days=(4.5,), strikes=[99000])
+        index = InstrumentIndex()
+        index.update(instruments)
+        
+        expiries = index.expiries_between(1, 5, now_ms=NOW_MS)
+        assert len(expiries) == 3
+        pair = index.best_atm_pair(expiries, 99200)
+        assert (pair.call, pair.put) == ("BTC-4.5-99000-C", "BTC-4.5-99000-P")
+        
+        assert index.best_atm_pair(index.expiries_between(40, 50, now_ms=NOW_MS), 99200) is None
+
+
+@pytest.mark.asyncio
+async def test_load_instrument_index_reads_through_snapshot(tmp_path):
+    """索引通过快照缓存读取合约列表，同一进程内复用"""
+    calls = []
+    
+    class FakeSnapshot(MarketSnapshot):
+        async def _request(self, method, params):
+            calls.append(method)
+            return make_instruments(expiry_days=(3.5,), strikes=[100000])
+    
+    snapshot = FakeSnapshot(base_url="http://index.test", db_path=tmp_path / "snapshot.db")
+    first = await load_instrument_index(snapshot)
+    second = await load_instrument_index(snapshot)
+    
+    assert first is second
+    assert len(first) == 2
+    assert calls == ["public/get_instruments"]
@@ -0,0 +1,119 @@
+"""
+测试共享行情快照缓存
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from market_snapshot import MarketSnapshot, MarketSnapshotError
+
+
+class FakeSnapshot(MarketSnapshot):
+    """用计数器替代网络请求"""
+    
+    def __init__(self, db_path, results=None, delay=0.0):
+        super().__init__(db_path=db_path)
+        self.calls = []
+        self.results = results or {}
+        self.delay = delay
+        self.fail = False
+    
+    async def _request(self, method, params):
+        self.calls.append((method, params))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("network down")
+        return self.results.get(method, {})
+
+
+@pytest.mark.asyncio
+async def test_ttl_hit_and_miss(tmp_path):
+    """TTL 内读缓存，过期后重新请求；不同实例共享同一数据库"""
+    db = tmp_path / "snapshot.db"
+    first = FakeSnapshot(db, {"public/ticker": {"mark_price": 0.05}})
+    second = FakeSnapshot(db, {"public/ticker": {"mark_price": 0.06}})
+    
+    assert (await first.get_ticker("BTC-X"))["mark_price"] == 0.05
+    assert (await second.get_ticker("BTC-X"))["mark_price"] == 0.05
+    assert len(first.calls) == 1 and second.calls == []
+    
+    # 其他合约使用不同的 key
+    await second.get_ticker("BTC-Y")
+    assert len(second.calls) == 1
+    
+    assert (await second.get_ticker("BTC-X", ttl=0))["mark_price"] == 0.06
+    assert len(second.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_request(tmp_path):
+    """并发读取同一个过期 key 时只发一次请求"""
+    db = tmp_path / "snapshot.db"
+    readers = [FakeSnapshot(db, {"public/get_index_price": {"index_price": 95000.0}}, delay=0.1) for _ in range(5)]
+    
+    prices = await asyncio.gather(*(r.get_index_price() for r in readers))
+    
+    assert prices == [95000.0] * 5
+    assert sum(len(r.calls) for r in readers) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_fallback_on_error(tmp_path):
+    """请求失败时退回到 max_stale 内的旧数据，否则抛出异常"""
+    snapshot = FakeSnapshot(tmp_path / "snapshot.db", {"public/get_index_price": {"index_price": 94000.0}})
+    await snapshot.get_index_price()
+    snapshot.fail = True
+    
+    price = await snapshot.fetch("public/get_index_price", {"index_name": "btc_usd"}, ttl=0, max_stale=60)
+    assert price["index_price"] == 94000.0
+    
+    with pytest.raises(MarketSnapshotError):
+        await snapshot.fetch("public/get_index_price", {"index_name": "btc_usd"}, ttl=0, max_stale=0)
+    
+    with pytest.raises(MarketSnapshotError):
+        await snapshot.get_ticker("BTC-NEW")
+
+
+@pytest.mark.asyncio
+async def test_closed_chart_window_cached_long(tmp_path):
+    """已结束时间窗口的K线长期缓存"""
+    snapshot = FakeSnapshot(tmp_path / "snapshot.db", {"public/get_tradingview_chart_data": {"status": "ok", "close": [1.0]}})
+    end_ms = int((time.time() - 7200) * 1000)
+    
+    await snapshot.get_chart_data("BTC-PERPETUAL", end_ms - 3600000, end_ms)
+    key = snapshot._key("public/get_tradingview_chart_data", snapshot.calls[0][1])
+    assert snapshot._read(key, max_age=3600) is not None
+    
+    # 一天后仍然命中
+    conn = snapshot._connect()
+    conn.execute("UPDATE snapshots SET fetched_at = fetched_at - 86400")
+    conn.commit()
+    conn.close()
+    await snapshot.get_chart_data("BTC-PERPETUAL", end_ms - 3600000, end_ms)
+    assert len(snapshot.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_old_entries_and_locks(tmp_path):
+    """purge 同时删除过期缓存和对应的锁文件"""
+    snapshot = FakeSnapshot(tmp_path / "snapshot.db", {"public/ticker": {"mark_price": 0.05}})
+    await snapshot.get_ticker("BTC-OLD")
+    await snapshot.get_ticker("BTC-NEW")
+    assert len(list(snapshot.lock_dir.glob("*.lock"))) == 2
+    
+    old_key = snapshot._key("public/ticker", {"instrument_name": "BTC-OLD"})
+    conn = snapshot._connect()
+    conn.execute("UPDATE snapshots SET fetched_at = fetched_at - 7200 WHERE key = ?", (old_key,))
+    conn.commit()
+    conn.close()
+    for lock_path in snapshot.lock_dir.glob("*.lock"):
+        if lock_path.name.startswith(hashlib.sha1(old_key.encode()).hexdigest()):
+            os.utime(lock_path, (time.time() - 7200,) * 2)
+    
+    assert snapshot.purge(older_than=3600) == 1
+    assert len(list(snapshot.lock_dir.glob("*.lock"))) == 1
+    assert snapshot._read(old_key, max_age=86400) is None
@@ -0,0 +1,108 @@
+"""
+蒙特卡洛定价引擎测试
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+import numpy as np
+
+from src.pricing.monte_carlo import (
+    MonteCarloEngine, PathPayoff, EuropeanPayoff, AsianPayoff, BarrierPayoff
+)
+from src.pricing.options_engine import OptionsEngine
+from src.core.models import OptionType
+from src.core.exceptions import OptionsCalculationError
+
+
+@pytest.fixture
+def mc_engine():
+    """创建蒙特卡洛引擎实例（小分块以覆盖多分块路径）"""
+    return MonteCarloEngine(chunk_size=20_000)
+
+
+def test_european_within_confidence_interval(mc_engine):
+    """测试欧式期权价格落在置信区间内"""
+    bs_price = OptionsEngine().black_scholes_price(100, 100, 1.0, 0.05, 0.2, OptionType.CALL)
+    
+    result = mc_engine.price(
+        100, 1.0, 0.05, 0.2, EuropeanPayoff(100, OptionType.CALL), n_paths=100_000, seed=7
+    )
+    low, high = result.confidence_interval(z=4.0)
+    
+    assert low[0] <= bs_price <= high[0]
+
+
+def test_variance_reduction_lowers_std_error():
+    """测试对偶变量和控制变量降低标准误差"""
+    payoff = AsianPayoff(100, OptionType.CALL)
+    plain = MonteCarloEngine(antithetic=False, control_variate=False).price(
+        100, 1.0, 0.05, 0.2, payoff, n_paths=40_000, n_steps=12, seed=3
+    )
+    reduced = MonteCarloEngine().price(
+        100, 1.0, 0.05, 0.2, payoff, n_paths=40_000, n_steps=12, seed=3
+    )
+    
+    assert reduced.std_error[0] < plain.std_error[0] / 2
+    assert abs(reduced.price[0] - plain.price[0]) < 4 * plain.std_error[0]
+
+
+def test_barrier_in_out_parity(mc_engine):
+    """测试敲入+敲出=普通欧式期权"""
+    payoffs = [
+        BarrierPayoff(100, OptionType.CALL, barrier=130, knock="out"),
+        BarrierPayoff(100, OptionType.CALL, barrier=130, knock="in"),
+        EuropeanPayoff(100, OptionType.CALL),
+    ]
+    result = mc_engine.price(100, 1.0, 0.05, 0.2, payoffs, n_paths=50_000, n_steps=50, seed=11)
+    
+    assert result.price[0] < result.price[2]
+    assert result.price[0] + result.price[1] == pytest.approx(result.price[2], rel=1e-2)
+
+
+def test_reproducible_across_workers(mc_engine):
+    """测试相同种子在不同进程数下结果一致"""
+    payoff = BarrierPayoff(100, OptionType.PUT, barrier=80, direction="down")
+    
+    single = mc_engine.price(100, 0.5, 0.05, 0.3, payoff, n_paths=60_000, n_steps=20, seed=5)
+    sharded = mc_engine.price(100, 0.5, 0.05, 0.3, payoff, n_paths=60_000, n_steps=20, seed=5, workers=2)
+    
+    np.testing.assert_array_equal(single.price, sharded.price)
+
+
+def test_does_not_touch_global_rng():
+    """测试定价不修改全局随机状态"""
+    np.random.seed(123)
+    expected = np.random.rand()
+    
+    np.random.seed(123)
+    OptionsEngine().monte_carlo_price(100, 100, 1.0, 0.05, 0.2, 1000, OptionType.CALL)
+    
+    assert np.random.rand() == expected
+
+
+def test_price_async(mc_engine):
+    """测试异步定价"""
+    result = asyncio.run(mc_engine.price_async(
+        100, 1.0, 0.05, 0.2, EuropeanPayoff(100, OptionType.PUT), n_paths=10_000, seed=1
+    ))
+    
+    assert result.price[0] > 0
+
+
+def test_invalid_parameters(mc_engine):
+    """测试无效参数"""
+    with pytest.raises(OptionsCalculationError):
+        mc_engine.price(100, 1.0, 0.05, 0.2, EuropeanPayoff(100, OptionType.CALL), n_paths=0)
+
+
+def test_payoff_must_implement_call():
+    """未实现 __call__ 的收益函数在创建时即报错"""
+    @dataclass
+    class NoPayoff(PathPayoff):
+        strike: float
+        option_type: OptionType
+    
+    with pytest.raises(TypeError):
+        NoPayoff(100, OptionType.CALL)
@@ -345,3 +345,133 @@ class TestImpliedVolatility:
         
         # 看涨和看跌的隐含波动率应该相同
         assert abs(call_iv - put_iv) < 0.01
+
+
+class TestBatchPricing:
+    """测试批量定价"""
+    
+    @pytest.fixture
+    def engine(self):
+        """创建定价引擎实例"""
+        return OptionsEngine()
+    
+    def test_batch_matches_scalar(self, engine):
+        """测试批量结果与逐个计算一致"""
+        S = 50000.0
+        strikes = np.array([40000.0, 45000.0, 50000.0, 55000.0, 60000.0, 50000.0])
+        T = np.array([0.1, 0.25, 0.5, 1.0, 0.05, 0.0])
+        sigma = np.array([0.6, 0.55, 0.5, 0.65, 0.8, 0.5])
+        types = [OptionType.CALL, OptionType.PUT, OptionType.CALL,
+                 OptionType.PUT, OptionType.CALL, OptionType.PUT]
+        
+        result = engine.price_batch(S, strikes, T, 0.05, sigma, types)
+        
+        assert len(result) == len(strikes)
+        for i in range(len(strikes)):
+            price = engine.black_scholes_price(S, strikes[i], T[i], 0.05, sigma[i], types[i])
+            greeks = engine.calculate_greeks(S, strikes[i], T[i], 0.05, sigma[i], types[i])
+            assert result.price[i] == pytest.approx(price, rel=1e-12, abs=1e-12)
+            batch_greeks = result.greeks_at(i)
+            assert batch_greeks.delta == pytest.approx(greeks.delta, rel=1e-12, abs=1e-12)
+            assert batch_greeks.gamma == pytest.approx(greeks.gamma, rel=1e-12, abs=1e-12)
+            assert batch_greeks.theta == pytest.approx(greeks.theta, rel=1e-12, abs=1e-12)
+            assert batch_greeks.vega == pytest.approx(greeks.vega, rel=1e-12, abs=1e-12)
+            assert batch_greeks.rho == pytest.approx(greeks.rho, rel=1e-12, abs=1e-12)
+    
+    def test_batch_option_type_formats(self, engine):
+        """测试期权类型支持字符串和布尔掩码"""
+        by_enum = engine.price_batch(100.0, [90.0, 110.0], 1.0, 0.05, 0.2, [OptionType.CALL, OptionType.PUT])
+        by_str = engine.price_batch(100.0, [90.0, 110.0], 1.0, 0.05, 0.2, ["call", "put"])
+        by_mask = engine.price_batch(100.0, [90.0, 110.0], 1.0, 0.05, 0.2, np.array([True, False]))
+        
+        np.testing.assert_allclose(by_enum.price, by_str.price)
+        np.testing.assert_allclose(by_enum.price, by_mask.price)
+    
+    def test_batch_invalid_parameters(self, engine):
+        """测试批量定价的参数验证"""
+        with pytest.raises(OptionsCalculationError, match="index 1"):
+            engine.price_batch(100.0, [100.0, -5.0], 1.0, 0.05, 0.2, OptionType.CALL)
+
+
+class TestBinomialBatch:
+    """测试批量二叉树定价"""
+    
+    @pytest.fixture
+    def engine(self):
+        """创建定价引擎实例"""
+        return OptionsEngine()
+    
+    def test_batch_matches_scalar(self, engine):
+        """测试批量结果与单个二叉树定价一致"""
+        strikes = np.array([90.0, 100.0, 110.0, 120.0])
+        T = np.array([0.25, 0.5, 1.0, 2.0])
+        types = [OptionType.PUT, OptionType.CALL, OptionType.PUT, OptionType.CALL]
+        
+        result = engine.binomial_batch(100.0, strikes, T, 0.05, 0.3, types, steps=80)
+        
+        for i in range(len(strikes)):
+            price = engine.binomial_tree_price(100.0, strikes[i], T[i], 0.05, 0.3, 80, types[i])
+            assert result.price[i] == pytest.approx(price, rel=1e-10)
+    
+    def test_european_tree_greeks_close_to_bs(self, engine):
+        """测试欧式树的希腊字母接近Black-Scholes"""
+        tree = engine.binomial_batch(100.0, 100.0, 1.0, 0.05, 0.2, OptionType.CALL, steps=400, american=False)
+        bs = engine.price_batch(100.0, 100.0, 1.0, 0.05, 0.2, OptionType.CALL)
+        
+        assert tree.price[0] == pytest.approx(bs.price[0], rel=1e-2)
+        assert tree.delta[0] == pytest.approx(bs.delta[0], rel=1e-2)
+        assert tree.gamma[0] == pytest.approx(bs.gamma[0], rel=2e-2)
+        assert tree.theta[0] == pytest.approx(bs.theta[0], rel=2e-2)
+    
+    def test_american_put_premium(self, engine):
+        """测试美式看跌期权存在提前行权溢价"""
+        american = engine.binomial_batch(100.0, 120.0, 1.0, 0.05, 0.2, OptionType.PUT, steps=200)
+        european = engine.binomial_batch(100.0, 120.0, 1.0, 0.05, 0.2, OptionType.PUT, steps=200, american=False)
+        
+        assert american.price[0] > european.price[0]
+        assert american.price[0] >= 20.0
+
+
+class TestImpliedVolatilityBatch:
+    """测试批量隐含波动率求解"""
+    
+    @pytest.fixture
+    def engine(self):
+        """创建定价引擎实例"""
+        return OptionsEngine()
+    
+    def test_batch_recovers_volatility(self, engine):
+        """测试批量反解恢复原始波动率"""
+        rng = np.random.default_rng(7)
+        n = 500
+        S = 50000.0
+        strikes = rng.uniform(30000, 80000, n)
+        T = rng.uniform(7 / 365, 1.0, n)
+        sigma = rng.uniform(0.3, 1.5, n)
+        is_call = rng.random(n) < 0.5
+        
+        priced = engine.price_batch(S, strikes, T, 0.05, sigma, is_call)
+        result = engine.implied_volatility_batch(priced.price, S, strikes, T, 0.05, is_call)
+        
+        # 价格对波动率几乎不敏感的深度虚值合约无法精确反解
+        sensitive = priced.vega > 1e-3
+        assert result.converged.all()
+        np.testing.assert_allclose(result.iv[sensitive], sigma[sensitive], atol=1e-6)
+        assert result.iterations.max() <= 20
+    
+    def test_batch_flags_arbitrage_violations(self, engine):
+        """测试超出无套利区间的报价被标记为未收敛"""
+        # 低于内在价值的看涨报价、高于标的价格的看涨报价
+        result = engine.implied_volatility_batch(
+            [5.0, 150.0, 10.45], 100.0, [90.0, 100.0, 100.0], 1.0, 0.05, OptionType.CALL
+        )
+        
+        assert not result.converged[0]
+        assert not result.converged[1]
+        assert result.converged[2]
+        assert abs(result.iv[2] - 0.2) < 0.01
+    
+    def test_batch_invalid_parameters(self, engine):
+        """测试无效参数"""
+        with pytest.raises(OptionsCalculationError):
+            engine.implied_volatility_batch([1.0, -1.0], 100.0, 100.0, 1.0, 0.05, OptionType.CALL)
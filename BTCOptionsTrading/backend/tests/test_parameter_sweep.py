@@ -0,0 +1,144 @@
+"""
+参数扫描回测测试
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from src.backtest.parameter_sweep import (
+    ParameterSweepRunner, SweepConfig, SweepSettings, build_strategy, build_sweep_grid
+)
+from src.historical.columnar_store import ColumnarMarketData, SharedMarketData
+from src.historical.models import BacktestDataSet, HistoricalOptionData
+from src.core.models import OptionType
+
+
+@pytest.fixture
+def grid():
+    """3个模板 × 2个入场日 × 2个到期天数"""
+    return build_sweep_grid(
+        templates=['long_call', 'short_straddle', 'iron_condor'],
+        entry_dates=[datetime(2024, 3, 1), datetime(2024, 3, 8)],
+        dtes=[7, 14]
+    )
+
+
+@pytest.fixture
+def market_data():
+    """一个合约、两周每小时一条记录"""
+    start = datetime(2024, 3, 1)
+    records = [
+        HistoricalOptionData(
+            instrument_name="BTC-15MAR24-60000-C",
+            timestamp=start + timedelta(hours=h),
+            open_price=Decimal("0.05"),
+            high_price=Decimal("0.05"),
+            low_price=Decimal("0.05"),
+            close_price=Decimal(str(round(0.05 + h / 10000, 4))),
+            volume=Decimal("1"),
+            strike_price=Decimal("60000"),
+            expiry_date=datetime(2024, 3, 15),
+            option_type=OptionType.CALL,
+            underlying_symbol="BTC"
+        )
+        for h in range(24 * 14)
+    ]
+    dataset = BacktestDataSet(
+        start_date=start,
+        end_date=start + timedelta(days=14),
+        options_data={"BTC-15MAR24-60000-C": records}
+    )
+    return ColumnarMarketData.from_dataset(dataset)
+
+
+def test_build_sweep_grid(grid):
+    """测试参数网格组合数和组合标识"""
+    assert len(grid) == 12
+    assert len({c.config_id for c in grid}) == 12
+    assert SweepConfig("long_call", datetime(2024, 3, 1), 7).config_id == grid[0].config_id
+    assert grid[0].exit_date == datetime(2024, 3, 8)
+    
+    with pytest.raises(ValueError):
+        SweepConfig("calendar", datetime(2024, 3, 1), 7)
+
+
+def test_build_strategy_centers_strikes_on_spot(market_data):
+    """测试执行价以入场日标的价格为中心，入场价格优先使用历史收盘价"""
+    config = SweepConfig("long_call", datetime(2024, 3, 1), 14)
+    strategy = build_strategy(config, SweepSettings(), market_data)
+    
+    option = strategy.legs[0].option_contract
+    assert option.instrument_name == "BTC-15MAR24-60000-C"
+    assert option.current_price == Decimal("0.05")
+    
+    condor = build_strategy(SweepConfig("iron_condor", datetime(2024, 3, 1), 14), SweepSettings())
+    assert [int(leg.option_contract.strike_price) for leg in condor.legs] == [40000, 45000, 55000, 60000]
+    assert all(leg.option_contract.current_price > 0 for leg in condor.legs)
+
+
+def test_shared_market_data_roundtrip(market_data):
+    """测试共享内存中的行情数据与原数据一致"""
+    shared = SharedMarketData.publish(market_data)
+    try:
+        attached, shm = SharedMarketData.attach(shared.handle)
+        original = market_data.series["BTC-15MAR24-60000-C"]
+        copy = attached.series["BTC-15MAR24-60000-C"]
+        
+        assert np.array_equal(copy.timestamps, original.timestamps)
+        assert np.array_equal(copy.close, original.close)
+        assert attached.close_asof("BTC-15MAR24-60000-C", datetime(2024, 3, 2, 5, 30)) == pytest.approx(0.0529)
+        assert attached.underlying_price_on(datetime(2024, 3, 3)) == 60000.0
+        
+        del attached, copy
+        shm.close()
+    finally:
+        shared.close()
+
+
+def test_sweep_runs_ranks_and_resumes(tmp_path, grid):
+    """测试扫描结果按夏普比率排序，续跑时跳过已完成的组合"""
+    runner = ParameterSweepRunner(results_path=str(tmp_path / "sweep.db"))
+    
+    first = runner.run(grid[:5])
+    assert first.completed == 5
+    assert first.skipped == 0
+    
+    second = runner.run(grid)
+    assert second.skipped == 5
+    assert second.completed == 7
+    assert second.failed == 0
+    
+    ranked = runner.ranked_results(limit=None)
+    assert len(ranked) == 12
+    sharpes = [row['sharpe_ratio'] for row in ranked]
+    assert sharpes == sorted(sharpes, reverse=True)
+    
+    by_drawdown = runner.ranked_results(by='max_drawdown', limit=3)
+    assert by_drawdown[0]['max_drawdown'] <= by_drawdown[-1]['max_drawdown']
+    runner.close()
+
+
+def test_parallel_sweep_matches_serial(tmp_path, grid, market_data):
+    """测试多进程扫描（共享内存数据）与单进程结果一致"""
+    serial = ParameterSweepRunner(results_path=str(tmp_path / "serial.db"))
+    parallel = ParameterSweepRunner(results_path=str(tmp_path / "parallel.db"), workers=2)
+    
+    serial.run(grid, market_data=market_data)
+    summary = parallel.run(grid, market_data=market_data)
+    assert summary.completed == len(grid)
+    
+    def by_id(runner):
+        return {row['config_id']: row for row in runner.ranked_results(limit=None)}
+    
+    serial_rows = by_id(serial)
+    parallel_rows = by_id(parallel)
+    assert serial_rows.keys() == parallel_rows.keys()
+    for config_id, row in serial_rows.items():
+        assert parallel_rows[config_id]['final_capital'] == pytest.approx(row['final_capital'])
+        assert parallel_rows[config_id]['sharpe_ratio'] == pytest.approx(row['sharpe_ratio'])
+    
+    serial.close()
+    parallel.close()
@@ -0,0 +1,115 @@
+"""
+列式查询结果缓存测试
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.historical.cache import HistoricalDataCache
+from src.historical.models import HistoricalOptionData
+from src.historical.result_cache import QueryResultCache
+from src.core.models import OptionType
+
+
+def _records(instrument: str, strike: str, count: int, start: datetime = datetime(2024, 3, 1)):
+    return [
+        HistoricalOptionData(
+            instrument_name=instrument,
+            timestamp=start + timedelta(hours=i),
+            open_price=Decimal("0.05"),
+            high_price=Decimal("0.06"),
+            low_price=Decimal("0.04"),
+            close_price=Decimal(str(round(0.05 + i / 1000, 3))),
+            volume=Decimal(str(i)),
+            strike_price=Decimal(strike),
+            expiry_date=datetime(2024, 3, 29),
+            option_type=OptionType.CALL,
+            underlying_symbol="BTC"
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HistoricalDataCache(db_path=str(tmp_path / "cache.db"), cache_size_mb=10)
+    cache.store_historical_data(
+        _records("BTC-29MAR24-50000-C", "50000", 240) + _records("BTC-29MAR24-60000-C", "60000", 240)
+    )
+    yield cache
+    cache.close()
+
+
+def _as_tuples(records):
+    return [
+        (r.instrument_name, r.timestamp, r.close_price, r.volume, r.strike_price, r.option_type, str(r.id))
+        for r in records
+    ]
+
+
+def test_sub_range_served_from_superset(cache):
+    """测试被已缓存结果覆盖的子区间查询直接从缓存返回"""
+    instrument = "BTC-29MAR24-50000-C"
+    cache.query_option_data(instrument_name=instrument)
+    
+    start, end = datetime(2024, 3, 3), datetime(2024, 3, 5, 12)
+    cached = cache.query_option_data(instrument_name=instrument, start_date=start, end_date=end)
+    direct = cache.query_option_data(instrument_name=instrument, start_date=start, end_date=end, use_cache=False)
+    
+    assert _as_tuples(cached) == _as_tuples(direct)
+    assert len(cached) == 61
+    
+    stats = cache.get_cache_stats()['memory_cache']
+    assert stats['misses'] == 1
+    assert stats['superset_hits'] == 1
+    assert stats['entries'] == 1
+
+
+def test_instrument_query_served_from_all_instruments(cache):
+    """测试全部合约的缓存结果可以按合约过滤后复用"""
+    cache.query_option_data(underlying_symbol="BTC")
+    
+    rows = cache.query_option_data(
+        instrument_name="BTC-29MAR24-60000-C",
+        start_date=datetime(2024, 3, 2),
+        underlying_symbol="BTC"
+    )
+    
+    assert {r.instrument_name for r in rows} == {"BTC-29MAR24-60000-C"}
+    assert len(rows) == 240 - 24
+    assert cache.get_cache_stats()['memory_cache']['superset_hits'] == 1
+
+
+def test_size_accounting_and_eviction():
+    """测试按数组实际字节数计量并按LRU淘汰"""
+    result_cache = QueryResultCache(max_bytes=0)
+    rows = result_cache.rows_from_db([
+        ("id-%d" % i, "BTC-29MAR24-50000-C", 1_700_000_000 + i, 1.0, 1.0, 1.0, 1.0, 1.0,
+         50000.0, 1_711_670_400, "call", "BTC", "crypto_data_download", 0)
+        for i in range(100)
+    ])
+    assert rows.nbytes == sum(getattr(rows, name).nbytes for name in rows.__slots__)
+    
+    result_cache.max_bytes = rows.nbytes * 2
+    for i in range(3):
+        result_cache.put(f"instrument-{i}", None, 0, i, rows)
+    
+    stats = result_cache.stats()
+    assert stats['entries'] == 2
+    assert stats['size_bytes'] == rows.nbytes * 2
+    assert stats['evictions'] == 1
+    assert result_cache.get("instrument-0", None, 0, 0) is None
+    assert result_cache.get("instrument-2", None, 0, 2) is not None
+
+
+def test_store_invalidates_cached_results(cache):
+    """测试写入新数据后缓存结果失效"""
+    instrument = "BTC-29MAR24-50000-C"
+    assert len(cache.query_option_data(instrument_name=instrument)) == 240
+    
+    cache.store_historical_data(_records(instrument, "50000", 24, start=datetime(2024, 3, 20)))
+    
+    assert len(cache.query_option_data(instrument_name=instrument)) == 264
+    assert cache.get_cache_stats()['memory_cache']['invalidations'] == 1
@@ -435,3 +435,289 @@ def test_var_time_horizon_scaling(risk_calculator, sample_portfolio):
     expected_ratio = np.sqrt(10)
     actual_ratio = var_10day['var'] / var_1day['var']
     assert 2.5 < actual_ratio < 4.0  # sqrt(10) ≈ 3.16
+
+
+def _straddle_portfolio(quantity=-10, days=7, iv=0.6):
+    """Short ATM straddle: the book delta-normal VaR understates."""
+    expiry = datetime.now() + timedelta(days=days, hours=1)
+    now = datetime.now()
+    positions = []
+    for option_type, suffix in ((OptionType.CALL, "C"), (OptionType.PUT, "P")):
+        contract = OptionContract(
+            instrument_name=f"BTC-30000-{suffix}",
+            underlying="BTC",
+            option_type=option_type,
+            strike_price=Decimal("30000"),
+            expiration_date=expiry,
+            current_price=Decimal("1000"),
+            bid_price=Decimal("990"),
+            ask_price=Decimal("1010"),
+            last_price=Decimal("1000"),
+            implied_volatility=iv,
+            delta=0.5,
+            gamma=0.001,
+            theta=-50,
+            vega=100,
+            rho=10,
+            open_interest=100,
+            volume=10,
+            timestamp=now
+        )
+        positions.append(Position(
+            option_contract=contract,
+            quantity=quantity,
+            entry_price=Decimal("1000"),
+            entry_date=now,
+            current_value=Decimal("1000"),
+            unrealized_pnl=Decimal("0")
+        ))
+    return Portfolio(positions=positions, cash_balance=Decimal("100000"), total_value=Decimal("100000"))
+
+
+def test_batch_greeks_match_per_position(risk_calculator, options_engine, sample_portfolio):
+    """Vectorized portfolio Greeks equal the per-position sum."""
+    spot_price = 29000.0
+    greeks = risk_calculator.calculate_portfolio_greeks(sample_portfolio, spot_price)
+    
+    expected = dict.fromkeys(greeks, 0.0)
+    for position in sample_portfolio.positions:
+        contract = position.option_contract
+        single = options_engine.calculate_greeks(
+            spot_price, float(contract.strike_price),
+            (contract.expiration_date - datetime.now()).days / 365.0,
+            0.05, contract.implied_volatility, contract.option_type
+        )
+        for name in expected:
+            expected[name] += getattr(single, name) * position.quantity
+    
+    for name in expected:
+        assert greeks[name] == pytest.approx(expected[name], rel=1e-9)
+
+
+def test_monte_carlo_var_short_straddle(risk_calculator):
+    """Full revaluation captures gamma/vega losses on a short straddle."""
+    portfolio = _straddle_portfolio()
+    spot_price = 30000.0
+    
+    delta_normal = risk_calculator.calculate_var(portfolio, spot_price, volatility=0.6)
+    mc = risk_calculator.calculate_monte_carlo_var(portfolio, spot_price, volatility=0.6, seed=1)
+    
+    assert mc['method'] == 'monte_carlo'
+    assert mc['n_scenarios'] == 10000
+    assert mc['var'] > delta_normal['var'] * 5
+    assert mc['cvar'] >= mc['var']
+    assert mc['worst_loss'] >= mc['cvar']
+    
+    contributions = mc['contributions']
+    assert [c['instrument_name'] for c in contributions] == ["BTC-30000-C", "BTC-30000-P"]
+    assert sum(c['cvar_contribution'] for c in contributions) == pytest.approx(mc['cvar'], rel=1e-9)
+
+
+def test_monte_carlo_scenarios_cached(risk_calculator, sample_portfolio):
+    """Identical parameters reuse the cached scenario set."""
+    first = risk_calculator.monte_carlo_scenarios(0.8, 5, n_scenarios=2000, seed=3)
+    assert risk_calculator.monte_carlo_scenarios(0.8, 5, n_scenarios=2000, seed=3) is first
+    assert risk_calculator.monte_carlo_scenarios(0.8, 5, n_scenarios=2000, seed=3, refresh=True) is not first
+    
+    var_1day = risk_calculator.calculate_monte_carlo_var(sample_portfolio, 29000.0, 0.8, time_horizon_days=1, seed=3)
+    var_10day = risk_calculator.calculate_monte_carlo_var(sample_portfolio, 29000.0, 0.8, time_horizon_days=10, seed=3)
+    assert var_10day['var'] > var_1day['var']
+
+
+
+def test_scenario_cache_is_bounded(options_engine):
+    """The scenario cache drops the least recently used sets beyond its size."""
+    calculator = RiskCalculator(options_engine, scenario_cache_size=2)
+    first = calculator.monte_carlo_scenarios(0.8, 1, n_scenarios=100, seed=1)
+    second = calculator.monte_carlo_scenarios(0.8, 2, n_scenarios=100, seed=1)
+    assert calculator.monte_carlo_scenarios(0.8, 1, n_scenarios=100, seed=1) is first
+    
+    calculator.monte_carlo_scenarios(0.8, 3, n_scenarios=100, seed=1)
+    assert len(calculator._scenario_cache) == 2
+    assert calculator.monte_carlo_scenarios(0.8, 1, n_scenarios=100, seed=1) is first
+    assert calculator.monte_carlo_scenarios(0.8, 2, n_scenarios=100, seed=1) is not second
+
+def test_historical_var(risk_calculator):
+    """Historical simulation uses overlapping horizon moves."""
+    portfolio = _straddle_portfolio()
+    rng = np.random.default_rng(5)
+    spot_history = 30000 * np.exp(np.cumsum(rng.normal(0, 0.03, 500)))
+    iv_history = 0.6 * np.exp(np.cumsum(rng.normal(0, 0.03, 500)))
+    
+    result = risk_calculator.calculate_historical_var(
+        portfolio, 30000.0, spot_history, iv_history, time_horizon_days=2
+    )
+    assert result['method'] == 'historical'
+    assert result['n_scenarios'] == 498
+    assert result['cvar'] >= result['var'] > 0
+    
+    with pytest.raises(ValueError):
+        risk_calculator.historical_scenarios(spot_history[:3], time_horizon_days=5)
+
+
+def test_scenario_var_empty_portfolio(risk_calculator):
+    """Scenario VaR of an empty book is zero."""
+    empty = Portfolio(positions=[], cash_balance=Decimal("100000"), total_value=Decimal("100000"))
+    result = risk_calculator.calculate_monte_carlo_var(empty, 29000.0, 0.8, n_scenarios=100, seed=0)
+    assert result['var'] == 0
+    assert result['cvar'] == 0
+    assert result['contributions'] == []
+
+
+def test_stress_test_matches_per_position_pricing(risk_calculator, options_engine, sample_portfolio):
+    """Vectorized stress test equals repricing each position separately."""
+    spot_price = 29000.0
+    result = risk_calculator.stress_test(sample_portfolio, spot_price)
+    
+    def value(spot, vol_multiplier):
+        total = 0.0
+        for position in sample_portfolio.positions:
+            contract = position.option_contract
+            total += options_engine.black_scholes_price(
+                spot, float(contract.strike_price),
+                (contract.expiration_date - datetime.now()).days / 365.0,
+                0.05, contract.implied_volatility * vol_multiplier, contract.option_type
+            ) * position.quantity
+        return total
+    
+    base = value(spot_price, 1.0)
+    assert result['base_portfolio_value'] == pytest.approx(base, rel=1e-9)
+    for scenario in result['price_scenarios']:
+        assert scenario['pnl'] == pytest.approx(value(scenario['shocked_price'], 1.0) - base, abs=1e-6)
+    for scenario in result['volatility_scenarios']:
+        expected = value(spot_price, 1 + scenario['shock_percentage'] / 100) - base
+        assert scenario['pnl'] == pytest.approx(expected, abs=1e-6)
+
+
+def test_stress_cube(risk_calculator, sample_portfolio):
+    """The cube agrees with the 1-D stress test and rolls time forward."""
+    spot_price = 29000.0
+    cube = risk_calculator.stress_cube(
+        sample_portfolio, spot_price,
+        spot_shocks=[-0.3, 0.0, 0.3], vol_shocks=[-0.5, 0.0, 1.0], days_forward=[0, 10, 40]
+    )
+    assert cube.pnl.shape == (3, 3, 3)
+    assert cube.pnl[1, 1, 0] == pytest.approx(0.0, abs=1e-9)
+    
+    stress = risk_calculator.stress_test(sample_portfolio, spot_price, price_shocks=[-0.3], volatility_shocks=[1.0])
+    assert cube.pnl[0, 1, 0] == pytest.approx(stress['price_scenarios'][0]['pnl'])
+    assert cube.pnl[1, 2, 0] == pytest.approx(stress['volatility_scenarios'][0]['pnl'])
+    
+    # After expiry the vol shock no longer matters (intrinsic value)
+    assert cube.pnl[0, 0, 2] == pytest.approx(cube.pnl[0, 2, 2])
+    
+    worst = cube.worst_case()
+    assert worst['pnl'] == pytest.approx(cube.pnl.min())
+    assert len(cube.worst_by_day()) == 3
+    assert cube.worst_slice().shape == (3, 3)
+    
+    with pytest.raises(ValueError):
+        risk_calculator.stress_cube(sample_portfolio, spot_price, vol_shocks=[-1.0])
+
+
+def test_historical_stress(risk_calculator):
+    """Historical episodes are replayed and sorted worst first."""
+    portfolio = _straddle_portfolio()
+    results = risk_calculator.historical_stress(portfolio, 30000.0)
+    
+    assert len(results) == 6
+    assert all(r['pnl'] < 0 for r in results)
+    assert results[0]['pnl'] == min(r['pnl'] for r in results)
+    
+    custom = risk_calculator.historical_stress(
+        portfolio, 30000.0, scenarios=[{'name': 'flat', 'spot_shock': 0.0, 'vol_shock': 0.0, 'days_forward': 1}]
+    )
+    assert custom[0]['name'] == 'flat'
+    assert custom[0]['pnl'] > 0  # short straddle collects one day of theta
+
+
+def _leg(option_type, strike, action, quantity=1, days=30):
+    expiry = (datetime.now() + timedelta(days=days, hours=1)).isoformat()
+    return {
+        'option_contract': {
+            'instrument_name': f"BTC-{strike}-{option_type[0].upper()}",
+            'underlying': 'BTC',
+            'option_type': option_type,
+            'strike_price': strike,
+            'expiration_date': expiry
+        },
+        'action': action,
+        'quantity': quantity
+    }
+
+
+def test_strategy_payoff_is_exact(risk_calculator):
+    """Breakevens and max profit/loss come from the strikes, not a grid."""
+    condor = [
+        _leg('put', 27000, 'buy'), _leg('put', 28000, 'sell'),
+        _leg('call', 30000, 'sell'), _leg('call', 31000, 'buy')
+    ]
+    result = risk_calculator.calculate_strategy_risk(condor, 29000.0)
+    credit = -result['initial_cost']
+    
+    assert credit > 0
+    assert result['max_profit'] == pytest.approx(credit)
+    assert result['max_loss'] == pytest.approx(credit - 1000)
+    assert result['breakeven_points'] == pytest.approx([28000 - credit, 30000 + credit])
+    assert not result['unlimited_profit'] and not result['unlimited_loss']
+    
+    straddle = [_leg('call', 29000, 'sell'), _leg('put', 29000, 'sell')]
+    result = risk_calculator.calculate_strategy_risk(straddle, 29000.0)
+    assert result['unlimited_loss']
+    assert result['max_loss'] == float('-inf')
+    assert result['max_profit'] == pytest.approx(-result['initial_cost'])
+    assert result['risk_reward_ratio'] == 0
+
+
+def test_probability_of_profit_lognormal(risk_calculator):
+    """Probability of profit matches a Monte Carlo of the lognormal terminal price."""
+    legs = [_leg('call', 29000, 'buy'), _leg('put', 29000, 'buy')]
+    result = risk_calculator.calculate_strategy_risk(legs, 29000.0, volatility=0.8)
+    
+    T = (datetime.fromisoformat(legs[0]['option_contract']['expiration_date']) - datetime.now()).days / 365.0
+    z = np.random.default_rng(0).standard_normal(400000)
+    terminal = 29000.0 * np.exp((0.05 - 0.32) * T + 0.8 * np.sqrt(T) * z)
+    low, high = result['breakeven_points']
+    expected = np.mean((terminal < low) | (terminal > high)) * 100
+    
+    assert result['probability_of_profit'] == pytest.approx(expected, abs=0.3)
+
+
+def test_probability_of_profit_surface(risk_calculator, options_engine):
+    """With a smile, P(S_T > K) equals minus the discounted strike-derivative of call prices."""
+    from src.volatility.svi_surface import SVIParams, SVIVolatilitySurface
+    
+    legs = [_leg('call', 31000, 'buy')]
+    T = (datetime.fromisoformat(legs[0]['option_contract']['expiration_date']) - datetime.now()).days / 365.0
+    params = SVIParams(a=0.004, b=0.08, rho=-0.4, m=0.0, sigma=0.1)
+    surface = SVIVolatilitySurface(29000.0, [T], params.as_array()[None, :])
+    result = risk_calculator.calculate_strategy_risk(legs, 29000.0, volatility_surface=surface)
+    
+    breakeven = result['breakeven_points'][0]
+    h = 1.0
+    call = lambda k: options_engine.black_scholes_price(29000.0, k, T, 0.05, surface.vol(k, T), OptionType.CALL)
+    expected = -(call(breakeven + h) - call(breakeven - h)) / (2 * h) * np.exp(0.05 * T) * 100
+    
+    assert result['probability_of_profit'] == pytest.approx(expected, abs=0.05)
+
+
+def test_batch_scoring_matches_single(risk_calculator):
+    """Scoring candidates in one batch gives the same metrics as one at a time."""
+    candidates = [
+        [_leg('call', 30000, 'buy')],
+        [_leg('put', 28000, 'sell', 2, days=7)],
+        [_leg('call', 29000, 'buy'), _leg('put', 29000, 'buy'), _leg('call', 33000, 'sell')],
+        [_leg('put', 27000, 'buy'), _leg('put', 28000, 'sell'), _leg('call', 30000, 'sell'), _leg('call', 31000, 'buy')],
+    ]
+    batch = risk_calculator.calculate_strategies_risk(candidates, 29000.0)
+    
+    for legs, scored in zip(candidates, batch):
+        single = risk_calculator.calculate_strategy_risk(legs, 29000.0)
+        assert scored['breakeven_points'] == pytest.approx(single['breakeven_points'])
+        for key in ('initial_cost', 'max_profit', 'max_loss', 'probability_of_profit'):
+            assert scored[key] == pytest.approx(single[key])
+        for name, value in single['greeks'].items():
+            assert scored['greeks'][name] == pytest.approx(value)
+    
+    with pytest.raises(ValueError):
+        risk_calculator.calculate_strategies_risk([[]], 29000.0)
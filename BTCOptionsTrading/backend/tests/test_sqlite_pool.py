@@ -0,0 +1,113 @@
+"""
+SQLite连接池测试
+"""
+
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.historical.cache import HistoricalDataCache
+from src.historical.models import HistoricalOptionData
+from src.historical.sqlite_pool import SQLiteConnectionPool
+from src.core.models import OptionType
+
+
+def _records(start: datetime, count: int):
+    return [
+        HistoricalOptionData(
+            instrument_name="BTC-29MAR24-50000-C",
+            timestamp=start + timedelta(minutes=i),
+            open_price=Decimal("0.05"),
+            high_price=Decimal("0.06"),
+            low_price=Decimal("0.04"),
+            close_price=Decimal("0.05"),
+            volume=Decimal("1"),
+            strike_price=Decimal("50000"),
+            expiry_date=datetime(2024, 3, 29),
+            option_type=OptionType.CALL,
+            underlying_symbol="BTC"
+        )
+        for i in range(count)
+    ]
+
+
+def test_pool_enables_wal_and_pragmas(tmp_path):
+    """测试写连接开启WAL，读连接为只读"""
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    
+    with pool.writer() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    
+    with pool.reader() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+        with pytest.raises(Exception):
+            conn.execute("INSERT INTO t VALUES (2)")
+    
+    pool.close()
+
+
+def test_writer_rolls_back_on_error(tmp_path):
+    """测试写事务异常时回滚"""
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    
+    with pytest.raises(RuntimeError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    
+    with pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_readers_are_reused(tmp_path):
+    """测试只读连接被复用而不是每次新建"""
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"), max_readers=2)
+    
+    with pool.reader() as first:
+        pass
+    with pool.reader() as second:
+        assert second is first
+    
+    pool.close()
+
+
+def test_concurrent_reads_during_import(tmp_path):
+    """测试导入写入期间并发读取不会出现database is locked"""
+    cache = HistoricalDataCache(db_path=str(tmp_path / "cache.db"), cache_size_mb=1)
+    cache.store_historical_data(_records(datetime(2024, 3, 1), 100))
+    
+    errors = []
+    stop = threading.Event()
+    
+    def read_loop():
+        while not stop.is_set():
+            try:
+                rows = cache.query_option_data(instrument_name="BTC-29MAR24-50000-C", use_cache=False)
+                assert len(rows) >= 100
+                cache.get_cache_stats()
+            except Exception as e:
+                errors.append(e)
+                return
+    
+    readers = [threading.Thread(target=read_loop) for _ in range(4)]
+    for t in readers:
+        t.start()
+    
+    for batch in range(1, 11):
+        cache.store_historical_data(_records(datetime(2024, 3, 1) + timedelta(days=batch), 200), batch_size=50)
+    
+    stop.set()
+    for t in readers:
+        t.join()
+    
+    assert not errors
+    assert cache.get_cache_stats()['database']['record_count'] == 2100
+    cache.close()
@@ -0,0 +1,121 @@
+"""
+测试流式历史数据导入
+"""
+
+import csv
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.historical.cache import HistoricalDataCache
+from src.historical.converter import HistoricalDataConverter
+from src.historical.importer import StreamingImporter
+from src.historical.models import DataIssue, DataQualityReport, ValidationSeverity
+from src.historical.validator import QualityReportAccumulator
+
+
+def write_csv(path: Path, rows: int, preamble: str = "", bad_rows=()):
+    """写入一个测试 CSV 文件（每小时一条）"""
+    with open(path, 'w', newline='') as f:
+        f.write(preamble)
+        writer = csv.writer(f)
+        writer.writerow(['unix', 'open', 'high', 'low', 'close', 'volume'])
+        for j in range(rows):
+            if j in bad_rows:
+                # high < low，应被跳过
+                writer.writerow([1711670400 + j * 3600, '0.05', '0.04', '0.06', '0.05', '1'])
+            else:
+                writer.writerow([1711670400 + j * 3600, '0.05', '0.055', '0.047', f'{0.05 + j * 0.0001:.4f}', '10'])
+    return path
+
+
+@pytest.fixture
+def files(tmp_path):
+    return [
+        write_csv(tmp_path / "Deribit_BTCUSD_20240329_50000_C.csv", 25),
+        write_csv(tmp_path / "Deribit_BTCUSD_20240329_48000_P.csv", 10, preamble="https://www.CryptoDataDownload.com\n", bad_rows={3}),
+    ]
+
+
+def test_iter_file_chunks_matches_process_file(files):
+    """按块解析的结果与逐行解析一致"""
+    converter = HistoricalDataConverter()
+    
+    for path in files:
+        expected = converter.process_file(path)
+        chunks = list(converter.iter_file_chunks(path, chunk_size=4))
+        
+        assert all(len(chunk) <= 4 for chunk in chunks)
+        assert sum(len(chunk) for chunk in chunks) == len(expected)
+        
+        records = [record for chunk in chunks for record in chunk.to_records()]
+        for got, want in zip(records, expected):
+            assert got.instrument_name == want.instrument_name
+            assert got.timestamp == want.timestamp
+            assert got.close_price == want.close_price
+            assert got.strike_price == want.strike_price
+            assert got.expiry_date == want.expiry_date
+            assert got.option_type == want.option_type
+
+
+def test_parse_csv_skips_preamble(files):
+    """表头前的注释行被跳过，无效行被丢弃"""
+    converter = HistoricalDataConverter()
+    assert len(converter.parse_csv_file(files[1])) == 9
+
+
+def test_streaming_import_with_backpressure(tmp_path, files):
+    """队列长度为1时所有数据块仍全部写入"""
+    cache = HistoricalDataCache(db_path=str(tmp_path / "test.db"))
+    progress_updates = []
+    bad_file = write_csv(tmp_path / "not_a_deribit_file.csv", 5)
+    
+    importer = StreamingImporter(cache, chunk_size=3, queue_size=1)
+    result = importer.run(files + [bad_file], progress_callback=lambda p: progress_updates.append(p.records_written))
+    
+    assert result.records_imported == 34
+    assert result.success_count == 2
+    assert result.failed_files == [str(bad_file)]
+    assert result.quality_report.total_records == 34
+    assert progress_updates[-1] == 34
+    assert progress_updates == sorted(progress_updates)
+    
+    stored = cache.query_option_data(underlying_symbol="BTC")
+    assert len(stored) == 34
+    cache.close()
+
+
+def test_streaming_import_with_workers(tmp_path, files):
+    """进程池解析与单线程解析写入相同的数据"""
+    cache = HistoricalDataCache(db_path=str(tmp_path / "test.db"))
+    
+    result = StreamingImporter(cache, chunk_size=8, max_workers=2).run(files, validate=False)
+    
+    assert result.records_imported == 34
+    assert result.quality_report is None
+    assert len(cache.query_option_data(instrument_name="BTC-29MAR24-50000-C")) == 25
+    cache.close()
+
+
+def test_quality_report_accumulator():
+    """合并报告累加计数并限制问题条数"""
+    start = datetime(2024, 3, 1)
+    accumulator = QualityReportAccumulator(max_issues=2)
+    for i in range(3):
+        accumulator.add(DataQualityReport(
+            total_records=10,
+            missing_records=0,
+            anomaly_records=1,
+            coverage_percentage=1.0,
+            time_range=(start + timedelta(days=i), start + timedelta(days=i, hours=10)),
+            issues=[DataIssue(severity=ValidationSeverity.ERROR, message=f"issue {i}")]
+        ))
+    
+    report = accumulator.report()
+    assert report.total_records == 30
+    assert report.anomaly_records == 3
+    assert report.coverage_percentage == 1.0
+    assert report.time_range == (start, start + timedelta(days=2, hours=10))
+    assert len(report.issues) == 3
+    assert report.issues[-1].message == "1 more issues omitted"
@@ -0,0 +1,128 @@
+"""
+SVI波动率曲面测试
+"""
+
+import numpy as np
+import pytest
+
+from src.volatility.svi_surface import SVIParams, SVISurfaceFitter, SVIVolatilitySurface, fit_svi_slice
+from src.volatility.volatility_analyzer import VolatilityAnalyzer
+
+SPOT = 95000.0
+TRUE_SLICES = {
+    0.05: SVIParams(a=0.004, b=0.05, rho=-0.3, m=0.01, sigma=0.08),
+    0.25: SVIParams(a=0.03, b=0.12, rho=-0.25, m=0.02, sigma=0.15),
+    0.75: SVIParams(a=0.10, b=0.20, rho=-0.2, m=0.03, sigma=0.25),
+}
+
+
+def market_quotes(noise=0.0, seed=0):
+    """由已知SVI参数生成报价"""
+    rng = np.random.default_rng(seed)
+    strikes, expiries, vols = [], [], []
+    for expiry, params in TRUE_SLICES.items():
+        k = np.linspace(-0.4, 0.4, 17)
+        iv = np.sqrt(params.total_variance(k) / expiry) * (1 + noise * rng.standard_normal(k.size))
+        strikes.extend(SPOT * np.exp(k))
+        expiries.extend([expiry] * k.size)
+        vols.extend(iv)
+    return np.array(strikes), np.array(expiries), np.array(vols)
+
+
+class TestSVISlice:
+    """测试单个切片拟合"""
+    
+    def test_recovers_known_parameters(self):
+        """无噪声数据能还原生成参数"""
+        params = TRUE_SLICES[0.25]
+        k = np.linspace(-0.5, 0.5, 21)
+        fitted, rmse = fit_svi_slice(k, params.total_variance(k))
+        
+        assert rmse < 1e-8
+        np.testing.assert_allclose(fitted.as_array(), params.as_array(), atol=1e-5)
+        assert fitted.min_variance() >= 0
+    
+    def test_too_few_points_gives_flat_slice(self):
+        """报价不足时退化为平坦切片"""
+        fitted, _ = fit_svi_slice([0.0, 0.1], [0.04, 0.06])
+        assert fitted.b == 0.0
+        assert fitted.total_variance([-1.0, 1.0]) == pytest.approx([0.05, 0.05])
+
+
+class TestSVIVolatilitySurface:
+    """测试曲面拟合与查询"""
+    
+    def test_fit_and_query(self):
+        """拟合后在报价点处还原隐含波动率，标量与批量查询一致"""
+        strikes, expiries, vols = market_quotes()
+        surface = SVISurfaceFitter().fit(strikes, expiries, vols, SPOT)
+        
+        assert len(surface) == 3
+        np.testing.assert_allclose(surface.implied_vol(strikes, expiries), vols, atol=1e-6)
+        
+        query_k = np.random.default_rng(1).uniform(80000, 110000, 50)
+        query_t = np.random.default_rng(2).uniform(0.01, 1.5, 50)
+        batch = surface.implied_vol(query_k, query_t)
+        assert isinstance(batch, np.ndarray)
+        np.testing.assert_allclose(batch, [surface.vol(k, t) for k, t in zip(query_k, query_t)], rtol=1e-12)
+    
+    def test_total_variance_monotone_in_time(self):
+        """总方差随到期时间不减，切片外按波动率不变外推"""
+        strikes, expiries, vols = market_quotes()
+        surface = SVISurfaceFitter().fit(strikes, expiries, vols, SPOT)
+        
+        k = np.linspace(-0.5, 0.5, 11)[:, None]
+        t = np.linspace(0.01, 2.0, 200)[None, :]
+        w = surface.total_variance(k, t)
+        assert np.all(np.diff(w, axis=1) >= -1e-12)
+        
+        assert surface.vol(SPOT, 0.01) == pytest.approx(surface.vol(SPOT, 0.05))
+        assert surface.vol(SPOT, 2.0) == pytest.approx(surface.vol(SPOT, 0.75))
+    
+    def test_lower_middle_slice_does_not_break_monotonicity(self):
+        """中间切片低于近月时，总方差仍随到期时间连续不减"""
+        flat = [[a, 0.0, 0.0, 0.0, 0.1] for a in (0.04, 0.02, 0.05)]
+        surface = SVIVolatilitySurface(SPOT, [0.1, 0.2, 0.3], np.array(flat))
+        
+        t = np.linspace(0.05, 0.5, 451)
+        w = surface.total_variance(np.zeros_like(t), t)
+        assert np.all(np.diff(w) >= -1e-12)
+        assert surface.total_variance(0.0, 0.1999) == pytest.approx(0.04)
+        assert surface.total_variance(0.0, 0.2) == pytest.approx(0.04)
+        np.testing.assert_allclose(w, [surface.vol(SPOT, x) ** 2 * x for x in t], rtol=1e-12)
+    
+    def test_calendar_violations_reported(self):
+        """远月切片低于近月时被检测到"""
+        near = TRUE_SLICES[0.75].as_array()
+        far = TRUE_SLICES[0.25].as_array()
+        surface = SVIVolatilitySurface(SPOT, [0.25, 0.75], np.vstack([near, far]))
+        assert surface.calendar_violations() == [(0.25, 0.75)]
+    
+    def test_warm_start_from_previous_fit(self):
+        """热启动：到期时间略有变化时沿用旧参数，拟合结果一致"""
+        fitter = SVISurfaceFitter()
+        strikes, expiries, vols = market_quotes(noise=0.002, seed=3)
+        first = fitter.fit(strikes, expiries, vols, SPOT)
+        
+        # 一小时后：到期时间缩短，报价小幅变化
+        shifted = expiries - 1 / (365 * 24)
+        assert fitter._warm_start(shifted[0]) is not None
+        second = fitter.fit(strikes, shifted, vols * 1.001, SPOT)
+        cold = SVISurfaceFitter().fit(strikes, shifted, vols * 1.001, SPOT)
+        
+        np.testing.assert_allclose(second.implied_vol(strikes, shifted), cold.implied_vol(strikes, shifted), atol=1e-4)
+        assert np.all(second.rmse <= first.rmse * 1.5 + 1e-6)
+
+
+def test_build_volatility_surface_returns_arrays():
+    """分析器返回NumPy网格和曲面对象"""
+    strikes, expiries, vols = market_quotes()
+    option_data = [
+        {'strike': k, 'expiry': t, 'implied_vol': v, 'option_type': 'call'}
+        for k, t, v in zip(strikes, expiries, vols)
+    ]
+    result = VolatilityAnalyzer().build_volatility_surface(option_data, spot_price=SPOT, grid_size=20)
+    
+    assert result['volatility'].shape == (20, 20)
+    assert np.all(np.isfinite(result['volatility']))
+    assert result['surface'].vol(SPOT, 0.25) == pytest.approx(np.sqrt(TRUE_SLICES[0.25].total_variance(0.0) / 0.25), rel=1e-6)
@@ -0,0 +1,183 @@
+"""
+测试交易记录存储
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import iv_collector
+import news_impact_tracker
+import pnl_updater
+import take_profit_monitor
+import trade_store
+from trade_store import TradeStore, parse_expiry
+from weighted_sentiment_cron import SimplifiedTradeLogger
+from weighted_sentiment_models import OptionTrade, StraddleTradeResult, WeightedNews
+
+# 旧版日志格式：没有“入场价(BTC)”、“盈亏平衡”和“下单数量”
+LEGACY_ENTRY = """
+================================================================================
+交易时间: 2026-03-10T09:00:00.123456
+新闻 ID: legacy-1
+新闻内容: Old style entry
+情绪: negative
+重要性评分: 9/10
+交易成功: True
+现货价格: $70,000.00
+看涨期权: BTC-27MAR26-70000-C
+  执行价: $70000.00
+  权利金: 0.0200 BTC
+  IV: 55.00%
+  订单 ID: 111
+看跌期权: BTC-27MAR26-70000-P
+  执行价: $70000.00
+  权利金: 0.0150 BTC
+  IV: 57.00%
+  订单 ID: 222
+平均 IV: 56.00%
+总成本: $2450.00
+================================================================================
+"""
+
+FAILED_ENTRY = """
+================================================================================
+交易时间: 2026-03-11T10:00:00
+新闻 ID: failed-1
+新闻内容: Failed trade
+情绪: positive
+重要性评分: 8.5/10
+交易成功: False
+错误信息: insufficient margin
+================================================================================
+"""
+
+
+def make_trade(news_id, trade_time, expiry, strike=100000.0, order_id="COMBO:abc123"):
+    """构造一笔成功的跨式交易"""
+    code = expiry.strftime("%d%b%y").upper().lstrip('0')
+    call = OptionTrade(f"BTC-{code}-{int(strike)}-C", "call", strike, expiry, 0.021, 0.1, order_id)
+    put = OptionTrade(f"BTC-{code}-{int(strike)}-P", "put", strike, expiry, 0.019, 0.1, "P-1")
+    news = WeightedNews(news_id, f"news {news_id}", "negative", 8.5, trade_time)
+    result = StraddleTradeResult(True, news_id, trade_time, 98000.0, call, put, 392.0)
+    return news, result
+
+
+@pytest.fixture
+def logger_and_store(tmp_path):
+    store = TradeStore(db_path=tmp_path / "trades.db", log_path=tmp_path / "logs" / "weighted_sentiment_trades.log")
+    return SimplifiedTradeLogger(log_dir=tmp_path / "logs", store=store), store
+
+
+class TestTradeStore:
+    """测试写入、迁移与查询"""
+    
+    @pytest.mark.asyncio
+    async def test_logger_writes_store_and_log(self, logger_and_store, tmp_path):
+        """日志记录器同时写入存储和文本日志，日志重新解析结果与存储一致"""
+        trade_logger, store = logger_and_store
+        expiry = datetime.now() + timedelta(days=3)
+        news, result = make_trade("n1", datetime(2026, 4, 1, 12, 0), expiry)
+        await trade_logger.log_trade(news, result, call_iv=50.0, put_iv=52.0)
+        
+        [trade] = store.successful_trades()
+        assert trade['combo_id'] == "abc123"
+        assert trade['avg_iv'] == pytest.approx(51.0)
+        assert trade['breakeven_lower'] == pytest.approx(100000 - 0.04 * 98000)
+        assert trade['expiry_ts'] == parse_expiry(trade['call_instrument'])[1]
+        
+        # 写入方已推进导入位置，读取时不会重复解析
+        assert store.sync_log() == 0
+        
+        migrated = TradeStore(db_path=tmp_path / "migrated.db", log_path=trade_logger.trade_log_file)
+        [reparsed] = migrated.successful_trades()
+        for key in ('trade_time', 'news_id', 'quantity', 'call_instrument', 'put_instrument',
+                    'call_entry_btc', 'put_entry_btc', 'call_iv', 'put_order_id', 'total_cost', 'is_virtual'):
+            assert reparsed[key] == pytest.approx(trade[key]) if isinstance(trade[key], float) else reparsed[key] == trade[key]
+    
+    def test_migrates_legacy_log_incrementally(self, tmp_path):
+        """旧日志一次性导入，之后只解析追加内容，未写完的记录等下次导入"""
+        log = tmp_path / "weighted_sentiment_trades.log"
+        log.write_text(LEGACY_ENTRY + FAILED_ENTRY, encoding='utf-8')
+        store = TradeStore(db_path=tmp_path / "trades.db", log_path=log, sync=False)
+        
+        assert store.sync_log() == 2
+        assert store.sync_log() == 0
+        
+        [legacy] = store.successful_trades(exclude_expiries=())
+        assert legacy['call_entry_btc'] == pytest.approx(0.02)
+        assert legacy['put_entry_btc'] == pytest.approx(0.015)
+        assert legacy['breakeven_upper'] == pytest.approx(70000 + 0.035 * 70000)
+        assert legacy['quantity'] is None
+        assert legacy['importance_score'] == 9
+        # 默认排除早期合约
+        assert store.successful_trades() == []
+        
+        # 半条记录：等写完再导入
+        partial, rest = LEGACY_ENTRY.replace("legacy-1", "legacy-2").split("现货价格")
+        with open(log, 'a', encoding='utf-8') as f:
+            f.write(partial)
+        assert store.sync_log() == 0
+        with open(log, 'a', encoding='utf-8') as f:
+            f.write("现货价格" + rest)
+        assert store.sync_log() == 1
+        
+        assert [t['news_id'] for t in store.recent_trades(successful_only=False)] == ["failed-1", "legacy-2", "legacy-1"]
+    
+    @pytest.mark.asyncio
+    async def test_open_positions_and_instruments(self, logger_and_store):
+        """未到期持仓按到期时间查询"""
+        trade_logger, store = logger_and_store
+        soon = datetime(2026, 5, 1, 8, 0)
+        later = datetime(2026, 6, 26, 8, 0)
+        for news_id, expiry, strike in (("a", soon, 90000.0), ("b", later, 95000.0)):
+            news, result = make_trade(news_id, datetime(2026, 4, 1, 12, 0), datetime.now() + timedelta(days=1), strike)
+            # 合约名决定到期时间
+            result.call_option.instrument_name = f"BTC-{expiry.strftime('%-d%b%y').upper()}-{int(strike)}-C"
+            result.put_option.instrument_name = f"BTC-{expiry.strftime('%-d%b%y').upper()}-{int(strike)}-P"
+            await trade_logger.log_trade(news, result)
+        
+        between = int(datetime(2026, 5, 10).timestamp() * 1000)
+        assert [t['news_id'] for t in store.open_positions(now_ms=between)] == ["b"]
+        assert len(store.open_positions(now_ms=0)) == 2
+        assert store.instruments() == ["BTC-1MAY26-90000-C", "BTC-1MAY26-90000-P", "BTC-26JUN26-95000-C", "BTC-26JUN26-95000-P"]
+
+
+@pytest.mark.asyncio
+async def test_cron_readers_use_store(tmp_path, monkeypatch):
+    """cron 脚本的读取函数从存储获取交易，字段与原日志解析一致"""
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    log = log_dir / "weighted_sentiment_trades.log"
+    log.write_text(LEGACY_ENTRY + FAILED_ENTRY, encoding='utf-8')
+    monkeypatch.setattr(trade_store, "DB_PATH", tmp_path / "trades.db")
+    for module in (pnl_updater, take_profit_monitor, news_impact_tracker, iv_collector):
+        monkeypatch.setattr(module, "TRADE_LOG", log)
+    
+    expiry = datetime.now() + timedelta(days=7)
+    news, result = make_trade("n1", datetime(2026, 4, 1, 12, 0), expiry)
+    await SimplifiedTradeLogger(log_dir=log_dir).log_trade(news, result, 50.0, 52.0)
+    
+    [pos] = pnl_updater.parse_trade_log()
+    assert pos == {
+        'trade_time': "2026-04-01T12:00:00",
+        'spot_price': 98000.0,
+        'call_instrument': result.call_option.instrument_name,
+        'put_instrument': result.put_option.instrument_name,
+        'call_entry_btc': 0.021,
+        'put_entry_btc': 0.019,
+        'total_cost': 392.0,
+        'is_virtual': False,
+        'quantity': 0.1,
+    }
+    
+    [active] = take_profit_monitor.parse_active_positions()
+    assert active['entry_spot'] == 98000.0
+    assert active['call_entry'] == 0.021
+    
+    [trade] = news_impact_tracker.parse_trades()
+    assert trade['score'] == "8.5/10"
+    assert trade['combo_id'] == "abc123"
+    
+    # IV 采集包括早期合约
+    assert len(iv_collector.get_active_instruments()) == 4
@@ -5,6 +5,8 @@
 import pytest
 import numpy as np
 from src.volatility.volatility_analyzer import VolatilityAnalyzer
+from src.pricing.options_engine import OptionsEngine
+from src.core.models import OptionType
 
 
 @pytest.fixture
@@ -179,3 +181,22 @@ def test_volatility_cone(analyzer, sample_prices):
         assert 'median' in item
         assert 'current' in item
         assert item['min'] <= item['median'] <= item['max']
+
+
+def test_volatility_surface_from_market_prices(analyzer, sample_option_data):
+    """测试由市场价格反解隐含波动率构建曲面"""
+    engine = OptionsEngine()
+    priced_data = []
+    for d in sample_option_data:
+        price = engine.black_scholes_price(45000, d['strike'], d['expiry'], 0.05, d['implied_vol'], OptionType.CALL)
+        priced_data.append({
+            'strike': d['strike'],
+            'expiry': d['expiry'],
+            'market_price': price,
+            'option_type': 'call'
+        })
+    
+    from_prices = analyzer.build_volatility_surface(priced_data, spot_price=45000)
+    from_vols = analyzer.build_volatility_surface(sample_option_data, spot_price=45000)
+    
+    np.testing.assert_allclose(from_prices['volatility'], from_vols['volatility'], atol=1e-6)
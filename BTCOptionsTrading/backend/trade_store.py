@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+加权情绪跨式交易记录存储
+Indexed SQLite store for weighted sentiment straddle trades
+
+SimplifiedTradeLogger 原来只把交易写入 logs/weighted_sentiment_trades.log，
+状态页和各个 cron 脚本（pnl_updater / take_profit_monitor / news_impact_tracker /
+iv_collector）每次都把整个日志读进内存，按 '='*80 分割后逐行解析。
+这里把每笔交易存为 SQLite 中的一行，读取方按索引查询：
+
+  - 成功交易按交易时间排序（idx_trades_success_time）
+  - 未到期持仓按到期时间过滤（idx_trades_expiry）
+
+文本日志继续保留（便于人工查看）。首次打开存储时自动导入已有日志，
+之后只解析上次导入位置之后追加的内容，按 (交易时间, 新闻ID) 去重，可以重复执行。
+
+使用方法：
+    store = TradeStore()
+    for trade in store.open_positions():
+        print(trade['call_instrument'], trade['put_instrument'])
+
+手动迁移旧日志：
+    python trade_store.py --migrate
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+DB_PATH = BASE_DIR / "data" / "weighted_sentiment_trades.db"
+TRADE_LOG = BASE_DIR / "logs" / "weighted_sentiment_trades.log"
+
+SEPARATOR = '=' * 80
+
+# 已清理的早期持仓（23MAR26 之前的合约），读取时默认排除
+EXCLUDED_EXPIRIES = ('27MAR26', '20MAR26')
+
+_EXPIRY_RE = re.compile(r'BTC-(\d{1,2})([A-Z]{3})(\d{2})-')
+
+COLUMNS = (
+    'trade_time', 'news_id', 'news_content', 'sentiment', 'importance_score',
+    'success', 'is_virtual', 'spot_price', 'combo_id',
+    'breakeven_lower', 'breakeven_upper', 'quantity',
+    'call_instrument', 'call_strike', 'call_entry_btc', 'call_iv', 'call_order_id',
+    'put_instrument', 'put_strike', 'put_entry_btc', 'put_iv', 'put_order_id',
+    'avg_iv', 'total_cost', 'error_message', 'expiry_code', 'expiry_ts',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trade_time TEXT NOT NULL,
+    news_id TEXT NOT NULL,
+    news_content TEXT,
+    sentiment TEXT,
+    importance_score REAL,
+    success INTEGER NOT NULL,
+    is_virtual INTEGER,
+    spot_price REAL,
+    combo_id TEXT,
+    breakeven_lower REAL,
+    breakeven_upper REAL,
+    quantity REAL,
+    call_instrument TEXT,
+    call_strike REAL,
+    call_entry_btc REAL,
+    call_iv REAL,
+    call_order_id TEXT,
+    put_instrument TEXT,
+    put_strike REAL,
+    put_entry_btc REAL,
+    put_iv REAL,
+    put_order_id TEXT,
+    avg_iv REAL,
+    total_cost REAL,
+    error_message TEXT,
+    expiry_code TEXT,
+    expiry_ts INTEGER,
+    UNIQUE (trade_time, news_id)
+);
+CREATE INDEX IF NOT EXISTS idx_trades_success_time ON trades (success, trade_time);
+CREATE INDEX IF NOT EXISTS idx_trades_expiry ON trades (success, expiry_ts);
+CREATE TABLE IF NOT EXISTS log_sync (
+    log_path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+def parse_expiry(instrument: str) -> tuple[Optional[str], Optional[int]]:
+    """
+    从合约名解析到期日
+
+    Returns:
+        (到期代码如 '27MAR26', 到期时间戳毫秒（08:00 UTC）)，无法解析时为 (None, None)
+    """
+    m = _EXPIRY_RE.search(instrument or '')
+    if not m:
+        return None, None
+    code = f"{m.group(1)}{m.group(2)}{m.group(3)}"
+    try:
+        expiry = datetime.strptime(
+            f"{m.group(1)}{m.group(2)}20{m.group(3)} 08:00", "%d%b%Y %H:%M"
+        ).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return code, None
+    return code, int(expiry.timestamp() * 1000)
+
+
+def _number(value: str) -> Optional[float]:
+    """'$65,000.00' / '0.1 BTC' / '55.00%' -> float"""
+    try:
+        return float(value.replace('$', '').replace(',', '').replace('BTC', '').replace('%', '').strip())
+    except ValueError:
+        return None
+
+
+def parse_log_entry(text: str) -> Optional[dict]:
+    """
+    解析一条交易日志（两条分隔线之间的内容）
+
+    兼容旧格式：没有“入场价(BTC)”时用“权利金”代替，没有“盈亏平衡”时由执行价和权利金计算。
+
+    Returns:
+        交易记录（字段见 COLUMNS），缺少交易时间或新闻 ID 时返回 None
+    """
+    trade = {}
+    side = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        key, value = key.strip(), value.strip()
+
+        if key == '交易时间':
+            trade['trade_time'] = value
+        elif key == '新闻 ID':
+            trade['news_id'] = value
+        elif key == '新闻内容':
+            trade['news_content'] = value
+        elif key == '情绪':
+            trade['sentiment'] = value
+        elif key == '重要性评分':
+            trade['importance_score'] = _number(value.split('/')[0])
+        elif key == '交易成功':
+            trade['success'] = value == 'True'
+        elif key == '虚拟交易':
+            trade['is_virtual'] = value == 'True'
+        elif key == '现货价格':
+            trade['spot_price'] = _number(value)
+        elif key == 'Combo ID':
+            trade['combo_id'] = value
+        elif key == '盈亏平衡' and '~' in value:
+            lower, upper = value.split('~', 1)
+            trade['breakeven_lower'] = _number(lower)
+            trade['breakeven_upper'] = _number(upper)
+        elif key == '下单数量':
+            trade['quantity'] = _number(value)
+        elif key == '看涨期权':
+            trade['call_instrument'] = value
+            side = 'call'
+        elif key == '看跌期权':
+            trade['put_instrument'] = value
+            side = 'put'
+        elif side and key == '执行价':
+            trade[f'{side}_strike'] = _number(value)
+        elif side and key == '入场价(BTC)':
+            trade[f'{side}_entry_btc'] = _number(value)
+        elif side and key == '权利金':
+            trade.setdefault(f'{side}_entry_btc', _number(value))
+        elif side and key == 'IV':
+            trade[f'{side}_iv'] = _number(value)
+        elif side and key == '订单 ID':
+            trade[f'{side}_order_id'] = value
+        elif key == '平均 IV':
+            trade['avg_iv'] = _number(value)
+        elif key == '总成本':
+            trade['total_cost'] = _number(value)
+        elif key == '错误信息':
+            trade['error_message'] = value
+
+    if 'trade_time' not in trade or 'news_id' not in trade:
+        return None
+    trade.setdefault('success', False)
+
+    if 'breakeven_lower' not in trade:
+        strike = trade.get('call_strike')
+        call_e, put_e = trade.get('call_entry_btc'), trade.get('put_entry_btc')
+        spot = trade.get('spot_price')
+        if strike and call_e and put_e and spot:
+            total_premium_usd = (call_e + put_e) * spot
+            trade['breakeven_lower'] = strike - total_premium_usd
+            trade['breakeven_upper'] = strike + total_premium_usd
+    return trade
+
+
+def select_fields(trade: dict, mapping: dict) -> dict:
+    """按 {输出字段: 列名} 取出非空字段（旧日志缺少的行在结果中同样缺省）"""
+    return {key: trade[column] for key, column in mapping.items() if trade.get(column) is not None}
+
+
+class TradeStore:
+    """交易记录的 SQLite 存储（写入方为 SimplifiedTradeLogger）"""
+
+    # 本进程内已初始化过的数据库
+    _initialized: set = set()
+
+    def __init__(self, db_path: Optional[Path] = None, log_path: Optional[Path] = TRADE_LOG, sync: bool = True):
+        """
+        Args:
+            db_path: 数据库路径，默认 DB_PATH
+            log_path: 文本交易日志路径（None 表示不导入日志）
+            sync: 查询前是否导入日志中新追加的记录
+        """
+        self.db_path = Path(db_path) if db_path is not None else DB_PATH
+        self.log_path = Path(log_path) if log_path is not None else None
+        self.sync = sync
+        if self.db_path not in TradeStore._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.executescript(_SCHEMA)
+            TradeStore._initialized.add(self.db_path)
+
+    @contextmanager
+    def _connect(self, write: bool = False):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if write:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            if write:
+                conn.execute("COMMIT")
+        except Exception:
+            if write and conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, trade: dict) -> bool:
+        row = {column: trade.get(column) for column in COLUMNS}
+        instrument = row['call_instrument'] or row['put_instrument']
+        if instrument and row['expiry_code'] is None:
+            row['expiry_code'], row['expiry_ts'] = parse_expiry(instrument)
+        for flag in ('success', 'is_virtual'):
+            if row[flag] is not None:
+                row[flag] = int(bool(row[flag]))
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO trades ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join(':' + c for c in COLUMNS)})",
+            row
+        )
+        return cursor.rowcount > 0
+
+    # ── 写入 ──────────────────────────────────────
+
+    def record(self, trade: dict, log_text: Optional[str] = None) -> bool:
+        """
+        保存一笔交易，可同时追加文本日志
+
+        日志追加和入库在同一个写事务中完成，并把导入位置移到日志末尾，
+        读取方不需要再解析这条记录。
+
+        Args:
+            trade: 交易记录（字段见 COLUMNS）
+            log_text: 要追加到文本日志的内容
+
+        Returns:
+            是否新插入（重复记录返回 False）
+        """
+        with self._connect(write=True) as conn:
+            if log_text is not None and self.log_path is not None:
+                self._sync_log(conn)
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(log_text)
+                self._set_offset(conn, self.log_path.stat().st_size)
+            return self._insert(conn, trade)
+
+    def sync_log(self) -> int:
+        """
+        导入文本日志中尚未入库的完整记录
+
+        Returns:
+            新导入的记录数
+        """
+        if self.log_path is None or not self.log_path.exists():
+            return 0
+        # 快速路径：日志没有新内容时不开写事务
+        with self._connect() as conn:
+            if self._get_offset(conn) == self.log_path.stat().st_size:
+                return 0
+        with self._connect(write=True) as conn:
+            return self._sync_log(conn)
+
+    def _get_offset(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT offset FROM log_sync WHERE log_path = ?", (str(self.log_path),)).fetchone()
+        return row['offset'] if row else 0
+
+    def _set_offset(self, conn: sqlite3.Connection, offset: int):
+        conn.execute(
+            "INSERT INTO log_sync (log_path, offset) VALUES (?, ?) "
+            "ON CONFLICT(log_path) DO UPDATE SET offset = excluded.offset",
+            (str(self.log_path), offset)
+        )
+
+    def _sync_log(self, conn: sqlite3.Connection) -> int:
+        if not self.log_path.exists():
+            return 0
+        offset = self._get_offset(conn)
+        size = self.log_path.stat().st_size
+        if size < offset:
+            # 日志被截断或轮转，从头导入（重复记录会被忽略）
+            offset = 0
+        if size == offset:
+            return 0
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read().decode('utf-8', errors='replace')
+
+        imported = 0
+        consumed = 0
+        while True:
+            start = data.find(SEPARATOR, consumed)
+            if start < 0:
+                break
+            end = data.find(SEPARATOR, start + len(SEPARATOR))
+            if end < 0:
+                break  # 记录尚未写完，下次再导入
+            trade = parse_log_entry(data[start + len(SEPARATOR):end])
+            if trade and self._insert(conn, trade):
+                imported += 1
+            consumed = end + len(SEPARATOR)
+            if data.startswith('\n', consumed):
+                consumed += 1
+
+        self._set_offset(conn, offset + len(data[:consumed].encode('utf-8')))
+        if imported:
+            logger.info(f"从交易日志导入 {imported} 条记录")
+        return imported
+
+    # ── 查询 ──────────────────────────────────────
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict]:
+        if self.sync:
+            try:
+                self.sync_log()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"导入交易日志失败: {e}")
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        trades = []
+        for row in rows:
+            trade = dict(row)
+            for flag in ('success', 'is_virtual'):
+                if trade.get(flag) is not None:
+                    trade[flag] = bool(trade[flag])
+            trades.append(trade)
+        return trades
+
+    @staticmethod
+    def _exclude_clause(exclude_expiries) -> tuple[str, tuple]:
+        if not exclude_expiries:
+            return "", ()
+        placeholders = ', '.join('?' * len(exclude_expiries))
+        return f" AND (expiry_code IS NULL OR expiry_code NOT IN ({placeholders}))", tuple(exclude_expiries)
+
+    def successful_trades(self, exclude_expiries=EXCLUDED_EXPIRIES, since: Optional[str] = None) -> list[dict]:
+        """
+        成功交易，按交易时间升序
+
+        Args:
+            exclude_expiries: 排除的到期代码
+            since: 只返回该时间（ISO 格式）之后的交易
+        """
+        clause, params = self._exclude_clause(exclude_expiries)
+        if since is not None:
+            clause += " AND trade_time >= ?"
+            params += (since,)
+        return self._query(f"SELECT * FROM trades WHERE success = 1{clause} ORDER BY trade_time, id", params)
+
+    def open_positions(self, now_ms: Optional[int] = None, exclude_expiries=EXCLUDED_EXPIRIES) -> list[dict]:
+        """
+        未到期的成功交易（到期日无法解析的记录视为未到期）
+
+        Args:
+            now_ms: 当前时间戳（毫秒），默认为现在
+            exclude_expiries: 排除的到期代码
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        clause, params = self._exclude_clause(exclude_expiries)
+        return self._query(
+            f"SELECT * FROM trades WHERE success = 1 AND (expiry_ts IS NULL OR expiry_ts > ?){clause} "
+            f"ORDER BY trade_time, id",
+            (now_ms,) + params
+        )
+
+    def recent_trades(self, limit: int = 20, successful_only: bool = True) -> list[dict]:
+        """最近的交易，最新在前"""
+        where = "WHERE success = 1 " if successful_only else ""
+        return self._query(f"SELECT * FROM trades {where}ORDER BY trade_time DESC, id DESC LIMIT ?", (limit,))
+
+    def instruments(self) -> list[str]:
+        """成功交易涉及的全部合约（去重排序）"""
+        rows = self._query(
+            "SELECT call_instrument AS name FROM trades WHERE success = 1 AND call_instrument IS NOT NULL "
+            "UNION SELECT put_instrument FROM trades WHERE success = 1 AND put_instrument IS NOT NULL "
+            "ORDER BY name"
+        )
+        return [row['name'] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="加权情绪交易记录存储")
+    parser.add_argument('--migrate', action='store_true', help="导入文本交易日志")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="数据库路径")
+    parser.add_argument('--log', type=Path, default=TRADE_LOG, help="交易日志路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = TradeStore(db_path=args.db, log_path=args.log, sync=False)
+    if args.migrate:
+        imported = store.sync_log()
+        print(f"导入 {imported} 条记录")
+    trades = store.successful_trades(exclude_expiries=())
+    print(f"成功交易: {len(trades)} 条，未到期: {len(store.open_positions(exclude_expiries=()))} 条")
+
+
+if __name__ == "__main__":
+    main()
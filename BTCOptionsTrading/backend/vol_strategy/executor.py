@@ -15,9 +15,12 @@ import logging
 import re
 import sqlite3
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 
+from instrument_index import load_instrument_index
+from market_snapshot import MarketSnapshot
+
 from . import config
 from .signal_engine import Signal
 
@@ -60,6 +63,8 @@ class Executor:
             trader: DeribitTrader 实例（已认证）
         """
         self.trader = trader
+        # 合约列表经共享快照缓存，ATM 查找走合约索引
+        self.snapshot = MarketSnapshot(base_url=self.DERIBIT_PUBLIC)
         self._init_db()
 
     def _init_db(self):
@@ -191,52 +196,19 @@ class Executor:
 
     async def _find_atm_options(self, spot_price: float) -> Tuple[Optional[str], Optional[str]]:
         """查找到期日在 EXPIRY_DAYS_MIN ~ EXPIRY_DAYS_MAX 之间、执行价最接近现货的 Call 和 Put"""
-        url = f"{self.DERIBIT_PUBLIC}/public/get_instruments"
-        params = {"currency": "BTC", "kind": "option", "expired": "false"}
-
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params,
-                                       timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    data = await resp.json()
-
-            now = datetime.now(timezone.utc)
-            min_exp = now + timedelta(days=config.EXPIRY_DAYS_MIN)
-            max_exp = now + timedelta(days=config.EXPIRY_DAYS_MAX)
+            index = await load_instrument_index(self.snapshot)
+            expiries = index.expiries_between(config.EXPIRY_DAYS_MIN, config.EXPIRY_DAYS_MAX)
 
-            calls, puts = [], []
-            for inst in data.get("result", []):
-                exp_ts = inst.get("expiration_timestamp", 0)
-                exp_dt = datetime.fromtimestamp(exp_ts / 1000, tz=timezone.utc)
-                if not (min_exp <= exp_dt <= max_exp):
-                    continue
-
-                strike = inst.get("strike", 0)
-                opt_type = inst.get("option_type", "")
-                name = inst.get("instrument_name", "")
-                diff = abs(strike - spot_price)
-
-                if opt_type == "call":
-                    calls.append((name, strike, diff, exp_dt))
-                elif opt_type == "put":
-                    puts.append((name, strike, diff, exp_dt))
-
-            if not calls or not puts:
+            # 优先选同一执行价的 Call/Put（真正的 ATM Straddle），两条腿同一到期日
+            pair = index.best_atm_pair(expiries, spot_price)
+            if pair is None:
                 logger.warning(f"未找到 {config.EXPIRY_DAYS_MIN}-{config.EXPIRY_DAYS_MAX} 天到期的期权")
                 return None, None
 
-            # 优先选同一执行价的 Call/Put（真正的 ATM Straddle）
-            calls.sort(key=lambda x: x[2])
-            puts.sort(key=lambda x: x[2])
-
-            best_call = calls[0]
-            # 找与 Call 执行价相同的 Put
-            same_strike_puts = [p for p in puts if p[1] == best_call[1]]
-            best_put = same_strike_puts[0] if same_strike_puts else puts[0]
-
-            logger.info(f"ATM Call: {best_call[0]} (strike={best_call[1]}, diff={best_call[2]:.0f})")
-            logger.info(f"ATM Put:  {best_put[0]}  (strike={best_put[1]}, diff={best_put[2]:.0f})")
-            return best_call[0], best_put[0]
+            logger.info(f"ATM Call: {pair.call} (strike={pair.call_strike}, diff={abs(pair.call_strike - spot_price):.0f})")
+            logger.info(f"ATM Put:  {pair.put}  (strike={pair.put_strike}, diff={abs(pair.put_strike - spot_price):.0f})")
+            return pair.call, pair.put
 
         except Exception as e:
             logger.error(f"查找 ATM 期权失败: {e}")
@@ -27,8 +27,13 @@ class PositionMonitor:
     DERIBIT_PUBLIC = "https://test.deribit.com/api/v2" if config.DERIBIT_TESTNET \
                      else "https://www.deribit.com/api/v2"
 
-    def __init__(self, trader):
+    # 行情存储中的 ticker 超过该秒数视为过期，改走 REST
+    STREAM_MAX_AGE = 10.0
+
+    def __init__(self, trader, market_store=None):
         self.trader = trader
+        # 可选的实时行情存储（src.connectors.deribit_stream.MarketDataStore），有新鲜数据时不再轮询 REST
+        self.market_store = market_store
         # 内存中记录每个持仓的历史最高 PnL（重启后从 0 开始，保守处理）
         self._peak_pnl: Dict[int, float] = {}
 
@@ -192,7 +197,16 @@ class PositionMonitor:
 
     # ── 辅助 ──────────────────────────────────────────
 
+    def _streamed_ticker(self, instrument_name: str) -> Optional[Dict]:
+        if self.market_store is None:
+            return None
+        return self.market_store.get_ticker(instrument_name, max_age=self.STREAM_MAX_AGE)
+
     async def _get_mark_price(self, instrument_name: str) -> float:
+        ticker = self._streamed_ticker(instrument_name)
+        if ticker and ticker.get("mark_price") is not None:
+            return float(ticker["mark_price"])
+
         url = f"{self.DERIBIT_PUBLIC}/public/ticker"
         try:
             async with aiohttp.ClientSession() as session:
@@ -204,6 +218,10 @@ class PositionMonitor:
             return 0.0
 
     async def _get_mark_iv(self, instrument_name: str) -> float:
+        ticker = self._streamed_ticker(instrument_name)
+        if ticker and ticker.get("mark_iv") is not None:
+            return float(ticker["mark_iv"]) / 100.0
+
         url = f"{self.DERIBIT_PUBLIC}/public/ticker"
         try:
             async with aiohttp.ClientSession() as session:
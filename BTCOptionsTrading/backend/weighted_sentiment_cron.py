@@ -14,7 +14,6 @@ Cron 配置示例：
 """
 
 import asyncio
-import aiohttp
 import importlib.util
 import logging
 import os
@@ -33,6 +32,9 @@ load_dotenv()
 from weighted_sentiment_api_client import NewsAPIClient
 from weighted_sentiment_news_tracker import NewsTracker
 from weighted_sentiment_models import WeightedNews, StraddleTradeResult, OptionTrade
+from market_snapshot import MarketSnapshot
+from instrument_index import load_instrument_index
+from trade_store import TradeStore
 
 # 直接导入 DeribitTrader，避免触发包的 __init__.py
 import importlib.util
@@ -93,6 +95,8 @@ class StraddleExecutor:
         
         # 主网公开API（无需认证，用于获取真实行情和IV）
         self.mainnet_url = "https://www.deribit.com/api/v2"
+        # 行情读取走共享快照缓存，与其他 cron 脚本共用同一次请求结果
+        self.snapshot = MarketSnapshot(base_url=self.mainnet_url)
     
     async def authenticate(self) -> bool:
         """认证 Deribit API
@@ -118,19 +122,10 @@ class StraddleExecutor:
     async def get_spot_price(self) -> float:
         """获取 BTC 现货价格（主网真实数据）"""
         try:
-            url = f"{self.mainnet_url}/public/get_index_price"
-            params = {"index_name": "btc_usd"}
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    if 'result' in data and 'index_price' in data['result']:
-                        price = data['result']['index_price']
-                        logger.info(f"获取 BTC 现货价格: ${price:.2f}")
-                        return price
-                    else:
-                        logger.error(f"获取现货价格失败: {data}")
-                        return 0.0
+            # 下单数量依赖现价：请求失败时不使用旧数据
+            price = await self.snapshot.get_index_price(max_stale=0)
+            logger.info(f"获取 BTC 现货价格: ${price:.2f}")
+            return price
         except Exception as e:
             logger.error(f"获取现货价格异常: {e}")
             return 0.0
@@ -138,100 +133,32 @@ class StraddleExecutor:
     async def find_atm_options(self, spot_price: float) -> tuple[Optional[str], Optional[str]]:
         """查找 ATM（平值）期权合约（主网真实数据）"""
         try:
-            url = f"{self.mainnet_url}/public/get_instruments"
-            params = {"currency": "BTC", "kind": "option", "expired": "false"}
+            index = await load_instrument_index(self.snapshot)
+            logger.info(f"合约索引: {len(index)} 个期权合约")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    if 'result' not in data:
-                        logger.error(f"获取合约列表失败: {data}")
-                        return None, None
-                    
-                    instruments = data['result']
-                    logger.info(f"获取到 {len(instruments)} 个期权合约")
-                    
-                    # 找到最接近现货价格的执行价格
-                    # 筛选出最近到期的合约（通常流动性更好）
-                    from datetime import datetime, timedelta
-                    
-                    # 目标：找距今最接近 3 天后到期的合约（保证每笔信号期权长度一致）
-                    # 由于 Deribit 不是每天都有合约，取所有到期日中最接近 +3 天的那个
-                    now = datetime.now()
-                    target_expiry = now + timedelta(days=3)
-
-                    # 先收集所有未来合约的到期日（去重）
-                    all_expiries = set()
-                    for inst in instruments:
-                        exp_ts = inst.get('expiration_timestamp')
-                        if exp_ts:
-                            all_expiries.add(datetime.fromtimestamp(exp_ts / 1000))
-
-                    # 只保留未来的到期日，找最接近 target_expiry 的
-                    future_expiries = sorted(e for e in all_expiries if e > now)
-                    if not future_expiries:
-                        logger.error("未找到任何未来到期合约")
-                        return None, None
-
-                    chosen_expiry = min(future_expiries, key=lambda e: abs((e - target_expiry).total_seconds()))
-                    logger.info(f"目标到期日: {target_expiry.strftime('%Y-%m-%d')}，"
-                                f"实际选用: {chosen_expiry.strftime('%Y-%m-%d')} "
-                                f"(距今 {(chosen_expiry - now).days} 天)")
-
-                    call_options = []
-                    put_options = []
-
-                    for inst in instruments:
-                        try:
-                            exp_ts = inst.get('expiration_timestamp')
-                            if not exp_ts:
-                                continue
-
-                            expiry_dt = datetime.fromtimestamp(exp_ts / 1000)
-
-                            # 只取 chosen_expiry 当天的合约
-                            if expiry_dt.date() != chosen_expiry.date():
-                                continue
-
-                            strike = inst.get('strike')
-                            option_type = inst.get('option_type')
-                            instrument_name = inst.get('instrument_name')
-
-                            if not all([strike, option_type, instrument_name]):
-                                continue
-
-                            price_diff = abs(strike - spot_price)
-
-                            if option_type == 'call':
-                                call_options.append((instrument_name, strike, price_diff, expiry_dt))
-                            elif option_type == 'put':
-                                put_options.append((instrument_name, strike, price_diff, expiry_dt))
-
-                        except Exception as e:
-                            logger.debug(f"解析合约失败: {e}")
-                            continue
-
-                    if not call_options or not put_options:
-                        logger.error(f"在 {chosen_expiry.strftime('%Y-%m-%d')} 未找到合适的期权合约")
-                        return None, None
-
-                    # 按与现货价差排序，选 ATM
-                    call_options.sort(key=lambda x: x[2])
-                    put_options.sort(key=lambda x: x[2])
-
-                    # 优先选同一执行价的 call/put（真正的 ATM straddle）
-                    best_call = call_options[0]
-                    same_strike_puts = [p for p in put_options if p[1] == best_call[1]]
-                    best_put = same_strike_puts[0] if same_strike_puts else put_options[0]
-
-                    call_instrument = best_call[0]
-                    put_instrument = best_put[0]
-
-                    logger.info(f"选择 ATM 期权:")
-                    logger.info(f"  看涨: {call_instrument} (执行价: {best_call[1]}, 价差: {best_call[2]:.0f})")
-                    logger.info(f"  看跌: {put_instrument} (执行价: {best_put[1]}, 价差: {best_put[2]:.0f})")
-                    
-                    return call_instrument, put_instrument
+            # 目标：找距今最接近 3 天后到期的合约（保证每笔信号期权长度一致）
+            # 由于 Deribit 不是每天都有合约，取所有到期日中最接近 +3 天的那个
+            expiry = index.nearest_expiry(days=3)
+            if expiry is None:
+                logger.error("未找到任何未来到期合约")
+                return None, None
+            
+            chosen_expiry = datetime.fromtimestamp(expiry / 1000)
+            logger.info(f"目标到期日: {(datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d')}，"
+                        f"实际选用: {chosen_expiry.strftime('%Y-%m-%d')} "
+                        f"(距今 {(chosen_expiry - datetime.now()).days} 天)")
+            
+            # 优先选同一执行价的 call/put（真正的 ATM straddle）
+            pair = index.atm_pair(expiry, spot_price)
+            if pair is None:
+                logger.error(f"在 {chosen_expiry.strftime('%Y-%m-%d')} 未找到合适的期权合约")
+                return None, None
+            
+            logger.info(f"选择 ATM 期权:")
+            logger.info(f"  看涨: {pair.call} (执行价: {pair.call_strike}, 价差: {abs(pair.call_strike - spot_price):.0f})")
+            logger.info(f"  看跌: {pair.put} (执行价: {pair.put_strike}, 价差: {abs(pair.put_strike - spot_price):.0f})")
+            
+            return pair.call, pair.put
         
         except Exception as e:
             logger.error(f"查找 ATM 期权异常: {e}")
@@ -240,19 +167,13 @@ class StraddleExecutor:
     async def get_option_price(self, instrument_name: str) -> float:
         """获取期权价格（主网真实数据）"""
         try:
-            url = f"{self.mainnet_url}/public/ticker"
-            params = {"instrument_name": instrument_name}
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    if 'result' in data and 'mark_price' in data['result']:
-                        price = data['result']['mark_price']
-                        logger.info(f"{instrument_name} 价格: {price}")
-                        return price
-                    else:
-                        logger.error(f"获取期权价格失败: {data}")
-                        return 0.0
+            ticker = await self.snapshot.get_ticker(instrument_name, max_stale=0)
+            price = ticker.get('mark_price')
+            if price is None:
+                logger.error(f"获取期权价格失败: {ticker}")
+                return 0.0
+            logger.info(f"{instrument_name} 价格: {price}")
+            return price
         except Exception as e:
             logger.error(f"获取期权价格异常: {e}")
             return 0.0
@@ -260,19 +181,13 @@ class StraddleExecutor:
     async def get_option_iv(self, instrument_name: str) -> float:
         """获取期权隐含波动率（主网真实数据）"""
         try:
-            url = f"{self.mainnet_url}/public/ticker"
-            params = {"instrument_name": instrument_name}
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    if 'result' in data and 'mark_iv' in data['result']:
-                        iv = data['result']['mark_iv']
-                        logger.info(f"{instrument_name} IV: {iv:.2f}%")
-                        return iv
-                    else:
-                        logger.warning(f"获取 IV 失败: {data}")
-                        return 0.0
+            ticker = await self.snapshot.get_ticker(instrument_name)
+            iv = ticker.get('mark_iv')
+            if iv is None:
+                logger.warning(f"获取 IV 失败: {ticker}")
+                return 0.0
+            logger.info(f"{instrument_name} IV: {iv:.2f}%")
+            return iv
         except Exception as e:
             logger.error(f"获取 IV 异常: {e}")
             return 0.0
@@ -581,6 +496,9 @@ class CalendarSpreadExecutor:
         near_put_price = await self.ex.get_option_price(near_put)
         far_call_price = await self.ex.get_option_price(far_call)
         far_put_price = await self.ex.get_option_price(far_put)
+        if min(near_call_price, near_put_price, far_call_price, far_put_price) <= 0:
+            logger.error("Calendar: 无法获取期权价格，跳过")
+            return None
 
         # 净成本（买远期 - 卖近期），正数表示净支出
         net_cost_btc = (far_call_price + far_put_price - near_call_price - near_put_price)
@@ -631,60 +549,14 @@ class CalendarSpreadExecutor:
     async def _find_atm_by_days(self, spot: float, target_days: int) -> tuple[Optional[str], Optional[str]]:
         """查找距今 target_days 天最近的 ATM 合约"""
         try:
-            url = f"{self.ex.mainnet_url}/public/get_instruments"
-            params = {"currency": "BTC", "kind": "option", "expired": "false"}
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    if 'result' not in data:
-                        return None, None
-
-                    now = datetime.now()
-                    target_expiry = now + timedelta(days=target_days)
-
-                    # 找最接近 target_days 的到期日
-                    expiries = set()
-                    for inst in data['result']:
-                        exp_ts = inst.get('expiration_timestamp')
-                        if exp_ts:
-                            expiries.add(datetime.fromtimestamp(exp_ts / 1000))
-
-                    future_expiries = sorted(e for e in expiries if e > now)
-                    if not future_expiries:
-                        return None, None
-
-                    chosen = min(future_expiries, key=lambda e: abs((e - target_expiry).total_seconds()))
-
-                    # 找 ATM
-                    calls, puts = [], []
-                    for inst in data['result']:
-                        exp_ts = inst.get('expiration_timestamp')
-                        if not exp_ts:
-                            continue
-                        if datetime.fromtimestamp(exp_ts / 1000).date() != chosen.date():
-                            continue
-                        strike = inst.get('strike')
-                        opt_type = inst.get('option_type')
-                        name = inst.get('instrument_name')
-                        if not all([strike, opt_type, name]):
-                            continue
-                        diff = abs(strike - spot)
-                        if opt_type == 'call':
-                            calls.append((name, strike, diff))
-                        elif opt_type == 'put':
-                            puts.append((name, strike, diff))
-
-                    if not calls or not puts:
-                        return None, None
-
-                    calls.sort(key=lambda x: x[2])
-                    puts.sort(key=lambda x: x[2])
-                    best_call = calls[0]
-                    same_strike_puts = [p for p in puts if p[1] == best_call[1]]
-                    best_put = same_strike_puts[0] if same_strike_puts else puts[0]
-
-                    logger.info(f"Calendar +{target_days}天: {best_call[0]} / {best_put[0]}")
-                    return best_call[0], best_put[0]
+            index = await load_instrument_index(self.ex.snapshot)
+            expiry = index.nearest_expiry(days=target_days)
+            pair = index.atm_pair(expiry, spot) if expiry is not None else None
+            if pair is None:
+                return None, None
+            
+            logger.info(f"Calendar +{target_days}天: {pair.call} / {pair.put}")
+            return pair.call, pair.put
         except Exception as e:
             logger.error(f"查找 +{target_days}天合约失败: {e}")
             return None, None
@@ -809,18 +681,24 @@ class TradeFilter:
 class SimplifiedTradeLogger:
     """简化版交易日志记录器
     
-    将交易记录写入日志文件，而不是数据库。
-    适合资源受限环境。
+    将交易记录写入本地 SQLite 交易存储（trade_store），同时追加文本日志便于人工查看。
+    读取方（状态页、cron 脚本）通过 TradeStore 按索引查询，不再解析日志。
     """
     
-    def __init__(self):
-        """初始化日志记录器"""
-        self.log_dir = Path(__file__).parent / "logs"
+    def __init__(self, log_dir: Optional[Path] = None, store: Optional[TradeStore] = None):
+        """初始化日志记录器
+        
+        Args:
+            log_dir: 日志目录，默认 backend/logs
+            store: 交易记录存储，默认写入 data/weighted_sentiment_trades.db
+        """
+        self.log_dir = Path(log_dir) if log_dir else Path(__file__).parent / "logs"
         self.log_dir.mkdir(exist_ok=True)
         self.trade_log_file = self.log_dir / "weighted_sentiment_trades.log"
+        self.store = store or TradeStore(log_path=self.trade_log_file)
     
     async def log_trade(self, news: WeightedNews, result: StraddleTradeResult, call_iv: float = 0.0, put_iv: float = 0.0):
-        """记录交易
+        """记录交易（写入交易存储，同时追加文本日志）
         
         Args:
             news: 触发交易的新闻
@@ -837,6 +715,14 @@ class SimplifiedTradeLogger:
             f"重要性评分: {news.importance_score}/10\n"
             f"交易成功: {result.success}\n"
         )
+        trade = {
+            'trade_time': result.trade_time.isoformat(),
+            'news_id': news.news_id,
+            'news_content': news.content,
+            'sentiment': news.sentiment,
+            'importance_score': news.importance_score,
+            'success': result.success,
+        }
         
         if result.success:
             avg_iv = (call_iv + put_iv) / 2 if call_iv > 0 and put_iv > 0 else 0.0
@@ -875,14 +761,33 @@ class SimplifiedTradeLogger:
                 f"平均 IV: {avg_iv:.2f}%\n"
                 f"总成本: ${result.total_cost:.2f}\n"
             )
+            trade.update({
+                'is_virtual': bool(is_virtual),
+                'spot_price': result.spot_price,
+                'combo_id': combo_id or None,
+                'breakeven_lower': be_lower,
+                'breakeven_upper': be_upper,
+                'quantity': result.call_option.quantity,
+                'call_instrument': result.call_option.instrument_name,
+                'call_strike': result.call_option.strike_price,
+                'call_entry_btc': call_entry_btc,
+                'call_iv': call_iv,
+                'call_order_id': result.call_option.order_id,
+                'put_instrument': result.put_option.instrument_name,
+                'put_strike': result.put_option.strike_price,
+                'put_entry_btc': put_entry_btc,
+                'put_iv': put_iv,
+                'put_order_id': result.put_option.order_id,
+                'avg_iv': avg_iv,
+                'total_cost': result.total_cost,
+            })
         else:
             log_entry += f"错误信息: {result.error_message}\n"
+            trade['error_message'] = result.error_message
         
         log_entry += f"{'='*80}\n"
         
-        # 写入文件
-        with open(self.trade_log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
+        self.store.record(trade, log_text=log_entry)
         
         logger.info(f"交易记录已保存: {news.news_id}")
 
@@ -20,6 +20,7 @@ from aiohttp import web
 from typing import List, Dict, Optional
 
 from weighted_sentiment_news_tracker import NewsTracker
+from trade_store import TradeStore, select_fields
 
 BASE_DIR = Path(__file__).parent
 
@@ -48,6 +49,7 @@ class MobileFriendlyStatusAPI:
         # 初始化组件
         self.news_tracker = NewsTracker()
         self.log_dir = Path(__file__).parent / "logs"
+        self.trade_store = TradeStore(log_path=self.log_dir / "weighted_sentiment_trades.log")
         self.db_path = Path(__file__).parent / "data" / "weighted_news_history.db"
         self.pnl_file = Path(__file__).parent / "data" / "pnl_history.json"
         self.impact_file = Path(__file__).parent / "data" / "news_impact.json"
@@ -158,127 +160,44 @@ class MobileFriendlyStatusAPI:
         )
     
     def _parse_trade_log(self) -> List[Dict]:
-        """解析交易日志，提取持仓和关联新闻"""
-        trade_log = self.log_dir / "weighted_sentiment_trades.log"
-        
-        if not trade_log.exists():
-            return []
-        
-        positions = []
-        
+        """读取成功交易（交易存储的索引查询），字段格式与原日志解析结果一致"""
         try:
-            with open(trade_log, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 按分隔符分割交易记录
-            trade_entries = content.split('='*80)
-            
-            for entry in trade_entries:
-                entry = entry.strip()
-                if not entry or '交易成功: True' not in entry:
-                    continue
-                
-                # 解析交易信息
-                position = {}
-                lines = entry.split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line or ':' not in line:
-                        continue
-                    
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == '交易时间':
-                        position['交易时间'] = value
-                    elif key == '新闻 ID':
-                        position['新闻ID'] = value
-                    elif key == '新闻内容':
-                        position['新闻内容'] = value
-                    elif key == '情绪':
-                        position['情绪'] = value
-                    elif key == '重要性评分':
-                        position['评分'] = value
-                    elif key == '虚拟交易':
-                        position['虚拟交易'] = value == 'True'
-                    elif key == 'Combo ID':
-                        position['combo_id'] = value
-                    elif key == '下单数量':
-                        try:
-                            position['quantity'] = float(value.replace(' BTC', ''))
-                        except Exception:
-                            pass
-                    elif key == '盈亏平衡':
-                        position['盈亏平衡'] = value  # 格式: "$65000.00 ~ $68000.00"
-                    elif key == '现货价格':
-                        position['现货价格'] = value
-                    elif key == '看涨期权':
-                        position['看涨合约'] = value
-                        position['_current_side'] = 'call'
-                    elif key == '看跌期权':
-                        position['看跌合约'] = value
-                        position['_current_side'] = 'put'
-                    elif key == '执行价':
-                        # 只取看涨期权的执行价（call/put 同执行价）
-                        if position.get('_current_side') == 'call' and '执行价' not in position:
-                            try:
-                                position['执行价'] = float(value.replace('$', '').replace(',', ''))
-                            except Exception:
-                                pass
-                    elif key == '入场价(BTC)':
-                        # 区分看涨/看跌（看涨期权行在前）
-                        if '看涨合约' in position and '看跌合约' not in position:
-                            position['call_entry_btc'] = value
-                        else:
-                            position['put_entry_btc'] = value
-                    elif key == '权利金':
-                        # 兼容旧日志（没有入场价字段，用权利金代替）
-                        try:
-                            btc_val = float(value.replace(' BTC', ''))
-                            side = position.get('_current_side')
-                            if side == 'call' and 'call_entry_btc' not in position:
-                                position['call_entry_btc'] = str(btc_val)
-                            elif side == 'put' and 'put_entry_btc' not in position:
-                                position['put_entry_btc'] = str(btc_val)
-                        except Exception:
-                            pass
-                    elif key == '平均 IV':
-                        position['平均IV'] = value
-                    elif key == '总成本':
-                        position['总成本'] = value                
-                if position and '新闻内容' in position:
-                    # 如果没有记录盈亏平衡，用已有数据实时计算
-                    if '盈亏平衡' not in position:
-                        try:
-                            strike = position.get('执行价')
-                            call_e = float(position.get('call_entry_btc', 0))
-                            put_e = float(position.get('put_entry_btc', 0))
-                            spot_str = position.get('现货价格', '0').replace('$', '').replace(',', '')
-                            spot = float(spot_str)
-                            if strike and call_e and put_e and spot:
-                                # 盈亏平衡 = 执行价 ± 总权利金(USD per BTC)
-                                # 不乘数量，因为盈亏平衡是价格概念
-                                total_prem_usd = (call_e + put_e) * spot
-                                be_lower = strike - total_prem_usd
-                                be_upper = strike + total_prem_usd
-                                position['盈亏平衡'] = f"${be_lower:.2f} ~ ${be_upper:.2f}"
-                        except Exception:
-                            pass
-                    positions.append(position)
-
-            # 只保留 23MAR26 及以后的合约（过滤掉已清理的早期持仓）
-            EXCLUDED = ('27MAR26', '20MAR26')
-            positions = [
-                p for p in positions
-                if not any(ex in p.get('看涨合约', '') for ex in EXCLUDED)
-            ]
-            return positions
-        
+            trades = self.trade_store.successful_trades()
         except Exception as e:
-            logger.error(f"解析交易日志失败: {e}")
+            logger.error(f"读取交易记录失败: {e}")
             return []
+        
+        positions = []
+        for trade in trades:
+            if trade['news_content'] is None:
+                continue
+            position = select_fields(trade, {
+                '交易时间': 'trade_time',
+                '新闻ID': 'news_id',
+                '新闻内容': 'news_content',
+                '情绪': 'sentiment',
+                '虚拟交易': 'is_virtual',
+                'combo_id': 'combo_id',
+                'quantity': 'quantity',
+                '看涨合约': 'call_instrument',
+                '看跌合约': 'put_instrument',
+                '执行价': 'call_strike',
+            })
+            if trade['importance_score'] is not None:
+                position['评分'] = f"{trade['importance_score']:g}/10"
+            if trade['spot_price'] is not None:
+                position['现货价格'] = f"${trade['spot_price']:.2f}"
+            if trade['breakeven_lower'] is not None:
+                position['盈亏平衡'] = f"${trade['breakeven_lower']:.2f} ~ ${trade['breakeven_upper']:.2f}"
+            for side in ('call', 'put'):
+                if trade[f'{side}_entry_btc'] is not None:
+                    position[f'{side}_entry_btc'] = str(trade[f'{side}_entry_btc'])
+            if trade['avg_iv'] is not None:
+                position['平均IV'] = f"{trade['avg_iv']:.2f}%"
+            if trade['total_cost'] is not None:
+                position['总成本'] = f"${trade['total_cost']:.2f}"
+            positions.append(position)
+        return positions
     
     async def handle_status(self, request):
         """处理状态查询请求 - 移动端优化"""
@@ -69,11 +69,13 @@ export const strategiesApi = {
       rho: number
     }
     initial_cost: number
-    max_profit: number
-    max_loss: number
+    max_profit: number | null
+    max_loss: number | null
     breakeven_points: number[]
-    risk_reward_ratio: number
+    risk_reward_ratio: number | null
     probability_of_profit?: number
+    unlimited_profit?: boolean
+    unlimited_loss?: boolean
   }> => {
     const response = await apiClient.post('/api/strategies/calculate-risk', data)
     return response.data
@@ -140,9 +140,11 @@ export interface RiskMetrics {
     rho: number
   }
   initial_cost: number
-  max_profit: number
-  max_loss: number
+  max_profit: number | null  // null表示无限
+  max_loss: number | null
   breakeven_points: number[]
-  risk_reward_ratio: number
+  risk_reward_ratio: number | null
   probability_of_profit?: number
+  unlimited_profit?: boolean
+  unlimited_loss?: boolean
 }
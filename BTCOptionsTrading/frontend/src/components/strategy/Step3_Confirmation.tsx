@@ -214,21 +214,21 @@ const Step3_Confirmation = ({
             <div className="p-3 bg-bg-primary rounded border border-text-disabled">
               <div className="text-xs text-text-secondary mb-1">风险收益比</div>
               <div className="text-lg font-semibold text-text-primary">
-                {riskMetrics.risk_reward_ratio.toFixed(2)}
+                {riskMetrics.risk_reward_ratio === null ? '∞' : riskMetrics.risk_reward_ratio.toFixed(2)}
               </div>
             </div>
             
             <div className="p-3 bg-bg-primary rounded border border-accent-green border-opacity-30">
               <div className="text-xs text-text-secondary mb-1">最大收益</div>
               <div className="text-lg font-semibold text-accent-green">
-                ${riskMetrics.max_profit === Infinity ? '无限' : riskMetrics.max_profit.toFixed(2)}
+                ${riskMetrics.max_profit === null ? '无限' : riskMetrics.max_profit.toFixed(2)}
               </div>
             </div>
             
             <div className="p-3 bg-bg-primary rounded border border-accent-red border-opacity-30">
               <div className="text-xs text-text-secondary mb-1">最大损失</div>
               <div className="text-lg font-semibold text-accent-red">
-                ${riskMetrics.max_loss === Infinity ? '无限' : Math.abs(riskMetrics.max_loss).toFixed(2)}
+                ${riskMetrics.max_loss === null ? '无限' : Math.abs(riskMetrics.max_loss).toFixed(2)}
               </div>
             </div>
           </div>
@@ -1,12 +1,13 @@
 """
 Backtesting API routes
 """
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 import sys
 import os
@@ -15,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 # Import only what we need to avoid dependency issues
 try:
     from backtesting.engine import BacktestEngine
+    from backtesting.optimizer import StrategyOptimizer, list_reports
     from core.data_models import MarketData
     BACKTESTING_AVAILABLE = True
 except ImportError as e:
@@ -39,6 +41,26 @@ class BacktestRequest(BaseModel):
     sentiment_weight: float = 0.4
     technical_weight: float = 0.6
     strategy_name: str = "Default Strategy"
+    fast_mode: bool = False
+
+
+class OptimizationRequest(BaseModel):
+    """Parameter sweep / walk-forward request model"""
+    symbol: str = "BTCUSDT"
+    days: int = 90
+    initial_capital: float = 10000.0
+    grid: Dict[str, List[float]]
+    base_parameters: Dict[str, Any] = {}
+    objective: str = "sharpe_ratio"
+    walk_forward: bool = False
+    train_days: int = 30
+    test_days: int = 7
+    step_days: Optional[int] = None
+    prune_fraction: float = 0.0
+    screening_fraction: float = 0.25
+    max_drawdown_limit: Optional[float] = None
+    max_workers: Optional[int] = Field(None, ge=1, le=os.cpu_count() or 1)
+    name: str = "Parameter Sweep"
 
 
 class BacktestResponse(BaseModel):
@@ -102,7 +124,8 @@ async def run_backtest(request: BacktestRequest):
             end_date=end_date,
             strategy_config=strategy_config,
             historical_data=historical_data,
-            strategy_name=request.strategy_name
+            strategy_name=request.strategy_name,
+            fast_mode=request.fast_mode
         )
         
         # Convert result to API format
@@ -161,6 +184,102 @@ async def run_backtest(request: BacktestRequest):
         )
 
 
+@router.post("/optimize", response_model=BacktestResponse)
+async def run_optimization(request: OptimizationRequest):
+    """
+    Sweep a grid of risk parameters, optionally walk-forward, in parallel
+    
+    Args:
+        request: Grid, objective and pruning/walk-forward settings
+    
+    Returns:
+        Saved report with the ranked leaderboard
+    """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting functionality is not available due to missing dependencies"
+        )
+    
+    try:
+        logger.info(f"Starting optimization '{request.name}' for {request.symbol} with {request.days} days")
+        
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=request.days)
+        historical_data = _generate_sample_market_data(request.symbol, start_date, end_date)
+        
+        optimizer = StrategyOptimizer(
+            historical_data,
+            initial_capital=request.initial_capital,
+            base_parameters=request.base_parameters,
+            objective=request.objective,
+            max_workers=request.max_workers
+        )
+        
+        if request.walk_forward:
+            run = lambda: optimizer.walk_forward(
+                request.grid, request.train_days, request.test_days, request.step_days,
+                name=request.name,
+                prune_fraction=request.prune_fraction,
+                screening_fraction=request.screening_fraction,
+                max_drawdown_limit=request.max_drawdown_limit
+            )
+        else:
+            run = lambda: optimizer.run_sweep(
+                request.grid,
+                name=request.name,
+                prune_fraction=request.prune_fraction,
+                screening_fraction=request.screening_fraction,
+                max_drawdown_limit=request.max_drawdown_limit
+            )
+        
+        # Worker processes do the backtests; keep the event loop free meanwhile
+        report = await asyncio.get_running_loop().run_in_executor(None, run)
+        
+        return BacktestResponse(
+            success=True,
+            message="Optimization completed successfully",
+            data=report.to_dict()
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running optimization: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run optimization: {str(e)}"
+        )
+
+
+@router.get("/optimizations")
+async def get_optimizations(limit: int = Query(20, ge=1, le=100)):
+    """
+    List saved optimization reports, newest first
+    
+    Returns:
+        Report summaries with their top leaderboard entries
+    """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting functionality is not available due to missing dependencies"
+        )
+    
+    reports = list_reports()[:limit]
+    return {
+        "success": True,
+        "message": f"Retrieved {len(reports)} optimization reports",
+        "data": [
+            {
+                **{key: report.get(key) for key in ('id', 'name', 'kind', 'objective', 'summary', 'created_at')},
+                'top': report.get('leaderboard', [])[:5]
+            }
+            for report in reports
+        ]
+    }
+
+
 @router.get("/status")
 async def get_backtest_status():
     """
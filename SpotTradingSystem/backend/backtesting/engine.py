@@ -5,9 +5,10 @@ Implements historical data backtesting with performance metrics calculation
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Sequence, Union
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from decimal import Decimal
 import uuid
 
@@ -24,6 +25,41 @@ from decision_engine.risk_parameters import RiskParameters
 
 logger = logging.getLogger(__name__)
 
+# DecisionEngine only returns BUY/SELL when |combined signal strength| > 0.3;
+# fast mode skips bars that cannot get there (margin covers its rounding)
+DECISION_STRENGTH_THRESHOLD = 0.3
+DECISION_STRENGTH_MARGIN = 0.01
+
+# Sentiment further than this from a bar is ignored
+SENTIMENT_MAX_AGE = timedelta(hours=6)
+
+
+class EquityCurve(Sequence):
+    """
+    (timestamp, value) pairs backed by a timestamp list and a NumPy value array
+    
+    Behaves like the List[Tuple[datetime, float]] produced by the regular
+    backtest loop (len, indexing, slicing, iteration) while keeping the
+    values in one array for vectorized metrics.
+    """
+    
+    def __init__(self, timestamps: List[datetime], values: np.ndarray):
+        if len(timestamps) != len(values):
+            raise ValueError("Timestamps and values must have the same length")
+        self.timestamps = timestamps
+        self.values = np.asarray(values, dtype=float)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EquityCurve(self.timestamps[index], self.values[index])
+        return self.timestamps[index], float(self.values[index])
+    
+    def __iter__(self):
+        return zip(self.timestamps, self.values.tolist())
+
 
 @dataclass
 class BacktestTrade:
@@ -133,8 +169,8 @@ class BacktestResult:
     performance_metrics: PerformanceMetrics
     trades: List[BacktestTrade]
     portfolio_history: List[Dict[str, Any]]
-    equity_curve: List[Tuple[datetime, float]]
-    drawdown_curve: List[Tuple[datetime, float]]
+    equity_curve: Union[List[Tuple[datetime, float]], EquityCurve]
+    drawdown_curve: Union[List[Tuple[datetime, float]], EquityCurve]
     created_at: datetime = field(default_factory=datetime.utcnow)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -174,7 +210,8 @@ class BacktestEngine:
                     strategy_config: Dict[str, Any],
                     historical_data: List[MarketData],
                     sentiment_data: Optional[List[Dict[str, Any]]] = None,
-                    strategy_name: str = "Default Strategy") -> BacktestResult:
+                    strategy_name: str = "Default Strategy",
+                    fast_mode: bool = False) -> BacktestResult:
         """
         Run complete backtest
         
@@ -185,6 +222,10 @@ class BacktestEngine:
             historical_data: Historical market data
             sentiment_data: Optional historical sentiment data
             strategy_name: Name of the strategy being tested
+            fast_mode: Precompute signals and only consult the decision engine
+                where a trade is possible. Trades and metrics are the same as
+                the bar-by-bar loop; equity/drawdown curves are EquityCurve
+                arrays and portfolio_history only holds the bars that traded.
             
         Returns:
             BacktestResult with complete results and metrics
@@ -199,6 +240,12 @@ class BacktestEngine:
         if len(filtered_data) < 2:
             raise ValueError(f"Insufficient historical data: only {len(filtered_data)} data points")
         
+        if fast_mode:
+            return self._run_backtest_fast(
+                backtest_id, start_date, end_date, strategy_config,
+                filtered_data, sentiment_data, strategy_name
+            )
+        
         # Initialize decision engine with strategy config
         risk_params = RiskParameters.from_dict(strategy_config.get('risk_parameters', {}))
         decision_engine = DecisionEngine(risk_params)
@@ -404,6 +451,231 @@ class BacktestEngine:
             contributing_indicators=["default"]
         )
     
+    def _run_backtest_fast(self, backtest_id: str,
+                          start_date: datetime,
+                          end_date: datetime,
+                          strategy_config: Dict[str, Any],
+                          filtered_data: List[MarketData],
+                          sentiment_data: Optional[List[Dict[str, Any]]],
+                          strategy_name: str) -> BacktestResult:
+        """Vectorized variant of run_backtest (see fast_mode)"""
+        risk_params = RiskParameters.from_dict(strategy_config.get('risk_parameters', {}))
+        decision_engine = DecisionEngine(risk_params)
+        
+        portfolio = Portfolio(
+            btc_balance=0.0,
+            usdt_balance=self.initial_capital,
+            total_value_usdt=self.initial_capital,
+            unrealized_pnl=0.0
+        )
+        
+        n = len(filtered_data)
+        timestamps = [d.timestamp for d in filtered_data]
+        prices = np.fromiter((d.price for d in filtered_data), dtype=float, count=n)
+        
+        # Signals for every bar up front
+        technical_strength, technical_confidence = self._technical_signal_series(prices)
+        sentiment_index, sentiment_values = self._align_sentiment(sentiment_data, timestamps)
+        combined_strength = (self._sentiment_strength(sentiment_values) * risk_params.sentiment_weight
+                             + technical_strength * risk_params.technical_weight)
+        candidates = np.flatnonzero(
+            np.abs(combined_strength) > DECISION_STRENGTH_THRESHOLD - DECISION_STRENGTH_MARGIN
+        )
+        
+        trades: List[BacktestTrade] = []
+        portfolio_history: List[Dict[str, Any]] = []
+        # Balances after each trade, applied from the following bar on
+        change_index = [0]
+        usdt_balances = [portfolio.usdt_balance]
+        btc_balances = [portfolio.btc_balance]
+        sentiment_cache: Dict[int, SentimentScore] = {}
+        
+        for i in candidates.tolist():
+            market_data = filtered_data[i]
+            try:
+                self._update_portfolio_value(portfolio, market_data.price)
+                
+                row = int(sentiment_index[i])
+                if row not in sentiment_cache:
+                    sentiment_cache[row] = self._sentiment_score_from_row(sentiment_data[row]) \
+                        if row >= 0 else self._generate_default_sentiment()
+                
+                market_analysis = decision_engine.analyze_market_conditions(
+                    sentiment_score=sentiment_cache[row],
+                    technical_signal=self._technical_signal_at(i, technical_strength, technical_confidence),
+                    portfolio=portfolio,
+                    current_price=market_data.price,
+                    market_data=filtered_data[max(0, i-24):i+1]
+                )
+                trading_decision = decision_engine.generate_trading_decision(market_analysis)
+                
+                if trading_decision.action != ActionType.HOLD:
+                    snapshot = self._portfolio_snapshot(portfolio, market_data)
+                    trade = self._execute_simulated_trade(trading_decision, portfolio, market_data)
+                    if trade:
+                        trades.append(trade)
+                        portfolio_history.append(snapshot)
+                        change_index.append(i + 1)
+                        usdt_balances.append(portfolio.usdt_balance)
+                        btc_balances.append(portfolio.btc_balance)
+                        decision_engine.update_trade_history(True)
+            
+            except Exception as e:
+                logger.error(f"Error processing data point {i} at {market_data.timestamp}: {e}")
+                continue
+        
+        # Equity is piecewise: balances only change at trades
+        segment = np.searchsorted(np.array(change_index), np.arange(n), side='right') - 1
+        equity = np.array(usdt_balances)[segment] + np.array(btc_balances)[segment] * prices
+        equity_curve = EquityCurve(timestamps, equity)
+        
+        performance_metrics = self._calculate_performance_metrics(
+            trades, equity_curve, start_date, end_date, self.initial_capital
+        )
+        
+        result = BacktestResult(
+            backtest_id=backtest_id,
+            strategy_name=strategy_name,
+            strategy_config=strategy_config,
+            performance_metrics=performance_metrics,
+            trades=trades,
+            portfolio_history=portfolio_history,
+            equity_curve=equity_curve,
+            drawdown_curve=self._calculate_drawdown_curve(equity_curve)
+        )
+        
+        logger.info(f"Backtest {backtest_id} (fast mode) completed: {n} bars, "
+                   f"{len(candidates)} evaluated, {len(trades)} trades, "
+                   f"{performance_metrics.total_return:.2%} return")
+        
+        return result
+    
+    def _portfolio_snapshot(self, portfolio: Portfolio, market_data: MarketData) -> Dict[str, Any]:
+        """Portfolio state record for portfolio_history"""
+        return {
+            'timestamp': market_data.timestamp.isoformat(),
+            'btc_balance': portfolio.btc_balance,
+            'usdt_balance': portfolio.usdt_balance,
+            'total_value_usdt': portfolio.total_value_usdt,
+            'unrealized_pnl': portfolio.unrealized_pnl,
+            'btc_price': market_data.price
+        }
+    
+    def _technical_signal_series(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signal strength and confidence of _generate_technical_signal for every bar
+        
+        Returns:
+            Tuple of (signal_strength, confidence) arrays
+        """
+        n = len(prices)
+        strength = np.zeros(n)
+        confidence = np.full(n, 0.5)
+        if n <= 20:
+            return strength, confidence
+        
+        short_windows = sliding_window_view(prices, 10)[11:]   # last 10 prices of bars 20..n-1
+        sma_short = short_windows.mean(axis=1)
+        sma_long = sliding_window_view(prices, 20)[1:].mean(axis=1)
+        
+        price_diff = (sma_short - sma_long) / sma_long
+        strength[20:] = np.clip(price_diff * 10, -1.0, 1.0)
+        
+        recent_returns = np.diff(short_windows, axis=1) / short_windows[:, :-1]
+        trend_consistency = 1.0 - recent_returns.std(axis=1) / (np.abs(recent_returns).mean(axis=1) + 1e-8)
+        confidence[20:] = np.clip(trend_consistency, 0.3, 0.9)
+        return strength, confidence
+    
+    def _technical_signal_at(self, index: int, strength: np.ndarray,
+                           confidence: np.ndarray) -> TechnicalSignal:
+        """TechnicalSignal for one bar from the precomputed series"""
+        if index < 20:
+            return TechnicalSignal(
+                signal_strength=0.0,
+                signal_type=ActionType.HOLD,
+                confidence=0.5,
+                contributing_indicators=["insufficient_data"]
+            )
+        
+        signal_strength = strength[index]
+        if signal_strength > 0.2:
+            signal_type = ActionType.BUY
+        elif signal_strength < -0.2:
+            signal_type = ActionType.SELL
+        else:
+            signal_type = ActionType.HOLD
+        
+        return TechnicalSignal(
+            signal_strength=signal_strength,
+            signal_type=signal_type,
+            confidence=confidence[index],
+            contributing_indicators=["sma_crossover", "trend_analysis"]
+        )
+    
+    def _align_sentiment(self, sentiment_data: Optional[List[Dict[str, Any]]],
+                        timestamps: List[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        As-of join of sentiment rows onto bars
+        
+        Picks the same row as _get_sentiment_for_timestamp (nearest in time,
+        earliest row on ties, within SENTIMENT_MAX_AGE) with a sort and
+        binary search instead of a scan per bar.
+        
+        Returns:
+            Tuple of (row index per bar or -1, sentiment value per bar)
+        """
+        n = len(timestamps)
+        if not sentiment_data:
+            return np.full(n, -1), np.full(n, 50.0)
+        
+        bar_us = self._epoch_microseconds(timestamps)
+        row_us = self._epoch_microseconds(
+            [datetime.fromisoformat(row['timestamp']) for row in sentiment_data]
+        )
+        order = np.argsort(row_us, kind='stable')
+        sorted_us = row_us[order]
+        
+        # First row at or after the bar, and first row of the run just before it
+        after = np.searchsorted(sorted_us, bar_us, side='left')
+        has_after = after < len(sorted_us)
+        has_before = after > 0
+        before = np.searchsorted(sorted_us, sorted_us[np.maximum(after - 1, 0)], side='left')
+        
+        big = np.iinfo(np.int64).max
+        after_gap = np.where(has_after, sorted_us[np.minimum(after, len(sorted_us) - 1)] - bar_us, big)
+        before_gap = np.where(has_before, bar_us - sorted_us[before], big)
+        after_row = order[np.minimum(after, len(sorted_us) - 1)]
+        before_row = order[before]
+        
+        use_before = (before_gap < after_gap) | ((before_gap == after_gap) & (before_row < after_row))
+        gap = np.where(use_before, before_gap, after_gap)
+        row = np.where(use_before, before_row, after_row)
+        row = np.where(gap < SENTIMENT_MAX_AGE // timedelta(microseconds=1), row, -1)
+        
+        values = np.array([float(r['sentiment_value']) for r in sentiment_data] + [50.0])
+        return row, values[row]
+    
+    @staticmethod
+    def _epoch_microseconds(timestamps: List[datetime]) -> np.ndarray:
+        """Integer microseconds for exact time differences (aware times in UTC)"""
+        return pd.to_datetime(timestamps).values.astype('datetime64[us]').astype(np.int64)
+    
+    @staticmethod
+    def _sentiment_strength(sentiment_values: np.ndarray) -> np.ndarray:
+        """DecisionEngine's sentiment signal strength (before rounding) for each value"""
+        return np.where(
+            sentiment_values <= 40, -(40 - sentiment_values) / 40,
+            np.where(sentiment_values >= 60, (sentiment_values - 60) / 40,
+                     (sentiment_values - 50) / 50 * 0.3)
+        )
+    
+    def _sentiment_score_from_row(self, row: Dict[str, Any]) -> SentimentScore:
+        return SentimentScore(
+            sentiment_value=row['sentiment_value'],
+            confidence=row['confidence'],
+            key_factors=row.get('key_factors', [])
+        )
+    
     def _execute_simulated_trade(self, decision: TradingDecision, 
                                portfolio: Portfolio, 
                                market_data: MarketData) -> Optional[BacktestTrade]:
@@ -532,7 +804,7 @@ class BacktestEngine:
             raise ValueError("No equity curve data available")
         
         final_capital = equity_curve[-1][1]
-        peak_capital = max(value for _, value in equity_curve)
+        peak_capital = float(np.max(self._equity_values(equity_curve)))
         
         # Basic metrics
         total_return = (final_capital - initial_capital) / initial_capital
@@ -573,8 +845,9 @@ class BacktestEngine:
         calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0.0
         
         # Sortino ratio
-        downside_returns = [r for r in returns if r < 0]
-        downside_deviation = np.std(downside_returns) * np.sqrt(252) if downside_returns else 0.0
+        returns = np.asarray(returns, dtype=float)
+        downside_returns = returns[returns < 0]
+        downside_deviation = np.std(downside_returns) * np.sqrt(252) if downside_returns.size else 0.0
         sortino_ratio = annualized_return / downside_deviation if downside_deviation > 0 else 0.0
         
         return PerformanceMetrics(
@@ -615,11 +888,22 @@ class BacktestEngine:
         """Calculate trade PnL"""
         return trade.portfolio_value_after - trade.portfolio_value_before
     
+    def _equity_values(self, equity_curve) -> np.ndarray:
+        """Equity values as an array (no copy for EquityCurve)"""
+        if isinstance(equity_curve, EquityCurve):
+            return equity_curve.values
+        return np.array([value for _, value in equity_curve], dtype=float)
+    
     def _calculate_returns(self, equity_curve: List[Tuple[datetime, float]]) -> List[float]:
         """Calculate daily returns from equity curve"""
         if len(equity_curve) < 2:
             return []
         
+        if isinstance(equity_curve, EquityCurve):
+            values = equity_curve.values
+            valid = values[:-1] > 0
+            return (values[1:][valid] - values[:-1][valid]) / values[:-1][valid]
+        
         values = [value for _, value in equity_curve]
         returns = []
         
@@ -635,6 +919,16 @@ class BacktestEngine:
         if len(equity_curve) < 2:
             return 0.0, 0
         
+        if isinstance(equity_curve, EquityCurve):
+            values = equity_curve.values
+            peak = np.maximum.accumulate(values)
+            # Bars since the last strictly new high (the first bar counts as one)
+            index = np.arange(len(values))
+            new_high = np.zeros(len(values), dtype=bool)
+            new_high[1:] = values[1:] > peak[:-1]
+            last_high = np.maximum.accumulate(np.where(new_high, index, -1))
+            return float(np.max((peak - values) / peak)), int(np.max(index - last_high))
+        
         values = [value for _, value in equity_curve]
         peak = values[0]
         max_drawdown = 0.0
@@ -658,6 +952,12 @@ class BacktestEngine:
         if len(equity_curve) < 2:
             return []
         
+        if isinstance(equity_curve, EquityCurve):
+            peak = np.maximum.accumulate(equity_curve.values)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                drawdown = np.where(peak > 0, (peak - equity_curve.values) / peak, 0.0)
+            return EquityCurve(equity_curve.timestamps, drawdown)
+        
         drawdown_curve = []
         peak = equity_curve[0][1]
         
@@ -0,0 +1,639 @@
+"""
+Strategy Optimizer
+Parallel parameter sweeps and walk-forward optimization for the backtesting engine
+"""
+import itertools
+import json
+import logging
+import math
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Tuple, Callable, Iterator
+import numpy as np
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models import MarketData
+from backtesting.engine import BacktestEngine
+from decision_engine.risk_parameters import RiskParameters
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVES = (
+    'sharpe_ratio', 'sortino_ratio', 'calmar_ratio',
+    'total_return', 'annualized_return', 'profit_factor', 'win_rate'
+)
+
+STATUS_COMPLETED = "completed"
+STATUS_PRUNED = "pruned"
+STATUS_FAILED = "failed"
+
+# Per-process state set up once by _init_worker; tasks only carry parameters
+_worker_engine: Optional[BacktestEngine] = None
+_worker_timestamps: Optional[np.ndarray] = None
+_worker_market_data: List[MarketData] = []
+_worker_sentiment: Optional[List[Dict[str, Any]]] = None
+
+
+def _pack_market_data(historical_data: List[MarketData]) -> Dict[str, Any]:
+    """Columnar, chronologically sorted copy of the market data for shipping to workers"""
+    data = sorted(historical_data, key=lambda d: d.timestamp)
+    return {
+        'timestamps': np.array([d.timestamp for d in data], dtype='datetime64[us]'),
+        'prices': np.fromiter((d.price for d in data), dtype=float, count=len(data)),
+        'volumes': np.fromiter((d.volume for d in data), dtype=float, count=len(data)),
+        'symbols': [d.symbol for d in data],
+        'sources': [d.source for d in data]
+    }
+
+
+def _init_worker(packed: Dict[str, Any], sentiment_data: Optional[List[Dict[str, Any]]],
+                 initial_capital: float):
+    """Pool initializer: rebuild the market data once per worker process"""
+    global _worker_engine, _worker_timestamps, _worker_market_data, _worker_sentiment
+    
+    _worker_engine = BacktestEngine(initial_capital=initial_capital)
+    _worker_timestamps = packed['timestamps']
+    _worker_market_data = [
+        MarketData(symbol=symbol, price=price, volume=volume, timestamp=timestamp, source=source)
+        for symbol, price, volume, timestamp, source in zip(
+            packed['symbols'], packed['prices'].tolist(), packed['volumes'].tolist(),
+            packed['timestamps'].astype(object), packed['sources']
+        )
+    ]
+    _worker_sentiment = sentiment_data
+
+
+def _run_task(task: Tuple[int, Dict[str, Any], datetime, datetime]) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Backtest one configuration on one window in a worker
+    
+    Returns:
+        Tuple of (task index, performance metrics dict or None, error or None)
+    """
+    index, risk_parameters, start_date, end_date = task
+    try:
+        # Hand run_backtest only the window (its date filter is inclusive)
+        lo = np.searchsorted(_worker_timestamps, np.datetime64(start_date, 'us'), side='left')
+        hi = np.searchsorted(_worker_timestamps, np.datetime64(end_date, 'us'), side='right')
+        
+        result = _worker_engine.run_backtest(
+            start_date=start_date,
+            end_date=end_date,
+            strategy_config={'risk_parameters': risk_parameters},
+            historical_data=_worker_market_data[lo:hi],
+            sentiment_data=_worker_sentiment,
+            strategy_name=f"sweep_{index}",
+            fast_mode=True
+        )
+        return index, result.performance_metrics.to_dict(), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+def expand_grid(grid: Dict[str, List[Any]],
+                base_parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into valid RiskParameters overrides
+    
+    When only one of sentiment_weight / technical_weight is swept, the other
+    is set to make them sum to 1. Combinations that RiskParameters rejects
+    (e.g. min confidence above high confidence) are dropped.
+    
+    Args:
+        grid: RiskParameters field name -> candidate values
+        base_parameters: Values for fields not in the grid (defaults otherwise)
+    
+    Returns:
+        List of parameter overrides, one per valid combination
+    """
+    base_parameters = base_parameters or {}
+    fields = set(RiskParameters().to_dict())
+    unknown = set(grid) - fields
+    if unknown:
+        raise ValueError(f"Unknown risk parameters: {', '.join(sorted(unknown))}")
+    
+    keys = list(grid)
+    combinations = []
+    skipped = 0
+    for values in itertools.product(*(grid[key] for key in keys)):
+        overrides = dict(zip(keys, values))
+        if 'sentiment_weight' in overrides and 'technical_weight' not in grid:
+            overrides['technical_weight'] = round(1.0 - overrides['sentiment_weight'], 10)
+        elif 'technical_weight' in overrides and 'sentiment_weight' not in grid:
+            overrides['sentiment_weight'] = round(1.0 - overrides['technical_weight'], 10)
+        try:
+            RiskParameters.from_dict({**base_parameters, **overrides})
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        combinations.append(overrides)
+    
+    if skipped:
+        logger.info(f"Skipped {skipped} invalid parameter combinations")
+    return combinations
+
+
+@dataclass
+class SweepResult:
+    """One configuration's entry on a leaderboard"""
+    config_id: str
+    parameters: Dict[str, Any]
+    status: str
+    score: Optional[float] = None
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    rank: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rank': self.rank,
+            'config_id': self.config_id,
+            'parameters': self.parameters,
+            'status': self.status,
+            'score': self.score,
+            'metrics': self.metrics,
+            'error': self.error
+        }
+
+
+@dataclass
+class WalkForwardFold:
+    """Parameters chosen on a training window and how they did on the next test window"""
+    fold: int
+    train_start: datetime
+    train_end: datetime
+    test_start: datetime
+    test_end: datetime
+    best_config_id: Optional[str]
+    best_parameters: Optional[Dict[str, Any]]
+    train_score: Optional[float]
+    test_metrics: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fold': self.fold,
+            'train_start': self.train_start.isoformat(),
+            'train_end': self.train_end.isoformat(),
+            'test_start': self.test_start.isoformat(),
+            'test_end': self.test_end.isoformat(),
+            'best_config_id': self.best_config_id,
+            'best_parameters': self.best_parameters,
+            'train_score': self.train_score,
+            'test_metrics': self.test_metrics
+        }
+
+
+@dataclass
+class OptimizationReport:
+    """Ranked leaderboard of a sweep or walk-forward run"""
+    id: str
+    name: str
+    kind: str  # "sweep" or "walk_forward"
+    objective: str
+    start_date: datetime
+    end_date: datetime
+    settings: Dict[str, Any]
+    leaderboard: List[SweepResult]
+    folds: List[WalkForwardFold] = field(default_factory=list)
+    summary: Dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    
+    @property
+    def best(self) -> Optional[SweepResult]:
+        """Top-ranked completed configuration"""
+        for entry in self.leaderboard:
+            if entry.status == STATUS_COMPLETED:
+                return entry
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'kind': self.kind,
+            'objective': self.objective,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'settings': self.settings,
+            'summary': _finite_or_none(self.summary),
+            'leaderboard': [_finite_or_none(entry.to_dict()) for entry in self.leaderboard],
+            'folds': [_finite_or_none(fold.to_dict()) for fold in self.folds],
+            'created_at': self.created_at.isoformat()
+        }
+    
+    def save(self, results_dir: str) -> str:
+        """Save report to disk as <id>.json"""
+        os.makedirs(results_dir, exist_ok=True)
+        report_path = os.path.join(results_dir, f"{self.id}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        
+        logger.info(f"Saved optimization report: {self.name} ({report_path})")
+        return report_path
+
+
+def _finite_or_none(value: Any) -> Any:
+    """Replace inf/NaN (e.g. profit_factor with no losing trades) with None, which JSON can hold"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_or_none(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite_or_none(item) for item in value]
+    return value
+
+
+def list_reports(results_dir: str = "optimizations") -> List[Dict[str, Any]]:
+    """Load all saved reports, newest first"""
+    reports = []
+    if not os.path.isdir(results_dir):
+        return reports
+    
+    for filename in os.listdir(results_dir):
+        if filename.endswith('.json'):
+            report_path = os.path.join(results_dir, filename)
+            try:
+                with open(report_path, 'r', encoding='utf-8') as f:
+                    reports.append(json.load(f))
+            except Exception as e:
+                logger.error(f"Error loading optimization report {filename}: {e}")
+    
+    reports.sort(key=lambda report: report.get('created_at', ''), reverse=True)
+    return reports
+
+
+class StrategyOptimizer:
+    """
+    Runs many backtest configurations over the same market data
+    
+    Market data is packed into arrays and handed to each worker process once
+    through the pool initializer; a task is just (parameters, date window),
+    so nothing large is pickled per configuration. Backtests use the
+    engine's fast mode.
+    """
+    
+    def __init__(self,
+                 historical_data: List[MarketData],
+                 sentiment_data: Optional[List[Dict[str, Any]]] = None,
+                 initial_capital: float = 10000.0,
+                 base_parameters: Optional[Dict[str, Any]] = None,
+                 objective: str = 'sharpe_ratio',
+                 max_workers: Optional[int] = None,
+                 results_dir: str = "optimizations"):
+        """
+        Initialize the optimizer
+        
+        Args:
+            historical_data: Market data shared by every run
+            sentiment_data: Optional historical sentiment data
+            initial_capital: Starting capital for each run
+            base_parameters: RiskParameters values for fields not being swept
+            objective: PerformanceMetrics field to maximize
+            max_workers: Worker processes (default and maximum CPU count; 1 runs in-process)
+            results_dir: Directory for saved reports
+        """
+        if not historical_data:
+            raise ValueError("Historical data cannot be empty")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {objective}. Use one of {', '.join(OBJECTIVES)}")
+        
+        self._packed = _pack_market_data(historical_data)
+        self.sentiment_data = sentiment_data
+        self.initial_capital = initial_capital
+        self.base_parameters = base_parameters or {}
+        self.objective = objective
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = max(1, min(max_workers or cpu_count, cpu_count))
+        self.results_dir = results_dir
+        
+        timestamps = self._packed['timestamps']
+        self.start_date = timestamps[0].astype(datetime)
+        self.end_date = timestamps[-1].astype(datetime)
+        
+        logger.info(f"Strategy optimizer initialized with {len(timestamps)} data points, "
+                   f"objective {objective}, {self.max_workers} workers")
+    
+    @contextmanager
+    def _pool(self) -> Iterator[Callable]:
+        """Yield a map function over tasks, backed by a process pool initialized once"""
+        initargs = (self._packed, self.sentiment_data, self.initial_capital)
+        if self.max_workers == 1:
+            _init_worker(*initargs)
+            yield lambda tasks: list(map(_run_task, tasks))
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=_init_worker, initargs=initargs) as executor:
+            def run(tasks):
+                chunksize = max(1, len(tasks) // (self.max_workers * 4))
+                return list(executor.map(_run_task, tasks, chunksize=chunksize))
+            yield run
+    
+    def _score(self, metrics: Dict[str, Any]) -> float:
+        # A run that never traded has nothing to rank (its profit_factor is inf)
+        value = metrics.get(self.objective)
+        if not metrics.get('total_trades') or value is None or not math.isfinite(value):
+            return float('-inf')
+        return float(value)
+    
+    def _evaluate(self, run: Callable, configs: List[Dict[str, Any]],
+                  start_date: datetime, end_date: datetime,
+                  prune_fraction: float, screening_fraction: float,
+                  max_drawdown_limit: Optional[float]) -> List[SweepResult]:
+        """
+        Backtest every configuration on a window and rank them
+        
+        With pruning enabled, every configuration is first run on the leading
+        screening_fraction of the window; those breaching max_drawdown_limit or
+        scoring in the bottom prune_fraction are not run on the full window.
+        """
+        results = {
+            i: SweepResult(config_id=f"cfg_{i:04d}", parameters=overrides, status=STATUS_COMPLETED)
+            for i, overrides in enumerate(configs)
+        }
+        survivors = list(results)
+        
+        if prune_fraction > 0 or max_drawdown_limit is not None:
+            screening_end = start_date + (end_date - start_date) * screening_fraction
+            screened = []
+            for i, metrics, error in run([
+                (i, {**self.base_parameters, **configs[i]}, start_date, screening_end) for i in survivors
+            ]):
+                entry = results[i]
+                if error is not None:
+                    entry.status, entry.error = STATUS_FAILED, error
+                    continue
+                entry.metrics, entry.score = metrics, self._score(metrics)
+                if max_drawdown_limit is not None and metrics['max_drawdown'] > max_drawdown_limit:
+                    entry.status = STATUS_PRUNED
+                else:
+                    screened.append(i)
+            
+            screened.sort(key=lambda i: results[i].score)
+            cut = int(len(screened) * prune_fraction)
+            for i in screened[:cut]:
+                results[i].status = STATUS_PRUNED
+            survivors = screened[cut:]
+            logger.info(f"Screening kept {len(survivors)} of {len(configs)} configurations")
+        
+        for i, metrics, error in run([
+            (i, {**self.base_parameters, **configs[i]}, start_date, end_date) for i in survivors
+        ]):
+            entry = results[i]
+            if error is not None:
+                entry.status, entry.error = STATUS_FAILED, error
+            else:
+                entry.metrics, entry.score = metrics, self._score(metrics)
+        
+        return self._rank(list(results.values()))
+    
+    @staticmethod
+    def _rank(entries: List[SweepResult]) -> List[SweepResult]:
+        """Completed first, then pruned (by screening score), then failed"""
+        order = {STATUS_COMPLETED: 0, STATUS_PRUNED: 1, STATUS_FAILED: 2}
+        entries.sort(key=lambda e: (order[e.status],
+                                    -e.score if e.score is not None else math.inf,
+                                    e.config_id))
+        for rank, entry in enumerate(entries, 1):
+            entry.rank = rank
+        return entries
+    
+    def run_sweep(self, grid: Dict[str, List[Any]],
+                 start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None,
+                 name: str = "Parameter Sweep",
+                 prune_fraction: float = 0.0,
+                 screening_fraction: float = 0.25,
+                 max_drawdown_limit: Optional[float] = None,
+                 save: bool = True) -> OptimizationReport:
+        """
+        Backtest every grid combination and rank by the objective
+        
+        Args:
+            grid: RiskParameters field name -> candidate values
+            start_date: Sweep start (default first data point)
+            end_date: Sweep end (default last data point)
+            name: Report name
+            prune_fraction: Share of screened configurations to drop (0 disables)
+            screening_fraction: Leading share of the window used for screening
+            max_drawdown_limit: Drop configurations whose screening drawdown exceeds this
+            save: Persist the report to results_dir
+        
+        Returns:
+            OptimizationReport with the ranked leaderboard
+        """
+        self._validate_pruning(prune_fraction, screening_fraction)
+        start_date = start_date or self.start_date
+        end_date = end_date or self.end_date
+        configs = expand_grid(grid, self.base_parameters)
+        if not configs:
+            raise ValueError("Parameter grid has no valid combinations")
+        
+        logger.info(f"Starting sweep '{name}': {len(configs)} configurations")
+        
+        with self._pool() as run:
+            leaderboard = self._evaluate(run, configs, start_date, end_date,
+                                         prune_fraction, screening_fraction, max_drawdown_limit)
+        
+        report = OptimizationReport(
+            id=str(uuid.uuid4()),
+            name=name,
+            kind="sweep",
+            objective=self.objective,
+            start_date=start_date,
+            end_date=end_date,
+            settings={
+                'grid': grid,
+                'base_parameters': self.base_parameters,
+                'initial_capital': self.initial_capital,
+                'prune_fraction': prune_fraction,
+                'screening_fraction': screening_fraction,
+                'max_drawdown_limit': max_drawdown_limit
+            },
+            leaderboard=leaderboard,
+            summary=self._status_counts(leaderboard)
+        )
+        
+        if save:
+            report.save(self.results_dir)
+        
+        best = report.best
+        logger.info(f"Sweep '{name}' completed: best {best.config_id if best else None} "
+                   f"({self.objective}={best.score if best else None})")
+        return report
+    
+    def walk_forward(self, grid: Dict[str, List[Any]],
+                    train_days: int,
+                    test_days: int,
+                    step_days: Optional[int] = None,
+                    start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None,
+                    name: str = "Walk-Forward Optimization",
+                    prune_fraction: float = 0.0,
+                    screening_fraction: float = 0.25,
+                    max_drawdown_limit: Optional[float] = None,
+                    save: bool = True) -> OptimizationReport:
+        """
+        Walk-forward optimization
+        
+        For each fold the grid is swept on a training window and the best
+        configuration is backtested on the test window that follows it.
+        Windows advance by step_days (default test_days).
+        
+        Args:
+            grid: RiskParameters field name -> candidate values
+            train_days: Training window length in days
+            test_days: Test window length in days
+            step_days: Offset between folds in days (default test_days)
+            start_date: First training window start (default first data point)
+            end_date: Last test window end (default last data point)
+            name: Report name
+            prune_fraction: See run_sweep (applied to each training sweep)
+            screening_fraction: See run_sweep
+            max_drawdown_limit: See run_sweep
+            save: Persist the report to results_dir
+        
+        Returns:
+            OptimizationReport with folds, out-of-sample summary and a
+            leaderboard ranked by mean training score
+        """
+        self._validate_pruning(prune_fraction, screening_fraction)
+        if train_days <= 0 or test_days <= 0 or (step_days is not None and step_days <= 0):
+            raise ValueError("Window lengths must be positive")
+        
+        start_date = start_date or self.start_date
+        end_date = end_date or self.end_date
+        train = timedelta(days=train_days)
+        test = timedelta(days=test_days)
+        step = timedelta(days=step_days or test_days)
+        # Windows are inclusive at both ends in run_backtest
+        just_before = timedelta(microseconds=1)
+        
+        windows = []
+        fold_start = start_date
+        while fold_start + train + test <= end_date + just_before:
+            windows.append((fold_start, fold_start + train - just_before,
+                            fold_start + train, fold_start + train + test - just_before))
+            fold_start += step
+        if not windows:
+            raise ValueError("Date range is too short for a single train/test fold")
+        
+        configs = expand_grid(grid, self.base_parameters)
+        if not configs:
+            raise ValueError("Parameter grid has no valid combinations")
+        
+        logger.info(f"Starting walk-forward '{name}': {len(configs)} configurations, {len(windows)} folds")
+        
+        folds: List[WalkForwardFold] = []
+        train_scores: Dict[str, List[float]] = {}
+        statuses: Dict[str, set] = {}
+        with self._pool() as run:
+            for number, (train_start, train_end, test_start, test_end) in enumerate(windows, 1):
+                ranked = self._evaluate(run, configs, train_start, train_end,
+                                        prune_fraction, screening_fraction, max_drawdown_limit)
+                for entry in ranked:
+                    statuses.setdefault(entry.config_id, set()).add(entry.status)
+                    if entry.status == STATUS_COMPLETED:
+                        train_scores.setdefault(entry.config_id, []).append(entry.score)
+                
+                best = next((e for e in ranked if e.status == STATUS_COMPLETED), None)
+                fold = WalkForwardFold(
+                    fold=number,
+                    train_start=train_start,
+                    train_end=train_end,
+                    test_start=test_start,
+                    test_end=test_end,
+                    best_config_id=best.config_id if best else None,
+                    best_parameters=best.parameters if best else None,
+                    train_score=best.score if best else None
+                )
+                if best is not None:
+                    [(_, metrics, error)] = run([
+                        (0, {**self.base_parameters, **best.parameters}, test_start, test_end)
+                    ])
+                    fold.test_metrics = metrics if error is None else {'error': error}
+                folds.append(fold)
+        
+        leaderboard = []
+        for i, overrides in enumerate(configs):
+            config_id = f"cfg_{i:04d}"
+            # Folds without trades score -inf; a config idle in every fold ranks last
+            scores = [s for s in train_scores.get(config_id, []) if math.isfinite(s)]
+            score = None
+            if config_id in train_scores:
+                status = STATUS_COMPLETED
+                score = float(np.mean(scores)) if scores else float('-inf')
+            elif STATUS_PRUNED in statuses.get(config_id, ()):
+                status = STATUS_PRUNED
+            else:
+                status = STATUS_FAILED
+            leaderboard.append(SweepResult(
+                config_id=config_id,
+                parameters=overrides,
+                status=status,
+                score=score,
+                metrics={
+                    'folds_completed': len(train_scores.get(config_id, [])),
+                    'folds_selected': sum(1 for f in folds if f.best_config_id == config_id)
+                }
+            ))
+        
+        tested = [f.test_metrics for f in folds if 'total_return' in f.test_metrics]
+        summary = {
+            'folds': len(folds),
+            'folds_tested': len(tested),
+            'out_of_sample_return': float(np.prod([1 + m['total_return'] for m in tested]) - 1) if tested else None,
+            f'mean_test_{self.objective}': float(np.mean([m[self.objective] for m in tested])) if tested else None
+        }
+        
+        report = OptimizationReport(
+            id=str(uuid.uuid4()),
+            name=name,
+            kind="walk_forward",
+            objective=self.objective,
+            start_date=start_date,
+            end_date=end_date,
+            settings={
+                'grid': grid,
+                'base_parameters': self.base_parameters,
+                'initial_capital': self.initial_capital,
+                'train_days': train_days,
+                'test_days': test_days,
+                'step_days': step_days or test_days,
+                'prune_fraction': prune_fraction,
+                'screening_fraction': screening_fraction,
+                'max_drawdown_limit': max_drawdown_limit
+            },
+            leaderboard=self._rank(leaderboard),
+            folds=folds,
+            summary=summary
+        )
+        
+        if save:
+            report.save(self.results_dir)
+        
+        logger.info(f"Walk-forward '{name}' completed: {len(folds)} folds, "
+                   f"out-of-sample return {summary['out_of_sample_return']}")
+        return report
+    
+    @staticmethod
+    def _validate_pruning(prune_fraction: float, screening_fraction: float):
+        if not 0 <= prune_fraction < 1:
+            raise ValueError("Prune fraction must be between 0 and 1")
+        if not 0 < screening_fraction <= 1:
+            raise ValueError("Screening fraction must be between 0 and 1")
+    
+    @staticmethod
+    def _status_counts(leaderboard: List[SweepResult]) -> Dict[str, int]:
+        return {
+            'configurations': len(leaderboard),
+            STATUS_COMPLETED: sum(1 for e in leaderboard if e.status == STATUS_COMPLETED),
+            STATUS_PRUNED: sum(1 for e in leaderboard if e.status == STATUS_PRUNED),
+            STATUS_FAILED: sum(1 for e in leaderboard if e.status == STATUS_FAILED)
+        }
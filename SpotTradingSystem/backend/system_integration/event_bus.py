@@ -4,10 +4,12 @@ Implements event-driven architecture for system communication
 """
 import logging
 import asyncio
-from typing import Dict, List, Callable, Any, Optional, Set
+import contextvars
+from typing import Dict, List, Callable, Any, Optional, Set, Tuple, FrozenSet
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from collections import deque
 import json
 import uuid
 from concurrent.futures import ThreadPoolExecutor
@@ -15,6 +17,11 @@ import threading
 
 logger = logging.getLogger(__name__)
 
+# Handlers whose execution the current publish is nested in (see EventBus._dispatch)
+_dispatch_chain: contextvars.ContextVar[FrozenSet[str]] = contextvars.ContextVar(
+    'event_bus_dispatch_chain', default=frozenset()
+)
+
 
 class EventType(Enum):
     """System event types"""
@@ -108,27 +115,39 @@ class Event:
 
 
 class EventHandler:
-    """Event handler wrapper"""
+    """
+    Event handler wrapper
+    
+    Events are delivered through a bounded queue per event loop, drained by a
+    worker task, so each handler sees its events in order and a slow handler
+    only holds up its own queue.
+    """
     
     def __init__(self, handler: Callable[[Event], Any], 
                  event_types: Set[EventType],
                  async_handler: bool = False,
-                 priority: int = 0):
+                 priority: int = 0,
+                 max_queue_size: int = 100):
         self.handler = handler
         self.event_types = event_types
         self.async_handler = async_handler
         self.priority = priority
+        self.max_queue_size = max_queue_size
         self.handler_id = str(uuid.uuid4())
         self.call_count = 0
         self.error_count = 0
         self.last_called = None
         self.last_error = None
+        self.closed = False
+        
+        # Event loop -> (queue, worker task)
+        self.workers: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Queue, asyncio.Task]] = {}
     
     def can_handle(self, event: Event) -> bool:
         """Check if this handler can handle the event"""
         return event.event_type in self.event_types
     
-    async def handle(self, event: Event) -> Any:
+    async def handle(self, event: Event, executor: Optional[ThreadPoolExecutor] = None) -> Any:
         """Handle the event"""
         try:
             self.call_count += 1
@@ -139,8 +158,8 @@ class EventHandler:
                     result = await self.handler(event)
                 else:
                     # Run sync handler in thread pool
-                    loop = asyncio.get_event_loop()
-                    result = await loop.run_in_executor(None, self.handler, event)
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(executor, self.handler, event)
             else:
                 result = self.handler(event)
             
@@ -161,6 +180,8 @@ class EventHandler:
             'call_count': self.call_count,
             'error_count': self.error_count,
             'success_rate': (self.call_count - self.error_count) / self.call_count if self.call_count > 0 else 0,
+            'queued_events': sum(queue.qsize() for queue, _ in list(self.workers.values())),
+            'max_queue_size': self.max_queue_size,
             'last_called': self.last_called.isoformat() if self.last_called else None,
             'last_error': self.last_error
         }
@@ -169,23 +190,37 @@ class EventHandler:
 class EventBus:
     """
     Event bus for system-wide event handling
+    
+    Matching handlers run concurrently, each fed by its own bounded queue:
+    a slow handler delays only its own events, and publishers wait (rather
+    than pile up events) when a handler's queue is full.
     """
     
-    def __init__(self, max_workers: int = 10):
+    def __init__(self, max_workers: int = 10, max_history: int = 1000):
         """
         Initialize event bus
         
         Args:
             max_workers: Maximum number of worker threads
+            max_history: Number of recent events kept in event_history
         """
         self.handlers: List[EventHandler] = []
-        self.event_history: List[Event] = []
-        self.max_history = 1000
+        self.event_history: deque = deque(maxlen=max_history)
+        
+        # Event type -> handlers, highest priority first; rebuilt on (un)subscribe
+        # so publishing is a lookup instead of a scan under the lock
+        self._dispatch: Dict[EventType, Tuple[EventHandler, ...]] = {}
         
         # Threading
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.lock = threading.RLock()
         
+        # Sync-to-async bridge: the loop async publishers run on, or a
+        # long-lived background loop when there is none
+        self._home_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge_thread: Optional[threading.Thread] = None
+        
         # Statistics
         self.total_events = 0
         self.total_handlers_called = 0
@@ -196,8 +231,18 @@ class EventBus:
         
         logger.info(f"Event bus initialized with {max_workers} workers")
     
+    @property
+    def max_history(self) -> int:
+        return self.event_history.maxlen
+    
+    @max_history.setter
+    def max_history(self, value: int):
+        with self.lock:
+            self.event_history = deque(self.event_history, maxlen=value)
+    
     def subscribe(self, event_types: Set[EventType], handler: Callable[[Event], Any],
-                 async_handler: bool = False, priority: int = 0) -> str:
+                 async_handler: bool = False, priority: int = 0,
+                 max_queue_size: int = 100) -> str:
         """
         Subscribe to events
         
@@ -205,17 +250,20 @@ class EventBus:
             event_types: Set of event types to handle
             handler: Event handler function
             async_handler: Whether handler is async
-            priority: Handler priority (higher = called first)
+            priority: Handler priority (higher = queued first)
+            max_queue_size: Events that may wait for this handler before
+                publishers are held back
             
         Returns:
             Handler ID for unsubscribing
         """
         with self.lock:
-            event_handler = EventHandler(handler, event_types, async_handler, priority)
+            event_handler = EventHandler(handler, event_types, async_handler, priority, max_queue_size)
             self.handlers.append(event_handler)
             
             # Sort handlers by priority (highest first)
             self.handlers.sort(key=lambda h: h.priority, reverse=True)
+            self._rebuild_dispatch()
             
             logger.info(f"Subscribed handler {event_handler.handler_id} to {len(event_types)} event types")
             return event_handler.handler_id
@@ -234,12 +282,22 @@ class EventBus:
             for i, handler in enumerate(self.handlers):
                 if handler.handler_id == handler_id:
                     del self.handlers[i]
+                    self._rebuild_dispatch()
+                    self._stop_workers(handler)
                     logger.info(f"Unsubscribed handler {handler_id}")
                     return True
             
             logger.warning(f"Handler {handler_id} not found for unsubscribe")
             return False
     
+    def _rebuild_dispatch(self):
+        """Recompute the event type -> handlers table (call with the lock held)"""
+        dispatch: Dict[EventType, List[EventHandler]] = {}
+        for handler in self.handlers:
+            for event_type in handler.event_types:
+                dispatch.setdefault(event_type, []).append(handler)
+        self._dispatch = {event_type: tuple(handlers) for event_type, handlers in dispatch.items()}
+    
     def add_filter(self, filter_func: Callable[[Event], bool]):
         """
         Add event filter
@@ -256,15 +314,22 @@ class EventBus:
             self.event_filters.remove(filter_func)
             logger.info("Removed event filter")
     
-    async def publish(self, event: Event) -> List[Any]:
+    async def publish(self, event: Event, wait: bool = True) -> List[Any]:
         """
         Publish event to all subscribers
         
+        The event is queued to every matching handler (highest priority
+        first) and the handlers run concurrently. Queuing waits while a
+        handler's queue is full.
+        
         Args:
             event: Event to publish
+            wait: Wait for the handlers and return their results; otherwise
+                return as soon as the event is queued
             
         Returns:
-            List of handler results
+            List of handler results (in priority order, failed handlers
+            omitted), or an empty list when not waiting
         """
         # Apply filters
         for filter_func in self.event_filters:
@@ -275,72 +340,177 @@ class EventBus:
             except Exception as e:
                 logger.error(f"Event filter error: {e}")
         
+        loop = asyncio.get_running_loop()
+        if loop is not self._bridge_loop:
+            self._home_loop = loop
+        
         # Add to history
         with self.lock:
             self.event_history.append(event)
-            if len(self.event_history) > self.max_history:
-                self.event_history = self.event_history[-self.max_history:]
-            
             self.total_events += 1
         
         # Find matching handlers
-        matching_handlers = []
-        with self.lock:
-            for handler in self.handlers:
-                if handler.can_handle(event):
-                    matching_handlers.append(handler)
+        matching_handlers = self._dispatch.get(event.event_type, ())
         
         if not matching_handlers:
             logger.debug(f"No handlers for event {event.event_type.value}")
             return []
         
-        # Execute handlers
-        results = []
+        # Queue to handlers
+        futures = []
         for handler in matching_handlers:
-            try:
-                with self.lock:
-                    self.total_handlers_called += 1
-                
-                result = await handler.handle(event)
-                results.append(result)
-                
-            except Exception as e:
-                with self.lock:
-                    self.total_errors += 1
-                
-                logger.error(f"Handler {handler.handler_id} failed for event {event.event_id}: {e}")
-                # Continue with other handlers
+            futures.append(await self._dispatch_to(handler, event, loop, wait))
         
         logger.debug(f"Published event {event.event_type.value} to {len(matching_handlers)} handlers")
-        return results
+        
+        if not wait:
+            return []
+        
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        return [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    
+    async def _dispatch_to(self, handler: EventHandler, event: Event,
+                           loop: asyncio.AbstractEventLoop, wait: bool) -> Optional[asyncio.Future]:
+        """Queue an event for a handler; returns a future for its result when waiting"""
+        chain = _dispatch_chain.get()
+        future = loop.create_future() if wait else None
+        
+        if handler.closed:
+            # Unsubscribed after this publish looked up its handlers
+            if future is not None:
+                future.cancel()
+            return future
+        
+        if handler.handler_id in chain:
+            # Published from within this handler (directly or through others):
+            # its worker is busy with the outer event, so run it inline
+            await self._run_handler(handler, event, future, chain)
+            return future
+        
+        queue = self._get_queue(handler, loop)
+        await queue.put((event, future, chain))
+        if handler.closed:
+            # Stopped while this publisher waited for room: nothing will
+            # drain the queue any more
+            self._drain_queue(queue)
+        return future
+    
+    def _get_queue(self, handler: EventHandler, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        """Handler's queue on this loop, starting its worker on first use"""
+        worker = handler.workers.get(loop)
+        if worker is None or worker[1].done():
+            # Forget workers of loops that have since closed
+            for stale in [l for l in handler.workers if l.is_closed()]:
+                del handler.workers[stale]
+            
+            queue = asyncio.Queue(maxsize=handler.max_queue_size)
+            task = loop.create_task(self._worker(handler, queue))
+            worker = handler.workers[loop] = (queue, task)
+        return worker[0]
+    
+    async def _worker(self, handler: EventHandler, queue: asyncio.Queue):
+        """Deliver a handler's queued events one at a time"""
+        while True:
+            event, future, chain = await queue.get()
+            try:
+                await self._run_handler(handler, event, future, chain)
+            finally:
+                queue.task_done()
+    
+    async def _run_handler(self, handler: EventHandler, event: Event,
+                           future: Optional[asyncio.Future], chain: FrozenSet[str]):
+        with self.lock:
+            self.total_handlers_called += 1
+        
+        token = _dispatch_chain.set(chain | {handler.handler_id})
+        try:
+            result = await handler.handle(event, self.executor)
+            if future is not None and not future.done():
+                future.set_result(result)
+        
+        except asyncio.CancelledError:
+            if future is not None and not future.done():
+                future.cancel()
+            raise
+        
+        except Exception as e:
+            with self.lock:
+                self.total_errors += 1
+            
+            logger.error(f"Handler {handler.handler_id} failed for event {event.event_id}: {e}")
+            if future is not None and not future.done():
+                future.set_exception(e)
+        
+        finally:
+            _dispatch_chain.reset(token)
+    
+    def _stop_workers(self, handler: EventHandler):
+        """Cancel a handler's worker tasks on every loop and drop their queued events"""
+        handler.closed = True
+        for loop, (queue, task) in list(handler.workers.items()):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._close_worker, queue, task)
+        handler.workers.clear()
+    
+    def _close_worker(self, queue: asyncio.Queue, task: asyncio.Task):
+        task.cancel()
+        self._drain_queue(queue)
+    
+    @staticmethod
+    def _drain_queue(queue: asyncio.Queue):
+        """
+        Cancel the futures of a stopped handler's queued events
+        
+        Each item taken wakes one publisher blocked on the full queue; that
+        publisher sees the handler is closed and drains again.
+        """
+        while True:
+            try:
+                _, future, _ = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            queue.task_done()
+            if future is not None and not future.done():
+                future.cancel()
     
     def publish_sync(self, event: Event) -> List[Any]:
         """
         Publish event synchronously
         
+        Runs the publish on the loop async publishers use when it is running
+        in another thread, otherwise on the bus's long-lived background loop,
+        and blocks until the handlers are done.
+        
         Args:
             event: Event to publish
             
         Returns:
             List of handler results
         """
-        # Check if we're already in an async context
         try:
-            loop = asyncio.get_running_loop()
-            # If we're in an async context, we can't use run_until_complete
-            # Instead, create a task and wait for it
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, self.publish(event))
-                return future.result()
+            running_loop = asyncio.get_running_loop()
         except RuntimeError:
-            # No running loop, safe to create one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.publish(event))
-            finally:
-                loop.close()
+            running_loop = None
+        
+        loop = self._home_loop
+        if loop is None or not loop.is_running() or loop is running_loop:
+            loop = self._get_bridge_loop()
+        if loop is running_loop:
+            raise RuntimeError("publish_sync cannot be called from a handler on the bridge loop; use publish")
+        
+        return asyncio.run_coroutine_threadsafe(self.publish(event), loop).result()
+    
+    def _get_bridge_loop(self) -> asyncio.AbstractEventLoop:
+        """Background event loop for sync publishers, started once"""
+        with self.lock:
+            if self._bridge_loop is None or self._bridge_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                self._bridge_thread = threading.Thread(
+                    target=loop.run_forever, name="event-bus-bridge", daemon=True
+                )
+                self._bridge_thread.start()
+                self._bridge_loop = loop
+            return self._bridge_loop
     
     def create_event(self, event_type: EventType, source: str, data: Dict[str, Any],
                     correlation_id: Optional[str] = None, priority: int = 0) -> Event:
@@ -398,12 +568,12 @@ class EventBus:
             List of historical events
         """
         with self.lock:
-            events = self.event_history
-            
-            if event_type:
-                events = [e for e in events if e.event_type == event_type]
-            
-            return events[-limit:] if limit > 0 else events
+            events = list(self.event_history)
+        
+        if event_type:
+            events = [e for e in events if e.event_type == event_type]
+        
+        return events[-limit:] if limit > 0 else events
     
     def get_handler_stats(self) -> List[Dict[str, Any]]:
         """
@@ -430,6 +600,9 @@ class EventBus:
                 'total_errors': self.total_errors,
                 'success_rate': (self.total_handlers_called - self.total_errors) / self.total_handlers_called if self.total_handlers_called > 0 else 0,
                 'event_history_size': len(self.event_history),
+                'queued_events': sum(
+                    queue.qsize() for handler in self.handlers for queue, _ in list(handler.workers.values())
+                ),
                 'active_filters': len(self.event_filters),
                 'timestamp': datetime.utcnow().isoformat()
             }
@@ -446,9 +619,21 @@ class EventBus:
         
         # Clear handlers
         with self.lock:
+            for handler in self.handlers:
+                self._stop_workers(handler)
             self.handlers.clear()
+            self._dispatch = {}
             self.event_filters.clear()
         
+        # Stop the sync bridge loop
+        if self._bridge_loop is not None and not self._bridge_loop.is_closed():
+            self._bridge_loop.call_soon_threadsafe(self._bridge_loop.stop)
+            self._bridge_thread.join(timeout=5)
+            if not self._bridge_loop.is_running():
+                self._bridge_loop.close()
+        self._bridge_loop = None
+        self._bridge_thread = None
+        
         # Shutdown executor
         self.executor.shutdown(wait=True)
         
@@ -11,6 +11,14 @@ from technical_analysis.indicators import (
     BollingerBands,
     MovingAverages
 )
+from technical_analysis.streaming import (
+    StreamingIndicators,
+    StreamingSMA,
+    StreamingEMA,
+    StreamingRSI,
+    StreamingMACD,
+    StreamingBollingerBands
+)
 from technical_analysis.signal_generator import (
     TechnicalSignalGenerator,
     SignalWeights
@@ -23,6 +31,12 @@ __all__ = [
     'MACDResult',
     'BollingerBands',
     'MovingAverages',
+    'StreamingIndicators',
+    'StreamingSMA',
+    'StreamingEMA',
+    'StreamingRSI',
+    'StreamingMACD',
+    'StreamingBollingerBands',
     'TechnicalSignalGenerator',
     'SignalWeights'
 ]
\ No newline at end of file
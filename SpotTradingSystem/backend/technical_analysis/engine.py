@@ -2,7 +2,7 @@
 Technical Analysis Engine
 Main interface for technical indicator calculations and signal generation
 """
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union, Iterable
 from datetime import datetime
 import logging
 import sys
@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.data_models import TechnicalSignal, MarketData
 from technical_analysis.indicators import TechnicalIndicators, TechnicalIndicatorCalculator
 from technical_analysis.signal_generator import TechnicalSignalGenerator, SignalWeights
+from technical_analysis.streaming import StreamingIndicators
 
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,7 @@ class TechnicalAnalysisEngine:
         """
         self.calculator = TechnicalIndicatorCalculator()
         self.signal_generator = TechnicalSignalGenerator(signal_weights)
+        self.stream = StreamingIndicators()
         self.logger = logging.getLogger(__name__)
     
     def extract_prices_from_market_data(self, market_data: List[MarketData]) -> List[float]:
@@ -134,6 +136,23 @@ class TechnicalAnalysisEngine:
             self.logger.error(f"Error calculating technical indicators: {e}")
             raise
     
+    def calculate_indicator_series(self, prices: List[float]) -> Dict[str, any]:
+        """
+        Calculate every indicator over the full price history in one pass
+        
+        Args:
+            prices: List or array of closing prices
+        
+        Returns:
+            Dict of NumPy arrays laid out like TechnicalIndicators.to_dict(),
+            NaN where there is not enough history yet
+        """
+        try:
+            return self.calculator.calculate_all_indicators_series(prices)
+        except Exception as e:
+            self.logger.error(f"Error calculating indicator series: {e}")
+            raise
+    
     def generate_technical_signals(self, indicators: TechnicalIndicators, 
                                  current_price: float) -> TechnicalSignal:
         """
@@ -210,6 +229,65 @@ class TechnicalAnalysisEngine:
             self.logger.error(f"Error in market analysis: {e}")
             raise
     
+    def warm_up_stream(self, prices: Iterable[float]):
+        """
+        Reset the streaming indicators and feed them historical prices
+        
+        Args:
+            prices: Closing prices in chronological order
+        """
+        self.stream.reset()
+        self.stream.warm_up(prices)
+    
+    def update_price(self, price: float, 
+                    timestamp: Optional[datetime] = None) -> Optional[Tuple[TechnicalIndicators, TechnicalSignal]]:
+        """
+        Ingest one new price into the streaming indicators and analyze it
+        
+        Each update costs the same regardless of how much history has been
+        seen, and the indicators equal calculate_all_indicators() over that
+        history.
+        
+        Args:
+            price: Latest price
+            timestamp: Time of the price (default now)
+        
+        Returns:
+            Tuple of (TechnicalIndicators, TechnicalSignal), or None while
+            fewer than get_required_data_length() prices have been seen
+        """
+        indicators = self.stream.update(price, timestamp)
+        if indicators is None:
+            return None
+        return indicators, self.generate_technical_signals(indicators, price)
+    
+    def generate_signals(self, market_data: List[Union[MarketData, Dict]]) -> List[TechnicalSignal]:
+        """
+        Stream market data points (MarketData or dicts with 'price' and
+        optional ISO 'timestamp') through the indicators
+        
+        Args:
+            market_data: New data points in chronological order
+        
+        Returns:
+            Signals for the points at which the indicators were ready
+        """
+        signals = []
+        for data in market_data:
+            if isinstance(data, MarketData):
+                price, timestamp = data.price, data.timestamp
+            else:
+                price = data.get('price')
+                if price is None:
+                    continue
+                timestamp = data.get('timestamp')
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+            result = self.update_price(float(price), timestamp)
+            if result is not None:
+                signals.append(result[1])
+        return signals
+    
     def get_signal_strength_score(self, signal: TechnicalSignal) -> float:
         """
         Get signal strength score (0-100)
@@ -2,9 +2,11 @@
 Technical Indicator Calculations
 Implements RSI, MACD, Moving Averages, and Bollinger Bands calculations
 """
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Any
 from dataclasses import dataclass
 import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime
 
 
@@ -74,6 +76,44 @@ class TechnicalIndicators:
         }
 
 
+def _recursive_ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = values[0], y[t] = alpha * values[t] + (1 - alpha) * y[t-1], in C via pandas"""
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _round(value: float, digits: int) -> float:
+    # Bit-for-bit the same as numpy's round() used by TechnicalIndicatorCalculator
+    scale = 10 ** digits
+    return round(float(value) * scale) / scale
+
+
+def _ema_step(ema: Optional[float], seed: List[float], price: float, period: int) -> Optional[float]:
+    """
+    Advance an EMA seeded with the SMA of the first `period` prices by one price
+    
+    `seed` collects prices until the EMA is seeded; returns None until then.
+    """
+    if ema is None:
+        seed.append(price)
+        if len(seed) < period:
+            return None
+        ema = np.mean(seed)
+        seed.clear()
+        return ema
+    multiplier = 2 / (period + 1)
+    return (price * multiplier) + (ema * (1 - multiplier))
+
+
+def _macd_result(macd_line: float, signal_ema: Optional[float]) -> MACDResult:
+    """MACDResult from the latest MACD line value and its (possibly unseeded) signal EMA"""
+    signal_line = _round(signal_ema, 2) if signal_ema is not None else macd_line
+    return MACDResult(
+        macd_line=_round(macd_line, 4),
+        signal_line=_round(signal_line, 4),
+        histogram=_round(macd_line - signal_line, 4)
+    )
+
+
 class TechnicalIndicatorCalculator:
     """Technical indicator calculation functions"""
     
@@ -179,35 +219,17 @@ class TechnicalIndicatorCalculator:
         if len(prices) < slow_period + signal_period:
             raise ValueError(f"Need at least {slow_period + signal_period} prices for MACD calculation")
         
-        # Calculate fast and slow EMAs
-        fast_ema = TechnicalIndicatorCalculator.calculate_ema(prices, fast_period)
-        slow_ema = TechnicalIndicatorCalculator.calculate_ema(prices, slow_period)
-        
-        # Calculate MACD line
-        macd_line = fast_ema - slow_ema
-        
-        # Calculate MACD values for signal line calculation
-        macd_values = []
-        for i in range(slow_period, len(prices) + 1):
-            if i >= slow_period:
-                fast_ema_temp = TechnicalIndicatorCalculator.calculate_ema(prices[:i], fast_period)
-                slow_ema_temp = TechnicalIndicatorCalculator.calculate_ema(prices[:i], slow_period)
-                macd_values.append(fast_ema_temp - slow_ema_temp)
-        
-        # Calculate signal line (EMA of MACD line)
-        if len(macd_values) >= signal_period:
-            signal_line = TechnicalIndicatorCalculator.calculate_ema(macd_values, signal_period)
-        else:
-            signal_line = macd_line
-        
-        # Calculate histogram
-        histogram = macd_line - signal_line
-        
-        return MACDResult(
-            macd_line=round(macd_line, 4),
-            signal_line=round(signal_line, 4),
-            histogram=round(histogram, 4)
-        )
+        # One pass over the prices: the signal line is the EMA of the MACD line
+        # at every prefix, kept up to date per price as StreamingMACD does
+        fast_ema = slow_ema = signal_ema = macd_line = None
+        fast_seed, slow_seed, signal_seed = [], [], []
+        for price in prices:
+            fast_ema = _ema_step(fast_ema, fast_seed, price, fast_period)
+            slow_ema = _ema_step(slow_ema, slow_seed, price, slow_period)
+            if slow_ema is not None:
+                macd_line = _round(fast_ema, 2) - _round(slow_ema, 2)
+                signal_ema = _ema_step(signal_ema, signal_seed, macd_line, signal_period)
+        return _macd_result(macd_line, signal_ema)
     
     @staticmethod
     def calculate_bollinger_bands(prices: List[float], period: int = 20, 
@@ -294,4 +316,188 @@ class TechnicalIndicatorCalculator:
             bollinger_bands=bollinger_bands,
             moving_averages=moving_averages,
             timestamp=datetime.now()
-        )
\ No newline at end of file
+        )
+    
+    # ------------------------------------------------------------------
+    # Full-series variants
+    #
+    # Each returns an array aligned with `prices` whose element i equals the
+    # scalar method applied to prices[:i + 1], and NaN where the scalar
+    # method would raise for lack of data.
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _ema_values(prices: np.ndarray, period: int) -> np.ndarray:
+        """Unrounded EMA series seeded with the SMA of the first `period` prices"""
+        out = np.full(len(prices), np.nan)
+        if len(prices) >= period:
+            seeded = np.concatenate(([np.mean(prices[:period])], prices[period:]))
+            out[period - 1:] = _recursive_ema(seeded, 2 / (period + 1))
+        return out
+    
+    @staticmethod
+    def calculate_rsi_series(prices: List[float], period: int = 14) -> np.ndarray:
+        """
+        Calculate the RSI (Wilder smoothing) for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+            period: RSI period (default 14)
+        
+        Returns:
+            Array of RSI values (NaN for the first `period` points)
+        """
+        prices = np.asarray(prices, dtype=float)
+        out = np.full(len(prices), np.nan)
+        if len(prices) < period + 1:
+            return out
+        
+        deltas = np.diff(prices)
+        gains = np.where(deltas > 0, deltas, 0)
+        losses = np.where(deltas < 0, -deltas, 0)
+        
+        # Wilder smoothing is an EMA with alpha = 1 / period
+        avg_gain = _recursive_ema(np.concatenate(([np.mean(gains[:period])], gains[period:])), 1 / period)
+        avg_loss = _recursive_ema(np.concatenate(([np.mean(losses[:period])], losses[period:])), 1 / period)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        out[period:] = np.where(avg_loss == 0, 100.0, np.round(rsi, 2))
+        return out
+    
+    @staticmethod
+    def calculate_sma_series(prices: List[float], period: int) -> np.ndarray:
+        """
+        Calculate the Simple Moving Average for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+            period: SMA period
+        
+        Returns:
+            Array of SMA values (NaN for the first `period - 1` points)
+        """
+        prices = np.asarray(prices, dtype=float)
+        out = np.full(len(prices), np.nan)
+        if len(prices) >= period:
+            out[period - 1:] = np.round(sliding_window_view(prices, period).mean(axis=1), 2)
+        return out
+    
+    @staticmethod
+    def calculate_ema_series(prices: List[float], period: int) -> np.ndarray:
+        """
+        Calculate the Exponential Moving Average for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+            period: EMA period
+        
+        Returns:
+            Array of EMA values (NaN for the first `period - 1` points)
+        """
+        prices = np.asarray(prices, dtype=float)
+        return np.round(TechnicalIndicatorCalculator._ema_values(prices, period), 2)
+    
+    @staticmethod
+    def calculate_macd_series(prices: List[float], fast_period: int = 12,
+                             slow_period: int = 26, signal_period: int = 9) -> Dict[str, np.ndarray]:
+        """
+        Calculate MACD, signal line and histogram for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+            fast_period: Fast EMA period (default 12)
+            slow_period: Slow EMA period (default 26)
+            signal_period: Signal line EMA period (default 9)
+        
+        Returns:
+            Dict of arrays keyed like MACDResult.to_dict()
+            (NaN for the first `slow_period + signal_period - 1` points)
+        """
+        prices = np.asarray(prices, dtype=float)
+        n = len(prices)
+        result = {key: np.full(n, np.nan) for key in ('macd_line', 'signal_line', 'histogram')}
+        first = slow_period + signal_period - 1
+        if n <= first:
+            return result
+        
+        calc = TechnicalIndicatorCalculator
+        macd_line = (np.round(calc._ema_values(prices, fast_period), 2)
+                     - np.round(calc._ema_values(prices, slow_period), 2))
+        signal_line = np.round(calc._ema_values(macd_line[slow_period - 1:], signal_period), 2)
+        macd_line = macd_line[slow_period - 1:]
+        
+        start = signal_period  # first complete signal value in the trimmed arrays
+        result['macd_line'][first:] = np.round(macd_line[start:], 4)
+        result['signal_line'][first:] = np.round(signal_line[start:], 4)
+        result['histogram'][first:] = np.round(macd_line[start:] - signal_line[start:], 4)
+        return result
+    
+    @staticmethod
+    def calculate_bollinger_bands_series(prices: List[float], period: int = 20,
+                                        std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+        """
+        Calculate Bollinger Bands for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+            period: Moving average period (default 20)
+            std_dev: Standard deviation multiplier (default 2.0)
+        
+        Returns:
+            Dict of arrays keyed like BollingerBands.to_dict()
+            (NaN for the first `period - 1` points)
+        """
+        prices = np.asarray(prices, dtype=float)
+        n = len(prices)
+        result = {key: np.full(n, np.nan) for key in ('upper_band', 'middle_band', 'lower_band')}
+        if n < period:
+            return result
+        
+        windows = sliding_window_view(prices, period)
+        middle_band = np.round(windows.mean(axis=1), 2)
+        width = std_dev * windows.std(axis=1)
+        result['upper_band'][period - 1:] = np.round(middle_band + width, 2)
+        result['middle_band'][period - 1:] = middle_band
+        result['lower_band'][period - 1:] = np.round(middle_band - width, 2)
+        return result
+    
+    @staticmethod
+    def calculate_moving_averages_series(prices: List[float]) -> Dict[str, np.ndarray]:
+        """
+        Calculate the moving averages for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+        
+        Returns:
+            Dict of arrays keyed like MovingAverages.to_dict()
+        """
+        calc = TechnicalIndicatorCalculator
+        return {
+            'sma_20': calc.calculate_sma_series(prices, 20),
+            'sma_50': calc.calculate_sma_series(prices, 50),
+            'ema_12': calc.calculate_ema_series(prices, 12),
+            'ema_26': calc.calculate_ema_series(prices, 26)
+        }
+    
+    @staticmethod
+    def calculate_all_indicators_series(prices: List[float]) -> Dict[str, Any]:
+        """
+        Calculate all technical indicators for every point of a price series
+        
+        Args:
+            prices: List or array of closing prices
+        
+        Returns:
+            Dict of arrays with the same layout as TechnicalIndicators.to_dict()
+            (without the timestamp)
+        """
+        prices = np.asarray(prices, dtype=float)
+        calc = TechnicalIndicatorCalculator
+        return {
+            'rsi': calc.calculate_rsi_series(prices),
+            'macd': calc.calculate_macd_series(prices),
+            'bollinger_bands': calc.calculate_bollinger_bands_series(prices),
+            'moving_averages': calc.calculate_moving_averages_series(prices)
+        }
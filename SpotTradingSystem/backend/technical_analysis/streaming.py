@@ -0,0 +1,302 @@
+"""
+Streaming Technical Indicators
+Stateful indicators that ingest one price at a time, with work per price
+independent of how much history has been seen
+"""
+from collections import deque
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from technical_analysis.indicators import (
+    TechnicalIndicators,
+    MACDResult,
+    BollingerBands,
+    MovingAverages,
+    _round,
+    _ema_step,
+    _macd_result
+)
+
+
+class StreamingSMA:
+    """
+    Simple moving average over a fixed window
+    
+    Updates only push into the window; the mean is taken over the window
+    (constant size) when read, so it rounds exactly like calculate_sma.
+    """
+    
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.reset()
+    
+    def reset(self):
+        self._window = deque(maxlen=self.period)
+    
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+    
+    @property
+    def window(self) -> deque:
+        """The last `period` prices"""
+        return self._window
+    
+    @property
+    def value(self) -> Optional[float]:
+        """Current average, or None until the window is full"""
+        if not self.ready:
+            return None
+        return np.mean(self._window)
+    
+    def update(self, price: float):
+        self._window.append(price)
+
+
+class StreamingEMA:
+    """Exponential moving average seeded with the SMA of the first `period` prices"""
+    
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.reset()
+    
+    def reset(self):
+        self._seed = []
+        self._ema = None
+    
+    @property
+    def ready(self) -> bool:
+        return self._ema is not None
+    
+    @property
+    def value(self) -> Optional[float]:
+        """Current EMA, or None until `period` prices have been seen"""
+        return self._ema
+    
+    def update(self, price: float) -> Optional[float]:
+        self._ema = _ema_step(self._ema, self._seed, price, self.period)
+        return self._ema
+
+
+class StreamingRSI:
+    """Relative Strength Index with Wilder smoothing"""
+    
+    def __init__(self, period: int = 14):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.reset()
+    
+    def reset(self):
+        self._prev_price = None
+        self._seed_gains = []
+        self._seed_losses = []
+        self._avg_gain = None
+        self._avg_loss = None
+    
+    @property
+    def ready(self) -> bool:
+        return self._avg_gain is not None
+    
+    @property
+    def value(self) -> Optional[float]:
+        """Current RSI (0-100, rounded like the calculator), or None until ready"""
+        if not self.ready:
+            return None
+        if self._avg_loss == 0:
+            return 100.0
+        rs = self._avg_gain / self._avg_loss
+        return _round(100 - (100 / (1 + rs)), 2)
+    
+    def update(self, price: float) -> Optional[float]:
+        if self._prev_price is not None:
+            delta = price - self._prev_price
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if self._avg_gain is None:
+                self._seed_gains.append(gain)
+                self._seed_losses.append(loss)
+                if len(self._seed_gains) == self.period:
+                    self._avg_gain = np.mean(self._seed_gains)
+                    self._avg_loss = np.mean(self._seed_losses)
+                    self._seed_gains, self._seed_losses = [], []
+            else:
+                self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+                self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        self._prev_price = price
+        return self.value
+
+
+class StreamingMACD:
+    """
+    MACD with signal line
+    
+    The MACD line fed to the signal EMA is the difference of the rounded fast
+    and slow EMAs, which is what TechnicalIndicatorCalculator.calculate_macd
+    computes for every prefix of the price history.
+    """
+    
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast = StreamingEMA(fast_period)
+        self.slow = StreamingEMA(slow_period)
+        self.signal = StreamingEMA(signal_period)
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self._macd_line = None
+        self._count = 0
+    
+    def reset(self):
+        self.fast.reset()
+        self.slow.reset()
+        self.signal.reset()
+        self._macd_line = None
+        self._count = 0
+    
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.slow_period + self.signal_period
+    
+    @property
+    def value(self) -> Optional[MACDResult]:
+        """Current MACD, or None until slow_period + signal_period prices have been seen"""
+        if not self.ready:
+            return None
+        return _macd_result(self._macd_line, self.signal.value)
+    
+    def update(self, price: float) -> Optional[MACDResult]:
+        self._count += 1
+        self.fast.update(price)
+        if self.slow.update(price) is not None:
+            self._macd_line = _round(self.fast.value, 2) - _round(self.slow.value, 2)
+            self.signal.update(self._macd_line)
+        return self.value
+
+
+class StreamingBollingerBands:
+    """Bollinger Bands from the rolling window's mean and population standard deviation"""
+    
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.sma = StreamingSMA(period)
+        self.period = period
+        self.std_dev = std_dev
+    
+    def reset(self):
+        self.sma.reset()
+    
+    @property
+    def ready(self) -> bool:
+        return self.sma.ready
+    
+    @property
+    def value(self) -> Optional[BollingerBands]:
+        """Current bands (rounded like the calculator), or None until the window is full"""
+        if not self.ready:
+            return None
+        middle_band = _round(self.sma.value, 2)
+        width = self.std_dev * np.std(self.sma.window)
+        return BollingerBands(
+            upper_band=_round(middle_band + width, 2),
+            middle_band=middle_band,
+            lower_band=_round(middle_band - width, 2)
+        )
+    
+    def update(self, price: float):
+        self.sma.update(price)
+
+
+class StreamingIndicators:
+    """
+    The full TechnicalIndicators set, updated one price at a time
+    
+    Produces the same snapshot as TechnicalIndicatorCalculator.calculate_all_indicators
+    on the price history seen so far, without re-reading that history.
+    """
+    
+    def __init__(self):
+        self.rsi = StreamingRSI(14)
+        self.macd = StreamingMACD(12, 26, 9)
+        self.bollinger = StreamingBollingerBands(20, 2.0)
+        self.sma_20 = StreamingSMA(20)
+        self.sma_50 = StreamingSMA(50)
+        self.count = 0
+        self.last_price = None
+    
+    @classmethod
+    def from_prices(cls, prices: Iterable[float]) -> 'StreamingIndicators':
+        """Create a stream warmed up with historical prices"""
+        stream = cls()
+        stream.warm_up(prices)
+        return stream
+    
+    def reset(self):
+        for indicator in (self.rsi, self.macd, self.bollinger, self.sma_20, self.sma_50):
+            indicator.reset()
+        self.count = 0
+        self.last_price = None
+    
+    @property
+    def ready(self) -> bool:
+        """True once enough prices have been seen for every indicator (50)"""
+        return self.count >= 50
+    
+    def warm_up(self, prices: Iterable[float]):
+        """Feed historical prices without building snapshots"""
+        for price in prices:
+            self._ingest(price)
+    
+    def _ingest(self, price: float):
+        price = float(price)
+        if price <= 0:
+            raise ValueError("Price must be positive")
+        self.rsi.update(price)
+        self.macd.update(price)
+        self.bollinger.update(price)
+        self.sma_20.update(price)
+        self.sma_50.update(price)
+        self.count += 1
+        self.last_price = price
+    
+    def update(self, price: float, timestamp: Optional[datetime] = None) -> Optional[TechnicalIndicators]:
+        """
+        Ingest one price
+        
+        Args:
+            price: Latest closing price
+            timestamp: Time of the price (default now)
+        
+        Returns:
+            Indicator snapshot, or None while warming up
+        """
+        self._ingest(price)
+        return self.snapshot(timestamp)
+    
+    def snapshot(self, timestamp: Optional[datetime] = None) -> Optional[TechnicalIndicators]:
+        """
+        Current indicator values
+        
+        Args:
+            timestamp: Snapshot timestamp (default now)
+        
+        Returns:
+            TechnicalIndicators, or None while warming up
+        """
+        if not self.ready:
+            return None
+        return TechnicalIndicators(
+            rsi=self.rsi.value,
+            macd=self.macd.value,
+            bollinger_bands=self.bollinger.value,
+            moving_averages=MovingAverages(
+                sma_20=_round(self.sma_20.value, 2),
+                sma_50=_round(self.sma_50.value, 2),
+                ema_12=_round(self.macd.fast.value, 2),
+                ema_26=_round(self.macd.slow.value, 2)
+            ),
+            timestamp=timestamp or datetime.now()
+        )
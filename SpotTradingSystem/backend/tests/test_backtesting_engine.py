@@ -3,6 +3,7 @@ Unit tests for the backtesting engine
 Tests backtest result accuracy and performance metrics calculation
 """
 import unittest
+import numpy as np
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -13,7 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backtesting.engine import (
-    BacktestEngine, PerformanceMetrics, BacktestTrade, BacktestResult
+    BacktestEngine, PerformanceMetrics, BacktestTrade, BacktestResult, EquityCurve
 )
 from core.data_models import (
     MarketData, TradingDecision, ActionType, Portfolio, Position, SentimentScore, TechnicalSignal
@@ -476,6 +477,89 @@ class TestBacktestEngine(unittest.TestCase):
         # Verify decision engine was called
         self.assertTrue(mock_decision_engine.analyze_market_conditions.called)
         self.assertTrue(mock_decision_engine.generate_trading_decision.called)
+    
+    def _volatile_market_data(self, n: int = 400) -> list:
+        """Random walk volatile enough for the SMA crossover to trade"""
+        rng = np.random.default_rng(0)
+        prices = 45000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        return [
+            MarketData(symbol="BTCUSDT", price=float(round(p, 2)), volume=float(rng.uniform(50, 150)),
+                       timestamp=self.start_date + timedelta(hours=i), source="test")
+            for i, p in enumerate(prices)
+        ]
+    
+    def test_fast_mode_matches_bar_by_bar_backtest(self):
+        """Test fast mode gives the same trades, equity and metrics as the regular loop"""
+        data = self._volatile_market_data()
+        rng = np.random.default_rng(4)
+        sentiment_data = [
+            {
+                'timestamp': (self.start_date + timedelta(hours=int(h), minutes=int(m))).isoformat(),
+                'sentiment_value': float(v),
+                'confidence': 0.8
+            }
+            for h, m, v in zip(rng.integers(0, 400, 60), rng.integers(0, 60, 60), rng.uniform(0, 100, 60))
+        ]
+        strategy_config = {
+            'risk_parameters': RiskParameters(
+                trade_cooldown_minutes=0,  # cooldown uses wall-clock time
+                min_confidence_threshold=0.4,
+                high_confidence_threshold=0.8,
+                max_portfolio_risk=0.9
+            ).to_dict()
+        }
+        
+        for sentiment in (None, sentiment_data):
+            regular = self.engine.run_backtest(
+                data[0].timestamp, data[-1].timestamp, strategy_config, data, sentiment
+            )
+            fast = self.engine.run_backtest(
+                data[0].timestamp, data[-1].timestamp, strategy_config, data, sentiment, fast_mode=True
+            )
+            
+            self.assertGreater(len(regular.trades), 0 if sentiment is None else 10)
+            self.assertEqual(
+                [(t.timestamp, t.action, t.quantity, t.portfolio_value_after) for t in fast.trades],
+                [(t.timestamp, t.action, t.quantity, t.portfolio_value_after) for t in regular.trades]
+            )
+            self.assertEqual(fast.performance_metrics.to_dict(), regular.performance_metrics.to_dict())
+            self.assertIsInstance(fast.equity_curve, EquityCurve)
+            self.assertEqual(list(fast.equity_curve), regular.equity_curve)
+            self.assertEqual(list(fast.drawdown_curve), regular.drawdown_curve)
+            self.assertEqual(len(fast.portfolio_history), len(fast.trades))
+    
+    def test_align_sentiment_matches_nearest_lookup(self):
+        """Test the as-of sentiment join against the per-bar scan"""
+        sentiment_data = [
+            {'timestamp': (self.start_date + timedelta(hours=h)).isoformat(), 'sentiment_value': v, 'confidence': 0.8}
+            for h, v in [(5, 70.0), (5, 20.0), (3, 65.0), (40, 10.0), (7, 90.0)]
+        ]
+        timestamps = [self.start_date + timedelta(minutes=30 * k) for k in range(100)]
+        
+        rows, values = self.engine._align_sentiment(sentiment_data, timestamps)
+        
+        for i, timestamp in enumerate(timestamps):
+            expected = self.engine._get_sentiment_for_timestamp(sentiment_data, timestamp)
+            self.assertEqual(values[i], expected.sentiment_value)
+            if rows[i] < 0:
+                self.assertEqual(expected.key_factors, ["no_sentiment_data"])
+        # Duplicate timestamps and equidistant neighbours resolve to the first matching input row
+        self.assertEqual(rows[10], 0)
+        self.assertEqual(rows[8], 0)
+        self.assertEqual(rows[7], 2)
+    
+    def test_equity_curve_sequence(self):
+        """Test EquityCurve behaves like a list of (timestamp, value) tuples"""
+        timestamps = [self.start_date + timedelta(hours=i) for i in range(5)]
+        curve = EquityCurve(timestamps, np.array([100.0, 110.0, 105.0, 120.0, 90.0]))
+        as_list = list(zip(timestamps, [100.0, 110.0, 105.0, 120.0, 90.0]))
+        
+        self.assertEqual(len(curve), 5)
+        self.assertEqual(curve[-1], as_list[-1])
+        self.assertEqual(list(curve[-2:]), as_list[-2:])
+        self.assertEqual(self.engine._calculate_max_drawdown(curve), self.engine._calculate_max_drawdown(as_list))
+        self.assertEqual(list(self.engine._calculate_drawdown_curve(curve)), self.engine._calculate_drawdown_curve(as_list))
+        np.testing.assert_array_equal(self.engine._calculate_returns(curve), self.engine._calculate_returns(as_list))
 
 
 class TestPerformanceMetrics(unittest.TestCase):
@@ -534,6 +618,7 @@ class TestPerformanceMetrics(unittest.TestCase):
         self.assertEqual(result_dict['end_date'], end_date.isoformat())
 
 
+
 class TestBacktestTrade(unittest.TestCase):
     """Test cases for BacktestTrade"""
     
@@ -0,0 +1,190 @@
+"""
+Unit tests for the strategy optimizer
+Tests grid expansion, parallel sweeps, pruning and walk-forward folds
+"""
+import unittest
+import tempfile
+import json
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.engine import BacktestEngine
+from backtesting.optimizer import StrategyOptimizer, expand_grid, list_reports
+from core.data_models import MarketData
+
+
+class TestStrategyOptimizer(unittest.TestCase):
+    """Test cases for StrategyOptimizer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(1)
+        self.start_date = datetime(2024, 1, 1)
+        prices = 45000 * np.exp(np.cumsum(rng.normal(0, 0.01, 1200)))
+        self.market_data = [
+            MarketData(symbol="BTCUSDT", price=float(round(p, 2)), volume=float(rng.uniform(50, 150)),
+                       timestamp=self.start_date + timedelta(hours=i), source="test")
+            for i, p in enumerate(prices)
+        ]
+        self.sentiment_data = [
+            {
+                'timestamp': (self.start_date + timedelta(hours=int(h))).isoformat(),
+                'sentiment_value': float(v),
+                'confidence': 0.8
+            }
+            for h, v in zip(rng.integers(0, 1200, 240), rng.uniform(0, 100, 240))
+        ]
+        # Cooldown off: the decision engine measures it in wall-clock time
+        self.base_parameters = {
+            'trade_cooldown_minutes': 0,
+            'max_portfolio_risk': 0.9,
+            'high_confidence_threshold': 0.9
+        }
+        self.grid = {
+            'sentiment_weight': [0.2, 0.5],
+            'min_confidence_threshold': [0.4, 0.6, 0.95],
+            'max_position_size': [0.05, 0.2]
+        }
+        self.results_dir = tempfile.mkdtemp()
+    
+    def _optimizer(self, **kwargs) -> StrategyOptimizer:
+        return StrategyOptimizer(
+            self.market_data, self.sentiment_data,
+            base_parameters=self.base_parameters,
+            results_dir=self.results_dir,
+            **{'max_workers': 1, **kwargs}
+        )
+    
+    def test_expand_grid(self):
+        """Test grid expansion fills the paired weight and drops invalid combinations"""
+        configs = expand_grid(self.grid, self.base_parameters)
+        
+        # min_confidence_threshold 0.95 is above high_confidence_threshold 0.9
+        self.assertEqual(len(configs), 8)
+        for config in configs:
+            self.assertAlmostEqual(config['sentiment_weight'] + config['technical_weight'], 1.0)
+        
+        with self.assertRaises(ValueError):
+            expand_grid({'no_such_parameter': [1]})
+    
+    def test_sweep_matches_individual_backtests(self):
+        """Test leaderboard metrics equal standalone backtests and are ranked by the objective"""
+        report = self._optimizer().run_sweep(self.grid)
+        
+        self.assertEqual(report.summary['completed'], 8)
+        scores = [entry.score for entry in report.leaderboard]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual([entry.rank for entry in report.leaderboard], list(range(1, 9)))
+        
+        best = report.best
+        result = BacktestEngine().run_backtest(
+            self.market_data[0].timestamp, self.market_data[-1].timestamp,
+            {'risk_parameters': {**self.base_parameters, **best.parameters}},
+            self.market_data, self.sentiment_data, fast_mode=True
+        )
+        self.assertEqual(best.metrics, result.performance_metrics.to_dict())
+        self.assertEqual(best.score, result.performance_metrics.sharpe_ratio)
+    
+    def test_process_pool_matches_in_process(self):
+        """Test the worker pool produces the same leaderboard as running in-process"""
+        inline = self._optimizer().run_sweep(self.grid, save=False)
+        pooled = self._optimizer(max_workers=2).run_sweep(self.grid, save=False)
+        
+        self.assertEqual(
+            [entry.to_dict() for entry in pooled.leaderboard],
+            [entry.to_dict() for entry in inline.leaderboard]
+        )
+    
+    def test_pruning(self):
+        """Test screening drops the bottom fraction and configurations over the drawdown limit"""
+        optimizer = self._optimizer()
+        report = optimizer.run_sweep(self.grid, prune_fraction=0.5, save=False)
+        
+        self.assertEqual(report.summary['pruned'], 4)
+        self.assertEqual(report.summary['completed'], 4)
+        statuses = [entry.status for entry in report.leaderboard]
+        self.assertEqual(statuses, ['completed'] * 4 + ['pruned'] * 4)
+        
+        report = optimizer.run_sweep(self.grid, max_drawdown_limit=0.0, save=False)
+        self.assertTrue(all(
+            entry.status == 'pruned' or entry.metrics['max_drawdown'] == 0.0
+            for entry in report.leaderboard
+        ))
+        
+        with self.assertRaises(ValueError):
+            optimizer.run_sweep(self.grid, prune_fraction=1.0)
+    
+    def test_configs_without_trades_rank_last(self):
+        """Test runs that never trade are not ranked by their infinite profit factor"""
+        optimizer = self._optimizer(objective='profit_factor')
+        report = optimizer.run_sweep(self.grid)
+        
+        idle = [entry for entry in report.leaderboard if entry.metrics['total_trades'] == 0]
+        self.assertTrue(idle)
+        self.assertTrue(all(entry.score == float('-inf') for entry in idle))
+        scored = [math.isfinite(entry.score) for entry in report.leaderboard]
+        self.assertTrue(scored[0])
+        self.assertEqual(scored, sorted(scored, reverse=True))
+        
+        def reject(constant):
+            raise ValueError(f"non-finite value {constant} in report")
+        
+        with open(os.path.join(self.results_dir, f"{report.id}.json"), 'r', encoding='utf-8') as f:
+            saved = json.load(f, parse_constant=reject)
+        self.assertIsNone(saved['leaderboard'][-1]['score'])
+        
+        walk_forward = optimizer.walk_forward(self.grid, train_days=20, test_days=5)
+        with open(os.path.join(self.results_dir, f"{walk_forward.id}.json"), 'r', encoding='utf-8') as f:
+            json.load(f, parse_constant=reject)
+    
+    def test_max_workers_capped_at_cpu_count(self):
+        """Test worker count requests beyond the CPU count are clamped"""
+        optimizer = self._optimizer(max_workers=10_000)
+        self.assertEqual(optimizer.max_workers, os.cpu_count() or 1)
+    
+    def test_walk_forward(self):
+        """Test walk-forward folds use disjoint train/test windows and pick the training leader"""
+        optimizer = self._optimizer()
+        report = optimizer.walk_forward(self.grid, train_days=20, test_days=5)
+        
+        # Hourly data ends an hour short of day 50: folds start on days 0, 5, ..., 20
+        self.assertEqual(len(report.folds), 5)
+        for fold in report.folds:
+            self.assertLess(fold.train_end, fold.test_start)
+            self.assertEqual(fold.test_start - fold.train_start, timedelta(days=20))
+            self.assertIn('total_return', fold.test_metrics)
+        
+        first = report.folds[0]
+        sweep = optimizer.run_sweep(self.grid, first.train_start, first.train_end, save=False)
+        self.assertEqual(first.best_config_id, sweep.best.config_id)
+        self.assertEqual(first.train_score, sweep.best.score)
+        
+        self.assertEqual(sum(entry.metrics['folds_selected'] for entry in report.leaderboard), 5)
+        self.assertEqual(report.summary['folds_tested'], 5)
+        
+        with self.assertRaises(ValueError):
+            optimizer.walk_forward(self.grid, train_days=60, test_days=5)
+    
+    def test_reports_are_saved(self):
+        """Test reports are written as JSON and listed newest first"""
+        optimizer = self._optimizer()
+        sweep = optimizer.run_sweep(self.grid)
+        walk_forward = optimizer.walk_forward(self.grid, train_days=30, test_days=10)
+        
+        with open(os.path.join(self.results_dir, f"{sweep.id}.json"), 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertEqual(saved['leaderboard'][0]['config_id'], sweep.best.config_id)
+        self.assertEqual(saved['settings']['grid'], self.grid)
+        
+        self.assertEqual([report['id'] for report in list_reports(self.results_dir)], [walk_forward.id, sweep.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Unit tests for the event bus
+Tests concurrent dispatch, per-handler queues, history and the sync bridge
+"""
+import asyncio
+import threading
+import time
+import sys
+import os
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from system_integration.event_bus import EventBus, EventType
+
+
+@pytest.fixture
+def event_bus():
+    bus = EventBus()
+    yield bus
+    bus.shutdown()
+
+
+class TestEventBus:
+    """Test cases for EventBus"""
+    
+    @pytest.mark.asyncio
+    async def test_slow_handler_does_not_delay_others(self, event_bus):
+        """A slow, higher-priority handler runs alongside the others"""
+        delivered = {}
+        
+        async def slow_sentiment(event):
+            await asyncio.sleep(0.3)
+            return "sentiment"
+        
+        async def risk_management(event):
+            delivered['risk'] = time.perf_counter()
+            return "risk"
+        
+        event_bus.subscribe({EventType.PRICE_UPDATE}, slow_sentiment, async_handler=True, priority=10)
+        event_bus.subscribe({EventType.PRICE_UPDATE}, risk_management, async_handler=True)
+        
+        start = time.perf_counter()
+        results = await event_bus.publish_new(EventType.PRICE_UPDATE, "test", {'price': 45000.0})
+        
+        # Results keep priority order; the fast handler was not held up
+        assert results == ["sentiment", "risk"]
+        assert delivered['risk'] - start < 0.1
+    
+    @pytest.mark.asyncio
+    async def test_dispatch_by_event_type(self, event_bus):
+        """Only handlers subscribed to the event type are called, failures are skipped"""
+        calls = []
+        
+        def failing(event):
+            raise ValueError("boom")
+        
+        event_bus.subscribe({EventType.ORDER_FILLED}, lambda e: calls.append('order') or 'order')
+        event_bus.subscribe({EventType.ORDER_FILLED, EventType.RISK_ALERT}, failing)
+        handler_id = event_bus.subscribe({EventType.RISK_ALERT}, lambda e: 'alert')
+        
+        assert await event_bus.publish_new(EventType.ORDER_FILLED, "test", {}) == ['order']
+        assert await event_bus.publish_new(EventType.RISK_ALERT, "test", {}) == ['alert']
+        assert await event_bus.publish_new(EventType.HEALTH_CHECK, "test", {}) == []
+        
+        assert event_bus.unsubscribe(handler_id)
+        assert await event_bus.publish_new(EventType.RISK_ALERT, "test", {}) == []
+        
+        stats = event_bus.get_bus_stats()
+        assert stats['total_handlers_called'] == 5
+        assert stats['total_errors'] == 3
+        assert calls == ['order']
+    
+    @pytest.mark.asyncio
+    async def test_bounded_queue_applies_backpressure(self, event_bus):
+        """Publishing without waiting blocks once a handler's queue is full, and keeps order"""
+        seen = []
+        
+        async def handler(event):
+            await asyncio.sleep(0.05)
+            seen.append(event.data['i'])
+        
+        event_bus.subscribe({EventType.PRICE_UPDATE}, handler, async_handler=True, max_queue_size=2)
+        
+        start = time.perf_counter()
+        for i in range(6):
+            await event_bus.publish(event_bus.create_event(EventType.PRICE_UPDATE, "test", {'i': i}), wait=False)
+        elapsed = time.perf_counter() - start
+        
+        # Room for two queued events plus the one being handled
+        assert elapsed >= 0.1
+        assert event_bus.get_handler_stats()[0]['queued_events'] <= 2
+        
+        await asyncio.sleep(0.3)
+        assert seen == list(range(6))
+    
+    @pytest.mark.asyncio
+    async def test_unsubscribe_releases_queued_publishers(self, event_bus):
+        """Unsubscribing drops queued events and wakes every publisher waiting on the handler"""
+        async def slow(event):
+            await asyncio.sleep(10)
+        
+        handler_id = event_bus.subscribe({EventType.PRICE_UPDATE}, slow, async_handler=True)
+        waiting = [
+            asyncio.ensure_future(event_bus.publish_new(EventType.PRICE_UPDATE, "test", {'i': i}))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        
+        assert event_bus.unsubscribe(handler_id)
+        results = await asyncio.wait_for(asyncio.gather(*waiting), timeout=2)
+        assert results == [[], [], []]
+    
+    @pytest.mark.asyncio
+    async def test_unsubscribe_releases_publishers_blocked_on_full_queue(self, event_bus):
+        """Publishers held back by a full queue return once the handler is removed"""
+        async def slow(event):
+            await asyncio.sleep(10)
+        
+        handler_id = event_bus.subscribe({EventType.PRICE_UPDATE}, slow, async_handler=True, max_queue_size=1)
+        blocked = [
+            asyncio.ensure_future(event_bus.publish(
+                event_bus.create_event(EventType.PRICE_UPDATE, "test", {'i': i}), wait=False
+            ))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.05)
+        assert sum(task.done() for task in blocked) == 2
+        
+        assert event_bus.unsubscribe(handler_id)
+        await asyncio.wait_for(asyncio.gather(*blocked), timeout=2)
+        assert event_bus.get_bus_stats()['queued_events'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_handler_can_publish_to_itself(self, event_bus):
+        """Re-entrant publishing runs inline instead of waiting on the handler's own queue"""
+        async def countdown(event):
+            n = event.data['n']
+            if n == 0:
+                return 0
+            results = await event_bus.publish_new(EventType.SIGNAL_GENERATED, "test", {'n': n - 1})
+            return results[0] + 1
+        
+        event_bus.subscribe({EventType.SIGNAL_GENERATED}, countdown, async_handler=True)
+        
+        results = await asyncio.wait_for(
+            event_bus.publish_new(EventType.SIGNAL_GENERATED, "test", {'n': 3}), timeout=2
+        )
+        assert results == [3]
+    
+    def test_history_is_bounded(self, event_bus):
+        """Event history keeps the most recent max_history events"""
+        event_bus.max_history = 5
+        for i in range(8):
+            event_bus.publish_sync(event_bus.create_event(EventType.PRICE_UPDATE, "test", {'i': i}))
+        event_bus.publish_sync(event_bus.create_event(EventType.HEALTH_CHECK, "test", {}))
+        
+        history = event_bus.get_event_history()
+        assert [e.data.get('i') for e in history] == [4, 5, 6, 7, None]
+        assert [e.data['i'] for e in event_bus.get_event_history(EventType.PRICE_UPDATE, limit=2)] == [6, 7]
+    
+    def test_publish_sync_reuses_one_loop(self, event_bus):
+        """Synchronous publishing runs on a single long-lived background loop"""
+        loops = set()
+        
+        async def handler(event):
+            loops.add(asyncio.get_running_loop())
+            return event.data['i']
+        
+        event_bus.subscribe({EventType.PRICE_UPDATE}, handler, async_handler=True)
+        
+        results = [
+            event_bus.publish_sync(event_bus.create_event(EventType.PRICE_UPDATE, "test", {'i': i}))
+            for i in range(3)
+        ]
+        assert results == [[0], [1], [2]]
+        assert len(loops) == 1
+        
+        event_bus.shutdown()
+        assert not any(thread.name == "event-bus-bridge" for thread in threading.enumerate())
+    
+    @pytest.mark.asyncio
+    async def test_publish_sync_from_thread_uses_running_loop(self, event_bus):
+        """Sync publishers in other threads are bridged onto the loop the async side runs on"""
+        loops = []
+        
+        async def handler(event):
+            loops.append(asyncio.get_running_loop())
+            return "handled"
+        
+        event_bus.subscribe({EventType.PRICE_UPDATE}, handler, async_handler=True)
+        await event_bus.publish_new(EventType.PRICE_UPDATE, "test", {})
+        
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, event_bus.publish_sync, event_bus.create_event(EventType.PRICE_UPDATE, "test", {})
+        )
+        
+        assert result == ["handled"]
+        assert loops == [asyncio.get_running_loop()] * 2
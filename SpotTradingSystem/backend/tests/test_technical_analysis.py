@@ -1,6 +1,7 @@
 """
 Tests for Technical Analysis Engine
 """
+import numpy as np
 import pytest
 import sys
 import os
@@ -12,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from technical_analysis.engine import TechnicalAnalysisEngine
 from technical_analysis.indicators import TechnicalIndicatorCalculator
 from technical_analysis.signal_generator import TechnicalSignalGenerator, SignalWeights
+from technical_analysis.streaming import StreamingIndicators, StreamingMACD
 from core.data_models import MarketData, SignalType
 
 
@@ -79,6 +81,38 @@ class TestTechnicalIndicatorCalculator:
         assert hasattr(ma, 'ema_26')
         assert all(avg > 0 for avg in [ma.sma_20, ma.sma_50, ma.ema_12, ma.ema_26])
 
+    
+    def test_series_match_scalar_calculations(self):
+        """Test full-series indicators equal the scalar result on every prefix"""
+        rng = np.random.default_rng(11)
+        prices = list(np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.01, 120))), 2))
+        series = self.calculator.calculate_all_indicators_series(prices)
+        
+        for i in range(len(prices)):
+            window = prices[:i + 1]
+            if i < 14:
+                assert np.isnan(series['rsi'][i])
+            else:
+                assert series['rsi'][i] == self.calculator.calculate_rsi(window)
+            if i < 34:
+                assert np.isnan(series['macd']['signal_line'][i])
+            else:
+                assert {k: v[i] for k, v in series['macd'].items()} == self.calculator.calculate_macd(window).to_dict()
+            if i >= 19:
+                bands = {k: v[i] for k, v in series['bollinger_bands'].items()}
+                assert bands == self.calculator.calculate_bollinger_bands(window).to_dict()
+            if i >= 49:
+                averages = {k: v[i] for k, v in series['moving_averages'].items()}
+                assert averages == self.calculator.calculate_moving_averages(window).to_dict()
+    
+    def test_series_with_short_input(self):
+        """Test series are all NaN when there is not enough data"""
+        series = self.calculator.calculate_macd_series(self.prices[:30])
+        assert len(series['macd_line']) == 30
+        assert np.all(np.isnan(series['histogram']))
+        assert np.isnan(self.calculator.calculate_sma_series(self.prices[:5], 10)).all()
+        assert len(self.calculator.calculate_rsi_series([])) == 0
+
 
 class TestTechnicalSignalGenerator:
     """Test signal generation"""
@@ -263,6 +297,73 @@ class TestTechnicalAnalysisEngine:
         assert required_length == 50
         assert isinstance(required_length, int)
 
+    
+    def test_streaming_updates_match_full_analysis(self):
+        """Test per-tick streaming analysis against full recalculation"""
+        assert self.engine.update_price(self.prices[0]) is None
+        self.engine.warm_up_stream(self.prices[:-1])
+        indicators, signals = self.engine.update_price(self.prices[-1])
+        expected_indicators, expected_signals = self.engine.analyze_market_from_prices(self.prices)
+        
+        assert indicators.to_dict()['macd'] == expected_indicators.to_dict()['macd']
+        assert indicators.rsi == expected_indicators.rsi
+        assert signals.to_dict() == expected_signals.to_dict()
+    
+    def test_generate_signals_from_price_updates(self):
+        """Test streaming PRICE_UPDATE payloads and MarketData objects"""
+        updates = [{'symbol': 'BTCUSDT', 'price': d.price, 'timestamp': d.timestamp.isoformat()}
+                   for d in self.market_data[:49]]
+        assert self.engine.generate_signals(updates) == []
+        
+        signals = self.engine.generate_signals(self.market_data[49:])
+        assert len(signals) == 1
+        assert signals[0].to_dict() == self.engine.analyze_market_from_data(self.market_data)[1].to_dict()
+
+
+class TestStreamingIndicators:
+    """Test incremental indicator updates"""
+    
+    def setup_method(self):
+        """Setup a random walk long enough for every indicator"""
+        rng = np.random.default_rng(7)
+        self.prices = list(np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.01, 300))), 2))
+    
+    def test_snapshot_matches_calculator_at_every_step(self):
+        """Test streaming snapshots equal calculate_all_indicators on each prefix"""
+        stream = StreamingIndicators()
+        for i, price in enumerate(self.prices, start=1):
+            snapshot = stream.update(price)
+            if i < 50:
+                assert snapshot is None
+                continue
+            expected = TechnicalIndicatorCalculator.calculate_all_indicators(self.prices[:i]).to_dict()
+            actual = snapshot.to_dict()
+            expected.pop('timestamp')
+            actual.pop('timestamp')
+            assert actual == expected
+    
+    def test_macd_matches_prefix_definition(self):
+        """Test the MACD signal line is the EMA of the MACD line at every prefix"""
+        calc = TechnicalIndicatorCalculator
+        macd_values = [calc.calculate_ema(self.prices[:i], 12) - calc.calculate_ema(self.prices[:i], 26)
+                       for i in range(26, len(self.prices) + 1)]
+        macd = StreamingMACD()
+        for price in self.prices:
+            result = macd.update(price)
+        
+        assert result.macd_line == pytest.approx(macd_values[-1], abs=1e-9)
+        assert result.signal_line == pytest.approx(calc.calculate_ema(macd_values, 9), abs=1e-9)
+    
+    def test_reset_and_invalid_price(self):
+        """Test reset clears state and non-positive prices are rejected"""
+        stream = StreamingIndicators.from_prices(self.prices)
+        assert stream.ready
+        stream.reset()
+        assert not stream.ready
+        assert stream.snapshot() is None
+        with pytest.raises(ValueError):
+            stream.update(0.0)
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file